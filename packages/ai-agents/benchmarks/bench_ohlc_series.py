@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark: list of OHLCData dataclasses vs columnar OHLCSeries on 365-day windows
+
+Run from packages/ai-agents:
+    python -m benchmarks.bench_ohlc_series [--candles 4d 4h 1h 30m] [--repeat 20]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, List
+
+import numpy as np
+
+from src.ohlc_series import OHLCSeries
+
+DAY_MS = 86_400_000
+CANDLE_MS = {"4d": 4 * DAY_MS, "4h": 4 * 3_600_000, "1h": 3_600_000, "30m": 1_800_000}
+
+
+@dataclass
+class OHLCData:
+    """The per-candle representation get_historical_prices used to return"""
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+def build_window(candle_ms: int, days: int = 365) -> np.ndarray:
+    """Random-walk candles, as (N, 5) rows like an OHLCStore window"""
+    count = days * DAY_MS // candle_ms
+    rng = np.random.default_rng(42)
+    close = 60_000 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, count)) * close
+    ts = (1_700_000_000_000 // candle_ms) * candle_ms + candle_ms * np.arange(count)
+    return np.column_stack([ts, open_, np.maximum(open_, close) + spread, np.minimum(open_, close) - spread, close])
+
+
+def legacy_build(rows: np.ndarray) -> List[OHLCData]:
+    return [
+        OHLCData(timestamp=int(r[0]), open=float(r[1]), high=float(r[2]), low=float(r[3]), close=float(r[4]))
+        for r in rows.tolist()
+    ]
+
+
+def legacy_json(candles: List[OHLCData]) -> str:
+    """What api.get_price_history did: a dict per candle, then jsonify"""
+    return json.dumps([
+        {'timestamp': c.timestamp, 'date': c.timestamp, 'open': c.open, 'high': c.high, 'low': c.low, 'close': c.close}
+        for c in candles
+    ])
+
+
+def legacy_resample(candles: List[OHLCData], interval_ms: int) -> List[OHLCData]:
+    out: List[OHLCData] = []
+    for c in candles:
+        bucket = c.timestamp // interval_ms * interval_ms
+        if out and out[-1].timestamp == bucket:
+            last = out[-1]
+            last.high = max(last.high, c.high)
+            last.low = min(last.low, c.low)
+            last.close = c.close
+        else:
+            out.append(OHLCData(bucket, c.open, c.high, c.low, c.close))
+    return out
+
+
+def best_ms(fn: Callable, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def retained_kb(build: Callable) -> float:
+    """Memory still held by what `build` returns"""
+    tracemalloc.start()
+    value = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return current / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candles", nargs="+", default=list(CANDLE_MS), choices=list(CANDLE_MS))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print("=" * 112)
+    print("365-day OHLC window — list[OHLCData] vs OHLCSeries (best of %d)" % args.repeat)
+    print("=" * 112)
+    print(f"{'candle':>6} {'rows':>7} | {'build ms':>17} | {'to JSON ms':>17} | {'binary ms':>9} | "
+          f"{'1w resample ms':>17} | {'memory KB':>17} | {'end-to-end':>10}")
+    print(f"{'':>6} {'':>7} | {'list':>8} {'series':>8} | {'list':>8} {'series':>8} | {'series':>9} | "
+          f"{'list':>8} {'series':>8} | {'list':>8} {'series':>8} | {'speedup':>10}")
+
+    week_ms = 7 * DAY_MS
+    for name in args.candles:
+        rows = build_window(CANDLE_MS[name])
+        candles = legacy_build(rows)
+        series = OHLCSeries.from_rows(rows)
+        assert json.loads(legacy_json(candles)) == json.loads(series.to_json({'timestamp': ['date']}))
+        assert len(legacy_resample(candles, week_ms)) == len(series.resample(week_ms))
+
+        build = (best_ms(lambda: legacy_build(rows), args.repeat), best_ms(lambda: OHLCSeries.from_rows(rows), args.repeat))
+        to_json = (
+            best_ms(lambda: legacy_json(candles), args.repeat),
+            best_ms(lambda: series.to_json({'timestamp': ['date']}), args.repeat),
+        )
+        binary = best_ms(series.to_bytes, args.repeat)
+        resample = (
+            best_ms(lambda: legacy_resample(legacy_build(rows), week_ms), args.repeat),
+            best_ms(lambda: series.resample(week_ms), args.repeat),
+        )
+        memory = (retained_kb(lambda: legacy_build(rows)), retained_kb(lambda: OHLCSeries.from_rows(rows)))
+        speedup = (build[0] + to_json[0]) / (build[1] + to_json[1])
+
+        print(f"{name:>6} {len(rows):>7,} | {build[0]:>8.2f} {build[1]:>8.3f} | {to_json[0]:>8.2f} {to_json[1]:>8.2f} | "
+              f"{binary:>9.3f} | {resample[0]:>8.2f} {resample[1]:>8.3f} | {memory[0]:>8.0f} {memory[1]:>8.0f} | {speedup:>9.1f}x")
+
+    print("\n'build' turns store rows into the in-memory representation; 'end-to-end' is build + JSON,")
+    print("i.e. one /api/prices/history response. 'binary' is the format=binary body (no JSON at all).")
+    print("The list resample includes building the list.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-wakeup cost of the cooldown scheduler vs a full-scan round
+
+Run from packages/ai-agents:
+    python -m benchmarks.bench_scheduler [--users 100000]
+"""
+import argparse
+import random
+import time
+
+from src.scheduler import CooldownScheduler
+
+
+def build_users(count: int, now: int, spread: int):
+    """Synthetic users with due times spread over `spread` seconds"""
+    return {f"0x{i:040x}": now + random.randint(0, spread) for i in range(count)}
+
+
+def full_scan(due_times: dict, now: int, cooldown: int) -> int:
+    """Baseline: check every user's cooldown (what run_multi_user_loop does)"""
+    due = 0
+    for user, due_at in due_times.items():
+        if now >= due_at:
+            due += 1
+            due_times[user] = now + cooldown
+    return due
+
+
+def scheduled(scheduler: CooldownScheduler, now: int, cooldown: int) -> int:
+    """Scheduler: pop only the due users and reschedule them"""
+    due_users = scheduler.pop_due(now)
+    for user in due_users:
+        scheduler.schedule(user, now + cooldown)
+    return len(due_users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--spread", type=int, default=3600, help="due-time spread in seconds")
+    parser.add_argument("--cooldown", type=int, default=3600)
+    args = parser.parse_args()
+
+    random.seed(42)
+    now = int(time.time())
+    users = build_users(args.users, now, args.spread)
+
+    scheduler = CooldownScheduler()
+    for user, due_at in users.items():
+        scheduler.schedule(user, due_at)
+    scan_state = dict(users)
+
+    print("=" * 70)
+    print(f"Scheduler benchmark — {args.users:,} users, due times spread over {args.spread}s")
+    print("=" * 70)
+    print(f"{'step (s)':>9} {'due':>8} {'scan ms':>10} {'heap ms':>10} {'heap µs/due':>12}")
+
+    clock = now
+    for step in (1, 5, 30, 60, 300, 900):
+        clock += step
+
+        started = time.perf_counter()
+        scan_due = full_scan(scan_state, clock, args.cooldown)
+        scan_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        heap_due = scheduled(scheduler, clock, args.cooldown)
+        heap_ms = (time.perf_counter() - started) * 1000
+
+        assert scan_due == heap_due
+        per_due = heap_ms * 1000 / heap_due if heap_due else 0.0
+        print(f"{step:>9} {heap_due:>8,} {scan_ms:>10.2f} {heap_ms:>10.2f} {per_due:>12.2f}")
+
+    print("\nScan cost tracks the total user count; heap cost tracks the number of due users.")
+    print("In production each scanned user also costs a getUserPreferences read; due users only here.")
+
+
+if __name__ == "__main__":
+    main()
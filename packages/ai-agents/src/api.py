@@ -1,8 +1,9 @@
 """
 REST API for serving price data to frontend
 """
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
+import json
 import sys
 import os
 
@@ -83,6 +84,9 @@ def get_price_history():
     Query params:
         symbol: Token symbol (e.g., "BTC", "ETH")
         days: Number of days of history (default: 30)
+        interval: Optional coarser candle size, e.g. "1d", "1w" (resampled locally)
+        format: "json" (default, array of candle objects), "columns" (one array per
+            field) or "binary" (little-endian float64 rows: timestamp, open, high, low, close)
 
     Returns:
         JSON with historical OHLC data
@@ -90,6 +94,8 @@ def get_price_history():
     try:
         symbol = request.args.get('symbol', 'BTC').upper()
         days = int(request.args.get('days', 30))
+        interval = request.args.get('interval')
+        output = request.args.get('format', 'json')
 
         # Validate days parameter
         if days not in [1, 7, 14, 30, 90, 180, 365]:
@@ -97,38 +103,39 @@ def get_price_history():
 
         logger.info(f"Fetching {days} days of historical data for {symbol}")
 
-        ohlc_data = price_service.get_historical_prices(symbol, days)
+        series = price_service.get_historical_prices(symbol, days)
 
-        if not ohlc_data:
+        if not len(series):
             return jsonify({
                 'success': False,
                 'error': f'No historical data available for {symbol}'
             }), 404
 
-        # Format response for frontend
-        formatted_data = [
-            {
-                'timestamp': item.timestamp,
-                'date': item.timestamp,  # Frontend expects 'date' field
-                'open': item.open,
-                'high': item.high,
-                'low': item.low,
-                'close': item.close
-            }
-            for item in ohlc_data
-        ]
+        if interval:
+            series = series.resample(_parse_interval(interval))
 
-        result = {
-            'success': True,
-            'data': {
-                'symbol': symbol,
-                'days': days,
-                'count': len(formatted_data),
-                'ohlc': formatted_data
-            }
-        }
+        if output == 'binary':
+            return Response(series.to_bytes(), mimetype='application/octet-stream', headers={
+                'X-OHLC-Symbol': symbol,
+                'X-OHLC-Fields': 'timestamp,open,high,low,close'
+            })
 
-        return jsonify(result)
+        if output == 'columns':
+            return jsonify({
+                'success': True,
+                'data': {
+                    'symbol': symbol,
+                    'days': days,
+                    'count': len(series),
+                    'columns': series.to_columns()
+                }
+            })
+
+        # Frontend format, serialized straight from the columns ('date' mirrors 'timestamp')
+        body = '{"success": true, "data": {"symbol": %s, "days": %d, "count": %d, "ohlc": %s}}' % (
+            json.dumps(symbol), days, len(series), series.to_json({'timestamp': ['date']})
+        )
+        return Response(body, mimetype='application/json')
 
     except ValueError as e:
         logger.error(f"Invalid parameter: {e}")
@@ -144,6 +151,23 @@ def get_price_history():
         }), 500
 
 
+def _parse_interval(interval: str) -> int:
+    """
+    Candle size from "30m", "4h", "1d", "1w" (ValueError otherwise)
+
+    Args:
+        interval: Number followed by a unit
+
+    Returns:
+        Interval in ms
+    """
+    units = {'m': 60_000, 'h': 3_600_000, 'd': 86_400_000, 'w': 604_800_000}
+    count, unit = interval[:-1], interval[-1:].lower()
+    if unit not in units or not count.isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid interval: {interval}")
+    return int(count) * units[unit]
+
+
 @app.route('/api/prices/cache', methods=['GET'])
 def get_cache_info():
     """
@@ -157,7 +181,8 @@ def get_cache_info():
 
         return jsonify({
             'success': True,
-            'data': cache_info
+            'data': cache_info,
+            'stats': price_service.get_stats()  # upstream calls, throttled/queued counts
         })
 
     except Exception as e:
@@ -0,0 +1,138 @@
+"""Non-blocking chain access on AsyncWeb3 with a pooled aiohttp session"""
+from typing import Any, Dict, Optional
+import aiohttp
+from web3 import AsyncWeb3, AsyncHTTPProvider
+
+from .batch_reader import decode_function_result
+
+
+class AsyncChainClient:
+    """
+    Async counterpart of the orchestrator's sync Web3 calls.
+
+    Reads, gas price lookups, sends and receipt waits all await on a single
+    pooled aiohttp session, so one slow RPC never blocks the event loop.
+    Contract functions are still built with the sync contract objects from
+    the ContractRegistry; only the transport is async.
+    """
+
+    def __init__(
+        self,
+        provider_uri: str,
+        pool_size: int = 32,
+        request_timeout: int = 30
+    ):
+        """
+        Initialize async client (the HTTP session is opened lazily)
+
+        Args:
+            provider_uri: JSON-RPC endpoint
+            pool_size: Max concurrent connections in the aiohttp pool
+            request_timeout: Per-request timeout in seconds
+        """
+        self.provider_uri = provider_uri
+        self.pool_size = pool_size
+        self.request_timeout = request_timeout
+        self.w3 = AsyncWeb3(AsyncHTTPProvider(
+            provider_uri,
+            request_kwargs={'timeout': aiohttp.ClientTimeout(total=request_timeout)}
+        ))
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._chain_id: Optional[int] = None
+
+    async def _ensure_session(self):
+        """Open the pooled session on first use and hand it to the provider"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size)
+            )
+            await self.w3.provider.cache_async_session(self._session)
+
+    async def close(self):
+        """Close the pooled HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def eth_call(self, tx: Dict, block_identifier: Any = 'latest') -> bytes:
+        """
+        Raw eth_call
+
+        Args:
+            tx: Transaction dict with at least `to` and `data`
+            block_identifier: Block to execute against
+
+        Returns:
+            Raw return data
+        """
+        await self._ensure_session()
+        return await self.w3.eth.call(tx, block_identifier)
+
+    async def call(self, fn, block_identifier: Any = 'latest') -> Any:
+        """
+        Execute a bound contract read and decode it like ContractFunction.call()
+
+        Args:
+            fn: Bound contract function (e.g. contract.functions.getUserState(user))
+            block_identifier: Block to execute against
+
+        Returns:
+            Decoded call result
+        """
+        data = await self.eth_call(
+            {'to': fn.address, 'data': fn._encode_transaction_data()},
+            block_identifier
+        )
+        return decode_function_result(self.w3, fn, data)
+
+    async def get_code(self, address: str) -> bytes:
+        """Deployed bytecode at `address`"""
+        await self._ensure_session()
+        return await self.w3.eth.get_code(address)
+
+    async def chain_id(self) -> int:
+        """Chain id (fetched once)"""
+        if self._chain_id is None:
+            await self._ensure_session()
+            self._chain_id = await self.w3.eth.chain_id
+        return self._chain_id
+
+    async def block_number(self) -> int:
+        """Latest block number"""
+        await self._ensure_session()
+        return await self.w3.eth.block_number
+
+    async def get_block(self, block_identifier: Any = 'latest') -> Dict:
+        """Block header (without full transactions)"""
+        await self._ensure_session()
+        return await self.w3.eth.get_block(block_identifier)
+
+    async def gas_price(self) -> int:
+        """Current legacy gas price in wei"""
+        await self._ensure_session()
+        return await self.w3.eth.gas_price
+
+    async def max_priority_fee(self) -> int:
+        """Suggested EIP-1559 priority fee in wei"""
+        await self._ensure_session()
+        return await self.w3.eth.max_priority_fee
+
+    async def estimate_gas(self, tx: Dict) -> int:
+        """Gas estimate for a transaction dict"""
+        await self._ensure_session()
+        return await self.w3.eth.estimate_gas(tx)
+
+    async def get_transaction_count(self, address: str, block_identifier: Any = 'latest') -> int:
+        """Account nonce at `block_identifier`"""
+        await self._ensure_session()
+        return await self.w3.eth.get_transaction_count(address, block_identifier)
+
+    async def send_raw_transaction(self, raw_tx: bytes):
+        """Broadcast a signed transaction and return its hash"""
+        await self._ensure_session()
+        return await self.w3.eth.send_raw_transaction(raw_tx)
+
+    async def get_transaction_receipt(self, tx_hash):
+        """Receipt for `tx_hash`, raising TransactionNotFound while pending"""
+        await self._ensure_session()
+        return await self.w3.eth.get_transaction_receipt(tx_hash)
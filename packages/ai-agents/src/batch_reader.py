@@ -0,0 +1,386 @@
+"""Batched chain state reader using Multicall3 aggregate calls"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from web3 import Web3
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+
+from .contract_registry import ContractRegistry
+from .models import AgentConfig, AgentState, Position
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+MULTICALL3_ABI = [
+    {
+        "name": "aggregate3",
+        "type": "function",
+        "stateMutability": "payable",
+        "inputs": [
+            {
+                "name": "calls",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "allowFailure", "type": "bool"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+            }
+        ],
+        "outputs": [
+            {
+                "name": "returnData",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "success", "type": "bool"},
+                    {"name": "returnData", "type": "bytes"},
+                ],
+            }
+        ],
+    }
+]
+
+
+def decode_function_result(w3, fn, data: bytes) -> Any:
+    """
+    Decode raw eth_call return data the same way ContractFunction.call() does
+
+    Args:
+        w3: Web3 or AsyncWeb3 instance (only its codec is used)
+        fn: Bound contract function the data was returned for
+        data: ABI-encoded return data
+
+    Returns:
+        Decoded (and address-checksummed) result
+    """
+    output_types = get_abi_output_types(fn.abi)
+    decoded = w3.codec.decode(output_types, bytes(data))
+    normalized = map_abi_data(BASE_RETURN_NORMALIZERS, output_types, decoded)
+    return normalized[0] if len(normalized) == 1 else normalized
+
+
+def parse_user_positions(positions_data: Sequence) -> List[Position]:
+    """
+    Convert a getUserPositions result into Position models
+
+    Args:
+        positions_data: Tuple list (protocol, asset, amount, entryPrice, timestamp, stopLoss, takeProfit)
+
+    Returns:
+        List of positions with amounts and prices unscaled from 10^18
+    """
+    return [
+        Position(
+            protocol=pos[0],
+            asset=pos[1],
+            amount=float(Web3.from_wei(pos[2], 'ether')),
+            entry_price=float(pos[3]) / 1e18,  # Price values ARE in wei (scaled by 10^18), unscale them
+            timestamp=pos[4],
+            stop_loss=float(pos[5]) / 1e18,
+            take_profit=float(pos[6]) / 1e18
+        )
+        for pos in positions_data
+    ]
+
+
+def parse_user_state(state: Sequence, positions: List[Position]) -> AgentState:
+    """
+    Convert a getUserState result into an AgentState model
+
+    Args:
+        state: (config, rwaCollateral, collateralAmount, borrowedUSDC, availableCredit, totalAssets, ...)
+        positions: Already-parsed positions for the user
+
+    Returns:
+        AgentState
+    """
+    config_tuple = state[0]
+    return AgentState(
+        config=AgentConfig(
+            owner=config_tuple[0],
+            risk_tolerance=config_tuple[1],
+            target_roi=config_tuple[2] / 10000.0,  # Convert from basis points
+            max_drawdown=config_tuple[3] / 10000.0,  # Convert from basis points
+            strategies=list(config_tuple[4])
+        ),
+        rwa_collateral=state[1],
+        collateral_amount=float(Web3.from_wei(state[2], 'ether')),
+        borrowed_usdc=float(Web3.from_wei(state[3], 'ether')),
+        available_credit=float(Web3.from_wei(state[4], 'ether')),
+        total_assets=float(Web3.from_wei(state[5], 'ether')),
+        positions=positions
+    )
+
+
+def parse_user_preferences(prefs: Sequence) -> Dict:
+    """
+    Convert a getUserPreferences result into a preferences dict
+
+    Args:
+        prefs: (autoDecisionsEnabled, decisionController, maxBorrowPerDecision,
+                cooldownPeriod, lastDecisionTime, strategy)
+
+    Returns:
+        Dict keyed by the Solidity field names
+    """
+    return {
+        'autoDecisionsEnabled': prefs[0],
+        'decisionController': prefs[1],
+        'maxBorrowPerDecision': prefs[2],
+        'cooldownPeriod': prefs[3],
+        'lastDecisionTime': prefs[4],
+        'strategy': prefs[5]
+    }
+
+
+class BatchStateReader:
+    """
+    Reads user preferences, state and positions for many users per round-trip.
+
+    Calls are packed into Multicall3 `aggregate3` batches of `batch_size` users.
+    When no Multicall3 contract is deployed the reader falls back to one
+    eth_call per user and function.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        contracts: ContractRegistry,
+        multicall_address: Optional[str] = None,
+        batch_size: int = 100,
+        eth_call: Optional[Callable[[Dict], Awaitable[bytes]]] = None,
+        get_code: Optional[Callable[[str], Awaitable[bytes]]] = None,
+        call: Optional[Callable[[Any], Awaitable[Any]]] = None
+    ):
+        """
+        Initialize batch reader
+
+        Args:
+            w3: Web3 instance (used for codec and the default eth_call)
+            contracts: Shared contract registry
+            multicall_address: Multicall3 address (default: canonical deployment)
+            batch_size: Users per aggregate call
+            eth_call: Optional coroutine performing a raw eth_call for a tx dict
+            get_code: Optional coroutine returning deployed bytecode for an address
+            call: Optional coroutine executing one bound contract function (fallback path)
+        """
+        self.w3 = w3
+        self.contracts = contracts
+        self.multicall_address = multicall_address or MULTICALL3_ADDRESS
+        self.batch_size = max(1, batch_size)
+        self._eth_call = eth_call or self._threaded_eth_call
+        self._get_code = get_code or self._threaded_get_code
+        self._call = call or self._threaded_call
+        self._multicall = None
+        self._has_multicall: Optional[bool] = None
+        self._stats = {
+            "round_trips": 0,
+            "batched_calls": 0,
+            "fallback_calls": 0,
+            "failed_calls": 0,
+        }
+
+    async def _threaded_eth_call(self, tx: Dict) -> bytes:
+        """Default eth_call on the sync provider, off the event loop"""
+        return await asyncio.to_thread(self.w3.eth.call, tx)
+
+    async def _threaded_call(self, fn) -> Any:
+        """Default single contract read on the sync provider, off the event loop"""
+        return await asyncio.to_thread(fn.call)
+
+    async def _threaded_get_code(self, address: str) -> bytes:
+        """Default eth_getCode on the sync provider, off the event loop"""
+        return await asyncio.to_thread(self.w3.eth.get_code, address)
+
+    async def has_multicall(self) -> bool:
+        """
+        Check (once) whether Multicall3 is deployed on the connected chain
+
+        Returns:
+            True if the multicall address has code
+        """
+        if self._has_multicall is None:
+            try:
+                code = await self._get_code(self.contracts.checksum(self.multicall_address))
+                self._has_multicall = len(code) > 0
+            except Exception as e:
+                print(f"Warning: Could not check for Multicall3 deployment: {e}")
+                self._has_multicall = False
+
+            if not self._has_multicall:
+                print(f"⚠️  Multicall3 not found at {self.multicall_address}, using per-user calls")
+
+        return self._has_multicall
+
+    def _get_multicall(self):
+        """Multicall3 contract instance (ABI is embedded, no artifact needed)"""
+        if self._multicall is None:
+            self.contracts.register_abi("Multicall3", MULTICALL3_ABI)
+            self._multicall = self.contracts.get_contract("Multicall3", self.multicall_address)
+        return self._multicall
+
+    def decode_result(self, fn, data: bytes) -> Any:
+        """Decode raw return data for a bound contract function"""
+        return decode_function_result(self.w3, fn, data)
+
+    async def aggregate(self, fns: Sequence) -> List[Tuple[bool, Any]]:
+        """
+        Execute bound contract reads, batched through Multicall3 when available
+
+        Args:
+            fns: Bound contract functions (e.g. contract.functions.getUserState(user))
+
+        Returns:
+            List of (success, decoded result) in the same order as `fns`
+        """
+        if not fns:
+            return []
+
+        if not await self.has_multicall():
+            return await self._aggregate_fallback(fns)
+
+        multicall = self._get_multicall()
+        calls = [(fn.address, True, fn._encode_transaction_data()) for fn in fns]
+        raw = await self._eth_call({
+            'to': multicall.address,
+            'data': multicall.encodeABI(fn_name="aggregate3", args=[calls])
+        })
+        self._stats["round_trips"] += 1
+        self._stats["batched_calls"] += len(fns)
+
+        results = self.decode_result(multicall.functions.aggregate3(calls), raw)
+        decoded: List[Tuple[bool, Any]] = []
+        for fn, (success, data) in zip(fns, results):
+            if not success:
+                self._stats["failed_calls"] += 1
+                decoded.append((False, None))
+                continue
+            try:
+                decoded.append((True, self.decode_result(fn, data)))
+            except Exception:
+                self._stats["failed_calls"] += 1
+                decoded.append((False, None))
+        return decoded
+
+    async def _aggregate_fallback(self, fns: Sequence) -> List[Tuple[bool, Any]]:
+        """One eth_call per function, issued concurrently"""
+        async def call_one(fn) -> Tuple[bool, Any]:
+            try:
+                return True, await self._call(fn)
+            except Exception:
+                self._stats["failed_calls"] += 1
+                return False, None
+
+        self._stats["fallback_calls"] += len(fns)
+        self._stats["round_trips"] += len(fns)
+        return list(await asyncio.gather(*(call_one(fn) for fn in fns)))
+
+    def _chunks(self, users: Sequence[str]):
+        for i in range(0, len(users), self.batch_size):
+            yield users[i:i + self.batch_size]
+
+    async def read_preferences(self, agent_id: str, users: Sequence[str]) -> Dict[str, Dict]:
+        """
+        Read getUserPreferences for many users
+
+        Args:
+            agent_id: Agent contract address
+            users: User wallet addresses
+
+        Returns:
+            Dict mapping user address to preferences (users whose call failed are omitted)
+        """
+        contract = self.contracts.agent(agent_id)
+        preferences: Dict[str, Dict] = {}
+
+        for chunk in self._chunks(list(users)):
+            fns = [contract.functions.getUserPreferences(self.contracts.checksum(u)) for u in chunk]
+            for user, (success, prefs) in zip(chunk, await self.aggregate(fns)):
+                if success:
+                    preferences[user] = parse_user_preferences(prefs)
+
+        return preferences
+
+    async def read_positions(self, agent_id: str, users: Sequence[str]) -> Dict[str, List[Position]]:
+        """
+        Read getUserPositions for many users
+
+        Args:
+            agent_id: Agent contract address
+            users: User wallet addresses
+
+        Returns:
+            Dict mapping user address to positions (users whose call failed are omitted)
+        """
+        contract = self.contracts.agent(agent_id)
+        positions: Dict[str, List[Position]] = {}
+
+        for chunk in self._chunks(list(users)):
+            fns = [contract.functions.getUserPositions(self.contracts.checksum(u)) for u in chunk]
+            for user, (success, data) in zip(chunk, await self.aggregate(fns)):
+                if success:
+                    positions[user] = parse_user_positions(data)
+
+        return positions
+
+    async def read_states(
+        self,
+        agent_id: str,
+        users: Sequence[str],
+        known_positions: Optional[Dict[str, List[Position]]] = None
+    ) -> Dict[str, AgentState]:
+        """
+        Read getUserState and getUserPositions for many users
+
+        Args:
+            agent_id: Agent contract address
+            users: User wallet addresses
+            known_positions: Positions already known (e.g. from the event index);
+                             getUserPositions is skipped for these users
+
+        Returns:
+            Dict mapping user address to AgentState (users whose state call failed are omitted)
+        """
+        contract = self.contracts.agent(agent_id)
+        known_positions = known_positions or {}
+        states: Dict[str, AgentState] = {}
+
+        for chunk in self._chunks(list(users)):
+            fns = []
+            slots = []  # (user, state index, positions index or None)
+            for user in chunk:
+                user_addr = self.contracts.checksum(user)
+                fns.append(contract.functions.getUserState(user_addr))
+                state_index = len(fns) - 1
+                positions_index = None
+                if user not in known_positions:
+                    fns.append(contract.functions.getUserPositions(user_addr))
+                    positions_index = len(fns) - 1
+                slots.append((user, state_index, positions_index))
+
+            results = await self.aggregate(fns)
+            for user, state_index, positions_index in slots:
+                state_ok, state = results[state_index]
+                if not state_ok:
+                    continue
+                if positions_index is None:
+                    positions = known_positions[user]
+                else:
+                    positions_ok, positions_data = results[positions_index]
+                    positions = parse_user_positions(positions_data) if positions_ok else []
+                states[user] = parse_user_state(state, positions)
+
+        return states
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching counters
+
+        Returns:
+            Dictionary with round-trip and call counters
+        """
+        return {
+            **self._stats,
+            "multicall_available": self._has_multicall,
+            "batch_size": self.batch_size,
+        }
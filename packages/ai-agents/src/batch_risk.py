@@ -0,0 +1,213 @@
+"""Vectorized risk assessment for every user in one NumPy pass"""
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from .models import AgentState, MarketData, RiskReport
+from .config import config
+
+
+class UserRiskArrays:
+    """
+    Column-per-field view of many users' agent state.
+
+    Positions are flattened into parallel arrays (owner index, asset code)
+    so per-user concentration can be computed without Python loops.
+    """
+
+    def __init__(
+        self,
+        users: Sequence[str],
+        collateral: np.ndarray,
+        borrowed: np.ndarray,
+        credit: np.ndarray,
+        position_owner: np.ndarray,
+        position_asset: np.ndarray
+    ):
+        """
+        Args:
+            users: User addresses, row order of the arrays
+            collateral: Collateral amount per user
+            borrowed: Borrowed USDC per user
+            credit: Available credit per user
+            position_owner: Row index of the user owning each position
+            position_asset: Integer asset code of each position
+        """
+        self.users = list(users)
+        self.collateral = np.asarray(collateral, dtype=np.float64)
+        self.borrowed = np.asarray(borrowed, dtype=np.float64)
+        self.credit = np.asarray(credit, dtype=np.float64)
+        self.position_owner = np.asarray(position_owner, dtype=np.int64)
+        self.position_asset = np.asarray(position_asset, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    @classmethod
+    def from_states(cls, states: Dict[str, AgentState]) -> "UserRiskArrays":
+        """Build arrays from per-user AgentState objects"""
+        users = list(states)
+        n = len(users)
+        collateral = np.empty(n)
+        borrowed = np.empty(n)
+        credit = np.empty(n)
+        owners: List[int] = []
+        assets: List[str] = []
+
+        for i, user in enumerate(users):
+            state = states[user]
+            collateral[i] = state.collateral_amount
+            borrowed[i] = state.borrowed_usdc
+            credit[i] = state.available_credit
+            for position in state.positions:
+                owners.append(i)
+                assets.append(position.asset)
+
+        if assets:
+            _, asset_codes = np.unique(np.array(assets), return_inverse=True)
+        else:
+            asset_codes = np.empty(0, dtype=np.int64)
+        return cls(users, collateral, borrowed, credit, np.array(owners, dtype=np.int64), asset_codes)
+
+
+class BatchRiskResult:
+    """Per-user risk metrics as arrays, with RiskReports built on demand"""
+
+    def __init__(
+        self,
+        users: List[str],
+        collateral_ratio: np.ndarray,
+        utilization: np.ndarray,
+        concentration: np.ndarray,
+        overall_risk: np.ndarray,
+        low_collateral: np.ndarray,
+        high_utilization: np.ndarray,
+        high_concentration: np.ndarray,
+        volatility_score: float,
+        liquidity_score: float
+    ):
+        self.users = users
+        self.collateral_ratio = collateral_ratio
+        self.utilization = utilization
+        self.concentration = concentration
+        self.overall_risk = overall_risk
+        self.low_collateral = low_collateral
+        self.high_utilization = high_utilization
+        self.high_concentration = high_concentration
+        self.volatility_score = volatility_score
+        self.liquidity_score = liquidity_score
+        self._index = {user: i for i, user in enumerate(users)}
+
+    @property
+    def breached_mask(self) -> np.ndarray:
+        """True for users with at least one threshold breached"""
+        return self.low_collateral | self.high_utilization | self.high_concentration
+
+    @property
+    def breached(self) -> List[str]:
+        """Users with at least one threshold breached"""
+        return [self.users[i] for i in np.flatnonzero(self.breached_mask)]
+
+    def _warnings(self, i: int) -> List[str]:
+        # Same wording as SimpleDecisionEngine._assess_risk
+        warnings = []
+        if self.low_collateral[i]:
+            warnings.append(f"Collateral ratio ({self.collateral_ratio[i]:.2f}x) below minimum ({config.MIN_COLLATERAL_RATIO}x)")
+        if self.high_utilization[i]:
+            warnings.append(f"High utilization rate: {self.utilization[i]:.1%}")
+        if self.high_concentration[i]:
+            warnings.append(f"High concentration risk: {self.concentration[i]:.1%} in single asset")
+        return warnings
+
+    def report(self, user: str) -> RiskReport:
+        """RiskReport for one user"""
+        i = self._index[user]
+        ratio = float(self.collateral_ratio[i])
+        return RiskReport(
+            collateral_ratio=ratio if np.isfinite(ratio) else 0.0,
+            utilization_rate=float(self.utilization[i]),
+            volatility_score=self.volatility_score,
+            liquidity_score=self.liquidity_score,
+            concentration_risk=float(self.concentration[i]),
+            overall_risk=float(self.overall_risk[i]),
+            warnings=self._warnings(i)
+        )
+
+    def reports(self, users: Optional[Sequence[str]] = None) -> Dict[str, RiskReport]:
+        """RiskReports for `users` (default: all)"""
+        return {user: self.report(user) for user in (self.users if users is None else users)}
+
+
+class BatchRiskEngine:
+    """
+    Computes every RiskReport field for all users at once.
+
+    Produces the same numbers and warnings as SimpleDecisionEngine._assess_risk,
+    but as array arithmetic over all users rather than a Python loop per user.
+    """
+
+    def assess_arrays(self, arrays: UserRiskArrays, market_data: MarketData) -> BatchRiskResult:
+        """
+        Vectorized risk pass over pre-built arrays
+
+        Args:
+            arrays: Column view of all users' state
+            market_data: Current market data
+
+        Returns:
+            BatchRiskResult with per-user metrics and breach masks
+        """
+        n = len(arrays)
+        borrowed, credit = arrays.borrowed, arrays.credit
+
+        denominator = borrowed + credit
+        utilization = np.divide(borrowed, denominator, out=np.zeros(n), where=denominator > 0)
+        collateral_ratio = np.divide(arrays.collateral, borrowed, out=np.full(n, np.inf), where=borrowed > 0)
+
+        # Concentration: largest same-asset position count / position count
+        position_count = np.bincount(arrays.position_owner, minlength=n)
+        concentration = np.zeros(n)
+        if arrays.position_owner.size:
+            n_assets = int(arrays.position_asset.max()) + 1
+            keys, counts = np.unique(arrays.position_owner * n_assets + arrays.position_asset, return_counts=True)
+            max_same_asset = np.zeros(n, dtype=np.int64)
+            np.maximum.at(max_same_asset, keys // n_assets, counts)
+            has_positions = position_count > 0
+            concentration[has_positions] = max_same_asset[has_positions] / position_count[has_positions]
+
+        low_collateral = collateral_ratio < config.MIN_COLLATERAL_RATIO
+        high_utilization = utilization > 0.8
+        high_concentration = concentration > config.MAX_CONCENTRATION
+        any_warning = low_collateral | high_utilization | high_concentration
+
+        overall_risk = np.minimum(
+            1.0,
+            0.4 * low_collateral + 0.3 * high_utilization + 0.2 * any_warning
+        )
+
+        volatility = market_data.volatility
+        liquidity = market_data.liquidity
+        return BatchRiskResult(
+            users=arrays.users,
+            collateral_ratio=collateral_ratio,
+            utilization=utilization,
+            concentration=concentration,
+            overall_risk=overall_risk,
+            low_collateral=low_collateral,
+            high_utilization=high_utilization,
+            high_concentration=high_concentration,
+            volatility_score=sum(volatility.values()) / len(volatility) if volatility else 0.5,
+            liquidity_score=sum(liquidity.values()) / len(liquidity) if liquidity else 0.8
+        )
+
+    def assess(self, states: Dict[str, AgentState], market_data: MarketData) -> BatchRiskResult:
+        """
+        Assess risk for every user
+
+        Args:
+            states: Dict of user -> AgentState
+            market_data: Current market data
+
+        Returns:
+            BatchRiskResult (use .breached and .report(user) / .reports())
+        """
+        return self.assess_arrays(UserRiskArrays.from_states(states), market_data)
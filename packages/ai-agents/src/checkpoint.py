@@ -0,0 +1,133 @@
+"""Orchestrator checkpoints for warm restarts"""
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Sequence, Set
+from eth_utils import event_abi_to_log_topic
+from web3._utils.events import get_event_data
+
+from .event_indexer import EVENT_EFFECTS
+
+CHECKPOINT_VERSION = 1
+
+
+class CheckpointStore:
+    """
+    One JSON document with what the decision loop needs to resume.
+
+    The checkpoint holds:
+    - the block it is consistent with
+    - every scheduled user's next due time
+    - the decision transactions still in flight
+
+    Writes go to a temp file and are renamed into place, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Checkpoint file path
+        """
+        self.path = path
+        self._stats = {
+            "saves": 0,
+            "restores": 0,
+            "bytes": 0,
+            "last_block": None,
+            "last_saved_at": None,
+        }
+
+    def save(self, snapshot: Dict[str, Any]) -> int:
+        """
+        Atomically replace the checkpoint
+
+        Args:
+            snapshot: JSON-serializable state (see AgentOrchestrator.save_checkpoint)
+
+        Returns:
+            Bytes written
+        """
+        data = json.dumps({"version": CHECKPOINT_VERSION, "saved_at": time.time(), **snapshot}, separators=(",", ":"))
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+        self._stats["saves"] += 1
+        self._stats["bytes"] = len(data)
+        self._stats["last_block"] = snapshot.get("block")
+        self._stats["last_saved_at"] = int(time.time())
+        return len(data)
+
+    def load(self, agent_id: str, controller: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Read the checkpoint if it belongs to this agent and controller
+
+        Args:
+            agent_id: Agent contract address
+            controller: Controller address of this process
+
+        Returns:
+            Checkpoint dict, or None if missing, unreadable or for another deployment
+        """
+        try:
+            with open(self.path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            print(f"Warning: Ignoring checkpoint version {checkpoint.get('version')}")
+            return None
+        if str(checkpoint.get("agent_id", "")).lower() != agent_id.lower():
+            return None
+        if (checkpoint.get("controller") or "").lower() != (controller or "").lower():
+            # Due times depend on which users this controller acts for
+            return None
+
+        self._stats["restores"] += 1
+        return checkpoint
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get checkpoint counters
+
+        Returns:
+            Dictionary with save/restore counts, size and last checkpoint block
+        """
+        return dict(self._stats)
+
+
+def users_with_changed_preferences(codec, agent_abi: Sequence[Dict], logs: Sequence[Dict]) -> Set[str]:
+    """
+    Users whose preferences (or registration) changed in a range of AIAgent logs
+
+    Args:
+        codec: w3.codec used to decode the logs
+        agent_abi: AIAgent ABI
+        logs: Raw logs from eth_getLogs on the agent contract
+
+    Returns:
+        Set of user addresses
+    """
+    events_by_topic = {
+        event_abi_to_log_topic(item): item
+        for item in agent_abi
+        if item.get("type") == "event" and "prefs" in EVENT_EFFECTS.get(item.get("name"), ())
+    }
+    users = set()
+    for log in logs:
+        if not log.get('topics'):
+            continue
+        event_abi = events_by_topic.get(bytes(log['topics'][0]))
+        if event_abi is not None:
+            users.add(get_event_data(codec, event_abi, log)['args']['user'])
+    return users
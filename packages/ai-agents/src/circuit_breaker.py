@@ -0,0 +1,185 @@
+"""Per-user failure tracking with exponential backoff and a circuit breaker"""
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class _UserCircuit:
+    failures: int = 0
+    state: str = CLOSED
+    retry_at: float = 0.0
+    last_error: str = ""
+    last_failure_at: float = 0.0
+
+
+class UserCircuitBreaker:
+    """
+    Keeps failing users from being retried every round.
+
+    Each consecutive failure of a user (state read, preferences, decision or
+    transaction) pushes their next attempt back by base_backoff * 2^(n-1),
+    capped at max_backoff. After `failure_threshold` consecutive failures the
+    circuit opens and the user is parked. Once the backoff has elapsed, one
+    attempt is let through as a half-open probe. Success closes the circuit.
+    Failure re-opens it with a longer backoff.
+
+    Users without failures have no entry, so healthy users cost nothing.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        base_backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize breaker
+
+        Args:
+            failure_threshold: Consecutive failures before the circuit opens
+            base_backoff: Seconds to wait after the first failure
+            max_backoff: Cap on the wait between attempts
+            clock: Time source (seconds)
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._circuits: Dict[str, _UserCircuit] = {}
+        self._stats = {
+            "failures": 0,
+            "opened": 0,
+            "recovered": 0,
+            "short_circuited": 0,
+        }
+
+    @staticmethod
+    def _key(user: str) -> str:
+        return user.lower()
+
+    def allow(self, user: str) -> bool:
+        """
+        Whether the user may be processed now
+
+        Call once per attempt: when an open circuit's backoff has elapsed the
+        user becomes the half-open probe, and further calls return False until
+        the probe's outcome is recorded.
+
+        Args:
+            user: User wallet address
+
+        Returns:
+            True if the user should be processed
+        """
+        circuit = self._circuits.get(self._key(user))
+        if circuit is None:
+            return True
+
+        if circuit.state == HALF_OPEN or self._clock() < circuit.retry_at:
+            self._stats["short_circuited"] += 1
+            return False
+        if circuit.state == OPEN:
+            circuit.state = HALF_OPEN
+            print(f"🔌 Probing parked user {user} after {circuit.failures} failure(s)")
+        return True
+
+    def record_success(self, user: str):
+        """The user was processed without errors: clear their failure history"""
+        circuit = self._circuits.pop(self._key(user), None)
+        if circuit is not None and circuit.state != CLOSED:
+            self._stats["recovered"] += 1
+            print(f"🔌 User {user} recovered, circuit closed")
+
+    def record_failure(self, user: str, error: Any = ""):
+        """
+        The user's processing failed
+
+        Args:
+            user: User wallet address
+            error: Exception or reason (kept for the status endpoint)
+        """
+        key = self._key(user)
+        circuit = self._circuits.setdefault(key, _UserCircuit())
+        now = self._clock()
+        circuit.failures += 1
+        circuit.last_error = str(error)[:200]
+        circuit.last_failure_at = now
+        circuit.retry_at = now + self.backoff(circuit.failures)
+        self._stats["failures"] += 1
+
+        if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+            if circuit.state == CLOSED:
+                self._stats["opened"] += 1
+                print(f"🔌 Parking user {user} after {circuit.failures} consecutive failures")
+            circuit.state = OPEN
+
+    def release_probe(self, user: str, retry_at: Optional[float] = None):
+        """
+        The half-open probe ended without a verdict (e.g. pre-flight dropped
+        its tx, so nothing was tried on-chain): park the user again
+
+        Args:
+            user: User wallet address
+            retry_at: When to probe next (default: now + the current backoff)
+        """
+        circuit = self._circuits.get(self._key(user))
+        if circuit is None or circuit.state != HALF_OPEN:
+            return
+        circuit.state = OPEN
+        circuit.retry_at = retry_at if retry_at is not None else self._clock() + self.backoff(circuit.failures)
+
+    def backoff(self, failures: int) -> float:
+        """Seconds to wait after `failures` consecutive failures"""
+        return min(self.max_backoff, self.base_backoff * 2 ** max(0, failures - 1))
+
+    def retry_at(self, user: str) -> Optional[float]:
+        """Earliest time the user will be attempted again (None if not backing off)"""
+        circuit = self._circuits.get(self._key(user))
+        return circuit.retry_at if circuit is not None else None
+
+    def state(self, user: str) -> str:
+        """closed, open or half_open"""
+        circuit = self._circuits.get(self._key(user))
+        return circuit.state if circuit is not None else CLOSED
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Every user with a failure history, most recently failed first
+
+        Returns:
+            List of dicts with user, state, failures, retry_in, last_error
+        """
+        now = self._clock()
+        return [
+            {
+                "user": user,
+                "state": circuit.state,
+                "failures": circuit.failures,
+                "retry_in": round(max(0.0, circuit.retry_at - now), 1),
+                "last_error": circuit.last_error,
+            }
+            for user, circuit in sorted(
+                self._circuits.items(), key=lambda item: item[1].last_failure_at, reverse=True
+            )
+        ]
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get breaker counters
+
+        Returns:
+            Dictionary with users per state and cumulative counters
+        """
+        states = [circuit.state for circuit in self._circuits.values()]
+        return {
+            **self._stats,
+            "backing_off": states.count(CLOSED),
+            "open": states.count(OPEN),
+            "half_open": states.count(HALF_OPEN),
+        }
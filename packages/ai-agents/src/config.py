@@ -16,6 +16,8 @@ class Config:
     # Blockchain
     WEB3_PROVIDER_URI = os.getenv("WEB3_PROVIDER_URI", "https://rpc.arc.testnet")
     PRIVATE_KEY = os.getenv("PRIVATE_KEY")
+    USE_ASYNC_WEB3 = os.getenv("USE_ASYNC_WEB3", "false").lower() == "true"
+    RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "32"))  # pooled aiohttp connections
 
     # Contract Addresses
     RWA_VAULT_ADDRESS = os.getenv("RWA_VAULT_ADDRESS")
@@ -30,6 +32,24 @@ class Config:
     WETH_ADDRESS = os.getenv("WETH_ADDRESS")
     WBTC_ADDRESS = os.getenv("WBTC_ADDRESS")
 
+    # Token registry (src/tokens.py); the mock tokens are plain 18-decimal ERC20s
+    WETH_DECIMALS = int(os.getenv("WETH_DECIMALS", "18"))
+    WBTC_DECIMALS = int(os.getenv("WBTC_DECIMALS", "18"))
+    USDC_DECIMALS = int(os.getenv("USDC_DECIMALS", "18"))
+    EXTRA_TOKENS = os.getenv("EXTRA_TOKENS", "")  # SYMBOL:address:coingecko_id:decimals,...
+
+    # CoinGecko price cache (src/price_service.py)
+    PRICE_CACHE_TTL = int(os.getenv("PRICE_CACHE_TTL", "60"))  # seconds a price is fresh
+    PRICE_REFRESH_AHEAD = float(os.getenv("PRICE_REFRESH_AHEAD", "10"))  # refresh read symbols this long before expiry, 0 = off
+    PRICE_MAX_STALENESS = float(os.getenv("PRICE_MAX_STALENESS", "180"))  # max age served without waiting (revalidated in the background)
+    PRICE_HARD_FAIL_AGE = float(os.getenv("PRICE_HARD_FAIL_AGE", "900"))  # max age served at all (fallback when CoinGecko fails)
+    COINGECKO_RATE_LIMIT = float(os.getenv("COINGECKO_RATE_LIMIT", "10"))  # upstream calls per minute, 0 = unlimited
+    COINGECKO_BURST = int(os.getenv("COINGECKO_BURST", "3"))
+    COINGECKO_DECISION_MAX_WAIT = float(os.getenv("COINGECKO_DECISION_MAX_WAIT", "5"))  # seconds a decision read queues for budget
+    COINGECKO_DASHBOARD_MAX_WAIT = float(os.getenv("COINGECKO_DASHBOARD_MAX_WAIT", "1"))  # API server reads; background refreshes never queue
+    OHLC_STORE_DIR = os.getenv("OHLC_STORE_DIR", "")  # directory for persistent candle history, empty = off (always fetch)
+    OHLC_TAIL_TTL = float(os.getenv("OHLC_TAIL_TTL", "300"))  # seconds between tail syncs per series
+
     # Supabase Database
     SUPABASE_URL = os.getenv("SUPABASE_URL")
     SUPABASE_KEY = os.getenv("SUPABASE_KEY")
@@ -46,6 +66,80 @@ class Config:
     MAX_POSITION_SIZE = 0.3  # 30% of portfolio
     MIN_SHARPE_RATIO = 1.5
 
+    # Multi-user concurrency (1 user at a time = legacy sequential round)
+    MAX_CONCURRENT_USERS = int(os.getenv("MAX_CONCURRENT_USERS", "1"))
+    MAX_CONCURRENT_READS = int(os.getenv("MAX_CONCURRENT_READS", "16"))
+    MAX_CONCURRENT_TXS = int(os.getenv("MAX_CONCURRENT_TXS", "4"))  # concurrent sign+broadcast
+    USE_SCHEDULER = os.getenv("USE_SCHEDULER", "false").lower() == "true"  # heap-driven loop instead of full scans
+    USE_BATCH_RISK = os.getenv("USE_BATCH_RISK", "true").lower() == "true"  # vectorized risk pass in monitor_risk
+
+    # Per-user circuit breaker (failing users back off, then are parked and probed)
+    USE_CIRCUIT_BREAKER = os.getenv("USE_CIRCUIT_BREAKER", "true").lower() == "true"
+    BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))  # consecutive failures before parking
+    BREAKER_BASE_BACKOFF = float(os.getenv("BREAKER_BASE_BACKOFF", "30"))  # seconds, doubled per failure
+    BREAKER_MAX_BACKOFF = float(os.getenv("BREAKER_MAX_BACKOFF", "3600"))
+
+    # Batched chain reads (Multicall3, falls back to per-user calls when not deployed)
+    USE_MULTICALL = os.getenv("USE_MULTICALL", "true").lower() == "true"
+    MULTICALL_ADDRESS = os.getenv("MULTICALL_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+    MULTICALL_BATCH_SIZE = int(os.getenv("MULTICALL_BATCH_SIZE", "100"))  # users per aggregate call
+
+    # Transaction pipelining (nonces allocated locally by NonceManager)
+    MAX_PENDING_TXS = int(os.getenv("MAX_PENDING_TXS", "16"))  # unconfirmed controller txs in flight
+    TX_STUCK_TIMEOUT = float(os.getenv("TX_STUCK_TIMEOUT", "60"))  # seconds before re-pricing
+    TX_POLL_INTERVAL = float(os.getenv("TX_POLL_INTERVAL", "1"))  # receipt tracker poll
+    GAS_BUMP_PERCENT = int(os.getenv("GAS_BUMP_PERCENT", "125"))  # nodes require >= 110
+    MAX_GAS_PRICE_GWEI = float(os.getenv("MAX_GAS_PRICE_GWEI", "0"))  # 0 = no cap
+
+    # Block-scoped read cache for getUserState/Positions/Preferences
+    USE_STATE_CACHE = os.getenv("USE_STATE_CACHE", "true").lower() == "true"
+    STATE_CACHE_HEAD_TTL = float(os.getenv("STATE_CACHE_HEAD_TTL", "0"))  # >0 trades up to this many seconds of staleness for fewer eth_blockNumber calls
+
+    # Fee oracle (fees cached per block, gas limits learned per action)
+    USE_EIP1559 = os.getenv("USE_EIP1559", "true").lower() == "true"  # falls back to gasPrice without baseFee
+    BLOCK_TIME = float(os.getenv("BLOCK_TIME", "2"))  # seconds a fee suggestion stays valid
+    GAS_LIMIT_MULTIPLIER = float(os.getenv("GAS_LIMIT_MULTIPLIER", "1.2"))
+    DEFAULT_GAS_LIMIT = int(os.getenv("DEFAULT_GAS_LIMIT", "1000000"))
+
+    # Pre-flight simulation (eth_call on the pending block, then estimate_gas for the limit)
+    USE_PREFLIGHT = os.getenv("USE_PREFLIGHT", "false").lower() == "true"
+    PREFLIGHT_RESIZE_STEPS = [float(s) for s in os.getenv("PREFLIGHT_RESIZE_STEPS", "0.5,0.25").split(",") if s.strip()]  # borrow fractions tried before dropping
+    PREFLIGHT_RETRY_DELAY = int(os.getenv("PREFLIGHT_RETRY_DELAY", "60"))  # seconds before a user whose tx was dropped is re-decided
+
+    # Write-behind Supabase persistence
+    DB_BATCH_SIZE = int(os.getenv("DB_BATCH_SIZE", "100"))  # rows per bulk insert
+    DB_FLUSH_INTERVAL = float(os.getenv("DB_FLUSH_INTERVAL", "2"))  # max seconds a row stays buffered
+    DB_MAX_BACKLOG = int(os.getenv("DB_MAX_BACKLOG", "10000"))  # oldest rows dropped beyond this
+    DB_MAX_RETRIES = int(os.getenv("DB_MAX_RETRIES", "3"))
+
+    # Event-log indexer (users, preferences and positions served from SQLite)
+    USE_EVENT_INDEXER = os.getenv("USE_EVENT_INDEXER", "false").lower() == "true"
+    INDEXER_DB_PATH = os.getenv("INDEXER_DB_PATH", "agent_index.db")
+    INDEXER_START_BLOCK = int(os.getenv("INDEXER_START_BLOCK", "0"))  # AIAgent deployment block
+    INDEXER_LOG_RANGE = int(os.getenv("INDEXER_LOG_RANGE", "2000"))  # blocks per eth_getLogs
+    INDEXER_REORG_DEPTH = int(os.getenv("INDEXER_REORG_DEPTH", "12"))
+    INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "5"))
+
+    # User enumeration (getUsersPaginated tail reads, AgentInitialized logs on older deployments)
+    USER_PAGE_SIZE = int(os.getenv("USER_PAGE_SIZE", "500"))
+
+    # Horizontal sharding (users hashed across worker processes, see src/workers.py)
+    SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0"))  # 0 = this process owns every user
+    SHARD_STORE = os.getenv("SHARD_STORE", ".shards")  # lock-file directory, or redis://host:port/0
+    SHARD_WORKER_ID = os.getenv("SHARD_WORKER_ID") or None  # default <hostname>-<pid>
+    SHARD_LEASE_TTL = float(os.getenv("SHARD_LEASE_TTL", "15"))  # seconds before a dead worker's shards move
+    SHARD_RENEW_INTERVAL = float(os.getenv("SHARD_RENEW_INTERVAL", "5"))
+
+    # Warm restart of the scheduled loop (per-worker file when sharded)
+    CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", "")  # empty = no checkpoints
+    CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", "30"))  # seconds between saves
+
+    # Observability (per-stage latency histograms, round gauges)
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = no /metrics endpoint
+    METRICS_HOST = os.getenv("METRICS_HOST", "0.0.0.0")
+    ROUND_SUMMARY_PATH = os.getenv("ROUND_SUMMARY_PATH", "")  # append one JSON line per round; "-" = stdout
+    RECORD_ROUNDS_DIR = os.getenv("RECORD_ROUNDS_DIR", "")  # write each decision round's inputs for src.replay
+
     # Risk Thresholds
     MAX_DRAWDOWN = 0.15  # 15%
     MIN_COLLATERAL_RATIO = 1.5  # 150%
@@ -0,0 +1,172 @@
+"""Contract registry that loads each ABI once and reuses contract objects"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from web3 import Web3
+
+# Hardhat artifacts live next to this package: packages/contracts/artifacts/...
+DEFAULT_ARTIFACTS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "contracts/artifacts/contracts"
+)
+
+
+class ContractRegistry:
+    """
+    Caches contract ABIs, checksummed addresses and contract instances.
+
+    ABIs are parsed from the Hardhat artifacts on first use only, and every
+    (name, address) pair maps to a single shared contract object for the
+    lifetime of the registry.
+    """
+
+    def __init__(self, w3: Web3, artifacts_dir: Optional[str] = None):
+        """
+        Initialize registry
+
+        Args:
+            w3: Web3 instance used to build contract objects
+            artifacts_dir: Directory containing `<Name>.sol/<Name>.json` artifacts
+        """
+        self.w3 = w3
+        self.artifacts_dir = artifacts_dir or DEFAULT_ARTIFACTS_DIR
+        self._abis: Dict[str, List[Dict[str, Any]]] = {}
+        self._addresses: Dict[str, str] = {}
+        self._contracts: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "abi_loads": 0,
+            "abi_hits": 0,
+            "contract_builds": 0,
+            "contract_hits": 0,
+            "checksum_computations": 0,
+            "checksum_hits": 0,
+        }
+
+    def abi_path(self, name: str) -> str:
+        """Path of the Hardhat artifact for contract `name`"""
+        return os.path.join(self.artifacts_dir, f"{name}.sol", f"{name}.json")
+
+    def register_abi(self, name: str, abi: List[Dict[str, Any]]):
+        """
+        Register an ABI directly, bypassing the artifact file
+
+        Args:
+            name: Contract name (e.g., "AIAgent")
+            abi: Parsed ABI list
+        """
+        with self._lock:
+            self._abis[name] = abi
+
+    def get_abi(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Get the ABI for a contract, parsing the artifact only once
+
+        Args:
+            name: Contract name (e.g., "AIAgent", "SimpleDEX")
+
+        Returns:
+            Parsed ABI list
+        """
+        abi = self._abis.get(name)
+        if abi is not None:
+            self._stats["abi_hits"] += 1
+            return abi
+
+        with self._lock:
+            abi = self._abis.get(name)
+            if abi is None:
+                path = self.abi_path(name)
+                if not os.path.exists(path):
+                    print(f"⚠️  ABI file not found at {path}")
+                    raise FileNotFoundError(f"ABI file not found: {path}")
+
+                with open(path, 'r') as f:
+                    abi = json.load(f)['abi']
+
+                self._abis[name] = abi
+                self._stats["abi_loads"] += 1
+            else:
+                self._stats["abi_hits"] += 1
+
+        return abi
+
+    def checksum(self, address: str) -> str:
+        """
+        Get the checksummed form of an address, computing it only once
+
+        Args:
+            address: Hex address in any case
+
+        Returns:
+            Checksummed address
+        """
+        cached = self._addresses.get(address)
+        if cached is not None:
+            self._stats["checksum_hits"] += 1
+            return cached
+
+        checksummed = self.w3.to_checksum_address(address)
+        self._addresses[address] = checksummed
+        self._stats["checksum_computations"] += 1
+        return checksummed
+
+    def get_contract(self, name: str, address: str):
+        """
+        Get the shared contract instance for `name` deployed at `address`
+
+        Args:
+            name: Contract name (e.g., "AIAgent")
+            address: Deployed contract address
+
+        Returns:
+            web3 Contract instance
+        """
+        checksummed = self.checksum(address)
+        key = (name, checksummed)
+        contract = self._contracts.get(key)
+        if contract is not None:
+            self._stats["contract_hits"] += 1
+            return contract
+
+        abi = self.get_abi(name)
+        with self._lock:
+            contract = self._contracts.get(key)
+            if contract is None:
+                contract = self.w3.eth.contract(address=checksummed, abi=abi)
+                self._contracts[key] = contract
+                self._stats["contract_builds"] += 1
+            else:
+                self._stats["contract_hits"] += 1
+
+        return contract
+
+    def agent(self, agent_id: str):
+        """Shared AIAgent contract instance"""
+        return self.get_contract("AIAgent", agent_id)
+
+    def dex(self, dex_address: str):
+        """Shared SimpleDEX contract instance"""
+        return self.get_contract("SimpleDEX", dex_address)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get registry counters
+
+        Returns:
+            Dictionary with load/build/hit counters and cache sizes
+        """
+        return {
+            **self._stats,
+            "cached_abis": len(self._abis),
+            "cached_addresses": len(self._addresses),
+            "cached_contracts": len(self._contracts),
+        }
+
+    def clear(self):
+        """Drop all cached ABIs, addresses and contract instances"""
+        with self._lock:
+            self._abis.clear()
+            self._addresses.clear()
+            self._contracts.clear()
@@ -4,6 +4,7 @@ from typing import Optional, Dict, Any, List
 from supabase import create_client, Client
 
 from .config import config
+from .write_queue import WriteBehindQueue
 
 class SupabaseDB:
     """Supabase database client"""
@@ -18,8 +19,17 @@ class SupabaseDB:
             config.SUPABASE_KEY
         )
 
+        # store_* rows are buffered and bulk-inserted over this same client
+        self.writer = WriteBehindQueue(
+            lambda: self.client,
+            max_batch=config.DB_BATCH_SIZE,
+            flush_interval=config.DB_FLUSH_INTERVAL,
+            max_backlog=config.DB_MAX_BACKLOG,
+            max_retries=config.DB_MAX_RETRIES
+        )
+
     async def store_decision(self, agent_id: str, decision: Dict[str, Any]) -> Dict:
-        """Store AI agent decision"""
+        """Queue AI agent decision for a bulk insert (returns the queued row)"""
         data = {
             "agent_id": agent_id,
             "action": decision.get("action"),
@@ -30,8 +40,8 @@ class SupabaseDB:
             "timestamp": decision.get("timestamp")
         }
 
-        result = self.client.table("agent_decisions").insert(data).execute()
-        return result.data[0] if result.data else {}
+        self.writer.enqueue("agent_decisions", data)
+        return data
 
     async def get_agent_history(self, agent_id: str, limit: int = 100) -> List[Dict]:
         """Get agent decision history"""
@@ -45,7 +55,7 @@ class SupabaseDB:
         return result.data if result.data else []
 
     async def store_risk_report(self, agent_id: str, risk_report: Dict[str, Any]) -> Dict:
-        """Store risk assessment report"""
+        """Queue risk assessment report for a bulk insert (returns the queued row)"""
         data = {
             "agent_id": agent_id,
             "collateral_ratio": risk_report.get("collateral_ratio"),
@@ -58,8 +68,8 @@ class SupabaseDB:
             "timestamp": risk_report.get("timestamp")
         }
 
-        result = self.client.table("risk_reports").insert(data).execute()
-        return result.data[0] if result.data else {}
+        self.writer.enqueue("risk_reports", data)
+        return data
 
     async def get_latest_risk_report(self, agent_id: str) -> Optional[Dict]:
         """Get latest risk report for agent"""
@@ -73,7 +83,7 @@ class SupabaseDB:
         return result.data[0] if result.data else None
 
     async def store_agent_state(self, agent_id: str, state: Dict[str, Any]) -> Dict:
-        """Store agent state snapshot"""
+        """Queue agent state snapshot for a bulk insert (returns the queued row)"""
         data = {
             "agent_id": agent_id,
             "collateral_amount": state.get("collateral_amount"),
@@ -84,8 +94,12 @@ class SupabaseDB:
             "timestamp": state.get("timestamp")
         }
 
-        result = self.client.table("agent_states").insert(data).execute()
-        return result.data[0] if result.data else {}
+        self.writer.enqueue("agent_states", data)
+        return data
+
+    async def flush(self) -> int:
+        """Write all queued rows now (e.g. before reading them back or on shutdown)"""
+        return await self.writer.flush()
 
     async def get_agent_performance(self, agent_id: str) -> Dict:
         """Get agent performance metrics"""
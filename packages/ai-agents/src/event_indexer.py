@@ -0,0 +1,453 @@
+"""Event-log indexer for AIAgent users, preferences and positions"""
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+from web3._utils.events import get_event_data
+
+from .batch_reader import BatchStateReader, parse_user_positions, parse_user_preferences
+from .contract_registry import ContractRegistry
+from .models import Position
+
+# Which snapshots each AIAgent event invalidates for its `user`
+EVENT_EFFECTS = {
+    "AgentInitialized": ("prefs", "positions"),
+    "AutomationEnabled": ("prefs",),
+    "AutomationDisabled": ("prefs",),
+    "AutomationUpdated": ("prefs",),
+    "DecisionExecuted": ("prefs", "positions"),  # lastDecisionTime moves
+    "PositionOpened": ("positions",),
+    "PositionClosed": ("positions",),
+}
+
+# Users per `address IN (...)` lookup, under SQLite's default 999 bound parameters
+LOOKUP_CHUNK = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS blocks (number INTEGER PRIMARY KEY, hash TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS users (address TEXT PRIMARY KEY, registered_block INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS events (
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    event TEXT NOT NULL,
+    user TEXT NOT NULL,
+    PRIMARY KEY (block_number, log_index)
+);
+CREATE TABLE IF NOT EXISTS preferences (address TEXT PRIMARY KEY, data TEXT NOT NULL, block_number INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS positions (address TEXT PRIMARY KEY, data TEXT NOT NULL, block_number INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS dirty (
+    address TEXT PRIMARY KEY,
+    prefs INTEGER NOT NULL DEFAULT 0,
+    positions INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class EventIndexer:
+    """
+    Backfills and tails AIAgent logs into a local SQLite store.
+
+    Logs only tell us *which* users changed; the indexer marks those users
+    dirty and re-reads their preferences/positions once per sync, so the
+    stored snapshots are exact without polling every user every round.
+    Recent block hashes are kept to detect reorgs up to `reorg_depth` deep;
+    on a reorg the rolled-back range is dropped and re-indexed.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        contracts: ContractRegistry,
+        agent_id: str,
+        db_path: str = "agent_index.db",
+        start_block: int = 0,
+        log_range: int = 2000,
+        reorg_depth: int = 12,
+        batch_reader: Optional[BatchStateReader] = None
+    ):
+        """
+        Initialize indexer and open (or create) the SQLite store
+
+        Args:
+            w3: Web3 instance
+            contracts: Shared contract registry (for the AIAgent ABI)
+            agent_id: AIAgent contract address
+            db_path: SQLite file path (":memory:" for tests)
+            start_block: First block to backfill from on an empty store
+            log_range: Max blocks per eth_getLogs request
+            reorg_depth: How many recent block hashes to keep for reorg detection
+            batch_reader: Optional batched reader used to refresh dirty users
+        """
+        self.w3 = w3
+        self.contracts = contracts
+        self.agent_id = agent_id
+        self.start_block = start_block
+        self.log_range = max(1, log_range)
+        self.reorg_depth = max(1, reorg_depth)
+        self.batch_reader = batch_reader
+        self.ready = False
+
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._db.commit()
+        self._lock = threading.Lock()
+        self._event_abis: Optional[Dict[bytes, Dict]] = None
+        self._stats = {
+            "logs_processed": 0,
+            "reorgs": 0,
+            "prefs_refreshed": 0,
+            "positions_refreshed": 0,
+        }
+
+    # ------------------------------------------------------------------ storage
+
+    def _meta_get(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _meta_set(self, key: str, value: Any):
+        self._db.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value))
+        )
+
+    @property
+    def last_block(self) -> Optional[int]:
+        """Last fully indexed block, or None before the first sync"""
+        value = self._meta_get("last_block")
+        return int(value) if value is not None else None
+
+    def get_users(self) -> List[str]:
+        """All registered users in registration order"""
+        rows = self._db.execute(
+            "SELECT address FROM users ORDER BY registered_block, rowid"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def _snapshots(self, table: str, users: Optional[Sequence[str]]) -> List[Tuple[str, str]]:
+        """(address, data) rows of a snapshot table, looked up by primary key when `users` is given"""
+        if users is None:
+            return self._db.execute(f"SELECT address, data FROM {table}").fetchall()
+        wanted = list(dict.fromkeys(users))
+        rows = []
+        for start in range(0, len(wanted), LOOKUP_CHUNK):
+            chunk = wanted[start:start + LOOKUP_CHUNK]
+            rows += self._db.execute(
+                f"SELECT address, data FROM {table} WHERE address IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+        return rows
+
+    def get_preferences(self, users: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+        """
+        Indexed preference snapshots
+
+        Args:
+            users: Restrict to these users (default: all)
+
+        Returns:
+            Dict of user -> prefs dict in the getUserPreferences layout
+        """
+        return {address: json.loads(data) for address, data in self._snapshots("preferences", users)}
+
+    def get_positions(self, users: Optional[Sequence[str]] = None) -> Dict[str, List[Position]]:
+        """
+        Indexed position snapshots
+
+        Args:
+            users: Restrict to these users (default: all)
+
+        Returns:
+            Dict of user -> positions
+        """
+        return {
+            address: [Position(**pos) for pos in json.loads(data)]
+            for address, data in self._snapshots("positions", users)
+        }
+
+    async def _read(self, getter, *args):
+        def read():
+            # Writers commit on the event loop under the lock; never read half a sync
+            with self._lock:
+                return getter(*args)
+        return await asyncio.to_thread(read)
+
+    async def read_users(self) -> List[str]:
+        """get_users() without blocking the event loop"""
+        return await self._read(self.get_users)
+
+    async def read_preferences(self, users: Optional[Sequence[str]] = None) -> Dict[str, Dict]:
+        """get_preferences() without blocking the event loop"""
+        return await self._read(self.get_preferences, users)
+
+    async def read_positions(self, users: Optional[Sequence[str]] = None) -> Dict[str, List[Position]]:
+        """get_positions() without blocking the event loop"""
+        return await self._read(self.get_positions, users)
+
+    def _dirty_users(self, column: str) -> List[str]:
+        rows = self._db.execute(f"SELECT address FROM dirty WHERE {column} = 1").fetchall()
+        return [row[0] for row in rows]
+
+    def _mark_dirty(self, user: str, effects: Sequence[str]):
+        self._db.execute("INSERT OR IGNORE INTO dirty (address) VALUES (?)", (user,))
+        for effect in effects:
+            self._db.execute(f"UPDATE dirty SET {effect} = 1 WHERE address = ?", (user,))
+
+    def invalidate(self, user: str):
+        """
+        Drop a user's snapshots until the next sync re-reads them
+
+        Called after we submit a transaction for the user, so readers fall
+        back to the chain instead of acting on pre-transaction state.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM preferences WHERE address = ?", (user,))
+            self._db.execute("DELETE FROM positions WHERE address = ?", (user,))
+            self._mark_dirty(user, ("prefs", "positions"))
+            self._db.commit()
+
+    # ------------------------------------------------------------------ chain access
+
+    async def _block_number(self) -> int:
+        return await asyncio.to_thread(lambda: self.w3.eth.block_number)
+
+    async def _block_hash(self, number: int) -> str:
+        block = await asyncio.to_thread(self.w3.eth.get_block, number)
+        return Web3.to_hex(block['hash'])
+
+    async def _get_logs(self, from_block: int, to_block: int) -> List[Dict]:
+        return await asyncio.to_thread(self.w3.eth.get_logs, {
+            'address': self.contracts.checksum(self.agent_id),
+            'fromBlock': from_block,
+            'toBlock': to_block,
+        })
+
+    def _events_by_topic(self) -> Dict[bytes, Dict]:
+        if self._event_abis is None:
+            self._event_abis = {
+                event_abi_to_log_topic(item): item
+                for item in self.contracts.get_abi("AIAgent")
+                if item.get("type") == "event" and item.get("name") in EVENT_EFFECTS
+            }
+        return self._event_abis
+
+    # ------------------------------------------------------------------ sync
+
+    async def _find_fork_point(self) -> Optional[int]:
+        """
+        Compare stored block hashes with the chain, newest first
+
+        Returns:
+            None if the tip is canonical, otherwise the last block still canonical
+        """
+        stored = self._db.execute(
+            "SELECT number, hash FROM blocks ORDER BY number DESC"
+        ).fetchall()
+        if not stored:
+            return None
+
+        for i, (number, block_hash) in enumerate(stored):
+            if await self._block_hash(number) == block_hash:
+                return None if i == 0 else number
+
+        # Deeper than anything we kept: rewind past the oldest stored block
+        return stored[-1][0] - 1
+
+    def _rollback(self, fork_point: int):
+        """Drop everything indexed after `fork_point` and mark affected users dirty"""
+        affected = self._db.execute(
+            "SELECT DISTINCT user FROM events WHERE block_number > ?", (fork_point,)
+        ).fetchall()
+        for (user,) in affected:
+            self._mark_dirty(user, ("prefs", "positions"))
+
+        self._db.execute("DELETE FROM events WHERE block_number > ?", (fork_point,))
+        self._db.execute("DELETE FROM blocks WHERE number > ?", (fork_point,))
+        removed = self._db.execute(
+            "SELECT address FROM users WHERE registered_block > ?", (fork_point,)
+        ).fetchall()
+        for (user,) in removed:
+            self._db.execute("DELETE FROM users WHERE address = ?", (user,))
+            self._db.execute("DELETE FROM preferences WHERE address = ?", (user,))
+            self._db.execute("DELETE FROM positions WHERE address = ?", (user,))
+            self._db.execute("DELETE FROM dirty WHERE address = ?", (user,))
+        self._meta_set("last_block", fork_point)
+        self._stats["reorgs"] += 1
+        print(f"⚠️  Reorg detected — rolled index back to block {fork_point}")
+
+    def _apply_logs(self, logs: Sequence[Dict]):
+        """Decode logs, record events, register users and mark them dirty"""
+        events_by_topic = self._events_by_topic()
+        for log in logs:
+            if not log.get('topics'):
+                continue
+            event_abi = events_by_topic.get(bytes(log['topics'][0]))
+            if event_abi is None:
+                continue
+
+            event = get_event_data(self.w3.codec, event_abi, log)
+            user = event['args']['user']
+            block_number = log['blockNumber']
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO events (block_number, log_index, tx_hash, event, user) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (block_number, log['logIndex'], Web3.to_hex(log['transactionHash']), event['event'], user)
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)",
+                (block_number, Web3.to_hex(log['blockHash']))
+            )
+            if event['event'] == "AgentInitialized":
+                self._db.execute(
+                    "INSERT OR IGNORE INTO users (address, registered_block) VALUES (?, ?)",
+                    (user, block_number)
+                )
+            self._mark_dirty(user, EVENT_EFFECTS[event['event']])
+            self._stats["logs_processed"] += 1
+
+    async def _refresh_dirty(self, block_number: int):
+        """Re-read preferences and positions for users touched by new logs"""
+        dirty_prefs = self._dirty_users("prefs")
+        dirty_positions = self._dirty_users("positions")
+        if not dirty_prefs and not dirty_positions:
+            return
+
+        if self.batch_reader:
+            prefs = await self.batch_reader.read_preferences(self.agent_id, dirty_prefs) if dirty_prefs else {}
+            positions = await self.batch_reader.read_positions(self.agent_id, dirty_positions) if dirty_positions else {}
+        else:
+            prefs, positions = await self._read_per_user(dirty_prefs, dirty_positions)
+
+        with self._lock:
+            for user, user_prefs in prefs.items():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO preferences (address, data, block_number) VALUES (?, ?, ?)",
+                    (user, json.dumps(user_prefs), block_number)
+                )
+                self._db.execute("UPDATE dirty SET prefs = 0 WHERE address = ?", (user,))
+            for user, user_positions in positions.items():
+                self._db.execute(
+                    "INSERT OR REPLACE INTO positions (address, data, block_number) VALUES (?, ?, ?)",
+                    (user, json.dumps([pos.dict() for pos in user_positions]), block_number)
+                )
+                self._db.execute("UPDATE dirty SET positions = 0 WHERE address = ?", (user,))
+            self._db.execute("DELETE FROM dirty WHERE prefs = 0 AND positions = 0")
+            self._db.commit()
+
+        self._stats["prefs_refreshed"] += len(prefs)
+        self._stats["positions_refreshed"] += len(positions)
+
+    async def _read_per_user(
+        self,
+        prefs_users: Sequence[str],
+        positions_users: Sequence[str]
+    ) -> Tuple[Dict[str, Dict], Dict[str, List[Position]]]:
+        """Fallback refresh with one eth_call per user"""
+        contract = self.contracts.agent(self.agent_id)
+        prefs: Dict[str, Dict] = {}
+        positions: Dict[str, List[Position]] = {}
+
+        for user in prefs_users:
+            try:
+                fn = contract.functions.getUserPreferences(self.contracts.checksum(user))
+                prefs[user] = parse_user_preferences(await asyncio.to_thread(fn.call))
+            except Exception as e:
+                print(f"Warning: Could not refresh preferences for {user}: {e}")
+        for user in positions_users:
+            try:
+                fn = contract.functions.getUserPositions(self.contracts.checksum(user))
+                positions[user] = parse_user_positions(await asyncio.to_thread(fn.call))
+            except Exception as e:
+                print(f"Warning: Could not refresh positions for {user}: {e}")
+
+        return prefs, positions
+
+    async def sync(self) -> int:
+        """
+        Index all logs up to the current head, handling reorgs
+
+        Returns:
+            Number of logs applied
+        """
+        head = await self._block_number()
+
+        # The lock is a threading.Lock: never hold it across an await
+        fork_point = await self._find_fork_point()
+        if fork_point is not None:
+            with self._lock:
+                self._rollback(fork_point)
+                self._db.commit()
+
+        last = self.last_block
+        from_block = self.start_block if last is None else last + 1
+        applied = 0
+
+        while from_block <= head:
+            to_block = min(from_block + self.log_range - 1, head)
+            logs = await self._get_logs(from_block, to_block)
+            # Remember the range end so reorgs in log-less blocks are noticed too
+            end_hash = await self._block_hash(to_block) if head - to_block < self.reorg_depth else None
+
+            with self._lock:
+                self._apply_logs(logs)
+                if end_hash is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)",
+                        (to_block, end_hash)
+                    )
+                self._meta_set("last_block", to_block)
+                self._db.execute(
+                    "DELETE FROM blocks WHERE number <= ?", (to_block - self.reorg_depth,)
+                )
+                self._db.commit()
+
+            applied += len(logs)
+            from_block = to_block + 1
+
+        await self._refresh_dirty(head)
+        self.ready = True
+        return applied
+
+    async def run(self, poll_interval: float = 5.0):
+        """
+        Backfill, then keep tailing new blocks
+
+        Args:
+            poll_interval: Seconds between syncs once caught up
+        """
+        print(f"📚 Starting event indexer for {self.agent_id} from block {self.last_block or self.start_block}")
+        while True:
+            try:
+                started = time.time()
+                applied = await self.sync()
+                if applied:
+                    print(f"📚 Indexed {applied} log(s) up to block {self.last_block} ({time.time() - started:.1f}s)")
+            except Exception as e:
+                print(f"Error in event indexer: {e}")
+            await asyncio.sleep(poll_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get indexer counters
+
+        Returns:
+            Dictionary with progress and refresh counters
+        """
+        return {
+            **self._stats,
+            "last_block": self.last_block,
+            "users": self._db.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+            "dirty_users": self._db.execute("SELECT COUNT(*) FROM dirty").fetchone()[0],
+            "ready": self.ready,
+        }
+
+    def close(self):
+        """Close the SQLite connection"""
+        self._db.close()
@@ -0,0 +1,161 @@
+"""Block-scoped fee suggestions and learned per-action gas limits"""
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+
+class FeeOracle:
+    """
+    Caches the fee suggestion for the current block and learns gas limits.
+
+    Fees are fetched at most once per block: a cached suggestion is reused
+    until `block_time` has passed or a newer block number is observed (via
+    note_block, fed from receipts). On EIP-1559 chains the suggestion is
+    maxFeePerGas/maxPriorityFeePerGas, otherwise a legacy gasPrice.
+
+    Gas limits are tracked per action from estimate_gas samples and from
+    gasUsed in receipts; once an action has samples, no estimate is needed.
+    """
+
+    def __init__(
+        self,
+        get_block: Callable[[str], Awaitable[Dict]],
+        get_gas_price: Callable[[], Awaitable[int]],
+        get_max_priority_fee: Optional[Callable[[], Awaitable[int]]] = None,
+        block_time: float = 2.0,
+        base_fee_multiplier: float = 2.0,
+        gas_limit_multiplier: float = 1.2,
+        default_gas_limit: int = 1_000_000,
+        max_samples: int = 20
+    ):
+        """
+        Initialize fee oracle
+
+        Args:
+            get_block: async (block_identifier) -> block header
+            get_gas_price: async () -> legacy gas price (wei)
+            get_max_priority_fee: async () -> suggested tip (wei); None disables EIP-1559
+            block_time: Seconds a cached suggestion stays valid without a new block
+            base_fee_multiplier: maxFeePerGas = base fee * multiplier + tip (headroom for rising base fee)
+            gas_limit_multiplier: Safety margin over the largest recent sample
+            default_gas_limit: Limit used when an action has no samples and estimation fails
+            max_samples: Samples kept per action
+        """
+        self._get_block = get_block
+        self._get_gas_price = get_gas_price
+        self._get_max_priority_fee = get_max_priority_fee
+        self.block_time = block_time
+        self.base_fee_multiplier = base_fee_multiplier
+        self.gas_limit_multiplier = gas_limit_multiplier
+        self.default_gas_limit = default_gas_limit
+        self.max_samples = max_samples
+
+        self._fees: Optional[Dict[str, int]] = None
+        self._fees_block: Optional[int] = None
+        self._fees_at = 0.0
+        self._latest_block: Optional[int] = None
+        self._refresh_lock = asyncio.Lock()
+        self._samples: Dict[str, Deque[int]] = {}
+        self._stats = {
+            "fee_hits": 0,
+            "fee_refreshes": 0,
+            "gas_estimates": 0,
+            "gas_limit_hits": 0,
+        }
+
+    def note_block(self, block_number: int):
+        """Record a block number seen elsewhere; a newer block expires the fee cache"""
+        if self._latest_block is None or block_number > self._latest_block:
+            self._latest_block = block_number
+
+    def _is_fresh(self) -> bool:
+        if self._fees is None:
+            return False
+        if self._latest_block is not None and self._fees_block is not None and self._latest_block > self._fees_block:
+            return False
+        return time.time() - self._fees_at < self.block_time
+
+    async def get_fees(self) -> Dict[str, int]:
+        """
+        Fee fields for a transaction in the current block
+
+        Returns:
+            {'maxFeePerGas', 'maxPriorityFeePerGas'} or {'gasPrice'}
+        """
+        if self._is_fresh():
+            self._stats["fee_hits"] += 1
+            return dict(self._fees)
+
+        # Concurrent callers in a burst share one refresh
+        async with self._refresh_lock:
+            if self._is_fresh():
+                self._stats["fee_hits"] += 1
+                return dict(self._fees)
+
+            block = await self._get_block('latest')
+            base_fee = block.get('baseFeePerGas')
+            if base_fee is not None and self._get_max_priority_fee is not None:
+                tip = await self._get_max_priority_fee()
+                fees = {
+                    'maxFeePerGas': int(base_fee * self.base_fee_multiplier) + tip,
+                    'maxPriorityFeePerGas': tip,
+                }
+            else:
+                fees = {'gasPrice': await self._get_gas_price()}
+
+            self._fees = fees
+            self._fees_block = block.get('number')
+            self._fees_at = time.time()
+            if self._fees_block is not None:
+                self.note_block(self._fees_block)
+            self._stats["fee_refreshes"] += 1
+            return dict(fees)
+
+    def record_gas(self, action: str, gas: int):
+        """Add a gas sample (estimate or receipt gasUsed) for an action"""
+        samples = self._samples.setdefault(action, deque(maxlen=self.max_samples))
+        samples.append(int(gas))
+
+    async def gas_limit(self, action: str, estimate: Optional[Callable[[], Awaitable[int]]] = None) -> int:
+        """
+        Gas limit for an action
+
+        Args:
+            action: Decision action (e.g. BORROW_AND_INVEST)
+            estimate: Optional async estimate_gas used only while the action has no samples
+
+        Returns:
+            Largest recent sample times the safety margin
+        """
+        samples = self._samples.get(action)
+        if samples:
+            self._stats["gas_limit_hits"] += 1
+        elif estimate is not None:
+            try:
+                self.record_gas(action, await estimate())
+                self._stats["gas_estimates"] += 1
+                samples = self._samples[action]
+            except Exception as e:
+                print(f"Warning: Gas estimate for {action} failed, using default limit: {e}")
+
+        if not samples:
+            return self.default_gas_limit
+        return int(max(samples) * self.gas_limit_multiplier)
+
+    def get_stats(self) -> Dict:
+        """
+        Get fee oracle counters
+
+        Returns:
+            Dictionary with cache counters, current fees and learned limits
+        """
+        return {
+            **self._stats,
+            "fees": dict(self._fees) if self._fees else None,
+            "fees_block": self._fees_block,
+            "gas_limits": {
+                action: int(max(samples) * self.gas_limit_multiplier)
+                for action, samples in self._samples.items() if samples
+            },
+        }
@@ -1,4 +1,5 @@
 """LLM-Powered Decision Engine using Claude"""
+import asyncio
 import time
 import json
 from typing import Dict, List
@@ -11,6 +12,7 @@ from .models import (
     Opportunity, RiskReport
 )
 from .config import config
+from .tokens import get_token_registry
 
 
 class LLMDecisionEngine:
@@ -23,6 +25,7 @@ class LLMDecisionEngine:
             temperature=0.3,  # Some creativity but mostly deterministic
             anthropic_api_key=config.ANTHROPIC_API_KEY
         )
+        self.tokens = get_token_registry()
 
     async def evaluate(
         self,
@@ -35,7 +38,7 @@ class LLMDecisionEngine:
         Use LLM to evaluate current state and make investment decision
         """
         # 1. Prepare context for LLM (with real prices if orchestrator available)
-        context = self._prepare_context(agent_state, market_data, orchestrator)
+        context = await self._prepare_context(agent_state, market_data, orchestrator)
 
         # 2. Create prompt for LLM
         prompt = self._create_decision_prompt(context, agent_state)
@@ -48,8 +51,7 @@ class LLMDecisionEngine:
 
         return decision
 
-    def _prepare_context(self, agent_state: AgentState, market_data: MarketData, orchestrator=None) -> Dict:
-    def _prepare_context(self, agent_state: AgentState, market_data: MarketData, orchestrator=None) -> Dict:
+    async def _prepare_context(self, agent_state: AgentState, market_data: MarketData, orchestrator=None) -> Dict:
         """Prepare context data for LLM with real market prices when available"""
         # Calculate portfolio metrics
         portfolio_value = agent_state.collateral_amount + agent_state.total_assets
@@ -60,8 +62,10 @@ class LLMDecisionEngine:
         real_prices = {}
         if orchestrator:
             try:
-                btc_price = orchestrator.get_market_price("BTC")
-                eth_price = orchestrator.get_market_price("ETH")
+                btc_price, eth_price = await asyncio.gather(
+                    orchestrator.aget_market_price("BTC"),
+                    orchestrator.aget_market_price("ETH")
+                )
                 if btc_price:
                     real_prices["BTC"] = btc_price
                 if eth_price:
@@ -91,7 +95,7 @@ class LLMDecisionEngine:
             # Get current price - prefer real price from orchestrator
             current_price = None
             if orchestrator:
-                current_price = orchestrator.get_dex_price(pos.asset)
+                current_price = await orchestrator.aget_dex_price(pos.asset)
 
             # Fallback to market data
             if current_price is None or current_price == 0:
@@ -137,13 +141,7 @@ class LLMDecisionEngine:
 
     def _get_token_name(self, asset_address: str) -> str:
         """Get token name from address"""
-        from .config import config
-        address_to_token = {
-            config.WETH_ADDRESS.lower() if config.WETH_ADDRESS else '': 'ETH',
-            config.WBTC_ADDRESS.lower() if config.WBTC_ADDRESS else '': 'BTC',
-            config.MOCK_USDC_ADDRESS.lower() if config.MOCK_USDC_ADDRESS else '': 'USDC',
-        }
-        return address_to_token.get(asset_address.lower(), 'Unknown')
+        return self.tokens.symbol_for(asset_address) or 'Unknown'
 
     def _estimate_return(self, token: str, market_data: MarketData) -> float:
         """Estimate potential return for a token"""
@@ -15,13 +15,22 @@ async def main():
     print(f"  Risk Check Interval: {config.RISK_CHECK_INTERVAL}s")
     print(f"  AI Agent Address: {config.AI_AGENT_ADDRESS}")
     print(f"  RPC URL: {config.WEB3_PROVIDER_URI}")
+    print(f"  Async RPC: {'enabled' if config.USE_ASYNC_WEB3 else 'disabled'}")
+    print(f"  Event Indexer: {config.INDEXER_DB_PATH if config.USE_EVENT_INDEXER else 'disabled'}")
+    print(f"  Sharding: {f'{config.SHARD_COUNT} shards via {config.SHARD_STORE}' if config.SHARD_COUNT > 0 else 'disabled'}")
     print(f"\n🚀 Multi-User Mode: Processing all users independently")
     print(f"\nStarting agent orchestrator...\n")
 
+    orchestrator = None
     try:
         orchestrator = AgentOrchestrator()
         print("✅ Orchestrator created")
 
+        if config.RECORD_ROUNDS_DIR:
+            from .replay import RoundRecorder
+            RoundRecorder(config.RECORD_ROUNDS_DIR).attach(orchestrator)
+            print(f"⏺️  Recording decision rounds to {config.RECORD_ROUNDS_DIR}")
+
         # Use deployed agent address
         agent_id = config.AI_AGENT_ADDRESS
         if not agent_id or agent_id == "":
@@ -33,15 +42,32 @@ async def main():
         print(f"Controller: {config.PRIVATE_KEY[:10]}..." if config.PRIVATE_KEY else "No private key")
         print()
 
+        if config.SHARD_COUNT > 0:
+            # Take this worker's shard leases before the loops read the user list
+            await orchestrator.join_shards(agent_id)
+
         # Run MULTI-USER loop and risk monitoring concurrently
-        await asyncio.gather(
-            orchestrator.run_multi_user_loop(agent_id),  # NEW: Multi-user loop
-            orchestrator.monitor_risk(agent_id)
-        )
+        if config.USE_SCHEDULER:
+            decision_loop = orchestrator.run_scheduled_loop(agent_id)
+        else:
+            decision_loop = orchestrator.run_multi_user_loop(agent_id)  # NEW: Multi-user loop
+
+        tasks = [decision_loop, orchestrator.monitor_risk(agent_id)]
+        if config.USE_EVENT_INDEXER:
+            tasks.append(orchestrator.run_indexer(agent_id))
+        if orchestrator.shards:
+            tasks.append(orchestrator.shards.run())
+        if config.METRICS_PORT > 0:
+            tasks.append(orchestrator.run_metrics_server())
+
+        await asyncio.gather(*tasks)
     except Exception as e:
         print(f"❌ Error in main: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if orchestrator:
+            await orchestrator.close()
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,360 @@
+"""Latency histograms, counters and gauges with Prometheus text export"""
+import bisect
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers cache hits (sub-ms) through slow RPC / LLM calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONFIRMATION_BUCKETS = (1, 2, 5, 10, 20, 30, 60, 120, 300, 600)
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Last set value per label set"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = float(value)
+
+    def value(self, **labels) -> Optional[float]:
+        return self._values.get(self._key(labels))
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (plus sum, count and max) per label set"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Labels, Dict[str, Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0, "max": 0.0}
+        series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+        series["max"] = max(series["max"], value)
+
+    def totals(self) -> Dict[Labels, Tuple[int, float]]:
+        """(count, sum) per label set, for computing per-round deltas"""
+        return {key: (series["count"], series["sum"]) for key, series in self._series.items()}
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Upper bucket bound containing the q-quantile (None without samples)"""
+        series = self._series.get(self._key(labels))
+        if not series or not series["count"]:
+            return None
+        target = q * series["count"]
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), series["counts"]):
+            seen += count
+            if seen >= target:
+                return bound if bound != math.inf else series["max"]
+        return series["max"]
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series["counts"]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{labels} {series['count']}")
+        return lines
+
+
+class _StageTimer:
+    def __init__(self, metrics: "AgentMetrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.stage_seconds.observe(time.perf_counter() - self.started, stage=self.stage)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            self.metrics.stage_errors.inc(stage=self.stage)
+        return False
+
+
+class MetricsRegistry:
+    """
+    A set of metrics plus collectors that expose component stats as gauges.
+
+    Collectors are callables returning a flat dict (e.g. a get_stats()
+    method); numeric values are rendered as `<prefix>_<key>` gauges at
+    scrape time, everything else is skipped.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Tuple[str, Callable[[], Dict]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, prefix: str, collect: Callable[[], Optional[Dict]]):
+        """
+        Export a stats dict as gauges on every scrape
+
+        Args:
+            prefix: Metric name prefix, e.g. "agent_state_cache"
+            collect: () -> flat dict of stats, or None when the component is not active
+        """
+        self._collectors.append((prefix, collect))
+
+    def _collected(self) -> List[str]:
+        lines = []
+        for prefix, collect in self._collectors:
+            try:
+                stats = collect() or {}
+            except Exception as e:
+                print(f"Warning: Metrics collector {prefix} failed: {e}")
+                continue
+            for key, value in sorted(stats.items()):
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {_format_value(value)}")
+        return lines
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        lines.extend(self._collected())
+        return "\n".join(lines) + "\n"
+
+
+class AgentMetrics(MetricsRegistry):
+    """Orchestrator metrics: per-stage latency, rounds, decisions and confirmations"""
+
+    def __init__(self):
+        super().__init__()
+        self.stage_seconds = self.histogram(
+            "agent_stage_seconds", "Latency of each orchestrator stage", ["stage"]
+        )
+        self.stage_errors = self.counter(
+            "agent_stage_errors_total", "Orchestrator stages that raised", ["stage"]
+        )
+        self.rounds = self.counter("agent_rounds_total", "Completed rounds", ["loop"])
+        self.round_seconds = self.gauge(
+            "agent_round_duration_seconds", "Duration of the last round", ["loop"]
+        )
+        self.users_per_second = self.gauge(
+            "agent_round_users_per_second", "Users processed per second in the last round", ["loop"]
+        )
+        self.users_processed = self.counter(
+            "agent_users_processed_total", "Users processed by outcome", ["loop", "outcome"]
+        )
+        self.decisions = self.counter("agent_decisions_total", "Decisions made by action", ["action"])
+        self.tx_confirmation_seconds = self.histogram(
+            "agent_tx_confirmation_seconds", "Submit-to-receipt latency of decision transactions",
+            ["status"], buckets=CONFIRMATION_BUCKETS
+        )
+
+    def stage(self, name: str) -> _StageTimer:
+        """
+        Time a block as one stage (errors are counted and re-raised)
+
+        Usage:
+            with metrics.stage("market_data"):
+                market_data = await self._fetch_market_data()
+        """
+        return _StageTimer(self, name)
+
+    def record_round(self, loop: str, users: int, duration: float, outcomes: Optional[Dict[str, int]] = None):
+        """
+        Record a completed round
+
+        Args:
+            loop: "decision" or "risk"
+            users: Users handled in the round
+            duration: Round wall time in seconds
+            outcomes: Optional outcome -> user count (e.g. acted / skipped)
+        """
+        self.rounds.inc(loop=loop)
+        self.round_seconds.set(duration, loop=loop)
+        self.users_per_second.set(users / duration if duration > 0 else 0.0, loop=loop)
+        for outcome, count in (outcomes or {}).items():
+            self.users_processed.inc(count, loop=loop, outcome=outcome)
+
+    def stage_totals(self) -> Dict[str, Tuple[int, float]]:
+        """Cumulative (count, seconds) per stage"""
+        return {key[0]: totals for key, totals in self.stage_seconds.totals().items()}
+
+    def round_summary(
+        self,
+        loop: str,
+        previous_totals: Dict[str, Tuple[int, float]],
+        extra: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Summary of one round: duration, throughput and per-stage time spent since `previous_totals`
+
+        Args:
+            loop: "decision" or "risk"
+            previous_totals: stage_totals() taken when the round started
+            extra: Additional fields to include
+
+        Returns:
+            JSON-serializable dict
+        """
+        stages = {}
+        for stage, (count, seconds) in self.stage_totals().items():
+            prev_count, prev_seconds = previous_totals.get(stage, (0, 0.0))
+            if count > prev_count:
+                stages[stage] = {
+                    "count": count - prev_count,
+                    "total_ms": round((seconds - prev_seconds) * 1000, 3),
+                    "avg_ms": round((seconds - prev_seconds) * 1000 / (count - prev_count), 3),
+                    "p95_ms_cumulative": round((self.stage_seconds.quantile(0.95, stage=stage) or 0) * 1000, 3),
+                }
+        return {
+            "timestamp": int(time.time()),
+            "loop": loop,
+            "duration_s": round(self.round_seconds.value(loop=loop) or 0.0, 3),
+            "users_per_second": round(self.users_per_second.value(loop=loop) or 0.0, 3),
+            "stages": stages,
+            **(extra or {}),
+        }
+
+
+class MetricsServer:
+    """
+    Serves GET /metrics (Prometheus text format) from inside the asyncio loop.
+
+    Other components can add JSON routes with add_json_route().
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "0.0.0.0", port: int = 9100):
+        """
+        Args:
+            registry: Metrics to expose
+            host: Bind address
+            port: Bind port
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._json_routes: Dict[str, Callable[[], Any]] = {}
+        self._runner = None
+
+    def add_json_route(self, path: str, handler: Callable[[], Any]):
+        """Serve handler() as JSON on GET `path` (register before start())"""
+        self._json_routes[path] = handler
+
+    async def start(self):
+        """Bind and start serving (returns once listening)"""
+        from aiohttp import web
+
+        async def metrics(request):
+            return web.Response(text=self.registry.render(), content_type="text/plain", charset="utf-8")
+
+        def json_handler(handler):
+            async def handle(request):
+                return web.json_response(handler())
+            return handle
+
+        app = web.Application()
+        app.router.add_get("/metrics", metrics)
+        for path, handler in self._json_routes.items():
+            app.router.add_get(path, json_handler(handler))
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        print(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self):
+        """Stop serving"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,310 @@
+"""Controller-side nonce allocation and pipelined transaction submission"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
+from web3.exceptions import TransactionNotFound
+
+# sign(nonce, fees) -> raw signed transaction; fees is e.g. {'gasPrice': wei}
+# or {'maxFeePerGas': wei, 'maxPriorityFeePerGas': wei}
+Signer = Callable[[int, Dict[str, int]], Awaitable[bytes]]
+
+
+class TransactionReplaced(Exception):
+    """Our nonce was mined by a transaction we did not send (or no longer track)"""
+
+
+@dataclass
+class PendingTransaction:
+    """A submitted transaction and every hash broadcast for its nonce"""
+    nonce: int
+    sign: Signer
+    fees: Dict[str, int]
+    hashes: List = field(default_factory=list)
+    sent_at: float = 0.0
+    bumps: int = 0
+    missing_polls: int = 0
+    raw: Optional[bytes] = None  # last signed broadcast
+
+
+class NonceManager:
+    """
+    Allocates controller nonces locally so transactions can be submitted
+    back-to-back instead of one per block.
+
+    Nonces are handed out from an in-memory counter seeded from the chain's
+    pending count. A failed broadcast or a dropped/replaced transaction
+    triggers a resync; allocation skips nonces still in flight so a resync
+    fills gaps rather than colliding. Transactions that sit unmined past
+    `stuck_timeout` are re-signed with bumped fees under the same nonce.
+
+    With an `allocator` (e.g. sharding.SharedNonceAllocator) nonces come
+    from a sequence shared by every process using the controller key, and
+    the local counter only tracks the chain's pending nonce (re-read before
+    each allocation) as a floor.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        get_transaction_count: Callable[[str, str], Awaitable[int]],
+        send_raw_transaction: Callable[[bytes], Awaitable],
+        get_transaction_receipt: Callable[[object], Awaitable[Dict]],
+        max_pending: int = 16,
+        stuck_timeout: float = 60.0,
+        gas_bump_percent: int = 125,
+        max_gas_price: Optional[int] = None,
+        allocator=None
+    ):
+        """
+        Initialize nonce manager
+
+        Args:
+            address: Controller account address
+            get_transaction_count: async (address, block_identifier) -> nonce
+            send_raw_transaction: async (raw_tx) -> tx hash
+            get_transaction_receipt: async (tx_hash) -> receipt, raising TransactionNotFound while pending
+            max_pending: Max unconfirmed transactions in flight
+            stuck_timeout: Seconds without a receipt before fees are bumped
+            gas_bump_percent: Fee multiplier per bump (nodes require >= 110)
+            max_gas_price: Optional cap on any bumped fee field (wei)
+            allocator: Optional shared allocator with async allocate(floor)/committed(nonce)/release(nonce)
+        """
+        self.address = address
+        self._get_transaction_count = get_transaction_count
+        self._send_raw_transaction = send_raw_transaction
+        self._get_transaction_receipt = get_transaction_receipt
+        self.max_pending = max(1, max_pending)
+        self.stuck_timeout = stuck_timeout
+        self.gas_bump_percent = max(110, gas_bump_percent)
+        self.max_gas_price = max_gas_price
+        self._allocator = allocator
+
+        self._next_nonce: Optional[int] = None
+        self._pending: Dict[int, PendingTransaction] = {}
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._stats = {
+            "submitted": 0,
+            "confirmed": 0,
+            "resyncs": 0,
+            "gas_bumps": 0,
+            "rebroadcasts": 0,
+            "replaced": 0,
+        }
+
+    @property
+    def pending_count(self) -> int:
+        """Transactions submitted but not yet confirmed"""
+        return len(self._pending)
+
+    async def resync(self):
+        """Reseed the local counter from the chain's pending nonce"""
+        async with self._lock:
+            await self._resync_locked()
+
+    async def _resync_locked(self):
+        chain_nonce = await self._get_transaction_count(self.address, 'pending')
+        if self._allocator is None and self._next_nonce is not None and chain_nonce != self._next_nonce:
+            self._stats["resyncs"] += 1
+            print(f"🔄 Nonce resync for {self.address}: local {self._next_nonce} -> chain {chain_nonce}")
+        self._next_nonce = chain_nonce
+
+    def _allocate_locked(self) -> int:
+        nonce = self._next_nonce
+        while nonce in self._pending:
+            nonce += 1
+        self._next_nonce = nonce + 1
+        return nonce
+
+    async def submit(self, sign: Signer, fees: Dict[str, int]) -> Tuple[int, object]:
+        """
+        Allocate a nonce, sign and broadcast without waiting for the receipt
+
+        Args:
+            sign: Async callback building and signing the tx for (nonce, fees)
+            fees: Initial fee fields
+
+        Returns:
+            (nonce, tx_hash)
+        """
+        await self._slots.acquire()
+        try:
+            async with self._lock:
+                if self._allocator is not None:
+                    # Fresh floor: the allocator only reissues abandoned claims the chain has not passed
+                    await self._resync_locked()
+                    nonce = await self._allocator.allocate(self._next_nonce)
+                else:
+                    if self._next_nonce is None:
+                        await self._resync_locked()
+                    nonce = self._allocate_locked()
+                pending = PendingTransaction(nonce=nonce, sign=sign, fees=dict(fees))
+                self._pending[nonce] = pending
+
+                try:
+                    tx_hash = await self._broadcast(pending)
+                except Exception:
+                    # Nothing reached the mempool: free the nonce and reseed
+                    del self._pending[nonce]
+                    if self._allocator is not None:
+                        try:
+                            await self._allocator.release(nonce)
+                        except Exception as e:
+                            # The claim goes stale and is reissued after the allocator's TTL
+                            print(f"Warning: Could not release shared nonce {nonce}: {e}")
+                    await self._resync_locked()
+                    raise
+
+                if self._allocator is not None:
+                    try:
+                        await self._allocator.committed(nonce)
+                    except Exception as e:
+                        # The tx is out; our claim stays live (we heartbeat) until the chain passes it
+                        print(f"Warning: Could not commit shared nonce {nonce}: {e}")
+        except Exception:
+            self._slots.release()
+            raise
+
+        self._stats["submitted"] += 1
+        return nonce, tx_hash
+
+    async def _broadcast(self, pending: PendingTransaction):
+        raw_tx = await pending.sign(pending.nonce, pending.fees)
+        tx_hash = await self._send_raw_transaction(raw_tx)
+        pending.hashes.append(tx_hash)
+        pending.sent_at = time.time()
+        pending.raw = raw_tx
+        return tx_hash
+
+    async def adopt(self, nonce: int, raw_tx: bytes, hashes: List, sent_at: float):
+        """
+        Track a transaction broadcast by a previous run (warm restart)
+
+        The signer is gone, so a stuck adopted transaction is rebroadcast
+        as-is instead of re-priced.
+
+        Args:
+            nonce: Transaction nonce
+            raw_tx: Last signed broadcast
+            hashes: Every hash broadcast for the nonce
+            sent_at: When it was last broadcast
+        """
+        if nonce in self._pending:
+            return
+
+        async def resend(_nonce: int, _fees: Dict[str, int]) -> bytes:
+            return raw_tx
+
+        await self._slots.acquire()
+        self._pending[nonce] = PendingTransaction(
+            nonce=nonce, sign=resend, fees={}, hashes=list(hashes), sent_at=sent_at, raw=raw_tx
+        )
+
+    def export_pending(self) -> List[Dict]:
+        """In-flight transactions as JSON-serializable dicts (for checkpoints)"""
+        return [
+            {
+                "nonce": pending.nonce,
+                "hashes": [h.hex() if isinstance(h, bytes) else str(h) for h in pending.hashes],
+                "raw": pending.raw.hex() if pending.raw else None,
+                "sent_at": pending.sent_at,
+            }
+            for pending in self._pending.values() if pending.raw
+        ]
+
+    def _bumped(self, fees: Dict[str, int]) -> Dict[str, int]:
+        bumped = {}
+        for key, value in fees.items():
+            new_value = value * self.gas_bump_percent // 100 + 1
+            if self.max_gas_price is not None:
+                new_value = min(new_value, self.max_gas_price)
+            bumped[key] = new_value
+        return bumped
+
+    async def _find_receipt(self, pending: PendingTransaction) -> Optional[Dict]:
+        for tx_hash in reversed(pending.hashes):
+            try:
+                receipt = await self._get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+            if receipt is not None:
+                return receipt
+        return None
+
+    async def _reprice(self, pending: PendingTransaction):
+        fees = self._bumped(pending.fees)
+        if fees == pending.fees:
+            self._stats["rebroadcasts"] += 1
+        else:
+            self._stats["gas_bumps"] += 1
+        pending.fees = fees
+        pending.bumps += 1
+
+        try:
+            tx_hash = await self._broadcast(pending)
+            print(f"⛽ Re-sent nonce {pending.nonce} with {fees} (attempt {pending.bumps + 1}): {tx_hash.hex()}")
+        except Exception as e:
+            # "nonce too low" means an earlier hash just got mined; the next poll finds it
+            pending.sent_at = time.time()
+            print(f"⚠️  Could not re-send nonce {pending.nonce}: {e}")
+
+    async def poll_pending(self) -> Dict[int, Union[Dict, Exception]]:
+        """
+        One pass over every in-flight nonce: fetch receipts for mined nonces
+        and re-price stuck ones. Costs one nonce lookup plus one receipt per
+        newly mined transaction, regardless of how many are pending.
+
+        Returns:
+            Dict of settled nonce -> receipt, or TransactionReplaced if the
+            nonce was consumed by a transaction we did not send
+        """
+        if not self._pending:
+            return {}
+
+        mined_nonce = await self._get_transaction_count(self.address, 'latest')
+        if self._allocator is not None and self._next_nonce is not None:
+            self._next_nonce = max(self._next_nonce, mined_nonce)
+        mined = [p for n, p in sorted(self._pending.items()) if n < mined_nonce]
+        waiting = [p for n, p in sorted(self._pending.items()) if n >= mined_nonce]
+
+        receipts = await asyncio.gather(*(self._find_receipt(p) for p in mined))
+        settled: Dict[int, Union[Dict, Exception]] = {}
+        for pending, receipt in zip(mined, receipts):
+            if receipt is None:
+                # Receipts can lag the nonce briefly; only give up after a few polls
+                pending.missing_polls += 1
+                if pending.missing_polls < 3:
+                    continue
+                self._stats["replaced"] += 1
+                receipt = TransactionReplaced(f"nonce {pending.nonce} was mined by another transaction")
+            settled[pending.nonce] = receipt
+            self._confirm(pending.nonce)
+
+        now = time.time()
+        for pending in waiting:
+            if now - pending.sent_at >= self.stuck_timeout:
+                await self._reprice(pending)
+
+        if any(isinstance(result, Exception) for result in settled.values()):
+            await self.resync()
+        return settled
+
+    def _confirm(self, nonce: int):
+        if self._pending.pop(nonce, None) is not None:
+            self._stats["confirmed"] += 1
+            self._slots.release()
+
+    def get_stats(self) -> Dict:
+        """
+        Get nonce manager counters
+
+        Returns:
+            Dictionary with submission counters and current nonce state
+        """
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "next_nonce": self._next_nonce,
+            "oldest_pending_nonce": min(self._pending) if self._pending else None,
+        }
@@ -0,0 +1,185 @@
+"""Columnar OHLC candle series backed by contiguous NumPy arrays"""
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+FIELDS = ("timestamp", "open", "high", "low", "close")
+
+
+class OHLCSeries:
+    """
+    Candles as five parallel arrays: int64 timestamps (ms) and float64
+    open/high/low/close, ordered by timestamp.
+
+    Time-range slices are views (binary search on the timestamp column, no
+    copy). Resampling to coarser candles and binary serialization are
+    whole-array operations. JSON is formatted straight from the columns, so
+    a 365-day history never becomes thousands of per-candle Python objects.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        timestamp: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray
+    ):
+        """
+        Args:
+            timestamp: Candle timestamps in ms, ascending
+            open: Open prices
+            high: High prices
+            low: Low prices
+            close: Close prices
+        """
+        self.timestamp = np.asarray(timestamp, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        if not all(len(getattr(self, field)) == len(self.timestamp) for field in FIELDS):
+            raise ValueError("OHLC columns differ in length")
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def empty(cls) -> "OHLCSeries":
+        """Series with no candles"""
+        return cls(*(np.empty(0) for _ in FIELDS))
+
+    @classmethod
+    def from_rows(cls, rows) -> "OHLCSeries":
+        """
+        Series from [timestamp, open, high, low, close] rows
+
+        Args:
+            rows: (N, >=5) array-like, e.g. an OHLCStore window or CoinGecko's /ohlc payload
+
+        Returns:
+            OHLCSeries with each column copied once into a contiguous array
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.size == 0:
+            return cls.empty()
+        if rows.ndim != 2 or rows.shape[1] < len(FIELDS):
+            raise ValueError(f"Expected (N, 5) OHLC rows, got shape {rows.shape}")
+        return cls(*(np.ascontiguousarray(rows[:, i]) for i in range(len(FIELDS))))
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> "OHLCSeries":
+        """Inverse of to_bytes()"""
+        return cls.from_rows(np.frombuffer(buffer, dtype="<f8").reshape(-1, len(FIELDS)))
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, OHLCSeries):
+            return NotImplemented
+        return all(np.array_equal(getattr(self, f), getattr(other, f)) for f in FIELDS)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "OHLCSeries(empty)"
+        return f"OHLCSeries({len(self)} candles, {self.timestamp[0]}..{self.timestamp[-1]})"
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the column arrays"""
+        return sum(getattr(self, field).nbytes for field in FIELDS)
+
+    def slice(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> "OHLCSeries":
+        """
+        Candles with start_ms <= timestamp < end_ms, as views into this series
+
+        Args:
+            start_ms: First timestamp included (None = from the oldest)
+            end_ms: First timestamp excluded (None = to the newest)
+
+        Returns:
+            OHLCSeries sharing this series' memory
+        """
+        lo = int(np.searchsorted(self.timestamp, start_ms, side='left')) if start_ms is not None else 0
+        hi = int(np.searchsorted(self.timestamp, end_ms, side='left')) if end_ms is not None else len(self)
+        return OHLCSeries(*(getattr(self, field)[lo:hi] for field in FIELDS))
+
+    def resample(self, interval_ms: int) -> "OHLCSeries":
+        """
+        Aggregate into coarser candles aligned to multiples of `interval_ms`
+
+        Each output candle takes the first open, max high, min low and last
+        close of the input candles in its bucket. It is stamped with the
+        bucket start.
+
+        Args:
+            interval_ms: Output candle size in ms
+
+        Returns:
+            New OHLCSeries
+        """
+        if not len(self):
+            return OHLCSeries.empty()
+        buckets = self.timestamp // interval_ms
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+        ends = np.concatenate((starts[1:], [len(self)])) - 1
+        return OHLCSeries(
+            buckets[starts] * interval_ms,
+            self.open[starts],
+            np.maximum.reduceat(self.high, starts),
+            np.minimum.reduceat(self.low, starts),
+            self.close[ends]
+        )
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+
+    def to_rows(self) -> np.ndarray:
+        """(N, 5) float64 rows [timestamp, open, high, low, close] (e.g. for OHLCStore)"""
+        return np.column_stack([getattr(self, field).astype(np.float64) for field in FIELDS])
+
+    def to_bytes(self) -> bytes:
+        """Little-endian float64 rows, 40 bytes per candle"""
+        return self.to_rows().astype("<f8", copy=False).tobytes()
+
+    def to_columns(self) -> Dict[str, List]:
+        """{"timestamp": [...], "open": [...], ...} for columnar JSON"""
+        return {field: getattr(self, field).tolist() for field in FIELDS}
+
+    def to_json(self, aliases: Optional[Dict[str, Sequence[str]]] = None) -> str:
+        """
+        JSON array of {"timestamp", "open", "high", "low", "close"} objects
+
+        Each candle is one %-template applied to the column values, so no
+        per-candle dict or dataclass is built on the way to the response
+        text. Non-finite prices become null.
+
+        Args:
+            aliases: Extra keys repeating a column, e.g. {"timestamp": ["date"]}
+
+        Returns:
+            JSON text
+        """
+        aliases = aliases or {}
+        keys, columns = [], []
+        for field in FIELDS:
+            column = getattr(self, field)
+            if column.dtype.kind == 'i':
+                spec, values = '%d', column.tolist()
+            elif np.isfinite(column).all():
+                spec, values = '%r', column.tolist()
+            else:
+                spec, values = '%s', np.where(np.isfinite(column), column.astype(str), 'null').tolist()
+            for key in (field, *aliases.get(field, ())):
+                keys.append(f'"{key}":{spec}')
+                columns.append(values)
+        template = '{' + ','.join(keys) + '}'
+        return '[' + ','.join(map(template.__mod__, zip(*columns))) + ']'
@@ -0,0 +1,236 @@
+"""Persistent append-only OHLC candle store, one file per symbol and candle size"""
+import json
+import os
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+DAY_MS = 86_400_000
+ROW_WIDTH = 5  # timestamp (ms), open, high, low, close
+ROW_BYTES = ROW_WIDTH * 8
+
+# CoinGecko /coins/{id}/ohlc picks the candle size from `days`, and only
+# accepts a fixed set of `days` values. Each candle size is a separate series.
+_BUCKETS: Tuple[Tuple[int, int, Tuple[int, ...]], ...] = (
+    # (max days, candle ms, accepted days values with this candle size)
+    (2, 30 * 60_000, (1,)),
+    (30, 4 * 3_600_000, (7, 14, 30)),
+    (10 ** 9, 4 * DAY_MS, (90, 180, 365)),
+)
+
+
+def granularity_for(days: int) -> int:
+    """Candle size (ms) CoinGecko returns for a `days` window"""
+    for max_days, granularity, _ in _BUCKETS:
+        if days <= max_days:
+            return granularity
+    return _BUCKETS[-1][1]
+
+
+def tail_days(granularity: int, gap_ms: int) -> int:
+    """
+    Smallest accepted `days` value with candle size `granularity` that covers `gap_ms`
+
+    Args:
+        granularity: Candle size in ms
+        gap_ms: Time since the last stored candle
+
+    Returns:
+        `days` to request (the largest in the bucket when none covers the gap)
+    """
+    for _, bucket_granularity, accepted in _BUCKETS:
+        if bucket_granularity == granularity:
+            for days in accepted:
+                if days * DAY_MS >= gap_ms:
+                    return days
+            return accepted[-1]
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class OHLCStore:
+    """
+    Local candle history so repeated chart requests never refetch.
+
+    Each (symbol, candle size) series is a flat file of float64 rows
+    [timestamp, open, high, low, close] in timestamp order. New candles are
+    appended. The newest stored candle may still be forming, so a row with
+    the same timestamp replaces it in place. Reads memory-map the file and
+    slice a window by binary search on the timestamp column, so serving any
+    window is one file read. A short trailing row left by a crash mid-append
+    is truncated on the next write.
+
+    A JSON sidecar per series records the longest window backfilled and
+    when the tail was last synced.
+
+    Not thread-safe per series: writes to one series must not overlap
+    (PriceService serializes them with a lock per series).
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize store
+
+        Args:
+            root: Directory holding the series files (created on first write)
+        """
+        self.root = root
+        self._stats = {"reads": 0, "appended_rows": 0, "replaced_rows": 0, "merges": 0}
+
+    def _path(self, symbol: str, granularity: int) -> str:
+        return os.path.join(self.root, f"{symbol.upper()}-{granularity // 1000}s.f64")
+
+    def _meta_path(self, symbol: str, granularity: int) -> str:
+        return self._path(symbol, granularity)[:-len(".f64")] + ".json"
+
+    def read(self, symbol: str, granularity: int) -> np.ndarray:
+        """
+        Whole series
+
+        Args:
+            symbol: Token symbol
+            granularity: Candle size in ms
+
+        Returns:
+            Read-only (N, 5) float64 array (memory-mapped), empty when nothing is stored
+        """
+        self._stats["reads"] += 1
+        path = self._path(symbol, granularity)
+        rows = os.path.getsize(path) // ROW_BYTES if os.path.exists(path) else 0
+        if rows == 0:
+            return np.empty((0, ROW_WIDTH))
+        return np.memmap(path, dtype=np.float64, mode='r', shape=(rows, ROW_WIDTH))
+
+    def window(self, symbol: str, granularity: int, start_ms: int, end_ms: Optional[int] = None) -> np.ndarray:
+        """
+        Candles with start_ms <= timestamp (< end_ms)
+
+        Args:
+            symbol: Token symbol
+            granularity: Candle size in ms
+            start_ms: First timestamp included
+            end_ms: First timestamp excluded (None = up to the newest)
+
+        Returns:
+            (N, 5) view into the series
+        """
+        series = self.read(symbol, granularity)
+        timestamps = series[:, 0]
+        lo = int(np.searchsorted(timestamps, start_ms, side='left'))
+        hi = int(np.searchsorted(timestamps, end_ms, side='left')) if end_ms is not None else len(series)
+        return series[lo:hi]
+
+    def last_timestamp(self, symbol: str, granularity: int) -> Optional[int]:
+        """Timestamp of the newest stored candle, or None"""
+        path = self._path(symbol, granularity)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size < ROW_BYTES:
+            return None
+        with open(path, 'rb') as f:
+            f.seek((size // ROW_BYTES - 1) * ROW_BYTES)
+            return int(np.frombuffer(f.read(8), dtype=np.float64)[0])
+
+    def append(self, symbol: str, granularity: int, rows: np.ndarray) -> int:
+        """
+        Add candles newer than the stored tail (the tail candle itself is replaced)
+
+        Args:
+            symbol: Token symbol
+            granularity: Candle size in ms
+            rows: (N, 5) candles, any order
+
+        Returns:
+            Number of rows appended
+        """
+        rows = _sorted_unique(rows)
+        if len(rows) == 0:
+            return 0
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(symbol, granularity)
+        _truncate_partial(path)
+        last = self.last_timestamp(symbol, granularity)
+        if last is None:
+            new = rows
+        else:
+            same = rows[rows[:, 0] == last]
+            if len(same):
+                with open(path, 'r+b') as f:
+                    f.seek(-ROW_BYTES, os.SEEK_END)
+                    f.write(same[-1].tobytes())
+                self._stats["replaced_rows"] += 1
+            new = rows[rows[:, 0] > last]
+
+        if len(new):
+            with open(path, 'ab') as f:
+                f.write(np.ascontiguousarray(new).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._stats["appended_rows"] += len(new)
+        return len(new)
+
+    def merge(self, symbol: str, granularity: int, rows: np.ndarray):
+        """
+        Union `rows` with the stored series (new rows win), rewritten atomically.
+        Used to backfill history older than the stored head.
+
+        Args:
+            symbol: Token symbol
+            granularity: Candle size in ms
+            rows: (N, 5) candles, any order
+        """
+        existing = np.array(self.read(symbol, granularity))
+        merged = _sorted_unique(np.concatenate([existing, np.asarray(rows, dtype=np.float64).reshape(-1, ROW_WIDTH)]))
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(symbol, granularity)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(np.ascontiguousarray(merged).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._stats["merges"] += 1
+
+    def get_meta(self, symbol: str, granularity: int) -> Dict:
+        """Sidecar for a series: {"days": longest backfilled window, "synced_at": epoch s}"""
+        try:
+            with open(self._meta_path(symbol, granularity)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def set_meta(self, symbol: str, granularity: int, **fields):
+        """Update sidecar fields (atomic replace)"""
+        meta = {**self.get_meta(symbol, granularity), **fields}
+        os.makedirs(self.root, exist_ok=True)
+        path = self._meta_path(symbol, granularity)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(meta, f)
+        os.replace(f"{path}.tmp", path)
+
+    def get_stats(self) -> Dict:
+        """
+        Get store size and I/O counters
+
+        Returns:
+            Dictionary with series/row/byte totals and read/append/merge counters
+        """
+        files = [name for name in os.listdir(self.root) if name.endswith(".f64")] if os.path.isdir(self.root) else []
+        size = sum(os.path.getsize(os.path.join(self.root, name)) for name in files)
+        return {**self._stats, "series": len(files), "rows": size // ROW_BYTES, "bytes": size}
+
+
+def _sorted_unique(rows: np.ndarray) -> np.ndarray:
+    """Rows ordered by timestamp, keeping the last occurrence of each timestamp"""
+    rows = np.asarray(rows, dtype=np.float64).reshape(-1, ROW_WIDTH)
+    if len(rows) == 0:
+        return rows
+    # Reverse so np.unique's first occurrence is the last given
+    reversed_rows = rows[::-1]
+    _, index = np.unique(reversed_rows[:, 0], return_index=True)
+    return reversed_rows[index]
+
+
+def _truncate_partial(path: str):
+    """Drop a trailing partial row left by an interrupted append"""
+    if os.path.exists(path):
+        size = os.path.getsize(path)
+        if size % ROW_BYTES:
+            os.truncate(path, size - size % ROW_BYTES)
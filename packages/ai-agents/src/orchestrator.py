@@ -1,13 +1,37 @@
 """Agent orchestrator for managing multiple AI agents"""
 import asyncio
+import json
+import os
 import time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+from hexbytes import HexBytes
 from web3 import Web3
 from .simple_decision_engine import SimpleDecisionEngine
 from .market_simulator import MarketSimulator
 from .models import AgentState, MarketData, Decision
 from .config import config
 from .price_service import get_price_service
+from .rate_governor import DECISION
+from .contract_registry import ContractRegistry
+from .async_chain import AsyncChainClient
+from .scheduler import CooldownScheduler
+from .event_indexer import EventIndexer
+from .nonce_manager import NonceManager
+from .receipt_tracker import ReceiptTracker, TrackedTransaction
+from .fee_oracle import FeeOracle
+from .state_cache import BlockStateCache
+from .write_queue import WriteBehindQueue
+from .batch_risk import BatchRiskEngine
+from .sharding import ShardCoordinator, SharedNonceAllocator, create_lease_store
+from .metrics import AgentMetrics, MetricsServer
+from .preflight import PreflightSimulator
+from .circuit_breaker import UserCircuitBreaker
+from .checkpoint import CheckpointStore, users_with_changed_preferences
+from .user_directory import UserDirectory
+from .tokens import get_token_registry
+from .batch_reader import (
+    BatchStateReader, parse_user_positions, parse_user_state, parse_user_preferences
+)
 
 class AgentOrchestrator:
     """Orchestrates multiple AI agents"""
@@ -16,49 +40,165 @@ class AgentOrchestrator:
         """Initialize orchestrator"""
         self.w3 = Web3(Web3.HTTPProvider(config.WEB3_PROVIDER_URI))
         self.decision_engine = SimpleDecisionEngine()
+        self.batch_risk_engine = BatchRiskEngine() if config.USE_BATCH_RISK else None
         self.market_simulator = MarketSimulator()
         self.active_agents: Dict[str, AgentState] = {}
         self.price_service = get_price_service()
+        self.contracts = ContractRegistry(self.w3)
+
+        # Bounded parallelism for chain reads and tx submission
+        self._read_limiter = asyncio.Semaphore(max(1, config.MAX_CONCURRENT_READS))
+        self._tx_limiter = asyncio.Semaphore(max(1, config.MAX_CONCURRENT_TXS))
+
+        # Users ordered by next eligible decision time (run_scheduled_loop)
+        self.scheduler = CooldownScheduler()
+
+        # Non-blocking RPC transport (reads, fees, sends and receipt lookups)
+        self.async_chain = AsyncChainClient(
+            config.WEB3_PROVIDER_URI,
+            pool_size=config.RPC_POOL_SIZE
+        ) if config.USE_ASYNC_WEB3 else None
+
+        # Multicall3 batching of per-user reads
+        self.batch_reader = BatchStateReader(
+            self.w3,
+            self.contracts,
+            multicall_address=config.MULTICALL_ADDRESS,
+            batch_size=config.MULTICALL_BATCH_SIZE,
+            eth_call=self.async_chain.eth_call if self.async_chain else None,
+            get_code=self.async_chain.get_code if self.async_chain else None,
+            call=self._call
+        ) if config.USE_MULTICALL else None
+
+        # Event-log index of users/prefs/positions (created by run_indexer)
+        self.indexer: Optional[EventIndexer] = None
+
+        # Known users of the agent contract, synced from the tail (created on first read)
+        self.user_directory: Optional[UserDirectory] = None
+
+        # Decision/outcome rows are buffered and bulk-inserted off the hot path
+        self.write_queue = WriteBehindQueue(
+            max_batch=config.DB_BATCH_SIZE,
+            flush_interval=config.DB_FLUSH_INTERVAL,
+            max_backlog=config.DB_MAX_BACKLOG,
+            max_retries=config.DB_MAX_RETRIES
+        )
 
-        # Token address to symbol mapping
-        self.token_address_to_symbol = {
-            config.WETH_ADDRESS.lower(): "ETH",
-            config.WBTC_ADDRESS.lower(): "BTC",
-        }
+        # Per-user reads cached for the current block (shared with monitor_risk)
+        self.state_cache = BlockStateCache(
+            self._block_number,
+            head_ttl=config.STATE_CACHE_HEAD_TTL
+        ) if config.USE_STATE_CACHE else None
+
+        # Fees cached per block, gas limits learned per action
+        self.fee_oracle = FeeOracle(
+            self._get_block,
+            self._gas_price,
+            get_max_priority_fee=self._max_priority_fee if config.USE_EIP1559 else None,
+            block_time=config.BLOCK_TIME,
+            gas_limit_multiplier=config.GAS_LIMIT_MULTIPLIER,
+            default_gas_limit=config.DEFAULT_GAS_LIMIT
+        )
 
-    async def orchestrate_decision(self, agent_id: str, user_address: str) -> Dict:
+        # eth_call + estimate_gas against the pending block before signing
+        self.preflight = PreflightSimulator(
+            self._eth_call,
+            self._estimate_gas,
+            gas_limit_multiplier=config.GAS_LIMIT_MULTIPLIER,
+            resize_steps=config.PREFLIGHT_RESIZE_STEPS,
+            max_concurrent=config.MAX_CONCURRENT_READS
+        ) if config.USE_PREFLIGHT else None
+
+        # Failing users back off exponentially and are parked after repeated failures
+        self.breaker = UserCircuitBreaker(
+            failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+            base_backoff=config.BREAKER_BASE_BACKOFF,
+            max_backoff=config.BREAKER_MAX_BACKOFF
+        ) if config.USE_CIRCUIT_BREAKER else None
+
+        # Shard ownership across worker processes (created by join_shards)
+        self.shards: Optional[ShardCoordinator] = None
+        self.lease_store = create_lease_store(config.SHARD_STORE) if config.SHARD_COUNT > 0 else None
+
+        # Local controller nonces and receipt tracking (created on first transaction)
+        self.nonce_manager: Optional[NonceManager] = None
+        self.receipt_tracker: Optional[ReceiptTracker] = None
+
+        # Scheduler state and in-flight txs for warm restarts (created by run_scheduled_loop)
+        self.checkpoints: Optional[CheckpointStore] = None
+        self._checkpoint_owner: Optional[Tuple[str, Optional[str]]] = None
+        self._checkpoint_block: Optional[int] = None
+
+        # Captures each round's external inputs when set (see src/replay.py)
+        self.recorder = None
+
+        # Per-stage latency, round throughput and component stats (/metrics)
+        self.metrics = AgentMetrics()
+        self.metrics_server: Optional[MetricsServer] = None
+        self.metrics.register_collector("agent_state_cache", lambda: self.state_cache and self.state_cache.get_stats())
+        self.metrics.register_collector("agent_fee_oracle", self.fee_oracle.get_stats)
+        self.metrics.register_collector("agent_write_queue", self.write_queue.get_stats)
+        self.metrics.register_collector("agent_nonce", lambda: self.nonce_manager and self.nonce_manager.get_stats())
+        self.metrics.register_collector("agent_txs", lambda: self.receipt_tracker and self.receipt_tracker.get_counts())
+        self.metrics.register_collector("agent_indexer", lambda: self.indexer and self.indexer.get_stats())
+        self.metrics.register_collector("agent_shards", lambda: self.shards and self.shards.get_stats())
+        self.metrics.register_collector("agent_preflight", lambda: self.preflight and self.preflight.get_stats())
+        self.metrics.register_collector("agent_breaker", lambda: self.breaker and self.breaker.get_stats())
+        self.metrics.register_collector("agent_checkpoint", lambda: self.checkpoints and self.checkpoints.get_stats())
+        self.metrics.register_collector("agent_prices", self.price_service.get_stats)
+        self.metrics.register_collector("agent_users", lambda: self.user_directory and self.user_directory.get_stats())
+
+        # Address/symbol/decimals for every configured token
+        self.tokens = get_token_registry()
+
+    async def orchestrate_decision(
+        self,
+        agent_id: str,
+        user_address: str,
+        agent_state: Optional[AgentState] = None
+    ) -> Dict:
         """
         Orchestrate decision-making for a specific user's agent
 
         Args:
             agent_id: Agent contract address
             user_address: User's wallet address
+            agent_state: Pre-fetched state (e.g. from a batched read), fetched if None
 
         Returns:
             Decision result with proof
         """
         # Get agent state from blockchain for specific user
-        agent_state = await self._fetch_agent_state(agent_id, user_address)
+        if agent_state is None:
+            with self.metrics.stage("fetch_state"):
+                agent_state = await self._fetch_agent_state(agent_id, user_address)
 
         # Get market data
-        market_data = await self._fetch_market_data()
+        with self.metrics.stage("market_data"):
+            market_data = await self._fetch_market_data()
+        await self.prefetch_market_prices()
 
         # Make decision
-        decision = await self.decision_engine.evaluate(
-            agent_state,
-            market_data,
-            int(time.time()),
-            orchestrator=self  # Pass orchestrator for DEX price fetching
-        )
+        with self.metrics.stage("decision_engine"):
+            decision = await self.decision_engine.evaluate(
+                agent_state,
+                market_data,
+                int(time.time()),
+                orchestrator=self  # Pass orchestrator for DEX price fetching
+            )
+        self.metrics.decisions.inc(action=getattr(decision.action, "value", decision.action))
 
         # Generate proof (simplified - in production use ZK proofs)
-        proof = self._generate_proof(decision)
+        with self.metrics.stage("proof"):
+            proof = self._generate_proof(decision)
 
         # Sign decision
-        signature = self._sign_decision(decision)
+        with self.metrics.stage("sign_decision"):
+            signature = self._sign_decision(decision)
 
         # Store decision in database with user_address
-        await self._store_decision(agent_id, user_address, decision)
+        with self.metrics.stage("store_decision"):
+            await self._store_decision(agent_id, user_address, decision)
 
         return {
             "decision": decision.dict(),
@@ -70,76 +210,37 @@ class AgentOrchestrator:
 
     async def _fetch_agent_state(self, agent_id: str, user_address: str) -> AgentState:
         """Fetch agent state from blockchain for a specific user"""
-        from .models import AgentConfig, Position
+        from .models import AgentConfig
 
         try:
-            # Load AIAgent contract ABI
-            import json
-            import os
-
-            # Get contract ABI from artifacts - go up to project root
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            abi_path = os.path.join(
-                project_root,
-                "contracts/artifacts/contracts/AIAgent.sol/AIAgent.json"
-            )
+            contract = self.contracts.agent(agent_id)
 
-            if not os.path.exists(abi_path):
-                print(f"⚠️  ABI file not found at {abi_path}")
-                raise FileNotFoundError(f"ABI file not found: {abi_path}")
+            user_addr = self.contracts.checksum(user_address)
 
-            with open(abi_path, 'r') as f:
-                contract_json = json.load(f)
-                abi = contract_json['abi']
+            async def load() -> AgentState:
+                # Fetch user-specific agent state from contract
+                print(f"Fetching agent state for user {user_addr} from {agent_id}...")
+                state = await self._call(contract.functions.getUserState(user_addr))
 
-            # Create contract instance
-            contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(agent_id),
-                abi=abi
-            )
-
-            # Fetch user-specific agent state from contract
-            user_addr = self.w3.to_checksum_address(user_address)
-            print(f"Fetching agent state for user {user_addr} from {agent_id}...")
-            state = contract.functions.getUserState(user_addr).call()
+                # Fetch positions for this user (indexed snapshot when available)
+                positions = []
+                indexed = self._index_for(agent_id)
+                indexed_positions = await indexed.read_positions([user_address]) if indexed else {}
+                if user_address in indexed_positions:
+                    positions = indexed_positions[user_address]
+                else:
+                    try:
+                        positions_data = await self._call(contract.functions.getUserPositions(user_addr))
+                        positions = parse_user_positions(positions_data)
+                        print(f"   User positions: {len(positions)}")
+                    except Exception as e:
+                        print(f"   Warning: Could not fetch user positions: {e}")
 
-            # Parse the state tuple
-            # state = (config, rwaCollateral, collateralAmount, borrowedUSDC, availableCredit, totalAssets)
-            config_tuple = state[0]
+                # state = (config, rwaCollateral, collateralAmount, borrowedUSDC, availableCredit, totalAssets)
+                return parse_user_state(state, positions)
 
-            # Fetch positions for this user
-            positions = []
-            try:
-                positions_data = contract.functions.getUserPositions(user_addr).call()
-                for pos in positions_data:
-                    positions.append(Position(
-                        protocol=pos[0],
-                        asset=pos[1],
-                        amount=float(self.w3.from_wei(pos[2], 'ether')),
-                        entry_price=float(pos[3]) / 1e18,  # Price values ARE in wei (scaled by 10^18), unscale them
-                        timestamp=pos[4],
-                        stop_loss=float(pos[5]) / 1e18,  # Price values ARE in wei (scaled by 10^18), unscale them
-                        take_profit=float(pos[6]) / 1e18  # Price values ARE in wei (scaled by 10^18), unscale them
-                    ))
-                print(f"   User positions: {len(positions)}")
-            except Exception as e:
-                print(f"   Warning: Could not fetch user positions: {e}")
-
-            agent_state = AgentState(
-                config=AgentConfig(
-                    owner=config_tuple[0],
-                    risk_tolerance=config_tuple[1],
-                    target_roi=config_tuple[2] / 10000.0,  # Convert from basis points
-                    max_drawdown=config_tuple[3] / 10000.0,  # Convert from basis points
-                    strategies=list(config_tuple[4])
-                ),
-                rwa_collateral=state[1],
-                collateral_amount=float(self.w3.from_wei(state[2], 'ether')),
-                borrowed_usdc=float(self.w3.from_wei(state[3], 'ether')),
-                available_credit=float(self.w3.from_wei(state[4], 'ether')),
-                total_assets=float(self.w3.from_wei(state[5], 'ether')),
-                positions=positions
-            )
+            # Shared with the risk monitor: one read per user per block
+            agent_state = await self._cached_read(agent_id, "state", user_address, load)
 
             print(f"✅ Agent state fetched for user {user_addr}:")
             print(f"   Collateral: {agent_state.collateral_amount}")
@@ -173,9 +274,26 @@ class AgentOrchestrator:
         """Fetch market data from simulator"""
         return self.market_simulator.get_market_data()
 
-    def get_market_price(self, token_symbol: str) -> Optional[float]:
+    async def prefetch_market_prices(self):
+        """
+        Warm the CoinGecko cache for every registry token without blocking the loop.
+
+        The decision engines read prices through aget_market_price /
+        aget_dex_price; after this they are cache hits. Concurrent users share
+        one in-flight upstream request.
+        """
+        try:
+            with self.metrics.stage("coingecko_price"):
+                await self.price_service.aget_multiple_prices(list(self.tokens.coingecko_ids))
+        except Exception as e:
+            print(f"Warning: Could not prefetch market prices: {e}")
+
+    async def aget_market_price(self, token_symbol: str) -> Optional[float]:
         """
-        Get current market price from CoinGecko for a token
+        Get current market price from CoinGecko for a token without blocking the event loop
+
+        A cache miss or an upstream outage waits on the PriceService loop,
+        not on this one, so other users keep running meanwhile.
 
         Args:
             token_symbol: Token symbol (e.g., "BTC", "ETH")
@@ -184,7 +302,8 @@ class AgentOrchestrator:
             Current market price in USD, or None if fetch fails
         """
         try:
-            price = self.price_service.get_current_price(token_symbol)
+            with self.metrics.stage("coingecko_price"):
+                price = await self.price_service.aget_current_price(token_symbol, priority=DECISION)
             if price:
                 print(f"Market price for {token_symbol}: ${price:,.2f}")
             return price
@@ -192,7 +311,7 @@ class AgentOrchestrator:
             print(f"Warning: Could not get market price for {token_symbol}: {e}")
             return None
 
-    def get_dex_price(self, token_address: str) -> float:
+    async def aget_dex_price(self, token_address: str) -> float:
         """
         Get current price for a token, preferring CoinGecko with DEX as fallback
 
@@ -203,22 +322,22 @@ class AgentOrchestrator:
             Current price in USD (NOT scaled, e.g., 69325 for BTC)
         """
         # Try to get market price from CoinGecko first
-        token_symbol = self.token_address_to_symbol.get(token_address.lower())
+        token_symbol = self.tokens.symbol_for(token_address)
         if token_symbol:
-            market_price = self.get_market_price(token_symbol)
+            market_price = await self.aget_market_price(token_symbol)
             if market_price:
                 # Return unscaled price in USD
                 return market_price
 
         # Fallback to DEX price
         print(f"Falling back to DEX price for {token_address}")
-        dex_price_scaled = self._get_dex_price_from_contract(token_address)
+        dex_price_scaled = await self._get_dex_price_from_contract(token_address)
         # DEX returns price scaled by 10^18, so divide to get USD price
         return dex_price_scaled / 1e18 if dex_price_scaled > 0 else 0.0
 
-    def _get_dex_price_from_contract(self, token_address: str) -> float:
+    async def _get_dex_price_from_contract(self, token_address: str) -> float:
         """
-        Get current price from DEX contract for a token
+        Get current price from DEX contract for a token without blocking the event loop
 
         Args:
             token_address: Address of the token to get price for
@@ -228,22 +347,16 @@ class AgentOrchestrator:
             Note: Caller should divide by 1e18 to get USD price
         """
         try:
-            import json
-
-            # Load DEX ABI
-            with open('../contracts/artifacts/contracts/SimpleDEX.sol/SimpleDEX.json') as f:
-                dex_abi = json.load(f)['abi']
-
-            # Get DEX contract
-            dex_address = self.w3.to_checksum_address(config.SIMPLE_DEX_ADDRESS)
-            dex_contract = self.w3.eth.contract(address=dex_address, abi=dex_abi)
+            with self.metrics.stage("contract_abi"):
+                dex_contract = self.contracts.dex(config.SIMPLE_DEX_ADDRESS)
 
             # Get USDC address
-            usdc_address = self.w3.to_checksum_address(config.MOCK_USDC_ADDRESS)
-            token_address = self.w3.to_checksum_address(token_address)
+            usdc_address = self.contracts.checksum(config.MOCK_USDC_ADDRESS)
+            token_address = self.contracts.checksum(token_address)
 
             # Get price from DEX (returns USDC per token, scaled by 10^18)
-            price = dex_contract.functions.getPrice(usdc_address, token_address).call()
+            with self.metrics.stage("dex_price"):
+                price = await self._call(dex_contract.functions.getPrice(usdc_address, token_address))
 
             return float(price)
 
@@ -312,6 +425,9 @@ class AgentOrchestrator:
         Each user is checked against their own cooldown period independently.
         The loop sleeps until the soonest cooldown expires rather than a fixed interval.
 
+        With config.MAX_CONCURRENT_USERS > 1 users are fanned out across a bounded
+        worker pool; each user's prefs -> state -> decision -> tx steps still run in order.
+
         Args:
             agent_id: Agent contract address
         """
@@ -323,93 +439,22 @@ class AgentOrchestrator:
             controller_addr = self.w3.eth.account.from_key(config.PRIVATE_KEY).address
             print(f"   Controller: {controller_addr}")
 
+        concurrency = max(1, config.MAX_CONCURRENT_USERS)
+        if concurrency > 1:
+            print(f"   Concurrency: {concurrency} users, {config.MAX_CONCURRENT_READS} reads, {config.MAX_CONCURRENT_TXS} txs")
+
         while True:
             try:
-                all_users = await self._get_all_users(agent_id)
+                summary = await self.run_round(agent_id, controller_addr)
 
-                if not all_users:
+                if not summary["users"]:
                     print(f"No users found, waiting {config.DECISION_INTERVAL}s...")
                     await asyncio.sleep(config.DECISION_INTERVAL)
                     continue
 
-                now = int(time.time())
-                print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Checking {len(all_users)} user(s)")
-
-                opted_in_count = 0
-                skipped_count = 0
-                # Track the earliest timestamp at which any user becomes actionable
-                next_wakeup: Optional[int] = None
-
-                for user_address in all_users:
-                    try:
-                        print(f"\n--- User {user_address} ---")
-
-                        prefs = await self._get_user_preferences(agent_id, user_address)
-
-                        if not prefs or not prefs.get('autoDecisionsEnabled'):
-                            print(f"⏭️  Automation disabled")
-                            skipped_count += 1
-                            continue
-
-                        if not controller_addr or prefs['decisionController'].lower() != controller_addr.lower():
-                            print(f"⚠️  Controller mismatch (expected {controller_addr}, got {prefs['decisionController']})")
-                            skipped_count += 1
-                            continue
-
-                        last_decision = int(prefs.get('lastDecisionTime', 0))
-                        cooldown = int(prefs.get('cooldownPeriod', 300))
-                        next_decision_at = last_decision + cooldown
-
-                        if now < next_decision_at:
-                            remaining = next_decision_at - now
-                            print(f"⏸️  Cooldown active — {remaining}s remaining (cooldown={cooldown}s)")
-                            # Record when this user can be processed next
-                            if next_wakeup is None or next_decision_at < next_wakeup:
-                                next_wakeup = next_decision_at
-                            skipped_count += 1
-                            continue
-
-                        # User is ready
-                        opted_in_count += 1
-                        strategy_name = ['Conservative', 'Balanced', 'Aggressive'][int(prefs.get('strategy', 1))]
-                        print(f"✅ Ready | Strategy: {strategy_name} | Cooldown: {cooldown}s")
-
-                        result = await self.orchestrate_decision(agent_id, user_address)
-
-                        print(f"   Action:          {result['decision']['action']}")
-                        print(f"   Reasoning:       {result['decision']['reasoning']}")
-                        print(f"   Risk Score:      {result['decision']['risk_score']:.2f}")
-                        print(f"   Expected Return: {result['decision']['expected_return']:.2%}")
-
-                        if result['decision']['action'] == 'BORROW_AND_INVEST':
-                            borrow_amount = result['decision']['params'].get('borrow_amount', 0)
-                            max_borrow = float(self.w3.from_wei(prefs['maxBorrowPerDecision'], 'ether'))
-                            if borrow_amount > max_borrow:
-                                print(f"⚠️  Capping borrow {borrow_amount:.4f} → {max_borrow:.4f}")
-                                result['decision']['params']['borrow_amount'] = max_borrow
-
-                        if result['decision']['action'] != "HOLD":
-                            await self._execute_decision(agent_id, user_address, result)
-                        else:
-                            print(f"   HOLD — no action taken")
-
-                        # After execution this user's next slot is now + their cooldown
-                        user_next = int(time.time()) + cooldown
-                        if next_wakeup is None or user_next < next_wakeup:
-                            next_wakeup = user_next
-
-                        await asyncio.sleep(1)  # brief pause between users
-
-                    except Exception as e:
-                        print(f"Error processing user {user_address}: {e}")
-                        import traceback
-                        traceback.print_exc()
-                        continue
-
-                print(f"\n📊 Round complete — acted: {opted_in_count}, skipped: {skipped_count}")
-
                 # Sleep until the soonest user cooldown expires.
                 # Cap at DECISION_INTERVAL so we also notice newly registered users.
+                next_wakeup = summary["next_wakeup"]
                 if next_wakeup is not None:
                     sleep_for = max(10, next_wakeup - int(time.time()))
                     sleep_for = min(sleep_for, config.DECISION_INTERVAL)
@@ -426,48 +471,848 @@ class AgentOrchestrator:
                 traceback.print_exc()
                 await asyncio.sleep(60)
 
-    async def _get_all_users(self, agent_id: str) -> List[str]:
+    async def run_round(
+        self,
+        agent_id: str,
+        controller_addr: Optional[str],
+        now: Optional[int] = None,
+        pause_between_users: float = 1.0
+    ) -> Dict:
         """
-        Get all users who have initialized agents on this contract
+        One full-scan decision round over every (owned) user
 
         Args:
             agent_id: Agent contract address
+            controller_addr: Address of this process' decision controller
+            now: Timestamp used for cooldown checks (default: current time)
+            pause_between_users: Sequential mode sleep after a user acted
 
         Returns:
-            List of user wallet addresses
+            {"users", "acted", "skipped", "next_wakeup", "duration"}
+        """
+        stage_totals = self.metrics.stage_totals()
+        now = int(time.time()) if now is None else now
+        if self.recorder:
+            self.recorder.begin_round(agent_id, controller_addr, now)
+
+        with self.metrics.stage("read_users"):
+            all_users = self._owned_users(await self._get_all_users(agent_id))
+
+        if not all_users:
+            if self.recorder:
+                self.recorder.cancel_round()
+            return {"users": 0, "acted": 0, "skipped": 0, "next_wakeup": None, "duration": 0.0}
+
+        round_started = time.time()
+        print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Checking {len(all_users)} user(s)")
+        users, parked = self._admit_users(all_users)
+
+        # Batched reads: prefs for everyone, then state for the users that are due
+        with self.metrics.stage("read_prefs"):
+            prefs_by_user = await self._batch_read_preferences(agent_id, users)
+        ready_users = [
+            user for user, prefs in prefs_by_user.items()
+            if self._is_ready(prefs, controller_addr, now)
+        ]
+        with self.metrics.stage("read_states"):
+            states_by_user = await self._batch_read_states(agent_id, ready_users)
+
+        def process(user: str):
+            return self._process_user(
+                agent_id, user, controller_addr, now,
+                prefs=prefs_by_user.get(user),
+                agent_state=states_by_user.get(user)
+            )
+
+        concurrency = max(1, config.MAX_CONCURRENT_USERS)
+        if concurrency > 1:
+            user_slots = asyncio.Semaphore(concurrency)
+
+            async def run_slot(user: str):
+                async with user_slots:
+                    return await process(user)
+
+            outcomes = await asyncio.gather(*(run_slot(user) for user in users))
+        else:
+            outcomes = []
+            for user_address in users:
+                outcome = await process(user_address)
+                outcomes.append(outcome)
+                if outcome[0] == "acted" and pause_between_users:
+                    await asyncio.sleep(pause_between_users)  # brief pause between users
+
+        # Parked / backing-off users count as skipped and wake the loop when they may retry
+        outcomes += [
+            ("skipped", max(int(self.breaker.retry_at(user)), now + 1) if self.breaker.retry_at(user) else None)
+            for user in parked
+        ]
+        opted_in_count = sum(1 for status, _ in outcomes if status == "acted")
+        skipped_count = len(outcomes) - opted_in_count
+        # Track the earliest timestamp at which any user becomes actionable
+        due_times = [next_at for _, next_at in outcomes if next_at is not None]
+        next_wakeup: Optional[int] = min(due_times) if due_times else None
+
+        round_duration = time.time() - round_started
+        self.metrics.record_round("decision", len(all_users), round_duration, {"acted": opted_in_count, "skipped": skipped_count})
+        self._write_round_summary("decision", stage_totals, acted=opted_in_count, skipped=skipped_count)
+        if self.recorder:
+            self.recorder.end_round()
+
+        print(f"\n📊 Round complete — acted: {opted_in_count}, skipped: {skipped_count} ({round_duration:.1f}s)")
+        if self.receipt_tracker:
+            counts = self.receipt_tracker.get_counts()
+            print(f"   Txs — pending: {counts['pending']}, confirmed: {counts['confirmed']}, failed: {counts['failed']}")
+        if self.state_cache:
+            cache_stats = self.state_cache.get_stats()
+            print(f"   State cache — hits: {cache_stats['hits'] + cache_stats['coalesced']}, misses: {cache_stats['misses']} ({cache_stats['hit_rate']:.0%})")
+
+        return {
+            "users": len(all_users),
+            "acted": opted_in_count,
+            "skipped": skipped_count,
+            "next_wakeup": next_wakeup,
+            "duration": round_duration,
+        }
+
+    async def run_scheduled_loop(self, agent_id: str):
+        """
+        Run the decision loop off a cooldown-aware scheduler instead of a full scan.
+
+        Users sit in a min-heap keyed by their next eligible decision time. The loop
+        wakes when the earliest user is due, re-reads preferences only for due users
+        and picks up newly registered users every DECISION_INTERVAL.
+
+        Args:
+            agent_id: Agent contract address
+        """
+        print(f"🚀 Starting scheduled multi-user agent loop for {agent_id}")
+
+        controller_addr = None
+        if config.PRIVATE_KEY:
+            controller_addr = self.w3.eth.account.from_key(config.PRIVATE_KEY).address
+            print(f"   Controller: {controller_addr}")
+
+        concurrency = max(1, config.MAX_CONCURRENT_USERS)
+        user_slots = asyncio.Semaphore(concurrency)
+        next_discovery = 0.0
+        next_checkpoint = float('inf')
+
+        if config.CHECKPOINT_PATH:
+            self.checkpoints = CheckpointStore(self._worker_path(config.CHECKPOINT_PATH))
+            self._checkpoint_owner = (agent_id, controller_addr)
+            if await self.restore_checkpoint(agent_id, controller_addr):
+                # Warm start: new users came from the logs, full discovery can wait
+                next_discovery = time.time() + config.DECISION_INTERVAL
+            next_checkpoint = time.time() + config.CHECKPOINT_INTERVAL
+
+        while True:
+            try:
+                if time.time() >= next_discovery:
+                    await self._discover_users(agent_id, controller_addr)
+                    next_discovery = time.time() + config.DECISION_INTERVAL
+
+                now = int(time.time())
+                due_users = self.scheduler.pop_due(now)
+                if self.shards:
+                    # Users whose shard moved away are dropped; discovery re-adds them if it comes back
+                    due_users = self.shards.owned_users(due_users)
+                due_users, parked = self._admit_users(due_users)
+                for user in parked:
+                    # Never in the past: a due parked user would spin the loop
+                    retry_at = int(self.breaker.retry_at(user) or now + config.DECISION_INTERVAL)
+                    self.scheduler.schedule(user, max(retry_at, now + 1))
+
+                if due_users:
+                    round_started = time.time()
+                    stage_totals = self.metrics.stage_totals()
+                    print(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] {len(due_users)} user(s) due of {len(self.scheduler) + len(due_users)}")
+
+                    with self.metrics.stage("read_prefs"):
+                        prefs_by_user = await self._read_preferences(agent_id, due_users)
+                    ready_users = [
+                        user for user in due_users
+                        if prefs_by_user.get(user) and self._is_ready(prefs_by_user[user], controller_addr, now)
+                    ]
+                    with self.metrics.stage("read_states"):
+                        states_by_user = await self._batch_read_states(agent_id, ready_users)
+
+                    async def run_slot(user: str):
+                        async with user_slots:
+                            return await self._process_user(
+                                agent_id, user, controller_addr, now,
+                                prefs=prefs_by_user.get(user),
+                                agent_state=states_by_user.get(user)
+                            )
+
+                    outcomes = await asyncio.gather(*(run_slot(user) for user in due_users))
+
+                    acted = 0
+                    for user, (status, next_at) in zip(due_users, outcomes):
+                        acted += status == "acted"
+                        # Disabled / foreign-controller users are rechecked at the discovery cadence
+                        self.scheduler.schedule(user, next_at or int(time.time()) + config.DECISION_INTERVAL)
+
+                    round_duration = time.time() - round_started
+                    self.metrics.record_round("decision", len(due_users), round_duration, {"acted": acted, "skipped": len(due_users) - acted})
+                    self._write_round_summary("decision", stage_totals, acted=acted, skipped=len(due_users) - acted)
+
+                    print(f"\n📊 Wakeup complete — acted: {acted}, skipped: {len(due_users) - acted} ({round_duration:.1f}s)")
+                    if self.receipt_tracker:
+                        counts = self.receipt_tracker.get_counts()
+                        print(f"   Txs — pending: {counts['pending']}, confirmed: {counts['confirmed']}, failed: {counts['failed']}")
+
+                if time.time() >= next_checkpoint:
+                    await self.save_checkpoint(agent_id, controller_addr)
+                    next_checkpoint = time.time() + config.CHECKPOINT_INTERVAL
+
+                max_wait = max(0.0, min(next_discovery, next_checkpoint) - time.time())
+                await self.scheduler.wait(max_wait)
+
+            except Exception as e:
+                print(f"Error in scheduled loop: {e}")
+                import traceback
+                traceback.print_exc()
+                await asyncio.sleep(60)
+
+    async def _discover_users(self, agent_id: str, controller_addr: Optional[str]):
+        """
+        Add newly registered users to the scheduler
+
+        Only users not already scheduled have their preferences read.
+        """
+        all_users = self._owned_users(await self._get_all_users(agent_id))
+        new_users = [user for user in all_users if user not in self.scheduler]
+        if not new_users:
+            return
+
+        await self._schedule_from_preferences(agent_id, new_users)
+        print(f"🆕 Scheduled {len(new_users)} new user(s), tracking {len(self.scheduler)}")
+
+    async def _schedule_from_preferences(self, agent_id: str, users: List[str]):
+        """(Re)schedule users at their cooldown expiry read from fresh preferences"""
+        now = int(time.time())
+        prefs_by_user = await self._read_preferences(agent_id, users)
+        for user in users:
+            prefs = prefs_by_user.get(user)
+            if prefs and prefs.get('autoDecisionsEnabled'):
+                due_at = int(prefs.get('lastDecisionTime', 0)) + int(prefs.get('cooldownPeriod', 300))
+            else:
+                due_at = now + config.DECISION_INTERVAL
+            self.scheduler.schedule(user, due_at)
+
+    async def save_checkpoint(self, agent_id: str, controller_addr: Optional[str], block_number: Optional[int] = None):
+        """
+        Write scheduler due times and in-flight transactions to the checkpoint file
+
+        Preference changes after `block_number` are replayed from the logs on
+        restore; earlier ones are picked up when the user is next due, as in a
+        running loop.
+
+        Args:
+            agent_id: Agent contract address
+            controller_addr: Address of this process' decision controller
+            block_number: Block the state is consistent with (default: current head)
         """
         try:
-            import json
-            import os
-
-            # Load AIAgent contract ABI
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            abi_path = os.path.join(
-                project_root,
-                "contracts/artifacts/contracts/AIAgent.sol/AIAgent.json"
+            if block_number is None:
+                block_number = await self._block_number()
+
+            inflight = []
+            if self.receipt_tracker:
+                sent_by_nonce = {sent["nonce"]: sent for sent in self.nonce_manager.export_pending()}
+                for tracked in self.receipt_tracker.pending():
+                    if tracked.nonce in sent_by_nonce:
+                        inflight.append({**tracked.to_dict(), **sent_by_nonce[tracked.nonce]})
+
+            size = await asyncio.to_thread(self.checkpoints.save, {
+                "agent_id": agent_id,
+                "controller": controller_addr,
+                "block": block_number,
+                "due": self.scheduler.snapshot(),
+                "inflight": inflight,
+                "users": self.user_directory.export() if self.user_directory else None,
+            })
+            self._checkpoint_block = block_number
+            print(f"💾 Checkpoint at block {block_number}: {len(self.scheduler)} user(s), {len(inflight)} in-flight tx(s), {size} bytes")
+        except Exception as e:
+            print(f"Warning: Could not write checkpoint: {e}")
+
+    async def restore_checkpoint(self, agent_id: str, controller_addr: Optional[str]) -> bool:
+        """
+        Resume scheduling from the checkpoint file
+
+        Restores due times for owned users and re-tracks in-flight
+        transactions. Then only users whose preferences changed (or who
+        registered) since the checkpoint block have their preferences re-read.
+
+        Args:
+            agent_id: Agent contract address
+            controller_addr: Address of this process' decision controller
+
+        Returns:
+            True if the checkpoint was restored and reconciled up to the head
+        """
+        checkpoint = await asyncio.to_thread(self.checkpoints.load, agent_id, controller_addr)
+        if checkpoint is None:
+            return False
+
+        if checkpoint.get("users"):
+            self._get_user_directory(agent_id).restore(checkpoint["users"])
+        due = checkpoint.get("due", {})
+        for user in self._owned_users(list(due)):
+            self.scheduler.schedule(user, due[user])
+        await self._restore_inflight(controller_addr, checkpoint.get("inflight", []))
+        print(f"♻️  Restored checkpoint from block {checkpoint['block']}: {len(self.scheduler)} user(s)")
+
+        try:
+            head = await self._block_number()
+            changed = self._owned_users(sorted(await self._users_changed_since(agent_id, checkpoint["block"], head)))
+            if changed:
+                await self._schedule_from_preferences(agent_id, changed)
+        except Exception as e:
+            print(f"Warning: Could not reconcile checkpoint, running full discovery: {e}")
+            return False
+
+        self._checkpoint_block = head
+        print(f"♻️  Reconciled blocks {checkpoint['block']}..{head}: {len(changed)} user(s) changed")
+        return True
+
+    async def _users_changed_since(self, agent_id: str, from_block: int, to_block: int) -> set:
+        """Users with preference-affecting AIAgent events in [from_block, to_block]"""
+        abi = self.contracts.get_abi("AIAgent")
+        address = self.contracts.checksum(agent_id)
+        step = max(1, config.INDEXER_LOG_RANGE)
+        users = set()
+        for start in range(from_block, to_block + 1, step):
+            logs = await asyncio.to_thread(self.w3.eth.get_logs, {
+                'address': address,
+                'fromBlock': start,
+                'toBlock': min(start + step - 1, to_block),
+            })
+            users |= users_with_changed_preferences(self.w3.codec, abi, logs)
+        return users
+
+    async def _restore_inflight(self, controller_addr: Optional[str], inflight: List[Dict]):
+        """Hand transactions broadcast before the restart back to the nonce manager and receipt tracker"""
+        if not inflight or not controller_addr:
+            return
+        nonce_manager = self._get_nonce_manager(controller_addr)
+        for entry in inflight:
+            if not entry.get("raw"):
+                continue
+            await nonce_manager.adopt(
+                entry["nonce"],
+                HexBytes(entry["raw"]),
+                [HexBytes(h) for h in entry.get("hashes", [])],
+                entry.get("sent_at", 0.0)
             )
+            self.receipt_tracker.restore(TrackedTransaction(
+                nonce=entry["nonce"],
+                tx_hash=entry["tx_hash"],
+                agent_id=entry["agent_id"],
+                user_address=entry["user_address"],
+                action=entry["action"],
+                submitted_at=entry["submitted_at"]
+            ))
+        print(f"♻️  Re-tracking {len(inflight)} in-flight transaction(s)")
+
+    async def _read_preferences(self, agent_id: str, users: List[str]) -> Dict[str, Dict]:
+        """Batched preference read with per-user fallback for anything the batch missed"""
+        prefs_by_user = await self._batch_read_preferences(agent_id, users)
+        missing = [user for user in users if user not in prefs_by_user]
+        if missing:
+            results = await asyncio.gather(*(self._get_user_preferences(agent_id, user) for user in missing))
+            for user, prefs in zip(missing, results):
+                if prefs:
+                    prefs_by_user[user] = prefs
+        return prefs_by_user
+
+    async def _process_user(
+        self,
+        agent_id: str,
+        user_address: str,
+        controller_addr: Optional[str],
+        now: int,
+        prefs: Optional[Dict] = None,
+        agent_state: Optional[AgentState] = None
+    ) -> Tuple[str, Optional[int]]:
+        """
+        Run the prefs -> state -> decision -> tx pipeline for one user
 
-            with open(abi_path, 'r') as f:
-                contract_json = json.load(f)
-                abi = contract_json['abi']
+        Args:
+            agent_id: Agent contract address
+            user_address: User wallet address
+            controller_addr: Address of this process' decision controller
+            now: Round start timestamp used for the cooldown check
+            prefs: Pre-fetched preferences, read from the contract if None
+            agent_state: Pre-fetched agent state, read from the contract if None
 
-            # Create contract instance
-            contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(agent_id),
-                abi=abi
+        Returns:
+            ("acted" | "dropped" | "skipped", timestamp at which the user is next due or None);
+            rounds count "dropped" (pre-flight refused the tx) as skipped
+        """
+        try:
+            outcome = await self._decide_for_user(agent_id, user_address, controller_addr, now, prefs, agent_state)
+        except Exception as e:
+            print(f"Error processing user {user_address}: {e}")
+            import traceback
+            traceback.print_exc()
+            if not self.breaker:
+                return "skipped", None
+            self.breaker.record_failure(user_address, e)
+            return "skipped", int(self.breaker.retry_at(user_address))
+
+        if self.breaker:
+            if outcome[0] == "dropped":
+                # No verdict on the user: a half-open probe goes back to parked
+                self.breaker.release_probe(user_address, outcome[1])
+            else:
+                self.breaker.record_success(user_address)
+        return outcome
+
+    async def _decide_for_user(
+        self,
+        agent_id: str,
+        user_address: str,
+        controller_addr: Optional[str],
+        now: int,
+        prefs: Optional[Dict],
+        agent_state: Optional[AgentState]
+    ) -> Tuple[str, Optional[int]]:
+        """Body of _process_user; raises when the user's reads, decision or tx fail"""
+        print(f"\n--- User {user_address} ---")
+
+        if self.shards and not self.shards.owns(user_address):
+            print(f"🔀 Shard moved to another worker")
+            return "skipped", None
+
+        if prefs is None:
+            prefs = await self._get_user_preferences(agent_id, user_address)
+            if prefs is None:
+                raise RuntimeError("preferences unavailable")
+
+        if not prefs.get('autoDecisionsEnabled'):
+            print(f"⏭️  Automation disabled")
+            return "skipped", None
+
+        if not controller_addr or prefs['decisionController'].lower() != controller_addr.lower():
+            print(f"⚠️  Controller mismatch (expected {controller_addr}, got {prefs['decisionController']})")
+            return "skipped", None
+
+        last_decision = int(prefs.get('lastDecisionTime', 0))
+        cooldown = int(prefs.get('cooldownPeriod', 300))
+        next_decision_at = last_decision + cooldown
+
+        if now < next_decision_at:
+            remaining = next_decision_at - now
+            print(f"⏸️  Cooldown active — {remaining}s remaining (cooldown={cooldown}s)")
+            # Record when this user can be processed next
+            return "skipped", next_decision_at
+
+        if self.receipt_tracker and self.receipt_tracker.has_pending(user_address):
+            # lastDecisionTime only moves once our previous tx is mined
+            print(f"⏳ Previous decision still pending on-chain")
+            return "skipped", now + max(1, int(config.TX_POLL_INTERVAL))
+
+        # User is ready
+        strategy_name = ['Conservative', 'Balanced', 'Aggressive'][int(prefs.get('strategy', 1))]
+        print(f"✅ Ready | Strategy: {strategy_name} | Cooldown: {cooldown}s")
+
+        result = await self.orchestrate_decision(agent_id, user_address, agent_state=agent_state)
+
+        print(f"   Action:          {result['decision']['action']}")
+        print(f"   Reasoning:       {result['decision']['reasoning']}")
+        print(f"   Risk Score:      {result['decision']['risk_score']:.2f}")
+        print(f"   Expected Return: {result['decision']['expected_return']:.2%}")
+
+        if result['decision']['action'] == 'BORROW_AND_INVEST':
+            borrow_amount = result['decision']['params'].get('borrow_amount', 0)
+            max_borrow = float(self.w3.from_wei(prefs['maxBorrowPerDecision'], 'ether'))
+            if borrow_amount > max_borrow:
+                print(f"⚠️  Capping borrow {borrow_amount:.4f} → {max_borrow:.4f}")
+                result['decision']['params']['borrow_amount'] = max_borrow
+
+        if result['decision']['action'] != "HOLD":
+            executed = await self._execute_decision(agent_id, user_address, result)
+            if executed is False:
+                raise RuntimeError("decision transaction failed")
+            if executed == "dropped":
+                # Nothing was sent, so lastDecisionTime has not moved: retry well before the cooldown
+                return "dropped", int(time.time()) + config.PREFLIGHT_RETRY_DELAY
+        else:
+            print(f"   HOLD — no action taken")
+
+        # After execution this user's next slot is now + their cooldown
+        return "acted", int(time.time()) + cooldown
+
+    def _admit_users(self, users: List[str]) -> Tuple[List[str], List[str]]:
+        """Split users into (admitted, parked) by the circuit breaker"""
+        if not self.breaker:
+            return users, []
+        admitted, parked = [], []
+        for user in users:
+            (admitted if self.breaker.allow(user) else parked).append(user)
+        if parked:
+            print(f"🔌 {len(parked)} failing user(s) backing off")
+        return admitted, parked
+
+    async def _call(self, fn):
+        """
+        Execute a contract read without blocking the event loop
+
+        Args:
+            fn: Bound contract function (e.g. contract.functions.getUserState(user))
+
+        Returns:
+            Decoded call result
+        """
+        async with self._read_limiter:
+            if self.async_chain:
+                return await self.async_chain.call(fn)
+            return await asyncio.to_thread(fn.call)
+
+    async def _get_transaction_count(self, address: str, block_identifier: str = 'latest') -> int:
+        """Controller nonce without blocking the event loop"""
+        if self.async_chain:
+            return await self.async_chain.get_transaction_count(address, block_identifier)
+        return await asyncio.to_thread(self.w3.eth.get_transaction_count, address, block_identifier)
+
+    async def _gas_price(self) -> int:
+        """Current gas price without blocking the event loop"""
+        if self.async_chain:
+            return await self.async_chain.gas_price()
+        return await asyncio.to_thread(lambda: self.w3.eth.gas_price)
+
+    async def _max_priority_fee(self) -> int:
+        """Suggested EIP-1559 tip without blocking the event loop"""
+        if self.async_chain:
+            return await self.async_chain.max_priority_fee()
+        return await asyncio.to_thread(lambda: self.w3.eth.max_priority_fee)
+
+    async def _get_block(self, block_identifier='latest') -> Dict:
+        """Block header without blocking the event loop"""
+        if self.async_chain:
+            return await self.async_chain.get_block(block_identifier)
+        return await asyncio.to_thread(self.w3.eth.get_block, block_identifier)
+
+    async def _estimate_gas(self, tx: Dict) -> int:
+        """Gas estimate without blocking the event loop"""
+        if self.async_chain:
+            return await self.async_chain.estimate_gas(tx)
+        return await asyncio.to_thread(self.w3.eth.estimate_gas, tx)
+
+    async def _eth_call(self, tx: Dict, block_identifier='latest') -> bytes:
+        """Raw eth_call without blocking the event loop (raises on revert)"""
+        if self.async_chain:
+            return await self.async_chain.eth_call(tx, block_identifier)
+        return await asyncio.to_thread(self.w3.eth.call, tx, block_identifier)
+
+    async def _send_raw_transaction(self, raw_tx: bytes):
+        """Broadcast a signed transaction without blocking the event loop"""
+        if self.async_chain:
+            return await self.async_chain.send_raw_transaction(raw_tx)
+        return await asyncio.to_thread(self.w3.eth.send_raw_transaction, raw_tx)
+
+    async def _get_transaction_receipt(self, tx_hash):
+        """Receipt lookup (raises TransactionNotFound while pending)"""
+        if self.async_chain:
+            return await self.async_chain.get_transaction_receipt(tx_hash)
+        return await asyncio.to_thread(self.w3.eth.get_transaction_receipt, tx_hash)
+
+    def _get_nonce_manager(self, controller_addr: str) -> NonceManager:
+        """Nonce manager for the controller account, created on first use"""
+        if self.nonce_manager is None:
+            self.nonce_manager = NonceManager(
+                controller_addr,
+                get_transaction_count=self._get_transaction_count,
+                send_raw_transaction=self._send_raw_transaction,
+                get_transaction_receipt=self._get_transaction_receipt,
+                max_pending=config.MAX_PENDING_TXS,
+                stuck_timeout=config.TX_STUCK_TIMEOUT,
+                gas_bump_percent=config.GAS_BUMP_PERCENT,
+                max_gas_price=int(config.MAX_GAS_PRICE_GWEI * 10 ** 9) if config.MAX_GAS_PRICE_GWEI else None,
+                allocator=SharedNonceAllocator(
+                    self.lease_store,
+                    controller_addr,
+                    worker_id=self.shards.worker_id if self.shards else config.SHARD_WORKER_ID,
+                    membership=self.shards.namespace if self.shards else None
+                ) if self.lease_store else None
+            )
+            self.receipt_tracker = ReceiptTracker(
+                self.nonce_manager,
+                on_outcome=self._record_outcome,
+                poll_interval=config.TX_POLL_INTERVAL
+            )
+        return self.nonce_manager
+
+    async def _record_outcome(self, tracked: TrackedTransaction):
+        """Reconcile a settled decision transaction"""
+        if tracked.status == "confirmed":
+            print(f"✅ Decision {tracked.action} for {tracked.user_address} confirmed in block {tracked.block_number} (gas {tracked.gas_used})")
+        else:
+            print(f"❌ Decision {tracked.action} for {tracked.user_address} failed: {tracked.error}")
+            if self.breaker:
+                self.breaker.record_failure(tracked.user_address, f"tx {tracked.status}: {tracked.error}")
+
+        if tracked.settled_at is not None:
+            self.metrics.tx_confirmation_seconds.observe(tracked.settled_at - tracked.submitted_at, status=tracked.status)
+
+        if tracked.block_number is not None:
+            self.fee_oracle.note_block(tracked.block_number)
+            if self.state_cache:
+                self.state_cache.note_block(tracked.block_number)
+        if tracked.status == "confirmed" and tracked.gas_used:
+            self.fee_oracle.record_gas(tracked.action, tracked.gas_used)
+
+        # Indexed snapshots predate this tx; read through until the next sync
+        if self.indexer:
+            self.indexer.invalidate(tracked.user_address)
+
+        await self._store_outcome(tracked)
+
+    async def run_metrics_server(self):
+        """Serve /metrics on config.METRICS_HOST:METRICS_PORT until cancelled"""
+        self.metrics_server = MetricsServer(self.metrics, host=config.METRICS_HOST, port=config.METRICS_PORT)
+        if self.breaker:
+            self.metrics_server.add_json_route("/breakers", lambda: {
+                **self.breaker.get_stats(),
+                "users": self.breaker.snapshot(),
+            })
+        await self.metrics_server.start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.metrics_server.stop()
+
+    def _write_round_summary(self, loop: str, stage_totals: Dict, **extra):
+        """Emit the JSON round summary if config.ROUND_SUMMARY_PATH is set ("-" = stdout)"""
+        if not config.ROUND_SUMMARY_PATH:
+            return
+        if self.preflight:
+            extra['preflight'] = self.preflight.get_stats()
+        line = json.dumps(self.metrics.round_summary(loop, stage_totals, extra))
+        if config.ROUND_SUMMARY_PATH == "-":
+            print(line)
+            return
+        try:
+            with open(config.ROUND_SUMMARY_PATH, "a") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            print(f"Warning: Could not write round summary: {e}")
+
+    async def close(self):
+        """Release pooled network resources"""
+        if self.checkpoints and self._checkpoint_owner and self._checkpoint_block is not None:
+            # Last reconciled block: later changes are replayed from the logs on restart
+            await self.save_checkpoint(*self._checkpoint_owner, block_number=self._checkpoint_block)
+        if self.async_chain:
+            await self.async_chain.close()
+        if self.receipt_tracker:
+            await self.receipt_tracker.close()
+        await self.write_queue.close()
+        if self.indexer:
+            self.indexer.close()
+        if self.shards:
+            await self.shards.leave()
+        await asyncio.to_thread(self.price_service.close)
+
+    def _worker_path(self, path: str) -> str:
+        """Per-worker variant of a local file path when sharded (files here are single-writer)"""
+        if not self.shards:
+            return path
+        root, ext = os.path.splitext(path)
+        return f"{root}-{self.shards.worker_id}{ext}"
+
+    def _index_for(self, agent_id: str) -> Optional[EventIndexer]:
+        """The event index for `agent_id`, once it has finished backfilling"""
+        if self.indexer and self.indexer.ready and self.indexer.agent_id.lower() == agent_id.lower():
+            return self.indexer
+        return None
+
+    async def run_indexer(self, agent_id: str):
+        """
+        Backfill and tail AIAgent event logs into the local index.
+        Until the backfill completes, reads go to the chain as before.
+
+        Args:
+            agent_id: Agent contract address
+        """
+        self.indexer = EventIndexer(
+            self.w3,
+            self.contracts,
+            agent_id,
+            db_path=self._worker_path(config.INDEXER_DB_PATH),
+            start_block=config.INDEXER_START_BLOCK,
+            log_range=config.INDEXER_LOG_RANGE,
+            reorg_depth=config.INDEXER_REORG_DEPTH,
+            batch_reader=self.batch_reader
+        )
+        await self.indexer.run(poll_interval=config.INDEXER_POLL_INTERVAL)
+
+    async def join_shards(self, agent_id: str):
+        """
+        Register this worker and take its first shard leases.
+        Call before starting the loops, then run `self.shards.run()` alongside them.
+
+        Args:
+            agent_id: Agent contract address (workers on the same contract share shards)
+        """
+        self.shards = ShardCoordinator(
+            self.lease_store,
+            config.SHARD_COUNT,
+            worker_id=config.SHARD_WORKER_ID,
+            namespace=f"shards-{agent_id.lower()}",
+            lease_ttl=config.SHARD_LEASE_TTL,
+            renew_interval=config.SHARD_RENEW_INTERVAL
+        )
+        await self.shards.rebalance()
+
+    def _owned_users(self, users: List[str]) -> List[str]:
+        """Users this worker is responsible for (all of them when unsharded)"""
+        if self.shards is None:
+            return users
+        return self.shards.owned_users(users)
+
+    @staticmethod
+    def _is_ready(prefs: Dict, controller_addr: Optional[str], now: int) -> bool:
+        """Whether a user is opted in, controlled by us and past their cooldown"""
+        if not prefs.get('autoDecisionsEnabled') or not controller_addr:
+            return False
+        if prefs['decisionController'].lower() != controller_addr.lower():
+            return False
+        return now >= int(prefs.get('lastDecisionTime', 0)) + int(prefs.get('cooldownPeriod', 300))
+
+    async def _cached_read(self, agent_id: str, kind: str, user_address: str, loader):
+        """Read through the block-scoped state cache when enabled"""
+        if self.state_cache:
+            return await self.state_cache.read(agent_id, kind, user_address, loader)
+        return await loader()
+
+    async def _cached_read_many(self, agent_id: str, kind: str, users: List[str], loader):
+        """Batched read through the block-scoped state cache when enabled"""
+        if self.state_cache:
+            return await self.state_cache.read_many(agent_id, kind, users, loader)
+        return await loader(users)
+
+    async def _block_number(self) -> int:
+        """Latest block number without blocking the event loop"""
+        if self.async_chain:
+            block_number = await self.async_chain.block_number()
+        else:
+            block_number = await asyncio.to_thread(lambda: self.w3.eth.block_number)
+        self.fee_oracle.note_block(block_number)
+        return block_number
+
+    async def _batch_read_preferences(self, agent_id: str, users: List[str]) -> Dict[str, Dict]:
+        """
+        Read preferences for many users in batched round-trips
+
+        Returns:
+            Dict of user -> prefs; empty if batching is disabled or failed
+            (callers then fall back to per-user reads)
+        """
+        prefs: Dict[str, Dict] = {}
+        indexed = self._index_for(agent_id)
+        if indexed:
+            prefs = await indexed.read_preferences(users)
+            users = [user for user in users if user not in prefs]
+
+        if not self.batch_reader or not users:
+            return prefs
+        try:
+            prefs.update(await self._cached_read_many(
+                agent_id, "prefs", users,
+                lambda missing: self.batch_reader.read_preferences(agent_id, missing)
+            ))
+        except Exception as e:
+            print(f"Warning: Batched preference read failed, falling back to per-user calls: {e}")
+        return prefs
+
+    async def _batch_read_states(self, agent_id: str, users: List[str]) -> Dict[str, AgentState]:
+        """
+        Read agent state and positions for many users in batched round-trips
+
+        Returns:
+            Dict of user -> AgentState; empty if batching is disabled or failed
+            (callers then fall back to per-user reads)
+        """
+        if not self.batch_reader or not users:
+            return {}
+        indexed = self._index_for(agent_id)
+        known_positions = await indexed.read_positions(users) if indexed else None
+        try:
+            return await self._cached_read_many(
+                agent_id, "state", users,
+                lambda missing: self.batch_reader.read_states(agent_id, missing, known_positions=known_positions)
             )
+        except Exception as e:
+            print(f"Warning: Batched state read failed, falling back to per-user calls: {e}")
+            return {}
 
-            # Call getAllUsers function
-            users = contract.functions.getAllUsers().call()
+    async def _get_all_users(self, agent_id: str) -> List[str]:
+        """
+        Get all users who have initialized agents on this contract
+
+        Args:
+            agent_id: Agent contract address
+
+        Returns:
+            List of user wallet addresses
+        """
+        indexed = self._index_for(agent_id)
+        if indexed:
+            return await indexed.read_users()
+
+        directory = self._get_user_directory(agent_id)
+        try:
+            # Only the tail of newly registered users is fetched
+            users = await directory.sync()
 
             print(f"Found {len(users)} users in contract")
-            return [str(user) for user in users]
+            return users
 
         except Exception as e:
             print(f"Error getting all users: {e}")
             import traceback
             traceback.print_exc()
-            return []
+            # Users only ever get added: the last known set is still valid
+            return directory.users
+
+    def _get_user_directory(self, agent_id: str) -> UserDirectory:
+        """User directory for the agent contract, created on first use"""
+        if self.user_directory is not None and self.user_directory.agent_id.lower() == agent_id.lower():
+            return self.user_directory
+
+        contract = self.contracts.agent(agent_id)
+
+        async def total_users() -> int:
+            return await self._call(contract.functions.getTotalUsers())
+
+        async def users_page(offset: int, limit: int):
+            users, total = await self._call(contract.functions.getUsersPaginated(offset, limit))
+            return [str(user) for user in users], total
+
+        async def registered_users(from_block: int, to_block: int) -> List[str]:
+            logs = await asyncio.to_thread(
+                contract.events.AgentInitialized.get_logs, fromBlock=from_block, toBlock=to_block
+            )
+            return [str(log['args']['user']) for log in logs]
+
+        async def all_users() -> List[str]:
+            return [str(user) for user in await self._call(contract.functions.getAllUsers())]
+
+        self.user_directory = UserDirectory(
+            agent_id,
+            total_users,
+            users_page=users_page,
+            registered_users=registered_users,
+            block_number=self._block_number,
+            all_users=all_users,
+            page_size=config.USER_PAGE_SIZE,
+            start_block=config.INDEXER_START_BLOCK,
+            log_range=config.INDEXER_LOG_RANGE
+        )
+        return self.user_directory
 
     async def _get_user_preferences(self, agent_id: str, user_address: str) -> Optional[Dict]:
         """
@@ -480,41 +1325,24 @@ class AgentOrchestrator:
         Returns:
             Dict with user preferences or None if error
         """
+        indexed = self._index_for(agent_id)
+        if indexed:
+            prefs = await indexed.read_preferences([user_address])
+            if user_address in prefs:
+                return prefs[user_address]
+
         try:
-            import json
-            import os
-
-            # Load AIAgent contract ABI
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            abi_path = os.path.join(
-                project_root,
-                "contracts/artifacts/contracts/AIAgent.sol/AIAgent.json"
-            )
+            contract = self.contracts.agent(agent_id)
 
-            with open(abi_path, 'r') as f:
-                contract_json = json.load(f)
-                abi = contract_json['abi']
+            # Call getUserPreferences function
+            user_addr = self.contracts.checksum(user_address)
 
-            # Create contract instance
-            contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(agent_id),
-                abi=abi
-            )
+            async def load() -> Dict:
+                prefs = await self._call(contract.functions.getUserPreferences(user_addr))
+                # (autoDecisionsEnabled, decisionController, maxBorrowPerDecision, cooldownPeriod, lastDecisionTime, strategy)
+                return parse_user_preferences(prefs)
 
-            # Call getUserPreferences function
-            user_addr = self.w3.to_checksum_address(user_address)
-            prefs = contract.functions.getUserPreferences(user_addr).call()
-
-            # Parse preferences tuple
-            # (autoDecisionsEnabled, decisionController, maxBorrowPerDecision, cooldownPeriod, lastDecisionTime, strategy)
-            return {
-                'autoDecisionsEnabled': prefs[0],
-                'decisionController': prefs[1],
-                'maxBorrowPerDecision': prefs[2],
-                'cooldownPeriod': prefs[3],
-                'lastDecisionTime': prefs[4],
-                'strategy': prefs[5]
-            }
+            return await self._cached_read(agent_id, "prefs", user_address, load)
 
         except Exception as e:
             print(f"Error getting user preferences for {user_address}: {e}")
@@ -532,19 +1360,6 @@ class AgentOrchestrator:
             decision: Decision object to store
         """
         try:
-            # Import Supabase client (if configured)
-            from supabase import create_client
-            import os
-
-            supabase_url = os.getenv('SUPABASE_URL')
-            supabase_key = os.getenv('SUPABASE_SERVICE_KEY')
-
-            if not supabase_url or not supabase_key:
-                print("⚠️  Supabase not configured, skipping decision storage")
-                return
-
-            supabase = create_client(supabase_url, supabase_key)
-
             # Insert decision with user_address
             data = {
                 'agent_id': agent_id,
@@ -557,40 +1372,56 @@ class AgentOrchestrator:
                 'timestamp': int(time.time())
             }
 
-            result = supabase.table('agent_decisions').insert(data).execute()
-            print(f"✅ Decision stored in database for user {user_address}")
+            # Write-behind: the decision loop never waits on the database
+            self.write_queue.enqueue('agent_decisions', data)
+            print(f"✅ Decision queued for storage for user {user_address}")
 
         except Exception as e:
             print(f"Warning: Could not store decision in database: {e}")
 
-    async def _execute_decision(self, agent_id: str, user_address: str, result: Dict):
-        """Execute decision on blockchain for a specific user"""
+    async def _store_outcome(self, tracked: TrackedTransaction):
+        """
+        Store a decision transaction outcome in Supabase
+
+        Args:
+            tracked: Settled transaction from the receipt tracker
+        """
+        try:
+            data = {
+                'agent_id': tracked.agent_id,
+                'user_address': tracked.user_address,
+                'action': tracked.action,
+                'tx_hash': tracked.tx_hash,
+                'nonce': tracked.nonce,
+                'status': tracked.status,
+                'gas_used': tracked.gas_used,
+                'block_number': tracked.block_number,
+                'error': tracked.error,
+                'submitted_at': int(tracked.submitted_at),
+                'settled_at': int(tracked.settled_at)
+            }
+            self.write_queue.enqueue('decision_outcomes', data)
+
+        except Exception as e:
+            print(f"Warning: Could not store decision outcome in database: {e}")
+
+    async def _execute_decision(self, agent_id: str, user_address: str, result: Dict) -> Union[bool, str, None]:
+        """
+        Execute decision on blockchain for a specific user
+
+        Returns:
+            True if the tx was submitted, "dropped" if pre-flight showed it would revert
+            (nothing sent), False on error, None if not attempted
+        """
         print(f"\n🤖 Executing decision on-chain for user {user_address} on agent {agent_id}")
 
         if not config.PRIVATE_KEY:
             print("⚠️  No private key configured, skipping on-chain execution")
-            return
+            return None
 
         try:
-            import json
-            import os
-
-            # Load AIAgent contract ABI
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            abi_path = os.path.join(
-                project_root,
-                "contracts/artifacts/contracts/AIAgent.sol/AIAgent.json"
-            )
-
-            with open(abi_path, 'r') as f:
-                contract_json = json.load(f)
-                abi = contract_json['abi']
-
-            # Create contract instance
-            contract = self.w3.eth.contract(
-                address=self.w3.to_checksum_address(agent_id),
-                abi=abi
-            )
+            with self.metrics.stage("contract_abi"):
+                contract = self.contracts.agent(agent_id)
 
             # Get account from private key
             account = self.w3.eth.account.from_key(config.PRIVATE_KEY)
@@ -606,44 +1437,125 @@ class AgentOrchestrator:
 
             action = result['decision']['action']
             action_enum = action_map.get(action, 0)
+            decision_params = result['decision']['params']
 
             print(f"Action: {action} (enum: {action_enum})")
             print(f"User: {user_address}")
             print(f"Params: {result['decision']['params']}")
 
-            # Encode parameters based on action
-            params = self._encode_params(action, result['decision']['params'])
+            # Encode parameters based on action (may quote the DEX)
+            with self.metrics.stage("encode_params"):
+                params = await asyncio.to_thread(self._encode_params, action, decision_params)
 
-            # Build transaction with user parameter (NEW)
-            nonce = self.w3.eth.get_transaction_count(account.address)
+            user_addr = self.contracts.checksum(user_address)
 
-            user_addr = self.w3.to_checksum_address(user_address)
+            def make_decision_fn(encoded_params: bytes):
+                # Build transaction with user parameter (NEW)
+                return contract.functions.makeInvestmentDecision(
+                    user_addr,      # NEW: user parameter
+                    action_enum,
+                    encoded_params
+                )
 
-            tx = contract.functions.makeInvestmentDecision(
-                user_addr,      # NEW: user parameter
-                action_enum,
-                params
-            ).build_transaction({
-                'from': account.address,
-                'nonce': nonce,
-                'gas': 1000000,
-                'gasPrice': self.w3.eth.gas_price
-            })
+            decision_fn = make_decision_fn(params)
+            base_params = {'from': account.address}
+            if self.async_chain:
+                # chainId supplied up front so build_transaction makes no sync RPC
+                with self.metrics.stage("chain_id"):
+                    base_params['chainId'] = await self.async_chain.chain_id()
+
+            if self.preflight:
+                # Simulate against the pending block: doomed txs are resized or dropped unsent
+                candidates = {}
+
+                async def candidate(scale: float) -> Optional[Dict]:
+                    if scale == 1.0:
+                        fn = decision_fn
+                    elif action == "BORROW_AND_INVEST":
+                        resized = {**decision_params, 'borrow_amount': decision_params.get('borrow_amount', 0) * scale}
+                        fn = make_decision_fn(await asyncio.to_thread(self._encode_params, action, resized))
+                    else:
+                        return None
+                    candidates[scale] = fn
+                    return {'from': account.address, 'to': contract.address, 'data': fn._encode_transaction_data()}
+
+                with self.metrics.stage("preflight"):
+                    checked = await self.preflight.check(candidate, await self.fee_oracle.gas_limit(action))
+                if checked.ok:
+                    decision_fn = candidates[checked.scale]
+                    self.fee_oracle.record_gas(action, checked.gas_estimate)
+                    base_params['gas'] = checked.gas_limit
+                    if checked.scale < 1.0:
+                        print(f"📉 Pre-flight: full borrow would revert, sending {checked.scale:.0%} of it")
+                elif not checked.inconclusive:
+                    print(f"🛑 Pre-flight: {action} for {user_address} would revert, not sending: {checked.reason}")
+                    return "dropped"
+                else:
+                    print(f"Warning: Pre-flight simulation failed, sending unchecked: {checked.reason}")
+
+            async def estimate() -> int:
+                tx = {**base_params, 'to': contract.address, 'data': decision_fn._encode_transaction_data()}
+                return await self._estimate_gas(tx)
+
+            if 'gas' not in base_params:
+                # Learned per-action limit; estimate_gas only until the action has samples
+                with self.metrics.stage("gas_limit"):
+                    base_params['gas'] = await self.fee_oracle.gas_limit(action, estimate)
+            build = decision_fn.build_transaction
+            with self.metrics.stage("fees"):
+                fees = await self.fee_oracle.get_fees()
+
+            async def sign(nonce: int, fees: Dict[str, int]) -> bytes:
+                with self.metrics.stage("sign_tx"):
+                    tx_params = {**base_params, 'nonce': nonce, **fees}
+                    if self.async_chain:
+                        tx = build(tx_params)
+                    else:
+                        tx = await asyncio.to_thread(build, tx_params)
+                    return self.w3.eth.account.sign_transaction(tx, config.PRIVATE_KEY).rawTransaction
+
+            # Nonces are allocated locally, so submissions don't wait on earlier receipts
+            nonce_manager = self._get_nonce_manager(account.address)
+            with self.metrics.stage("tx_slot_wait"):
+                await self._tx_limiter.acquire()
+            try:
+                with self.metrics.stage("submit"):
+                    nonce, tx_hash = await nonce_manager.submit(sign, fees)
+            finally:
+                self._tx_limiter.release()
 
-            # Sign and send transaction
-            signed_tx = self.w3.eth.account.sign_transaction(tx, config.PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+            print(f"✅ Transaction sent: {tx_hash.hex()} (nonce {nonce})")
 
-            print(f"✅ Transaction sent: {tx_hash.hex()}")
+            # Cached reads for this user predate the tx
+            if self.state_cache:
+                self.state_cache.invalidate(user_address)
 
-            # Wait for receipt
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=120)
-            print(f"✅ Transaction confirmed in block {receipt['blockNumber']}")
+            # Hand off to the receipt tracker and move on to the next user
+            self.receipt_tracker.track(nonce, tx_hash, agent_id, user_address, action)
+            return True
 
         except Exception as e:
             print(f"❌ Error executing decision on-chain: {e}")
             import traceback
             traceback.print_exc()
+            return False
+
+    def _get_dex_amount_out(self, dex_address: str, token_in: str, token_out: str, amount_in: int) -> int:
+        """
+        Quote a swap on the DEX
+
+        Args:
+            dex_address: DEX contract address
+            token_in: Token sold
+            token_out: Token bought
+            amount_in: Amount of token_in (wei)
+
+        Returns:
+            Expected amount of token_out (wei)
+        """
+        with self.metrics.stage("dex_quote"):
+            dex_contract = self.contracts.dex(dex_address)
+            return dex_contract.functions.getAmountOut(token_in, token_out, amount_in).call()
 
     def _encode_params(self, action: str, params: Dict) -> bytes:
         """Encode parameters for smart contract call"""
@@ -651,58 +1563,33 @@ class AgentOrchestrator:
 
         if action == "BORROW_AND_INVEST":
             # New format: (uint256 borrowAmount, address dexAddress, address tokenOut, uint256 minAmountOut)
-            borrow_amount = self.w3.to_wei(params.get('borrow_amount', 0), 'ether')
+            zero_address = '0x' + '0' * 40
+            usdc = self.tokens.by_symbol('USDC')
+            borrow_amount = usdc.to_units(params.get('borrow_amount', 0))
 
             # Get DEX address
-            dex_address = self.w3.to_checksum_address(config.SIMPLE_DEX_ADDRESS or '0x' + '0' * 40)
-
-            # Get token address based on token name
-            token_name = params.get('token', 'ETH')
-            if token_name == 'ETH':
-                token_out = self.w3.to_checksum_address(config.WETH_ADDRESS or '0x' + '0' * 40)
-            elif token_name == 'BTC':
-                token_out = self.w3.to_checksum_address(config.WBTC_ADDRESS or '0x' + '0' * 40)
-            else:
-                token_out = self.w3.to_checksum_address(config.WETH_ADDRESS or '0x' + '0' * 40)
+            dex_address = self.contracts.checksum(config.SIMPLE_DEX_ADDRESS or zero_address)
+
+            # Get token address based on token name (anything not tradable buys ETH)
+            token = self.tokens.tradable(params.get('token', 'ETH')) or self.tokens.by_symbol('ETH')
+            token_name = token.symbol
+            token_out = token.address or zero_address
 
             # Get expected output amount from DEX
             try:
-                # Load SimpleDEX ABI
-                import json
-                import os
-                project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-                dex_abi_path = os.path.join(
-                    project_root,
-                    "contracts/artifacts/contracts/SimpleDEX.sol/SimpleDEX.json"
-                )
-
-                with open(dex_abi_path, 'r') as f:
-                    dex_json = json.load(f)
-                    dex_abi = dex_json['abi']
-
-                # Create DEX contract instance
-                dex_contract = self.w3.eth.contract(
-                    address=dex_address,
-                    abi=dex_abi
-                )
-
-                # Get expected output amount
-                usdc_address = self.w3.to_checksum_address(config.MOCK_USDC_ADDRESS)
-                expected_out = dex_contract.functions.getAmountOut(
-                    usdc_address,
-                    token_out,
-                    borrow_amount
-                ).call()
+                if usdc.address is None:
+                    raise ValueError("MOCK_USDC_ADDRESS is not configured")
+                expected_out = self._get_dex_amount_out(dex_address, usdc.address, token_out, borrow_amount)
 
                 # Calculate minimum with 2% slippage
                 min_amount_out = int(expected_out * 0.98)
 
                 print(f"Encoded params:")
-                print(f"  Borrow: {self.w3.from_wei(borrow_amount, 'ether')} USDC")
+                print(f"  Borrow: {usdc.from_units(borrow_amount)} USDC")
                 print(f"  DEX: {dex_address}")
                 print(f"  Token Out: {token_out} ({token_name})")
-                print(f"  Expected Out: {self.w3.from_wei(expected_out, 'ether')}")
-                print(f"  Min Amount Out: {self.w3.from_wei(min_amount_out, 'ether')} (2% slippage)")
+                print(f"  Expected Out: {token.from_units(expected_out)}")
+                print(f"  Min Amount Out: {token.from_units(min_amount_out)} (2% slippage)")
 
             except Exception as e:
                 print(f"Warning: Could not get expected output from DEX: {e}")
@@ -745,14 +1632,35 @@ class AgentOrchestrator:
 
         while True:
             try:
+                round_started = time.time()
+                stage_totals = self.metrics.stage_totals()
                 if user_address:
                     # Monitor specific user
                     await self._monitor_user_risk(agent_id, user_address)
+                    users_checked = 1
                 else:
                     # Monitor all users
-                    all_users = await self._get_all_users(agent_id)
-                    for user in all_users:
-                        await self._monitor_user_risk(agent_id, user)
+                    with self.metrics.stage("risk_read_users"):
+                        all_users = self._owned_users(await self._get_all_users(agent_id))
+                    with self.metrics.stage("risk_read_states"):
+                        states = await self._batch_read_states(agent_id, all_users)
+
+                    if self.batch_risk_engine and states:
+                        # One vectorized pass for every user we have state for
+                        with self.metrics.stage("risk_market_data"):
+                            market_data = await self._fetch_market_data()
+                        with self.metrics.stage("risk_assess_batch"):
+                            self._report_batch_risk(states, market_data)
+                        remaining = [user for user in all_users if user not in states]
+                    else:
+                        remaining = all_users
+
+                    for user in remaining:
+                        await self._monitor_user_risk(agent_id, user, states.get(user))
+                    users_checked = len(all_users)
+
+                self.metrics.record_round("risk", users_checked, time.time() - round_started)
+                self._write_round_summary("risk", stage_totals)
 
                 await asyncio.sleep(config.RISK_CHECK_INTERVAL)
 
@@ -760,16 +1668,33 @@ class AgentOrchestrator:
                 print(f"Error in risk monitoring: {e}")
                 await asyncio.sleep(60)
 
-    async def _monitor_user_risk(self, agent_id: str, user_address: str):
-        """Monitor risk for a specific user"""
+    def _report_batch_risk(self, states: Dict[str, AgentState], market_data: MarketData):
+        """Assess all users at once and print warnings for those breaching thresholds"""
+        result = self.batch_risk_engine.assess(states, market_data)
+        for user in result.breached:
+            print(f"\n⚠️  RISK WARNINGS for user {user}:")
+            for warning in result.report(user).warnings:
+                print(f"  - {warning}")
+
+    async def _monitor_user_risk(
+        self,
+        agent_id: str,
+        user_address: str,
+        agent_state: Optional[AgentState] = None
+    ):
+        """Monitor risk for a specific user, reusing a pre-fetched state if given"""
         try:
-            agent_state = await self._fetch_agent_state(agent_id, user_address)
-            market_data = await self._fetch_market_data()
-
-            risk_report = await self.decision_engine._assess_risk(
-                agent_state,
-                market_data
-            )
+            if agent_state is None:
+                with self.metrics.stage("risk_fetch_state"):
+                    agent_state = await self._fetch_agent_state(agent_id, user_address)
+            with self.metrics.stage("risk_market_data"):
+                market_data = await self._fetch_market_data()
+
+            with self.metrics.stage("risk_assess"):
+                risk_report = await self.decision_engine._assess_risk(
+                    agent_state,
+                    market_data
+                )
 
             if risk_report.warnings:
                 print(f"\n⚠️  RISK WARNINGS for user {user_address}:")
@@ -0,0 +1,150 @@
+"""Pre-flight simulation of decision transactions before they are signed"""
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from web3.exceptions import ContractLogicError
+
+# build(scale) -> tx dict ({'from', 'to', 'data'}) at `scale` of the decided size,
+# or None when the action cannot be resized
+TxBuilder = Callable[[float], Awaitable[Optional[Dict]]]
+
+
+@dataclass
+class PreflightResult:
+    """Outcome of simulating one transaction"""
+    ok: bool
+    tx: Optional[Dict] = None
+    scale: float = 1.0
+    gas_estimate: Optional[int] = None
+    gas_limit: Optional[int] = None
+    reason: Optional[str] = None
+    inconclusive: bool = False  # the simulation itself failed (RPC error), not the tx
+
+
+def _is_revert(error: Exception) -> bool:
+    if isinstance(error, ContractLogicError):
+        return True
+    message = str(error).lower()
+    return "revert" in message or "invalid opcode" in message
+
+
+class PreflightSimulator:
+    """
+    Runs eth_call against the pending block, then estimate_gas, before a
+    transaction is signed.
+
+    A transaction that would revert is not sent. If it can be resized
+    (e.g. a smaller borrow), the smaller candidates are simulated
+    concurrently and the largest one that passes is used instead.
+    Otherwise it is dropped and counted as an avoided revert, together with
+    the gas it would have been sent with. RPC failures of the simulation
+    itself are inconclusive: the caller sends the transaction as before.
+    """
+
+    def __init__(
+        self,
+        eth_call: Callable[[Dict, Any], Awaitable[bytes]],
+        estimate_gas: Callable[[Dict], Awaitable[int]],
+        gas_limit_multiplier: float = 1.2,
+        resize_steps: Sequence[float] = (0.5, 0.25),
+        max_concurrent: int = 8,
+        block_identifier: Any = 'pending'
+    ):
+        """
+        Initialize simulator
+
+        Args:
+            eth_call: async (tx, block_identifier) -> return data, raising on revert
+            estimate_gas: async (tx) -> gas
+            gas_limit_multiplier: Safety margin applied to the estimate
+            resize_steps: Fractions of the decided size tried when the full size reverts
+            max_concurrent: Max simulation RPCs in flight
+            block_identifier: Block the call is simulated against
+        """
+        self._eth_call = eth_call
+        self._estimate_gas = estimate_gas
+        self.gas_limit_multiplier = gas_limit_multiplier
+        self.resize_steps = sorted((s for s in resize_steps if 0 < s < 1), reverse=True)
+        self.block_identifier = block_identifier
+        self._limiter = asyncio.Semaphore(max(1, max_concurrent))
+        self._stats = {
+            "simulated": 0,
+            "passed": 0,
+            "resized": 0,
+            "avoided_reverts": 0,
+            "saved_gas": 0,
+            "inconclusive": 0,
+        }
+
+    async def simulate(self, tx: Dict) -> PreflightResult:
+        """
+        Simulate one transaction and estimate its gas
+
+        Args:
+            tx: Transaction dict with 'from', 'to' and 'data'
+
+        Returns:
+            PreflightResult (ok with gas_limit set, or the revert reason)
+        """
+        async with self._limiter:
+            self._stats["simulated"] += 1
+            try:
+                await self._eth_call(tx, self.block_identifier)
+                gas = await self._estimate_gas(tx)
+            except Exception as e:
+                if _is_revert(e):
+                    return PreflightResult(ok=False, tx=tx, reason=str(e))
+                return PreflightResult(ok=False, tx=tx, reason=str(e), inconclusive=True)
+
+        return PreflightResult(
+            ok=True,
+            tx=tx,
+            gas_estimate=gas,
+            gas_limit=int(gas * self.gas_limit_multiplier)
+        )
+
+    async def simulate_many(self, txs: Sequence[Dict]) -> List[PreflightResult]:
+        """Simulate a batch of transactions concurrently (bounded by max_concurrent)"""
+        return list(await asyncio.gather(*(self.simulate(tx) for tx in txs)))
+
+    async def check(self, build: TxBuilder, expected_gas: int = 0) -> PreflightResult:
+        """
+        Pre-flight a decision, resizing it if the full size would revert
+
+        Args:
+            build: async (scale) -> tx at that fraction of the decided size, or None
+            expected_gas: Gas limit the tx would have been sent with (counted as saved if dropped)
+
+        Returns:
+            PreflightResult for the tx to send (check .scale), or not ok if it should be dropped
+        """
+        full = await self.simulate(await build(1.0))
+        if full.ok:
+            self._stats["passed"] += 1
+            return full
+        if full.inconclusive:
+            self._stats["inconclusive"] += 1
+            return full
+
+        candidates = await asyncio.gather(*(build(scale) for scale in self.resize_steps))
+        sized = [(scale, tx) for scale, tx in zip(self.resize_steps, candidates) if tx is not None]
+        if sized:
+            results = await self.simulate_many([tx for _, tx in sized])
+            for (scale, _), result in zip(sized, results):
+                if result.ok:
+                    result.scale = scale
+                    self._stats["resized"] += 1
+                    return result
+
+        self._stats["avoided_reverts"] += 1
+        self._stats["saved_gas"] += expected_gas
+        return full
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get simulation counters
+
+        Returns:
+            Dictionary with simulated/passed/resized counts, avoided reverts and saved gas
+        """
+        return dict(self._stats)
@@ -3,237 +3,590 @@ Price Service for fetching real-time cryptocurrency prices from CoinGecko API.
 
 This service provides:
 - Real-time BTC/ETH prices
-- Historical OHLC data for charts
+- Historical OHLC data for charts (kept in a local store, only the tail is refetched)
 - Caching to avoid rate limits
 - Fallback mechanisms for reliability
 """
 
-import requests
+import asyncio
+import threading
 import time
+import aiohttp
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
 from datetime import datetime
 import logging
 
-logger = logging.getLogger(__name__)
-
+from .config import config
+from .ohlc_series import OHLCSeries
+from .ohlc_store import DAY_MS, OHLCStore, granularity_for, tail_days
+from .rate_governor import BACKGROUND, DASHBOARD, DECISION, PRIORITY_NAMES, RateGovernor, parse_retry_after
+from .tokens import get_token_registry
 
-@dataclass
-class OHLCData:
-    """Open, High, Low, Close data point"""
-    timestamp: int  # Unix timestamp in milliseconds
-    open: float
-    high: float
-    low: float
-    close: float
+logger = logging.getLogger(__name__)
 
 
 class PriceService:
-    """Service for fetching cryptocurrency prices from CoinGecko API"""
+    """
+    Service for fetching cryptocurrency prices from CoinGecko API
+
+    All upstream calls run on one background event loop thread over a pooled
+    aiohttp session, shared by async callers (the orchestrator) and sync
+    callers (the Flask API). Fetches are single-flight per symbol: while a
+    price for BTC is in flight, every other caller wanting BTC awaits that
+    request instead of issuing its own, so N concurrent cache misses cost one
+    CoinGecko call. The sync methods are thin blocking wrappers over the
+    async ones.
+
+    Cache entries age through three windows:
+
+    - fresh (age < cache_ttl): served as is
+    - stale (age < max_staleness): served immediately while one background
+      fetch revalidates it
+    - expired (age < hard_fail_age): callers wait for a fetch and get this
+      value only if the fetch fails
+
+    Past hard_fail_age a price is never served. With refresh_ahead > 0 a
+    background task re-fetches recently read symbols that many seconds
+    before they expire. Decision-time reads then stay dict lookups.
+
+    With a RateGovernor every upstream call first takes a token. Decision
+    reads queue ahead of dashboard reads, and background refreshes never
+    queue. A throttled fetch is treated like a failed one: callers get the
+    last good value within hard_fail_age.
+    """
 
     # CoinGecko API endpoints
     BASE_URL = "https://api.coingecko.com/api/v3"
     SIMPLE_PRICE_URL = f"{BASE_URL}/simple/price"
     OHLC_URL = f"{BASE_URL}/coins/{{coin_id}}/ohlc"
 
-    # Token mapping to CoinGecko IDs
-    TOKEN_MAP = {
-        "BTC": "bitcoin",
-        "ETH": "ethereum",
-        "USDC": "usd-coin",
-        "USDT": "tether"
-    }
+    # Token mapping to CoinGecko IDs (from the token registry)
+    TOKEN_MAP = get_token_registry().coingecko_ids
 
     # Cache settings
     CACHE_TTL = 60  # 60 seconds cache
 
-    def __init__(self, cache_ttl: int = CACHE_TTL):
+    HEADERS = {
+        'Accept': 'application/json',
+        'User-Agent': 'RebelInParadise-Trading-Bot/1.0'
+    }
+
+    def __init__(
+        self,
+        cache_ttl: int = CACHE_TTL,
+        pool_size: int = 10,
+        refresh_ahead: float = 0.0,
+        max_staleness: float = 0.0,
+        hard_fail_age: float = 0.0,
+        governor: Optional[RateGovernor] = None,
+        ohlc_store: Optional[OHLCStore] = None,
+        ohlc_tail_ttl: float = 300.0
+    ):
         """
-        Initialize PriceService
+        Initialize PriceService (the loop thread and HTTP session start lazily)
 
         Args:
             cache_ttl: Cache time-to-live in seconds (default: 60)
+            pool_size: Max concurrent connections to CoinGecko
+            refresh_ahead: Seconds before expiry at which read symbols are re-fetched (0 = off)
+            max_staleness: Max age served without waiting for a fetch (raised to cache_ttl)
+            hard_fail_age: Max age ever served, as a fallback when fetches fail (raised to max_staleness)
+            governor: Upstream rate limiter (None = unlimited)
+            ohlc_store: Persistent candle history (None = every history request goes upstream)
+            ohlc_tail_ttl: Seconds between tail syncs of a stored series (capped at its candle size)
         """
         self.cache_ttl = cache_ttl
+        self.pool_size = pool_size
+        self.refresh_ahead = min(max(0.0, refresh_ahead), cache_ttl)
+        self.max_staleness = max(max_staleness, cache_ttl)
+        self.hard_fail_age = max(hard_fail_age, self.max_staleness)
+        self.governor = governor
+        self.ohlc_store = ohlc_store
+        self.ohlc_tail_ttl = ohlc_tail_ttl
         self._price_cache: Dict[str, Tuple[float, float]] = {}  # {symbol: (price, timestamp)}
-        self._session = requests.Session()
-        self._session.headers.update({
-            'Accept': 'application/json',
-            'User-Agent': 'RebelInParadise-Trading-Bot/1.0'
-        })
+        self._last_read: Dict[str, float] = {}  # {symbol: last read time}, drives refresh-ahead
+
+        # Owned by the loop thread: session and in-flight fetches
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[str, asyncio.Future] = {}  # {symbol: future of its batch's prices}
+        self._inflight_ohlc: Dict[Tuple[str, int], asyncio.Future] = {}
+        self._ohlc_locks: Dict[Tuple[str, int], asyncio.Lock] = {}  # {(symbol, candle ms): store writer}
+        self._background = set()  # revalidations, referenced until done
+        self._refresher: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "cache_hits": 0,
+            "stale_served": 0,
+            "stale_fallbacks": 0,
+            "hard_failures": 0,
+            "refreshes": 0,
+            "upstream_calls": 0,
+            "upstream_errors": 0,
+            "coalesced": 0,
+            "ohlc_store_hits": 0,
+            "ohlc_tail_syncs": 0,
+            "ohlc_backfills": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Loop thread plumbing
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background loop thread on first use"""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="price-service", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _on_loop(self, coro):
+        """Await `coro` on the service loop from any event loop"""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _run(self, coro):
+        """Block the calling thread until `coro` finishes on the service loop"""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("PriceService sync API called from its own loop; await the async method")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _get_json(self, url: str, params: Dict, timeout: float):
+        """GET `url` on the pooled session and decode the JSON body"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.HEADERS,
+                connector=aiohttp.TCPConnector(limit=self.pool_size)
+            )
+        async with self._session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _admit(self, priority: int, what: str) -> bool:
+        """Take a governor token for one upstream call (loop thread)"""
+        if self.governor is None or await self.governor.acquire(priority):
+            return True
+        logger.warning(f"CoinGecko budget exhausted, skipping {PRIORITY_NAMES[priority]} fetch of {what}")
+        return False
+
+    def _upstream_failed(self, error: Exception):
+        """Count an upstream error; a 429 blocks the governor for its Retry-After"""
+        self._stats["upstream_errors"] += 1
+        if isinstance(error, aiohttp.ClientResponseError) and error.status == 429 and self.governor:
+            retry_after = parse_retry_after((error.headers or {}).get('Retry-After'))
+            self.governor.penalize(retry_after)
+            logger.warning(f"CoinGecko rate limit hit, backing off {retry_after:.0f}s")
+
+    def _cached(self, symbol: str) -> Optional[float]:
+        """Fresh cached price for `symbol`, or None"""
+        entry = self._price_cache.get(symbol)
+        if entry is not None and time.time() - entry[1] < self.cache_ttl:
+            return entry[0]
+        return None
+
+    def _age(self, symbol: str) -> Optional[float]:
+        """Seconds since `symbol` was fetched, or None when never cached"""
+        entry = self._price_cache.get(symbol)
+        return time.time() - entry[1] if entry is not None else None
+
+    def _serve_cached(self, symbols: List[str]) -> Tuple[Dict[str, Optional[float]], List[str]]:
+        """
+        Answer what the cache can without waiting
+
+        Fresh and stale entries are served (stale ones are revalidated in
+        the background). Everything else must be fetched.
 
-    def get_current_price(self, token_symbol: str) -> Optional[float]:
+        Args:
+            symbols: Upper-cased token symbols
+
+        Returns:
+            (served prices, symbols to fetch)
         """
-        Get current price for a token in USD
+        now = time.time()
+        result: Dict[str, Optional[float]] = {}
+        to_fetch, to_revalidate = [], []
+        for symbol in symbols:
+            if symbol in self.TOKEN_MAP:
+                self._last_read[symbol] = now
+            entry = self._price_cache.get(symbol)
+            age = now - entry[1] if entry is not None else None
+            if age is not None and age < self.cache_ttl:
+                self._stats["cache_hits"] += 1
+                result[symbol] = entry[0]
+            elif age is not None and age < self.max_staleness:
+                self._stats["stale_served"] += 1
+                result[symbol] = entry[0]
+                to_revalidate.append(symbol)
+            else:
+                to_fetch.append(symbol)
+
+        if to_revalidate:
+            self._revalidate(to_revalidate)
+        if self.refresh_ahead and self._refresher is None:
+            self._ensure_loop().call_soon_threadsafe(self._start_refresher)
+        return result, to_fetch
+
+    def _with_fallback(self, fetched: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+        """Fill failed fetches with cached values younger than hard_fail_age"""
+        for symbol, price in fetched.items():
+            if price is not None:
+                continue
+            age = self._age(symbol)
+            if age is not None and age < self.hard_fail_age:
+                self._stats["stale_fallbacks"] += 1
+                fetched[symbol] = self._price_cache[symbol][0]
+                logger.warning(f"Serving {symbol} price from {age:.0f}s ago (fetch failed)")
+            elif age is not None:
+                self._stats["hard_failures"] += 1
+        return fetched
+
+    def _revalidate(self, symbols: List[str]):
+        """Fetch `symbols` in the background (from any thread)"""
+        def start():
+            task = asyncio.ensure_future(self._fetch_prices(symbols, priority=BACKGROUND))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        self._ensure_loop().call_soon_threadsafe(start)
+
+    def _start_refresher(self):
+        """Start the refresh-ahead task once (loop thread)"""
+        if self._refresher is None:
+            self._refresher = asyncio.ensure_future(self._refresh_ahead_loop())
+
+    async def _refresh_ahead_loop(self):
+        """Re-fetch read symbols `refresh_ahead` seconds before they expire (loop thread)"""
+        tick = max(0.05, min(1.0, self.refresh_ahead / 2))
+        while True:
+            now = time.time()
+            due = []
+            for symbol, last_read in list(self._last_read.items()):
+                if now - last_read > 10 * self.cache_ttl:
+                    del self._last_read[symbol]  # nobody reads it any more
+                    continue
+                age = self._age(symbol)
+                if age is None or age >= self.cache_ttl - self.refresh_ahead:
+                    due.append(symbol)
+
+            delay = tick
+            if due:
+                self._stats["refreshes"] += 1
+                prices = await self._fetch_prices(due, force=True, priority=BACKGROUND)
+                if any(price is None for price in prices.values()):
+                    delay = max(tick, self.refresh_ahead)  # don't hammer a failing upstream
+            await asyncio.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def aget_current_price(self, token_symbol: str, priority: int = DECISION) -> Optional[float]:
+        """
+        Get current price for a token in USD without blocking the event loop
 
         Args:
             token_symbol: Token symbol (e.g., "BTC", "ETH")
+            priority: Rate governor priority (rate_governor.DECISION/DASHBOARD/BACKGROUND)
 
         Returns:
             Current price in USD, or None if fetch fails
         """
         token_symbol = token_symbol.upper()
-
-        # Check cache first
-        if token_symbol in self._price_cache:
-            cached_price, cached_time = self._price_cache[token_symbol]
-            if time.time() - cached_time < self.cache_ttl:
-                logger.debug(f"Using cached price for {token_symbol}: ${cached_price}")
-                return cached_price
-
-        # Fetch from API
-        try:
-            coin_id = self.TOKEN_MAP.get(token_symbol)
-            if not coin_id:
-                logger.error(f"Unknown token symbol: {token_symbol}")
-                return None
-
-            params = {
-                'ids': coin_id,
-                'vs_currencies': 'usd'
-            }
-
-            response = self._session.get(self.SIMPLE_PRICE_URL, params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-            price = data.get(coin_id, {}).get('usd')
-
-            if price is None:
-                logger.error(f"Price not found in response for {token_symbol}")
-                return None
-
-            # Update cache
-            self._price_cache[token_symbol] = (price, time.time())
-            logger.info(f"Fetched {token_symbol} price: ${price}")
-
-            return price
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch price for {token_symbol}: {e}")
-            return None
-        except (KeyError, ValueError) as e:
-            logger.error(f"Failed to parse price data for {token_symbol}: {e}")
+        if token_symbol not in self.TOKEN_MAP:
+            logger.error(f"Unknown token symbol: {token_symbol}")
             return None
+        prices = await self.aget_multiple_prices([token_symbol], priority)
+        return prices.get(token_symbol)
 
-    def get_multiple_prices(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+    async def aget_multiple_prices(self, symbols: List[str], priority: int = DECISION) -> Dict[str, Optional[float]]:
         """
-        Get current prices for multiple tokens in a single API call
+        Get current prices for multiple tokens, coalescing with in-flight fetches
 
         Args:
             symbols: List of token symbols (e.g., ["BTC", "ETH"])
+            priority: Rate governor priority
 
         Returns:
             Dictionary mapping symbols to prices
         """
-        symbols = [s.upper() for s in symbols]
-        result = {}
+        result, to_fetch = self._serve_cached([s.upper() for s in symbols])
+        if to_fetch:
+            result.update(self._with_fallback(await self._on_loop(self._fetch_prices(to_fetch, priority=priority))))
+        return result
+
+    async def _fetch_prices(
+        self,
+        symbols: List[str],
+        force: bool = False,
+        priority: int = DECISION
+    ) -> Dict[str, Optional[float]]:
+        """Join in-flight fetches for `symbols` and start one batch for the rest (loop thread)"""
+        waits = {}
+        missing = []
+        for symbol in dict.fromkeys(symbols):
+            if symbol in self._inflight:
+                self._stats["coalesced"] += 1
+                waits[symbol] = self._inflight[symbol]
+            elif not force and self._cached(symbol) is not None:
+                continue  # landed while this call was hopping threads
+            else:
+                missing.append(symbol)
+
+        if missing:
+            batch = asyncio.ensure_future(self._fetch_batch(missing, priority))
+            for symbol in missing:
+                self._inflight[symbol] = batch
+
+            def release(_, missing=missing, batch=batch):
+                for symbol in missing:
+                    if self._inflight.get(symbol) is batch:
+                        del self._inflight[symbol]
+            batch.add_done_callback(release)
+            for symbol in missing:
+                waits[symbol] = batch
 
-        # Separate cached and non-cached symbols
-        to_fetch = []
+        result = {}
         for symbol in symbols:
-            if symbol in self._price_cache:
-                cached_price, cached_time = self._price_cache[symbol]
-                if time.time() - cached_time < self.cache_ttl:
-                    result[symbol] = cached_price
-                    continue
-            to_fetch.append(symbol)
+            if symbol in waits:
+                prices = await asyncio.shield(waits[symbol])
+                result[symbol] = prices.get(symbol)
+            else:
+                result[symbol] = self._cached(symbol)
+        return result
 
-        if not to_fetch:
+    async def _fetch_batch(self, symbols: List[str], priority: int = DECISION) -> Dict[str, Optional[float]]:
+        """One /simple/price call for `symbols`; never raises (failures map to None)"""
+        result: Dict[str, Optional[float]] = {symbol: None for symbol in symbols}
+        coin_ids = [self.TOKEN_MAP[s] for s in symbols if s in self.TOKEN_MAP]
+        if not coin_ids:
+            logger.error(f"No valid token symbols in: {symbols}")
             return result
 
-        # Fetch non-cached prices
-        try:
-            coin_ids = [self.TOKEN_MAP.get(s) for s in to_fetch if s in self.TOKEN_MAP]
-            if not coin_ids:
-                logger.error(f"No valid token symbols in: {to_fetch}")
-                return result
-
-            params = {
-                'ids': ','.join(coin_ids),
-                'vs_currencies': 'usd'
-            }
-
-            response = self._session.get(self.SIMPLE_PRICE_URL, params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
+        params = {
+            'ids': ','.join(coin_ids),
+            'vs_currencies': 'usd'
+        }
 
-            for symbol in to_fetch:
+        if not await self._admit(priority, symbols):
+            return result
+        self._stats["upstream_calls"] += 1
+        try:
+            data = await self._get_json(self.SIMPLE_PRICE_URL, params, timeout=10)
+            for symbol in symbols:
                 coin_id = self.TOKEN_MAP.get(symbol)
-                if coin_id and coin_id in data:
-                    price = data[coin_id].get('usd')
-                    if price is not None:
-                        result[symbol] = price
-                        self._price_cache[symbol] = (price, time.time())
-                        logger.info(f"Fetched {symbol} price: ${price}")
-                    else:
-                        result[symbol] = None
+                price = data.get(coin_id, {}).get('usd') if coin_id else None
+                if price is not None:
+                    result[symbol] = price
+                    self._price_cache[symbol] = (price, time.time())
+                    logger.info(f"Fetched {symbol} price: ${price}")
                 else:
-                    result[symbol] = None
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch multiple prices: {e}")
-            for symbol in to_fetch:
-                result[symbol] = None
-        except (KeyError, ValueError) as e:
-            logger.error(f"Failed to parse price data: {e}")
-            for symbol in to_fetch:
-                result[symbol] = None
-
+                    logger.error(f"Price not found in response for {symbol}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._upstream_failed(e)
+            logger.error(f"Failed to fetch prices for {symbols}: {e}")
+        except (KeyError, ValueError, AttributeError) as e:
+            self._stats["upstream_errors"] += 1
+            logger.error(f"Failed to parse price data for {symbols}: {e}")
         return result
 
-    def get_historical_prices(self, token_symbol: str, days: int = 30) -> List[OHLCData]:
+    async def aget_historical_prices(
+        self,
+        token_symbol: str,
+        days: int = 30,
+        priority: int = DASHBOARD
+    ) -> OHLCSeries:
         """
-        Get historical OHLC (Open, High, Low, Close) data for a token
+        Get historical OHLC data for a token without blocking the event loop
 
         Args:
             token_symbol: Token symbol (e.g., "BTC", "ETH")
             days: Number of days of historical data (1, 7, 14, 30, 90, 180, 365, max)
+            priority: Rate governor priority
 
         Returns:
-            List of OHLC data points
+            OHLCSeries (empty if the fetch fails)
         """
-        token_symbol = token_symbol.upper()
+        return await self._on_loop(self._fetch_ohlc(token_symbol.upper(), days, priority))
+
+    async def _fetch_ohlc(self, token_symbol: str, days: int, priority: int = DASHBOARD) -> OHLCSeries:
+        """Single-flight OHLC fetch per (symbol, days) (loop thread)"""
+        key = (token_symbol, days)
+        pending = self._inflight_ohlc.get(key)
+        if pending is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        pending = asyncio.ensure_future(self._load_ohlc(token_symbol, days, priority))
+        self._inflight_ohlc[key] = pending
+        pending.add_done_callback(lambda _: self._inflight_ohlc.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _load_ohlc(self, token_symbol: str, days: int, priority: int) -> OHLCSeries:
+        """
+        History window from the OHLC store, fetching only what it lacks (loop thread)
+
+        A window longer than any stored before for this candle size is
+        fetched in full once and merged in. After that only the tail since
+        the newest stored candle is fetched, at most every ohlc_tail_ttl.
+        When upstream fails or is throttled, whatever is stored is served.
 
+        Store I/O (reads, fsync'd writes) runs in worker threads so price
+        fetches on this loop never wait behind it. Windows of the same
+        candle size share one series file, so each series is handled under
+        its own lock: one writer per file.
+        """
+        if self.ohlc_store is None:
+            return await self._fetch_ohlc_upstream(token_symbol, days, priority)
+
+        store = self.ohlc_store
+        granularity = granularity_for(days)
+        async with self._ohlc_locks.setdefault((token_symbol, granularity), asyncio.Lock()):
+            meta = await asyncio.to_thread(store.get_meta, token_symbol, granularity)
+            now = time.time()
+
+            if meta.get("days", 0) < days:
+                fetched = await self._fetch_ohlc_upstream(token_symbol, days, priority)
+                if fetched:
+                    self._stats["ohlc_backfills"] += 1
+
+                    def backfill():
+                        store.merge(token_symbol, granularity, fetched.to_rows())
+                        store.set_meta(token_symbol, granularity, days=days, synced_at=now)
+                    await asyncio.to_thread(backfill)
+            elif now - meta.get("synced_at", 0) >= min(self.ohlc_tail_ttl, granularity / 1000):
+                last = await asyncio.to_thread(store.last_timestamp, token_symbol, granularity)
+                gap_ms = int(now * 1000) - last if last is not None else days * DAY_MS
+                fetched = await self._fetch_ohlc_upstream(token_symbol, tail_days(granularity, gap_ms), priority)
+                if fetched:
+                    self._stats["ohlc_tail_syncs"] += 1
+
+                    def sync_tail():
+                        store.append(token_symbol, granularity, fetched.to_rows())
+                        store.set_meta(token_symbol, granularity, synced_at=now)
+                    await asyncio.to_thread(sync_tail)
+            else:
+                self._stats["ohlc_store_hits"] += 1
+
+            # Copied out of the memory map: a later merge may replace the file
+            return await asyncio.to_thread(
+                lambda: OHLCSeries.from_rows(store.window(token_symbol, granularity, int(now * 1000) - days * DAY_MS))
+            )
+
+    async def _fetch_ohlc_upstream(self, token_symbol: str, days: int, priority: int = DASHBOARD) -> OHLCSeries:
+        """One /coins/{id}/ohlc call; never raises (failures map to an empty series)"""
+        coin_id = self.TOKEN_MAP.get(token_symbol)
+        if not coin_id:
+            logger.error(f"Unknown token symbol: {token_symbol}")
+            return OHLCSeries.empty()
+
+        params = {
+            'vs_currency': 'usd',
+            'days': days
+        }
+
+        if not await self._admit(priority, f"{token_symbol} OHLC"):
+            return OHLCSeries.empty()
+        self._stats["upstream_calls"] += 1
         try:
-            coin_id = self.TOKEN_MAP.get(token_symbol)
-            if not coin_id:
-                logger.error(f"Unknown token symbol: {token_symbol}")
-                return []
-
-            params = {
-                'vs_currency': 'usd',
-                'days': days
-            }
+            data = await self._get_json(self.OHLC_URL.format(coin_id=coin_id), params, timeout=15)
 
-            url = self.OHLC_URL.format(coin_id=coin_id)
-            response = self._session.get(url, params=params, timeout=15)
-            response.raise_for_status()
+            # CoinGecko OHLC format: [[timestamp, open, high, low, close], ...]
+            series = OHLCSeries.from_rows(data)
 
-            data = response.json()
+            logger.info(f"Fetched {len(series)} OHLC data points for {token_symbol}")
+            return series
 
-            # CoinGecko OHLC format: [[timestamp, open, high, low, close], ...]
-            ohlc_data = []
-            for item in data:
-                if len(item) >= 5:
-                    ohlc_data.append(OHLCData(
-                        timestamp=int(item[0]),
-                        open=float(item[1]),
-                        high=float(item[2]),
-                        low=float(item[3]),
-                        close=float(item[4])
-                    ))
-
-            logger.info(f"Fetched {len(ohlc_data)} OHLC data points for {token_symbol}")
-            return ohlc_data
-
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._upstream_failed(e)
             logger.error(f"Failed to fetch historical prices for {token_symbol}: {e}")
-            return []
-        except (KeyError, ValueError, IndexError) as e:
+            return OHLCSeries.empty()
+        except (KeyError, ValueError, IndexError, TypeError) as e:
+            self._stats["upstream_errors"] += 1
             logger.error(f"Failed to parse historical data for {token_symbol}: {e}")
-            return []
+            return OHLCSeries.empty()
+
+    # ------------------------------------------------------------------
+    # Sync API (blocking wrappers)
+    # ------------------------------------------------------------------
+
+    def get_current_price(self, token_symbol: str, priority: int = DASHBOARD) -> Optional[float]:
+        """
+        Get current price for a token in USD
+
+        Args:
+            token_symbol: Token symbol (e.g., "BTC", "ETH")
+            priority: Rate governor priority (DECISION from the decision path)
+
+        Returns:
+            Current price in USD, or None if fetch fails
+        """
+        token_symbol = token_symbol.upper()
+        return self.get_multiple_prices([token_symbol], priority).get(token_symbol)
+
+    def get_multiple_prices(self, symbols: List[str], priority: int = DASHBOARD) -> Dict[str, Optional[float]]:
+        """
+        Get current prices for multiple tokens in a single API call
+
+        Args:
+            symbols: List of token symbols (e.g., ["BTC", "ETH"])
+            priority: Rate governor priority
+
+        Returns:
+            Dictionary mapping symbols to prices
+        """
+        # Cache hits (fresh or stale) stay on the caller's thread
+        result, to_fetch = self._serve_cached([s.upper() for s in symbols])
+        if to_fetch:
+            result.update(self._with_fallback(self._run(self._fetch_prices(to_fetch, priority=priority))))
+        return result
+
+    def get_historical_prices(self, token_symbol: str, days: int = 30, priority: int = DASHBOARD) -> OHLCSeries:
+        """
+        Get historical OHLC (Open, High, Low, Close) data for a token
+
+        Args:
+            token_symbol: Token symbol (e.g., "BTC", "ETH")
+            days: Number of days of historical data (1, 7, 14, 30, 90, 180, 365, max)
+            priority: Rate governor priority
+
+        Returns:
+            OHLCSeries (empty if the fetch fails)
+        """
+        return self._run(self.aget_historical_prices(token_symbol, days, priority))
+
+    def close(self):
+        """Close the HTTP session and stop the loop thread (restarted on next use)"""
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+
+        async def shutdown():
+            for task in [self._refresher, *self._background]:
+                if task is not None:
+                    task.cancel()
+            self._refresher = None
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
 
     def clear_cache(self):
         """Clear the price cache"""
@@ -250,34 +603,71 @@ class PriceService:
         cache_info = {}
         current_time = time.time()
 
-        for symbol, (price, timestamp) in self._price_cache.items():
+        for symbol, (price, timestamp) in list(self._price_cache.items()):
             age = current_time - timestamp
+            if age < self.cache_ttl:
+                state = 'fresh'
+            elif age < self.max_staleness:
+                state = 'stale'
+            elif age < self.hard_fail_age:
+                state = 'expired'
+            else:
+                state = 'dead'
             cache_info[symbol] = {
                 'price': price,
                 'age_seconds': age,
-                'is_valid': age < self.cache_ttl
+                'is_valid': age < self.cache_ttl,
+                'state': state,  # fresh | stale (served, revalidating) | expired (fallback only) | dead
+                'refreshing': symbol in self._inflight
             }
 
         return cache_info
 
+    def get_stats(self) -> Dict:
+        """
+        Get upstream call accounting
+
+        Returns:
+            Dictionary with cache hits, stale serves/fallbacks, refreshes, upstream calls/errors,
+            coalesced waits, in-flight count and governor_* rate limiter state
+        """
+        stats = {**self._stats, "inflight": len(set(map(id, self._inflight.values())))}
+        if self.ohlc_store:
+            stats.update({f"ohlc_{key}": value for key, value in self.ohlc_store.get_stats().items()})
+        if self.governor:
+            stats.update({f"governor_{key}": value for key, value in self.governor.get_stats().items()})
+        return stats
+
 
 # Singleton instance for easy import
 _price_service_instance = None
 
 
-def get_price_service(cache_ttl: int = 60) -> PriceService:
+def get_price_service(cache_ttl: Optional[int] = None) -> PriceService:
     """
     Get or create the singleton PriceService instance
 
     Args:
-        cache_ttl: Cache time-to-live in seconds
+        cache_ttl: Cache time-to-live in seconds (default: PRICE_CACHE_TTL)
 
     Returns:
         PriceService instance
     """
     global _price_service_instance
     if _price_service_instance is None:
-        _price_service_instance = PriceService(cache_ttl=cache_ttl)
+        _price_service_instance = PriceService(
+            cache_ttl=config.PRICE_CACHE_TTL if cache_ttl is None else cache_ttl,
+            refresh_ahead=config.PRICE_REFRESH_AHEAD,
+            max_staleness=config.PRICE_MAX_STALENESS,
+            hard_fail_age=config.PRICE_HARD_FAIL_AGE,
+            governor=RateGovernor(
+                rate=config.COINGECKO_RATE_LIMIT / 60,
+                burst=config.COINGECKO_BURST,
+                max_wait={DECISION: config.COINGECKO_DECISION_MAX_WAIT, DASHBOARD: config.COINGECKO_DASHBOARD_MAX_WAIT}
+            ) if config.COINGECKO_RATE_LIMIT > 0 else None,
+            ohlc_store=OHLCStore(config.OHLC_STORE_DIR) if config.OHLC_STORE_DIR else None,
+            ohlc_tail_ttl=config.OHLC_TAIL_TTL
+        )
     return _price_service_instance
 
 
@@ -304,10 +694,10 @@ if __name__ == "__main__":
 
     print("\n=== Testing Historical Data ===")
     historical = ps.get_historical_prices("BTC", days=7)
-    if historical:
+    if len(historical):
         print(f"Fetched {len(historical)} data points")
-        print(f"First: {datetime.fromtimestamp(historical[0].timestamp/1000)} - O:{historical[0].open:.2f} H:{historical[0].high:.2f} L:{historical[0].low:.2f} C:{historical[0].close:.2f}")
-        print(f"Last: {datetime.fromtimestamp(historical[-1].timestamp/1000)} - O:{historical[-1].open:.2f} H:{historical[-1].high:.2f} L:{historical[-1].low:.2f} C:{historical[-1].close:.2f}")
+        for label, i in (("First", 0), ("Last", -1)):
+            print(f"{label}: {datetime.fromtimestamp(historical.timestamp[i]/1000)} - O:{historical.open[i]:.2f} H:{historical.high[i]:.2f} L:{historical.low[i]:.2f} C:{historical.close[i]:.2f}")
     else:
         print("Failed to fetch historical data")
 
@@ -315,3 +705,5 @@ if __name__ == "__main__":
     cache_info = ps.get_cache_info()
     for symbol, info in cache_info.items():
         print(f"{symbol}: ${info['price']:,.2f} (age: {info['age_seconds']:.1f}s, valid: {info['is_valid']})")
+
+    ps.close()
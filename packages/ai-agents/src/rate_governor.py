@@ -0,0 +1,186 @@
+"""Token-bucket rate governor for an upstream API with priority queueing"""
+import asyncio
+import heapq
+import itertools
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Lower value = served first
+DECISION = 0
+DASHBOARD = 1
+BACKGROUND = 2
+
+PRIORITY_NAMES = {DECISION: "decision", DASHBOARD: "dashboard", BACKGROUND: "background"}
+
+
+def parse_retry_after(value: Optional[str], default: float = 60.0) -> float:
+    """
+    Seconds to wait from a Retry-After header
+
+    Args:
+        value: Header value, delta-seconds or an HTTP date
+        default: Used when the header is missing or unparseable
+
+    Returns:
+        Non-negative seconds
+    """
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateGovernor:
+    """
+    Token bucket in front of a rate-limited upstream.
+
+    Tokens refill at `rate` per second up to `burst`. A caller that finds the
+    bucket empty queues by priority, so decision-path requests get the next
+    token before dashboard requests, and dashboard requests before
+    background refreshes. A caller that is not served within its priority's
+    max wait is throttled. It gets False and should serve what it has
+    cached. A 429 empties the bucket and blocks every grant until its
+    Retry-After has passed.
+
+    Not thread-safe: it lives on the event loop that makes the upstream calls.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        max_wait: Optional[Dict[int, float]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize governor
+
+        Args:
+            rate: Tokens (upstream calls) per second
+            burst: Bucket size
+            max_wait: {priority: seconds} a caller may queue (missing priorities don't wait)
+            clock: Monotonic time source
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_wait = max_wait or {DECISION: 5.0, DASHBOARD: 1.0, BACKGROUND: 0.0}
+        self._clock = clock
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {
+            "granted": 0,
+            "throttled": 0,
+            "queued_total": 0,
+            "retry_after_hits": 0,
+        }
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _try_take(self) -> bool:
+        """Take a token if the bucket has one and no Retry-After block is active"""
+        if self._clock() < self._blocked_until:
+            return False
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self, priority: int = DECISION) -> bool:
+        """
+        Wait for a token
+
+        Args:
+            priority: DECISION, DASHBOARD or BACKGROUND
+
+        Returns:
+            True when the caller may make one upstream call, False when throttled
+        """
+        if not self._waiters and self._try_take():
+            self._stats["granted"] += 1
+            return True
+
+        max_wait = self.max_wait.get(priority, 0.0)
+        if max_wait <= 0:
+            self._stats["throttled"] += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), waiter))
+        self._stats["queued_total"] += 1
+        self._schedule()
+        try:
+            await asyncio.wait_for(waiter, timeout=max_wait)
+            return True
+        except asyncio.TimeoutError:
+            self._stats["throttled"] += 1
+            return False
+
+    def _dispatch(self):
+        """Hand available tokens to the highest-priority live waiters"""
+        self._timer = None
+        while self._waiters:
+            if self._waiters[0][2].done():
+                heapq.heappop(self._waiters)  # timed out
+                continue
+            if not self._try_take():
+                break
+            _, _, waiter = heapq.heappop(self._waiters)
+            waiter.set_result(True)
+            self._stats["granted"] += 1
+        self._schedule()
+
+    def _schedule(self):
+        """Wake the dispatcher when the next token (or the end of a block) is due"""
+        if self._timer is not None or not self._waiters:
+            return
+        now = self._clock()
+        self._refill()
+        delay = max(self._blocked_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0, 0.0)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def penalize(self, retry_after: float):
+        """
+        Record an upstream 429: no grants until `retry_after` seconds from now
+
+        Args:
+            retry_after: Seconds from the Retry-After header
+        """
+        self._stats["retry_after_hits"] += 1
+        self._tokens = 0.0
+        self._updated = self._clock()
+        self._blocked_until = max(self._blocked_until, self._updated + retry_after)
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._waiters:
+            self._schedule()
+
+    def get_stats(self) -> Dict:
+        """
+        Get governor state
+
+        Returns:
+            Dictionary with granted/throttled counts, current and total queued, tokens and block time left
+        """
+        self._refill()
+        return {
+            **self._stats,
+            "queued": sum(1 for _, _, waiter in self._waiters if not waiter.done()),
+            "tokens": round(self._tokens, 2),
+            "blocked_for": round(max(0.0, self._blocked_until - self._clock()), 1),
+        }
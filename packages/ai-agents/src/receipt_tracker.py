@@ -0,0 +1,198 @@
+"""Background receipt tracking and decision outcome reconciliation"""
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from .nonce_manager import NonceManager
+
+
+@dataclass
+class TrackedTransaction:
+    """A submitted decision transaction and, once settled, its outcome"""
+    nonce: int
+    tx_hash: str
+    agent_id: str
+    user_address: str
+    action: str
+    submitted_at: float
+    status: str = "pending"  # pending | confirmed | failed
+    gas_used: Optional[int] = None
+    block_number: Optional[int] = None
+    settled_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class ReceiptTracker:
+    """
+    Watches every in-flight decision transaction from one polling loop.
+
+    The decision loop hands over (nonce, hash, decision) and moves on; each
+    poll asks the NonceManager for newly mined nonces (one nonce lookup plus
+    one receipt per mined tx), matches them back to the originating decision
+    and records status, gas used and block number. Stuck transactions are
+    re-priced by the same pass.
+
+    A nonce can settle before track() is called for it (submit() is still
+    committing it while another poll runs); its result is kept until the
+    decision is handed over.
+    """
+
+    def __init__(
+        self,
+        nonce_manager: NonceManager,
+        on_outcome: Optional[Callable[[TrackedTransaction], Awaitable]] = None,
+        poll_interval: float = 1.0,
+        history_size: int = 1000
+    ):
+        """
+        Initialize tracker
+
+        Args:
+            nonce_manager: Nonce manager the transactions were submitted through
+            on_outcome: Optional async callback invoked once per settled transaction
+            poll_interval: Seconds between polls while anything is pending
+            history_size: Settled transactions kept for get_recent()
+        """
+        self.nonce_manager = nonce_manager
+        self.on_outcome = on_outcome
+        self.poll_interval = poll_interval
+
+        self._pending: Dict[int, TrackedTransaction] = {}
+        self._history: Deque[TrackedTransaction] = deque(maxlen=history_size)
+        self._unclaimed: Dict[int, Union[Dict, Exception]] = {}  # settled before track()
+        self._unclaimed_limit = history_size
+        self._task: Optional[asyncio.Task] = None
+        self._counts = {"confirmed": 0, "failed": 0}
+
+    def track(
+        self,
+        nonce: int,
+        tx_hash,
+        agent_id: str,
+        user_address: str,
+        action: str
+    ) -> TrackedTransaction:
+        """
+        Start tracking a submitted transaction (returns immediately)
+
+        Args:
+            nonce: Nonce from NonceManager.submit()
+            tx_hash: First broadcast hash
+            agent_id: Agent contract address
+            user_address: User the decision was made for
+            action: Decision action
+
+        Returns:
+            The tracking record (updated in place once settled)
+        """
+        tracked = TrackedTransaction(
+            nonce=nonce,
+            tx_hash=tx_hash.hex() if isinstance(tx_hash, bytes) else str(tx_hash),
+            agent_id=agent_id,
+            user_address=user_address,
+            action=action,
+            submitted_at=time.time()
+        )
+        self._pending[nonce] = tracked
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+        return tracked
+
+    def restore(self, tracked: TrackedTransaction):
+        """Resume tracking a transaction submitted by a previous run"""
+        self._pending[tracked.nonce] = tracked
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    def pending(self) -> List[TrackedTransaction]:
+        """Transactions still waiting for a receipt"""
+        return list(self._pending.values())
+
+    def has_pending(self, user_address: str) -> bool:
+        """Whether a decision for this user is still waiting for its receipt"""
+        user = user_address.lower()
+        return any(t.user_address.lower() == user for t in self._pending.values())
+
+    async def poll_once(self) -> List[TrackedTransaction]:
+        """
+        Settle whatever got mined since the last poll
+
+        Returns:
+            Transactions settled by this poll
+        """
+        settled = []
+        results = await self.nonce_manager.poll_pending()
+        # Results that arrived before their track() call
+        results.update((n, self._unclaimed.pop(n)) for n in list(self._unclaimed) if n in self._pending)
+        for nonce, result in results.items():
+            tracked = self._pending.pop(nonce, None)
+            if tracked is None:
+                self._unclaimed[nonce] = result
+                if len(self._unclaimed) > self._unclaimed_limit:
+                    del self._unclaimed[min(self._unclaimed)]
+                continue
+
+            tracked.settled_at = time.time()
+            if isinstance(result, Exception):
+                tracked.status = "failed"
+                tracked.error = str(result)
+            else:
+                tracked.status = "confirmed" if result.get('status', 1) == 1 else "failed"
+                tracked.gas_used = result.get('gasUsed')
+                tracked.block_number = result.get('blockNumber')
+                tx_hash = result.get('transactionHash')
+                if tx_hash is not None:
+                    # May differ from the first hash if fees were bumped
+                    tracked.tx_hash = tx_hash.hex() if isinstance(tx_hash, bytes) else str(tx_hash)
+                if tracked.status == "failed":
+                    tracked.error = "reverted"
+
+            self._counts[tracked.status] += 1
+            self._history.append(tracked)
+            settled.append(tracked)
+
+            if self.on_outcome:
+                try:
+                    await self.on_outcome(tracked)
+                except Exception as e:
+                    print(f"Warning: Outcome callback failed for {tracked.tx_hash}: {e}")
+
+        return settled
+
+    async def run(self):
+        """Poll until nothing is pending (track() restarts the loop)"""
+        while self._pending:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                print(f"Error polling receipts: {e}")
+            if self._pending:
+                await asyncio.sleep(self.poll_interval)
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Pending/confirmed/failed counts
+
+        Returns:
+            Dictionary with current pending count and cumulative outcomes
+        """
+        return {"pending": len(self._pending), **self._counts}
+
+    def get_recent(self, limit: int = 50) -> List[Dict]:
+        """Most recently settled transactions, newest first"""
+        return [t.to_dict() for t in list(self._history)[-limit:][::-1]]
+
+    async def close(self):
+        """Stop the polling loop (pending transactions stay on chain)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,410 @@
+"""
+Record a production decision round and replay it offline.
+
+Recording wraps the orchestrator's external boundaries (user list,
+preferences, agent state/positions, simulator market data, CoinGecko
+prices, DEX prices and swap quotes) and writes one JSON file per round.
+Replay feeds a ReplayOrchestrator from such a file with no network
+access, runs the same run_round() code and reports per-stage timing and
+the decisions made.
+
+Run from packages/ai-agents:
+    python -m src.replay recordings/round-1700000000.json [--repeat 5] [--latency]
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+from .models import AgentState, Decision, MarketData
+from .orchestrator import AgentOrchestrator
+from . import simple_decision_engine
+
+RECORDING_VERSION = 1
+
+_recording: contextvars.ContextVar[bool] = contextvars.ContextVar("recording", default=False)
+
+
+def _quote_key(token_in: str, token_out: str, amount_in: int) -> str:
+    return f"{token_in.lower()}:{token_out.lower()}:{amount_in}"
+
+
+def _decision_row(user: str, decision: Decision) -> Dict[str, Any]:
+    action = decision.action
+    return {
+        "user": user,
+        "action": getattr(action, "value", action),
+        "params": decision.params,
+        "risk_score": decision.risk_score,
+        "expected_return": decision.expected_return,
+    }
+
+
+class RoundRecorder:
+    """
+    Captures every external response seen by run_round() into a recording.
+
+    Only calls made from inside a decision round are captured (the risk
+    monitor runs concurrently and is left out). Each completed round is
+    written to `<directory>/round-<now>.json`.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Where round recordings are written
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._reset()
+        self.saved: List[str] = []
+
+    def _reset(self):
+        self._data: Dict[str, Any] = {
+            "version": RECORDING_VERSION,
+            "users": [],
+            "prefs": {},
+            "states": {},
+            "market_data": [],
+            "prices": {},
+            "dex_prices": {},
+            "dex_quotes": {},
+            "decisions": [],
+            "latency": {},
+        }
+
+    def attach(self, orchestrator: AgentOrchestrator):
+        """Wrap the orchestrator's read methods and start recording its rounds"""
+        orchestrator.recorder = self
+
+        get_all_users = orchestrator._get_all_users
+        batch_read_preferences = orchestrator._batch_read_preferences
+        get_user_preferences = orchestrator._get_user_preferences
+        batch_read_states = orchestrator._batch_read_states
+        fetch_agent_state = orchestrator._fetch_agent_state
+        fetch_market_data = orchestrator._fetch_market_data
+        get_market_price = orchestrator.aget_market_price
+        get_dex_price_from_contract = orchestrator._get_dex_price_from_contract
+        get_dex_amount_out = orchestrator._get_dex_amount_out
+        store_decision = orchestrator._store_decision
+
+        async def _get_all_users(agent_id):
+            started = time.perf_counter()
+            users = await get_all_users(agent_id)
+            if _recording.get():
+                self._note_latency("read_users", started)
+                self._data["users"] = list(users)
+            return users
+
+        async def _batch_read_preferences(agent_id, users):
+            started = time.perf_counter()
+            prefs = await batch_read_preferences(agent_id, users)
+            if _recording.get():
+                self._note_latency("read_prefs", started)
+                self._data["prefs"].update(prefs)
+            return prefs
+
+        async def _get_user_preferences(agent_id, user):
+            started = time.perf_counter()
+            prefs = await get_user_preferences(agent_id, user)
+            if _recording.get() and prefs is not None:
+                self._note_latency("read_user_prefs", started)
+                self._data["prefs"][user] = prefs
+            return prefs
+
+        async def _batch_read_states(agent_id, users):
+            started = time.perf_counter()
+            states = await batch_read_states(agent_id, users)
+            if _recording.get():
+                self._note_latency("read_states", started)
+                self._data["states"].update({user: state.dict() for user, state in states.items()})
+            return states
+
+        async def _fetch_agent_state(agent_id, user):
+            started = time.perf_counter()
+            state = await fetch_agent_state(agent_id, user)
+            if _recording.get():
+                self._note_latency("read_user_state", started)
+                self._data["states"][user] = state.dict()
+            return state
+
+        async def _fetch_market_data():
+            market_data = await fetch_market_data()
+            if _recording.get():
+                self._data["market_data"].append(market_data.dict())
+            return market_data
+
+        async def _get_market_price(symbol):
+            started = time.perf_counter()
+            price = await get_market_price(symbol)
+            if _recording.get():
+                self._note_latency("coingecko_price", started)
+                self._data["prices"].setdefault(symbol, []).append(price)
+            return price
+
+        async def _get_dex_price_from_contract(token_address):
+            started = time.perf_counter()
+            price = await get_dex_price_from_contract(token_address)
+            if _recording.get():
+                self._note_latency("dex_price", started)
+                self._data["dex_prices"].setdefault(token_address.lower(), []).append(price)
+            return price
+
+        def _get_dex_amount_out(dex_address, token_in, token_out, amount_in):
+            started = time.perf_counter()
+            amount = get_dex_amount_out(dex_address, token_in, token_out, amount_in)
+            if _recording.get():
+                self._note_latency("dex_quote", started)
+                self._data["dex_quotes"].setdefault(_quote_key(token_in, token_out, amount_in), []).append(amount)
+            return amount
+
+        async def _store_decision(agent_id, user, decision):
+            if _recording.get():
+                self._data["decisions"].append(_decision_row(user, decision))
+            return await store_decision(agent_id, user, decision)
+
+        orchestrator._get_all_users = _get_all_users
+        orchestrator._batch_read_preferences = _batch_read_preferences
+        orchestrator._get_user_preferences = _get_user_preferences
+        orchestrator._batch_read_states = _batch_read_states
+        orchestrator._fetch_agent_state = _fetch_agent_state
+        orchestrator._fetch_market_data = _fetch_market_data
+        orchestrator.aget_market_price = _get_market_price
+        orchestrator._get_dex_price_from_contract = _get_dex_price_from_contract
+        orchestrator._get_dex_amount_out = _get_dex_amount_out
+        orchestrator._store_decision = _store_decision
+
+    def _note_latency(self, kind: str, started: float):
+        calls, seconds = self._data["latency"].get(kind, (0, 0.0))
+        self._data["latency"][kind] = (calls + 1, seconds + time.perf_counter() - started)
+
+    def begin_round(self, agent_id: str, controller_addr: Optional[str], now: int):
+        """Start capturing (called by run_round)"""
+        self._reset()
+        self._data.update({
+            "agent_id": agent_id,
+            "controller": controller_addr,
+            "now": now,
+            "recorded_at": int(time.time()),
+        })
+        _recording.set(True)
+
+    def cancel_round(self):
+        """Stop capturing without writing (round had no users)"""
+        _recording.set(False)
+        self._reset()
+
+    def end_round(self) -> str:
+        """Stop capturing and write the round to disk"""
+        _recording.set(False)
+        path = os.path.join(self.directory, f"round-{self._data['now']}.json")
+        with open(path, "w") as f:
+            json.dump(self._data, f, default=str)
+        self.saved.append(path)
+        print(f"💾 Recorded round to {path}")
+        return path
+
+
+def load_recording(path: str) -> Dict[str, Any]:
+    """Read a recording written by RoundRecorder"""
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != RECORDING_VERSION:
+        raise ValueError(f"Unsupported recording version {data.get('version')} in {path}")
+    return data
+
+
+class ReplayOrchestrator(AgentOrchestrator):
+    """
+    AgentOrchestrator fed from a recording instead of the chain and APIs.
+
+    Everything after the reads (readiness checks, batching/concurrency,
+    decision engine, param encoding) runs the real code. Transactions are
+    not signed or sent; decisions and would-be executions are collected.
+    With `latency=True` each read sleeps for its recorded average latency.
+    """
+
+    def __init__(self, recording: Dict[str, Any], latency: bool = False):
+        """
+        Args:
+            recording: Dict from load_recording()
+            latency: Replay recorded per-call latency of reads
+        """
+        super().__init__()
+        self.recording = recording
+        self.latency = latency
+
+        # Nothing below may reach the network
+        self.async_chain = None
+        self.batch_reader = None
+        self.state_cache = None
+        self.indexer = None
+
+        self._market_data = [MarketData.parse_obj(md) for md in recording.get("market_data", [])]
+        self._cursors: Dict[str, int] = {}
+        self.decisions: List[Dict[str, Any]] = []
+        self.executions: List[Dict[str, Any]] = []
+
+    def _next(self, kind: str, values: List):
+        if not values:
+            return None
+        index = self._cursors.get(kind, 0)
+        self._cursors[kind] = index + 1
+        return values[index % len(values)]
+
+    def _delay(self, kind: str) -> float:
+        if not self.latency or kind not in self.recording.get("latency", {}):
+            return 0.0
+        calls, seconds = self.recording["latency"][kind]
+        return seconds / calls if calls else 0.0
+
+    async def _sleep(self, kind: str):
+        delay = self._delay(kind)
+        if delay:
+            await asyncio.sleep(delay)
+
+    async def _get_all_users(self, agent_id: str) -> List[str]:
+        await self._sleep("read_users")
+        return list(self.recording["users"])
+
+    async def _batch_read_preferences(self, agent_id: str, users: List[str]) -> Dict[str, Dict]:
+        await self._sleep("read_prefs")
+        prefs = self.recording["prefs"]
+        return {user: prefs[user] for user in users if user in prefs}
+
+    async def _get_user_preferences(self, agent_id: str, user_address: str) -> Optional[Dict]:
+        await self._sleep("read_user_prefs")
+        return self.recording["prefs"].get(user_address)
+
+    async def _batch_read_states(self, agent_id: str, users: List[str]) -> Dict[str, AgentState]:
+        await self._sleep("read_states")
+        states = self.recording["states"]
+        return {user: AgentState.parse_obj(states[user]) for user in users if user in states}
+
+    async def _fetch_agent_state(self, agent_id: str, user_address: str) -> AgentState:
+        await self._sleep("read_user_state")
+        return AgentState.parse_obj(self.recording["states"][user_address])
+
+    async def _fetch_market_data(self) -> MarketData:
+        market_data = self._next("market_data", self._market_data)
+        return market_data if market_data is not None else await super()._fetch_market_data()
+
+    async def prefetch_market_prices(self):
+        pass  # prices come from the recording
+
+    async def aget_market_price(self, token_symbol: str) -> Optional[float]:
+        await self._sleep("coingecko_price")
+        return self._next(f"price:{token_symbol}", self.recording["prices"].get(token_symbol, []))
+
+    async def _get_dex_price_from_contract(self, token_address: str) -> float:
+        await self._sleep("dex_price")
+        price = self._next(f"dex:{token_address.lower()}", self.recording["dex_prices"].get(token_address.lower(), []))
+        return price or 0.0
+
+    def _get_dex_amount_out(self, dex_address: str, token_in: str, token_out: str, amount_in: int) -> int:
+        delay = self._delay("dex_quote")
+        if delay:
+            time.sleep(delay)
+        key = _quote_key(token_in, token_out, amount_in)
+        amount = self._next(f"quote:{key}", self.recording.get("dex_quotes", {}).get(key, []))
+        if amount is None:
+            raise ValueError(f"no recorded DEX quote for {key}")
+        return amount
+
+    async def _store_decision(self, agent_id: str, user_address: str, decision: Decision):
+        self.decisions.append(_decision_row(user_address, decision))
+
+    async def _execute_decision(self, agent_id: str, user_address: str, result: Dict):
+        action = result['decision']['action']
+        params = result['decision']['params']
+        self.executions.append({
+            "user": user_address,
+            "action": action,
+            "encoded_params": self._encode_params(action, params).hex(),
+        })
+
+
+async def replay_round(recording: Dict[str, Any], latency: bool = False, seed: int = 0) -> Dict[str, Any]:
+    """
+    Replay one recorded round
+
+    Args:
+        recording: Dict from load_recording()
+        latency: Replay recorded read latency
+        seed: Seed for the engine's random choices (same seed -> same decisions)
+
+    Returns:
+        {"summary", "stages", "decisions", "executions"}
+    """
+    orchestrator = ReplayOrchestrator(recording, latency=latency)
+    random.seed(seed)
+    # The engine ages positions against the wall clock; pin it to the recorded round
+    clock = mock.Mock(wraps=time)
+    clock.time = lambda: float(recording["now"])
+    try:
+        with mock.patch.object(simple_decision_engine, "time", clock):
+            stage_totals = orchestrator.metrics.stage_totals()
+            summary = await orchestrator.run_round(
+                recording["agent_id"],
+                recording.get("controller"),
+                now=recording["now"],
+                pause_between_users=0
+            )
+            stages = orchestrator.metrics.round_summary("decision", stage_totals)["stages"]
+    finally:
+        await orchestrator.close()
+
+    return {
+        "summary": summary,
+        "stages": stages,
+        "decisions": orchestrator.decisions,
+        "executions": orchestrator.executions,
+    }
+
+
+def _compare(recorded: List[Dict], replayed: List[Dict]) -> int:
+    recorded_actions = {row["user"]: row["action"] for row in recorded}
+    return sum(1 for row in replayed if recorded_actions.get(row["user"]) == row["action"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded decision round offline")
+    parser.add_argument("recording", help="round-*.json written with RECORD_ROUNDS_DIR")
+    parser.add_argument("--repeat", type=int, default=1, help="replay N times and report the fastest")
+    parser.add_argument("--latency", action="store_true", help="sleep for the recorded read latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the full result as JSON")
+    args = parser.parse_args()
+
+    recording = load_recording(args.recording)
+    results = [asyncio.run(replay_round(recording, args.latency, args.seed)) for _ in range(max(1, args.repeat))]
+    best = min(results, key=lambda r: r["summary"]["duration"])
+
+    if args.json:
+        print(json.dumps(best, indent=2, default=str))
+        return
+
+    summary = best["summary"]
+    print("=" * 70)
+    print(f"Replay of {args.recording} — {len(recording['users'])} user(s), best of {len(results)}")
+    print("=" * 70)
+    print(f"Round: {summary['duration'] * 1000:.1f} ms, acted {summary['acted']}, skipped {summary['skipped']}")
+    print(f"\n{'stage':<20} {'count':>7} {'total ms':>10} {'avg ms':>10}")
+    for stage, stats in sorted(best["stages"].items(), key=lambda item: -item[1]["total_ms"]):
+        print(f"{stage:<20} {stats['count']:>7} {stats['total_ms']:>10.2f} {stats['avg_ms']:>10.3f}")
+
+    print(f"\nDecisions ({len(best['decisions'])}):")
+    for row in best["decisions"]:
+        print(f"  {row['user']}: {row['action']} (risk {row['risk_score']:.2f})")
+    if recording.get("decisions"):
+        matched = _compare(recording["decisions"], best["decisions"])
+        print(f"\nSame action as recorded: {matched}/{len(recording['decisions'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Cooldown-aware scheduler keyed by each user's next eligible decision time"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class CooldownScheduler:
+    """
+    Min-heap of users ordered by the time they next become due.
+
+    Rescheduling a user pushes a new heap entry and leaves the old one in
+    place; stale entries are skipped when they reach the top, so every
+    operation is O(log n) and a wakeup costs O(k log n) for k due users,
+    independent of the total user count.
+    """
+
+    def __init__(self):
+        """Initialize an empty scheduler"""
+        self._heap: List[Tuple[int, int, str]] = []
+        self._due_at: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._due_at)
+
+    def __contains__(self, user: str) -> bool:
+        return user in self._due_at
+
+    def schedule(self, user: str, due_at: int):
+        """
+        Schedule (or reschedule) a user
+
+        Args:
+            user: User wallet address
+            due_at: Unix timestamp at which the user becomes due
+        """
+        due_at = int(due_at)
+
+        # Wake a sleeping waiter if this user is now the earliest
+        if self._wakeup is not None and not self._wakeup.is_set():
+            current_head = self.next_due()
+            if current_head is None or due_at < current_head:
+                self._wakeup.set()
+
+        self._due_at[user] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._seq), user))
+
+        if len(self._heap) > 2 * len(self._due_at) + 1024:
+            self._compact()
+
+    def remove(self, user: str):
+        """Stop scheduling a user (its heap entry is dropped lazily)"""
+        self._due_at.pop(user, None)
+
+    def due_at(self, user: str) -> Optional[int]:
+        """Scheduled due time for a user, or None if not scheduled"""
+        return self._due_at.get(user)
+
+    def _is_live(self, entry: Tuple[int, int, str]) -> bool:
+        due_at, _, user = entry
+        return self._due_at.get(user) == due_at
+
+    def _compact(self):
+        """Rebuild the heap without stale entries"""
+        self._heap = [entry for entry in self._heap if self._is_live(entry)]
+        heapq.heapify(self._heap)
+
+    def next_due(self) -> Optional[int]:
+        """
+        Earliest due time across all scheduled users
+
+        Returns:
+            Unix timestamp, or None if nothing is scheduled
+        """
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[int] = None) -> List[str]:
+        """
+        Remove and return every user due at or before `now`
+
+        Args:
+            now: Unix timestamp (default: current time)
+
+        Returns:
+            Due users in due-time order; callers must reschedule them
+        """
+        now = int(time.time()) if now is None else now
+        due: List[str] = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            if self._is_live(entry):
+                user = entry[2]
+                del self._due_at[user]
+                due.append(user)
+        return due
+
+    async def wait(self, max_wait: float):
+        """
+        Sleep until the earliest user is due, a sooner user is scheduled,
+        or `max_wait` seconds pass
+
+        Args:
+            max_wait: Upper bound on the sleep in seconds
+        """
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.clear()
+
+        head = self.next_due()
+        timeout = max_wait if head is None else min(max_wait, max(0.0, head - time.time()))
+        if timeout <= 0:
+            return
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def snapshot(self) -> Dict[str, int]:
+        """Copy of the user -> due time mapping"""
+        return dict(self._due_at)
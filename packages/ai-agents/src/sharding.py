@@ -0,0 +1,434 @@
+"""Partition users across worker processes with leased shard ownership"""
+import asyncio
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, TypeVar
+
+T = TypeVar("T")
+
+
+def shard_for(address: str, num_shards: int) -> int:
+    """
+    Stable shard of a user address (same result in every process and host)
+
+    Args:
+        address: User wallet address (case-insensitive)
+        num_shards: Total number of shards
+
+    Returns:
+        Shard index in [0, num_shards)
+    """
+    digest = hashlib.sha256(address.lower().encode()).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def default_worker_id() -> str:
+    """Worker id unique per process: <hostname>-<pid>"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class FileLeaseStore:
+    """
+    JSON documents in a directory, updated under an exclusive flock.
+
+    Coordinates processes on one host (or hosts sharing a filesystem with
+    working POSIX locks).
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Where documents are kept (created if missing)
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def update(self, key: str, mutate: Callable[[Dict], T]) -> T:
+        """
+        Atomically read-modify-write a document
+
+        Args:
+            key: Document name
+            mutate: Changes the document in place and returns a result
+
+        Returns:
+            Whatever `mutate` returned
+        """
+        with open(self._path(key), "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                doc = json.loads(raw) if raw else {}
+                result = mutate(doc)
+                f.seek(0)
+                f.truncate()
+                json.dump(doc, f)
+                f.flush()
+                os.fsync(f.fileno())
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read(self, key: str) -> Dict:
+        """Current document (empty if it does not exist yet)"""
+        try:
+            with open(self._path(key)) as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                try:
+                    raw = f.read()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        except FileNotFoundError:
+            return {}
+        return json.loads(raw) if raw else {}
+
+
+class RedisLeaseStore:
+    """
+    JSON documents in Redis, updated with WATCH/MULTI optimistic transactions.
+
+    Use this to coordinate workers on several hosts. Lease expiry compares
+    wall-clock times written by different hosts, so keep clocks in sync (NTP).
+    """
+
+    def __init__(self, url: str, prefix: str = "race:"):
+        """
+        Args:
+            url: redis:// URL
+            prefix: Key prefix
+        """
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.prefix = prefix
+
+    def update(self, key: str, mutate: Callable[[Dict], T]) -> T:
+        """Atomically read-modify-write a document (retried on concurrent writes)"""
+        key = self.prefix + key
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    doc = json.loads(raw) if raw else {}
+                    result = mutate(doc)
+                    pipe.multi()
+                    pipe.set(key, json.dumps(doc))
+                    pipe.execute()
+                    return result
+                except self._watch_error:
+                    continue
+
+    def read(self, key: str) -> Dict:
+        """Current document (empty if it does not exist yet)"""
+        raw = self._redis.get(self.prefix + key)
+        return json.loads(raw) if raw else {}
+
+
+def create_lease_store(location: str):
+    """
+    Lease store from a location string
+
+    Args:
+        location: redis://host:port/db, or a directory for file locks
+
+    Returns:
+        RedisLeaseStore or FileLeaseStore
+    """
+    if location.startswith(("redis://", "rediss://", "unix://")):
+        return RedisLeaseStore(location)
+    if location.startswith("file://"):
+        location = location[len("file://"):]
+    return FileLeaseStore(location)
+
+
+class ShardCoordinator:
+    """
+    Decides which shards of the user space this worker owns.
+
+    Users map to one of `num_shards` shards by a hash of their address.
+    Live workers heartbeat into a shared membership document; shard `s` is
+    assigned to the (s mod N)-th live worker in id order, and a worker only
+    takes a shard once the previous owner's lease is released or expired.
+    When a worker joins, the others hand over the shards it is now assigned;
+    when a worker leaves (or stops renewing for `lease_ttl`), its shards are
+    picked up by the remaining workers on their next rebalance.
+
+    Ownership is only trusted until the last successful renewal plus
+    `lease_ttl`, so a worker that loses the store stops acting on its shards
+    before anyone else can take them.
+    """
+
+    def __init__(
+        self,
+        store,
+        num_shards: int,
+        worker_id: Optional[str] = None,
+        namespace: str = "shards",
+        lease_ttl: float = 15.0,
+        renew_interval: float = 5.0
+    ):
+        """
+        Initialize coordinator
+
+        Args:
+            store: FileLeaseStore or RedisLeaseStore
+            num_shards: Number of shards users are hashed into
+            worker_id: Unique id of this worker (default <hostname>-<pid>)
+            namespace: Membership document name (one per agent contract)
+            lease_ttl: Seconds a lease or heartbeat stays valid without renewal
+            renew_interval: Seconds between rebalances (must be well under lease_ttl)
+        """
+        self.store = store
+        self.num_shards = max(1, num_shards)
+        self.worker_id = worker_id or default_worker_id()
+        self.namespace = namespace
+        self.lease_ttl = lease_ttl
+        self.renew_interval = min(renew_interval, lease_ttl / 2)
+
+        self.owned: Set[int] = set()
+        self.live_workers: List[str] = []
+        self._valid_until = 0.0
+        self._stats = {
+            "rebalances": 0,
+            "ownership_changes": 0,
+            "store_errors": 0,
+        }
+
+    def shard_of(self, user: str) -> int:
+        """Shard a user belongs to"""
+        return shard_for(user, self.num_shards)
+
+    def owns(self, user: str) -> bool:
+        """Whether this worker currently owns the user's shard"""
+        return time.time() < self._valid_until and self.shard_of(user) in self.owned
+
+    def owned_users(self, users: Sequence[str]) -> List[str]:
+        """The subset of `users` this worker is responsible for"""
+        if time.time() >= self._valid_until:
+            return []
+        return [user for user in users if self.shard_of(user) in self.owned]
+
+    def _assign(self, doc: Dict, now: float):
+        workers = {w: exp for w, exp in doc.get("workers", {}).items() if exp > now}
+        workers[self.worker_id] = now + self.lease_ttl
+        leases = {
+            int(shard): lease for shard, lease in doc.get("leases", {}).items()
+            if lease["expires"] > now
+        }
+
+        live = sorted(workers)
+        owned = set()
+        for shard in range(self.num_shards):
+            desired = live[shard % len(live)]
+            lease = leases.get(shard)
+            if desired == self.worker_id:
+                if lease is None or lease["owner"] == self.worker_id:
+                    leases[shard] = {"owner": self.worker_id, "expires": now + self.lease_ttl}
+                    owned.add(shard)
+            elif lease is not None and lease["owner"] == self.worker_id:
+                # Assigned elsewhere now: release so the new owner can take it
+                del leases[shard]
+
+        doc["workers"] = workers
+        doc["leases"] = {str(shard): lease for shard, lease in leases.items()}
+        return owned, live
+
+    async def rebalance(self) -> Set[int]:
+        """
+        Heartbeat, renew owned leases and take/release shards
+
+        Returns:
+            Shards owned after this rebalance
+        """
+        started = time.time()
+        try:
+            owned, live = await asyncio.to_thread(
+                self.store.update, self.namespace, lambda doc: self._assign(doc, time.time())
+            )
+        except Exception as e:
+            self._stats["store_errors"] += 1
+            print(f"Warning: Shard lease renewal failed: {e}")
+            return self.owned if time.time() < self._valid_until else set()
+
+        self._stats["rebalances"] += 1
+        self._valid_until = started + self.lease_ttl
+        if owned != self.owned or live != self.live_workers:
+            self._stats["ownership_changes"] += 1
+            print(f"🔀 Worker {self.worker_id}: shards {sorted(owned)} of {self.num_shards} ({len(live)} live worker(s))")
+        self.owned = owned
+        self.live_workers = live
+        return owned
+
+    async def run(self):
+        """Rebalance every renew_interval until cancelled, then leave"""
+        try:
+            while True:
+                await self.rebalance()
+                await asyncio.sleep(self.renew_interval)
+        finally:
+            await self.leave()
+
+    async def leave(self):
+        """Release every lease and drop out of membership so others take over at once"""
+        def remove(doc: Dict):
+            doc.get("workers", {}).pop(self.worker_id, None)
+            doc["leases"] = {
+                shard: lease for shard, lease in doc.get("leases", {}).items()
+                if lease["owner"] != self.worker_id
+            }
+
+        self.owned = set()
+        self._valid_until = 0.0
+        try:
+            await asyncio.to_thread(self.store.update, self.namespace, remove)
+        except Exception as e:
+            print(f"Warning: Could not release shard leases: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get coordinator state
+
+        Returns:
+            Dictionary with worker id, owned shards, live workers and counters
+        """
+        return {
+            **self._stats,
+            "worker_id": self.worker_id,
+            "num_shards": self.num_shards,
+            "owned": sorted(self.owned),
+            "live_workers": list(self.live_workers),
+            "valid_for": max(0.0, self._valid_until - time.time()),
+        }
+
+
+class SharedNonceAllocator:
+    """
+    Controller nonces allocated through the lease store, so every worker
+    signing with the same key draws from one sequence.
+
+    Each allocation is recorded as a claim until the worker reports the
+    broadcast (committed) or its failure (release). Released nonces are
+    handed out again first so the sequence has no gaps. `floor` is the
+    chain's pending nonce; anything below it has already been used and is
+    forgotten.
+
+    A claim that is never settled may still have been broadcast (a slow
+    RPC, or a committed() that failed after the send), so age alone never
+    frees it. It is reissued only once it is older than `claim_ttl`, its
+    owner's heartbeat in the shard membership document has expired, and
+    the chain's pending nonce has not passed it. Otherwise it stays claimed
+    until `floor` moves past it.
+
+    Claims also carry the incarnation (worker id, pid, start time) that made
+    them, since a worker id survives restarts. A stale claim left by an
+    earlier run of this worker, or one this process itself gave up on (its
+    release() failed), is reissued after `claim_ttl` like a dead worker's.
+    """
+
+    def __init__(
+        self,
+        store,
+        address: str,
+        worker_id: Optional[str] = None,
+        claim_ttl: float = 30.0,
+        membership: Optional[str] = None
+    ):
+        """
+        Args:
+            store: FileLeaseStore or RedisLeaseStore
+            address: Controller account address
+            worker_id: Unique id of this worker (default <hostname>-<pid>)
+            claim_ttl: Seconds before an unsettled claim may be reissued
+            membership: ShardCoordinator namespace whose heartbeats tell live
+                workers apart (None: only this worker's own claims count as live)
+        """
+        self.store = store
+        self.key = f"nonce-{address.lower()}"
+        self.worker_id = worker_id or default_worker_id()
+        self.incarnation = f"{self.worker_id}:{os.getpid()}:{time.time()}"
+        self.claim_ttl = claim_ttl
+        self.membership = membership
+        self._held: Set[int] = set()  # claims this process may still broadcast
+
+    def _live_workers(self, now: float) -> Set[str]:
+        live = {self.worker_id}
+        if self.membership:
+            workers = self.store.read(self.membership).get("workers", {})
+            live.update(worker for worker, expires in workers.items() if expires > now)
+        return live
+
+    def _abandoned(self, nonce: int, claim: Dict, live: Set[str], held: Set[int]) -> bool:
+        if claim.get("run") == self.incarnation:
+            return nonce not in held
+        if claim["owner"] == self.worker_id:
+            return True  # an earlier run of this worker
+        return claim["owner"] not in live
+
+    def _allocate(self, doc: Dict, floor: int, now: float, live: Set[str], held: Set[int]) -> int:
+        claims = {int(n): claim for n, claim in doc.get("claims", {}).items() if int(n) >= floor}
+        free = {n for n in doc.get("free", []) if n >= floor}
+        for nonce, claim in list(claims.items()):
+            # Still at or above the chain's pending nonce (filtered above);
+            # a live owner may yet broadcast it, so leave it for `floor`
+            if now - claim["at"] > self.claim_ttl and self._abandoned(nonce, claim, live, held):
+                del claims[nonce]
+                free.add(nonce)
+
+        if free:
+            nonce = min(free)
+            free.discard(nonce)
+        else:
+            nonce = max(doc.get("next", 0), floor)
+            doc["next"] = nonce + 1
+
+        claims[nonce] = {"owner": self.worker_id, "run": self.incarnation, "at": now}
+        doc["claims"] = {str(n): claim for n, claim in claims.items()}
+        doc["free"] = sorted(free)
+        return nonce
+
+    async def allocate(self, floor: int) -> int:
+        """
+        Next nonce for this controller across all workers
+
+        Args:
+            floor: The chain's current pending nonce for the controller
+
+        Returns:
+            Nonce reserved for this worker
+        """
+        self._held = {n for n in self._held if n >= floor}
+        held = set(self._held)
+
+        def allocate() -> int:
+            live = self._live_workers(time.time())
+            return self.store.update(self.key, lambda doc: self._allocate(doc, floor, time.time(), live, held))
+
+        nonce = await asyncio.to_thread(allocate)
+        self._held.add(nonce)
+        return nonce
+
+    async def committed(self, nonce: int):
+        """The transaction for `nonce` reached the mempool"""
+        def commit(doc: Dict):
+            doc.get("claims", {}).pop(str(nonce), None)
+        # If this fails the tx is still out: keep holding the claim until the chain passes it
+        await asyncio.to_thread(self.store.update, self.key, commit)
+        self._held.discard(nonce)
+
+    async def release(self, nonce: int):
+        """Broadcast for `nonce` failed: return it for the next allocation"""
+        # Nothing was sent, so even if the store update fails the claim may be reissued after claim_ttl
+        self._held.discard(nonce)
+        def release(doc: Dict):
+            doc.get("claims", {}).pop(str(nonce), None)
+            doc["free"] = sorted(set(doc.get("free", [])) | {nonce})
+        await asyncio.to_thread(self.store.update, self.key, release)
@@ -4,11 +4,16 @@ import random
 from typing import Dict, List
 from .models import AgentState, MarketData, Decision, InvestmentAction, RiskReport
 from .config import config
+from .tokens import get_token_registry
 
 
 class SimpleDecisionEngine:
     """Simple rule-based decision engine for testing"""
 
+    def __init__(self):
+        """Initialize engine"""
+        self.tokens = get_token_registry()
+
     async def evaluate(
         self,
         agent_state: AgentState,
@@ -29,7 +34,7 @@ class SimpleDecisionEngine:
                 # Get current price from DEX (same scale as entry_price, stop_loss, take_profit)
                 current_price = None
                 if orchestrator:
-                    current_price = orchestrator.get_dex_price(position.asset)
+                    current_price = await orchestrator.aget_dex_price(position.asset)
 
                 # Fallback to market data if orchestrator not available (for testing)
                 if current_price is None or current_price == 0:
@@ -151,14 +156,7 @@ class SimpleDecisionEngine:
 
     def _get_current_price(self, asset_address: str, market_data: MarketData) -> float:
         """Get current price for an asset by matching its address"""
-        # Map addresses to token names
-        address_to_token = {
-            config.WETH_ADDRESS.lower() if config.WETH_ADDRESS else '': 'ETH',
-            config.WBTC_ADDRESS.lower() if config.WBTC_ADDRESS else '': 'BTC',
-            config.MOCK_USDC_ADDRESS.lower() if config.MOCK_USDC_ADDRESS else '': 'USDC',
-        }
-
-        token_name = address_to_token.get(asset_address.lower())
+        token_name = self.tokens.symbol_for(asset_address)
         if token_name and token_name in market_data.prices:
             return market_data.prices[token_name]
 
@@ -0,0 +1,201 @@
+"""Block-number-keyed read-through cache for per-user contract state"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class BlockStateCache:
+    """
+    Read-through cache for getUserState/getUserPositions/getUserPreferences
+    results, shared by the decision loop and the risk monitor.
+
+    Every entry is tagged with the block it was read at and is only served
+    while that block is still the head, so a hit is never older than the
+    current block. The head is looked up at most once per `head_ttl`
+    seconds (one eth_blockNumber shared by every caller); a new head drops
+    the whole cache. Submitting a tx for a user invalidates that user
+    immediately. Concurrent misses for the same key share one load.
+    """
+
+    def __init__(self, get_block_number: Callable[[], Awaitable[int]], head_ttl: float = 0.0):
+        """
+        Initialize cache
+
+        Args:
+            get_block_number: async () -> latest block number
+            head_ttl: Seconds a head lookup is reused (0 = check on every read)
+        """
+        self._get_block_number = get_block_number
+        self.head_ttl = head_ttl
+
+        self._head: Optional[int] = None
+        self._head_at = 0.0
+        self._head_lookup: Optional[asyncio.Future] = None
+        self._entries: Dict[Tuple, Any] = {}
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self._generation: Dict[str, int] = {}  # user -> bumped on invalidate
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "new_blocks": 0,
+            "head_errors": 0,
+        }
+
+    async def head(self) -> int:
+        """Current block number (shared lookup, refreshed every head_ttl)"""
+        if self._head is not None and time.time() - self._head_at < self.head_ttl:
+            return self._head
+
+        # Callers arriving while a lookup is in flight share its result
+        if self._head_lookup is None or self._head_lookup.done():
+            self._head_lookup = asyncio.ensure_future(self._refresh_head())
+        return await asyncio.shield(self._head_lookup)
+
+    async def _try_head(self) -> Optional[int]:
+        try:
+            return await self.head()
+        except Exception as e:
+            print(f"Warning: Block number lookup failed, reading uncached: {e}")
+            self._stats["head_errors"] += 1
+            return None
+
+    async def _refresh_head(self) -> int:
+        self.note_block(await self._get_block_number())
+        self._head_at = time.time()
+        return self._head
+
+    def note_block(self, block_number: int):
+        """Advance the head (e.g. from a receipt); a newer block clears the cache"""
+        if self._head is None or block_number > self._head:
+            if self._head is not None:
+                self._stats["new_blocks"] += 1
+            self._head = block_number
+            self._entries.clear()
+
+    def invalidate(self, user: str):
+        """Drop every cached read for a user (call when submitting a tx for them)"""
+        user = user.lower()
+        self._generation[user] = self._generation.get(user, 0) + 1
+        for key in [key for key in self._entries if key[2] == user]:
+            del self._entries[key]
+        self._stats["invalidations"] += 1
+
+    def _key(self, agent_id: str, kind: str, user: str) -> Tuple:
+        return (agent_id.lower(), kind, user.lower())
+
+    def _store(self, key: Tuple, block: int, generation: int, value: Any):
+        # Skip if the block moved on or the user was invalidated mid-load
+        if block == self._head and self._generation.get(key[2], 0) == generation:
+            self._entries[key] = value
+
+    async def read(
+        self,
+        agent_id: str,
+        kind: str,
+        user: str,
+        loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Cached read of one value
+
+        Args:
+            agent_id: Agent contract address
+            kind: Read kind, e.g. "state" or "prefs"
+            user: User wallet address
+            loader: async () -> value, called on a miss (exceptions are not cached)
+
+        Returns:
+            Value read at the current block
+        """
+        block = await self._try_head()
+        if block is None:
+            return await loader()
+
+        key = self._key(agent_id, kind, user)
+        if key in self._entries:
+            self._stats["hits"] += 1
+            return self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self._stats["misses"] += 1
+        generation = self._generation.get(key[2], 0)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(value)
+        self._store(key, block, generation, value)
+        return value
+
+    async def read_many(
+        self,
+        agent_id: str,
+        kind: str,
+        users: Sequence[str],
+        loader: Callable[[List[str]], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Cached read of many values; misses are loaded in one batch
+
+        Args:
+            agent_id: Agent contract address
+            kind: Read kind, e.g. "state" or "prefs"
+            users: User wallet addresses
+            loader: async (missing users) -> {user: value}; users left out are not cached
+
+        Returns:
+            Dict of user -> value for hits plus whatever the loader returned
+        """
+        block = await self._try_head()
+        if block is None:
+            return await loader(list(users))
+
+        results: Dict[str, Any] = {}
+        missing: List[str] = []
+        for user in users:
+            key = self._key(agent_id, kind, user)
+            if key in self._entries:
+                results[user] = self._entries[key]
+            else:
+                missing.append(user)
+
+        self._stats["hits"] += len(results)
+        self._stats["misses"] += len(missing)
+        if not missing:
+            return results
+
+        generations = {user: self._generation.get(user.lower(), 0) for user in missing}
+        loaded = await loader(missing)
+        for user, value in loaded.items():
+            self._store(self._key(agent_id, kind, user), block, generations.get(user, 0), value)
+        results.update(loaded)
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit/miss counters, hit rate and current head
+        """
+        lookups = self._stats["hits"] + self._stats["misses"] + self._stats["coalesced"]
+        served = self._stats["hits"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "hit_rate": served / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "block": self._head,
+        }
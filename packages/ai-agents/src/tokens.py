@@ -0,0 +1,134 @@
+"""Immutable token registry built once from config"""
+from dataclasses import dataclass
+from decimal import Decimal
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional
+from eth_utils import is_address, to_checksum_address
+
+from .config import config
+
+# Symbols the agent may buy with borrowed USDC (tokenOut of BORROW_AND_INVEST)
+TRADABLE_SYMBOLS = ("ETH", "BTC")
+
+
+@dataclass(frozen=True)
+class Token:
+    """A token the agent prices or trades"""
+    symbol: str
+    address: Optional[str]  # checksummed, None when not deployed/configured
+    coingecko_id: Optional[str]
+    decimals: int = 18
+
+    def to_units(self, amount: float) -> int:
+        """Human amount -> integer base units (exact for the decimal repr of `amount`)"""
+        return int(Decimal(str(amount)) * (Decimal(10) ** self.decimals))
+
+    def from_units(self, units: int) -> float:
+        """Integer base units -> human amount"""
+        return float(Decimal(units) / (Decimal(10) ** self.decimals))
+
+
+class TokenRegistry:
+    """
+    Address/symbol lookups over a fixed set of tokens.
+
+    Every address is checksummed once at construction and indexed under both
+    its checksummed and lowercase forms. A lookup with either form is a
+    single dict hit. Any other casing is lowercased first. Nothing can be
+    added after construction; build a new registry instead.
+    """
+
+    def __init__(self, tokens: Iterable[Token]):
+        """
+        Args:
+            tokens: Tokens to index (later entries win on duplicate symbols)
+        """
+        by_symbol: Dict[str, Token] = {}
+        by_address: Dict[str, Token] = {}
+        for token in tokens:
+            by_symbol[token.symbol] = token
+            if token.address:
+                by_address[token.address] = token
+                by_address[token.address.lower()] = token
+
+        self._by_symbol = MappingProxyType(by_symbol)
+        self._by_address = MappingProxyType(by_address)
+        self.coingecko_ids: Mapping[str, str] = MappingProxyType({
+            token.symbol: token.coingecko_id for token in by_symbol.values() if token.coingecko_id
+        })
+
+    def __iter__(self):
+        return iter(self._by_symbol.values())
+
+    def __len__(self) -> int:
+        return len(self._by_symbol)
+
+    def by_address(self, address: Optional[str]) -> Optional[Token]:
+        """Token at `address` (any casing), or None"""
+        if not address:
+            return None
+        token = self._by_address.get(address)
+        if token is None:
+            token = self._by_address.get(address.lower())
+        return token
+
+    def by_symbol(self, symbol: str) -> Optional[Token]:
+        """Token with `symbol` (e.g. "ETH"), or None"""
+        return self._by_symbol.get(symbol)
+
+    def symbol_for(self, address: Optional[str]) -> Optional[str]:
+        """Symbol of the token at `address`, or None"""
+        token = self.by_address(address)
+        return token.symbol if token else None
+
+    def address_of(self, symbol: str) -> Optional[str]:
+        """Checksummed address of the token with `symbol`, or None"""
+        token = self._by_symbol.get(symbol)
+        return token.address if token else None
+
+    def tradable(self, symbol: str) -> Optional[Token]:
+        """Deployed token with `symbol` the agent may buy, or None"""
+        token = self._by_symbol.get(symbol) if symbol in TRADABLE_SYMBOLS else None
+        return token if token and token.address else None
+
+    def symbols(self) -> List[str]:
+        """Registered symbols"""
+        return list(self._by_symbol)
+
+    @classmethod
+    def from_config(cls, cfg=config) -> "TokenRegistry":
+        """
+        Registry from config: ETH (WETH), BTC (WBTC), USDC and USDT, plus
+        anything in EXTRA_TOKENS ("SYMBOL:address:coingecko_id:decimals,...",
+        address may be empty for price-only tokens)
+
+        Args:
+            cfg: Config object
+
+        Returns:
+            TokenRegistry
+        """
+        def checksum(address: Optional[str]) -> Optional[str]:
+            return to_checksum_address(address) if address and is_address(address) else None
+
+        tokens = [
+            Token("ETH", checksum(cfg.WETH_ADDRESS), "ethereum", cfg.WETH_DECIMALS),
+            Token("BTC", checksum(cfg.WBTC_ADDRESS), "bitcoin", cfg.WBTC_DECIMALS),
+            Token("USDC", checksum(cfg.MOCK_USDC_ADDRESS), "usd-coin", cfg.USDC_DECIMALS),
+            Token("USDT", None, "tether", 6),
+        ]
+        for entry in filter(None, (part.strip() for part in cfg.EXTRA_TOKENS.split(","))):
+            symbol, address, coingecko_id, decimals = (entry.split(":") + ["", "", "18"])[:4]
+            tokens.append(Token(symbol, checksum(address), coingecko_id or None, int(decimals or 18)))
+        return cls(tokens)
+
+
+_registry: Optional[TokenRegistry] = None
+
+
+def get_token_registry() -> TokenRegistry:
+    """Process-wide registry built from config on first use"""
+    global _registry
+    if _registry is None:
+        _registry = TokenRegistry.from_config()
+    return _registry
@@ -0,0 +1,210 @@
+"""Incremental enumeration of an AIAgent contract's users"""
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from web3.exceptions import ABIFunctionNotFound, BadFunctionCallOutput, ContractLogicError
+
+PAGINATED = "paginated"
+EVENTS = "events"
+FULL = "full"
+
+
+class UserDirectory:
+    """
+    Locally known user set for one agent contract, grown from the tail.
+
+    AIAgent only ever appends to its user list, so each sync first asks
+    for the on-chain total and, when it moved, fetches just the users past
+    the ones already known. The fetch uses the first source that works:
+
+    1. getUsersPaginated(offset, limit) pages
+    2. AgentInitialized logs since the last scanned block (contracts deployed
+       before pagination existed)
+    3. getAllUsers(), the legacy single call, for a sync where both of the
+       above fail
+
+    A contract without getUsersPaginated is detected once and switched to
+    event discovery for good. Other failures only affect the current sync.
+    When the total has not changed a sync costs one eth_call.
+    """
+
+    def __init__(
+        self,
+        agent_id: str,
+        total_users: Callable[[], Awaitable[int]],
+        users_page: Optional[Callable[[int, int], Awaitable[Tuple[Sequence[str], int]]]] = None,
+        registered_users: Optional[Callable[[int, int], Awaitable[Sequence[str]]]] = None,
+        block_number: Optional[Callable[[], Awaitable[int]]] = None,
+        all_users: Optional[Callable[[], Awaitable[Sequence[str]]]] = None,
+        page_size: int = 500,
+        start_block: int = 0,
+        log_range: int = 2000
+    ):
+        """
+        Initialize directory
+
+        Args:
+            agent_id: AIAgent contract address
+            total_users: async () -> getTotalUsers()
+            users_page: async (offset, limit) -> (users, total), i.e. getUsersPaginated
+            registered_users: async (from_block, to_block) -> users from AgentInitialized logs, in order
+            block_number: async () -> chain head (required for event discovery)
+            all_users: async () -> getAllUsers(), last resort
+            page_size: Users per page
+            start_block: First block scanned for AgentInitialized logs
+            log_range: Max blocks per log query
+        """
+        self.agent_id = agent_id
+        self._total_users = total_users
+        self._users_page = users_page
+        self._registered_users = registered_users
+        self._block_number = block_number
+        self._all_users = all_users
+        self.page_size = max(1, page_size)
+        self.log_range = max(1, log_range)
+        self.start_block = start_block
+
+        if users_page is not None:
+            self.mode = PAGINATED
+        elif registered_users is not None and block_number is not None:
+            self.mode = EVENTS
+        else:
+            self.mode = FULL
+
+        self._users: List[str] = []
+        self._known = set()
+        self._scanned_block = start_block - 1
+        self._head_block: Optional[int] = None
+        self._onchain_total: Optional[int] = None
+        self._last_sync_at: Optional[float] = None
+        self._stats = {
+            "syncs": 0,
+            "unchanged_syncs": 0,
+            "pages_fetched": 0,
+            "log_queries": 0,
+            "full_fetches": 0,
+        }
+
+    @property
+    def users(self) -> List[str]:
+        """Known users in registration order"""
+        return list(self._users)
+
+    def _append(self, users: Sequence[str]):
+        for user in users:
+            user = str(user)
+            if user.lower() not in self._known:
+                self._known.add(user.lower())
+                self._users.append(user)
+
+    def _reset(self):
+        self._users = []
+        self._known = set()
+
+    async def sync(self) -> List[str]:
+        """
+        Bring the known set up to date with the chain
+
+        Returns:
+            Known users in registration order
+        """
+        self._stats["syncs"] += 1
+        try:
+            self._onchain_total = await self._total_users()
+        except Exception as e:
+            print(f"Warning: getTotalUsers failed, syncing without a total: {e}")
+            self._onchain_total = None
+
+        if self._onchain_total is not None:
+            if self._onchain_total == len(self._users):
+                self._stats["unchanged_syncs"] += 1
+                self._last_sync_at = time.time()
+                return self.users
+            if self._onchain_total < len(self._users):
+                # Only possible after a reorg or redeploy at the same address
+                print(f"⚠️  User count dropped to {self._onchain_total} (knew {len(self._users)}), re-enumerating")
+                self._reset()
+                self._scanned_block = self.start_block - 1
+
+        if self.mode == PAGINATED:
+            try:
+                await self._sync_pages()
+                self._last_sync_at = time.time()
+                return self.users
+            except (ABIFunctionNotFound, BadFunctionCallOutput, ContractLogicError) as e:
+                # Deployed before getUsersPaginated existed
+                self.mode = EVENTS if self._registered_users and self._block_number else FULL
+                print(f"⚠️  getUsersPaginated unavailable ({e}), switching to {self.mode} discovery")
+
+        if self.mode == EVENTS:
+            try:
+                await self._sync_events()
+                self._last_sync_at = time.time()
+                return self.users
+            except Exception as e:
+                if self._all_users is None:
+                    raise
+                print(f"⚠️  Event discovery failed ({e}), using getAllUsers for this sync")
+
+        await self._sync_full()
+        self._last_sync_at = time.time()
+        return self.users
+
+    async def _sync_pages(self):
+        """Fetch pages from the first unknown offset until the total is reached"""
+        while True:
+            offset = len(self._users)
+            page, total = await self._users_page(offset, self.page_size)
+            self._stats["pages_fetched"] += 1
+            self._onchain_total = int(total)
+            self._append(page)
+            if not page or len(self._users) >= self._onchain_total:
+                return
+
+    async def _sync_events(self):
+        """Scan AgentInitialized logs from the last scanned block to the head"""
+        head = await self._block_number()
+        self._head_block = head
+        while self._scanned_block < head:
+            start = self._scanned_block + 1
+            end = min(start + self.log_range - 1, head)
+            self._append(await self._registered_users(start, end))
+            self._stats["log_queries"] += 1
+            self._scanned_block = end
+
+    async def _sync_full(self):
+        """Legacy getAllUsers() call (keeps the event scan position)"""
+        users = await self._all_users()
+        self._stats["full_fetches"] += 1
+        self._reset()
+        self._append(users)
+
+    def export(self) -> Dict:
+        """Known set and scan position (JSON-serializable, for checkpoints)"""
+        return {"users": list(self._users), "scanned_block": self._scanned_block, "mode": self.mode}
+
+    def restore(self, state: Dict):
+        """Seed the known set from export() output"""
+        self._reset()
+        self._append(state.get("users", []))
+        self._scanned_block = max(self._scanned_block, int(state.get("scanned_block", self._scanned_block)))
+
+    def get_stats(self) -> Dict:
+        """
+        Get enumeration state
+
+        Returns:
+            Dictionary with known/on-chain counts, lag (users and blocks) and counters
+        """
+        known = len(self._users)
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "users": known,
+            "onchain_total": self._onchain_total,
+            "lag_users": max(0, self._onchain_total - known) if self._onchain_total is not None else None,
+            "lag_blocks": (
+                max(0, self._head_block - self._scanned_block)
+                if self.mode == EVENTS and self._head_block is not None else 0
+            ),
+            "last_sync_age": round(time.time() - self._last_sync_at, 1) if self._last_sync_at else None,
+        }
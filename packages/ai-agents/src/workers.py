@@ -0,0 +1,69 @@
+"""Run several sharded orchestrator workers on one host"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+from .config import config
+
+
+def spawn(index: int, shards: int, store: str) -> subprocess.Popen:
+    """Start one worker process running src.main in sharded mode"""
+    env = dict(
+        os.environ,
+        SHARD_COUNT=str(shards),
+        SHARD_STORE=store,
+        # Stable per slot, so a restarted worker reclaims the same shards and index file
+        SHARD_WORKER_ID=f"{socket.gethostname()}-w{index}",
+    )
+    if config.METRICS_PORT > 0:
+        env["METRICS_PORT"] = str(config.METRICS_PORT + index)  # one scrape target per worker
+    return subprocess.Popen([sys.executable, "-m", "src.main"], env=env)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run K sharded agent workers (one process each)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, default=0, help="number of shards (default: one per worker)")
+    parser.add_argument("--store", default=config.SHARD_STORE, help="lock-file directory or redis:// URL")
+    parser.add_argument("--restart-delay", type=float, default=5.0, help="seconds before restarting a crashed worker")
+    args = parser.parse_args()
+
+    shards = args.shards or args.workers
+    print(f"🚀 Starting {args.workers} worker(s) over {shards} shard(s) via {args.store}")
+
+    workers = {i: spawn(i, shards, args.store) for i in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while not stopping:
+        time.sleep(1)
+        for i, process in list(workers.items()):
+            if process.poll() is not None and not stopping:
+                # The others pick up its shards once its leases expire; then it rejoins
+                print(f"⚠️  Worker {i} exited with {process.returncode}, restarting in {args.restart_delay}s")
+                time.sleep(args.restart_delay)
+                workers[i] = spawn(i, shards, args.store)
+
+    print("\nShutting down workers...")
+    for process in workers.values():
+        if process.poll() is None:
+            process.send_signal(signal.SIGINT)
+    for process in workers.values():
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Write-behind batching of Supabase inserts over one pooled client"""
+import asyncio
+import os
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+def create_supabase_client():
+    """
+    Create a Supabase client from the environment
+
+    Returns:
+        Client, or None if SUPABASE_URL / SUPABASE_SERVICE_KEY (or SUPABASE_KEY) are unset
+    """
+    supabase_url = os.getenv('SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_KEY') or os.getenv('SUPABASE_KEY')
+    if not supabase_url or not supabase_key:
+        return None
+
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
+
+class WriteBehindQueue:
+    """
+    Buffers rows per table and flushes them as bulk inserts.
+
+    enqueue() never waits on the database: rows are appended to an
+    in-memory backlog and a background task flushes a table once it has
+    `max_batch` rows or `flush_interval` seconds have passed. Failed
+    batches are retried with exponential backoff, then put back at the
+    head of the backlog. The backlog is bounded; when full the oldest rows
+    are dropped (and counted) rather than growing without limit.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any] = create_supabase_client,
+        max_batch: int = 100,
+        flush_interval: float = 2.0,
+        max_backlog: int = 10_000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        """
+        Initialize queue (the client is created on first flush and reused)
+
+        Args:
+            client_factory: () -> Supabase client, or None when not configured
+            max_batch: Rows per bulk insert; reaching it triggers a flush
+            flush_interval: Max seconds a row waits before being flushed
+            max_backlog: Max buffered rows across all tables
+            max_retries: Retries per batch before it is requeued
+            retry_backoff: Initial retry delay in seconds (doubles per retry)
+        """
+        self.client_factory = client_factory
+        self.max_batch = max(1, max_batch)
+        self.flush_interval = flush_interval
+        self.max_backlog = max(self.max_batch, max_backlog)
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._client = None
+        self._client_checked = False
+        self._buffers: Dict[str, Deque[Dict]] = {}
+        self._backlog = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "batches": 0,
+            "retries": 0,
+            "failed_batches": 0,
+            "dropped": 0,
+            "discarded": 0,  # Supabase not configured
+        }
+
+    def _get_client(self):
+        if not self._client_checked:
+            self._client = self.client_factory()
+            self._client_checked = True
+            if self._client is None:
+                print("⚠️  Supabase not configured, buffered rows will be discarded")
+        return self._client
+
+    def enqueue(self, table: str, row: Dict):
+        """
+        Buffer a row for `table` (returns immediately)
+
+        Args:
+            table: Supabase table name
+            row: Row to insert
+        """
+        if self._backlog >= self.max_backlog:
+            self._drop_oldest()
+
+        buffer = self._buffers.setdefault(table, deque())
+        buffer.append(row)
+        self._backlog += 1
+        self._stats["enqueued"] += 1
+
+        self._ensure_running()
+        if len(buffer) >= self.max_batch:
+            self._wakeup.set()
+
+    def _drop_oldest(self):
+        # Drop from the fullest table so one noisy table can't starve the others
+        table = max(self._buffers, key=lambda t: len(self._buffers[t]))
+        self._buffers[table].popleft()
+        self._backlog -= 1
+        self._stats["dropped"] += 1
+        if self._stats["dropped"] == 1 or self._stats["dropped"] % 1000 == 0:
+            print(f"⚠️  Write backlog full ({self.max_backlog} rows), dropped {self._stats['dropped']} row(s) so far")
+
+    def _ensure_running(self):
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def run(self):
+        """Flush on size or time until the backlog is empty (enqueue restarts it)"""
+        while self._backlog:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def _take_batch(self, table: str) -> List[Dict]:
+        buffer = self._buffers[table]
+        batch = [buffer.popleft() for _ in range(min(self.max_batch, len(buffer)))]
+        self._backlog -= len(batch)
+        return batch
+
+    def _requeue(self, table: str, batch: List[Dict]):
+        buffer = self._buffers.setdefault(table, deque())
+        room = self.max_backlog - self._backlog
+        if room < len(batch):
+            self._stats["dropped"] += len(batch) - room
+            batch = batch[len(batch) - room:] if room > 0 else []
+        buffer.extendleft(reversed(batch))
+        self._backlog += len(batch)
+
+    async def _insert(self, table: str, batch: List[Dict]) -> bool:
+        client = self._get_client()
+        delay = self.retry_backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(lambda: client.table(table).insert(batch).execute())
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Warning: Bulk insert of {len(batch)} row(s) into {table} failed: {e}")
+                    return False
+                self._stats["retries"] += 1
+                await asyncio.sleep(delay)
+                delay *= 2
+        return False
+
+    async def flush(self) -> int:
+        """
+        Write every buffered row now
+
+        Returns:
+            Number of rows written
+        """
+        if self._flush_lock is None:
+            return 0
+
+        written = 0
+        async with self._flush_lock:
+            if self._get_client() is None:
+                self._stats["discarded"] += self._backlog
+                self._buffers.clear()
+                self._backlog = 0
+                return 0
+
+            for table in list(self._buffers):
+                while self._buffers[table]:
+                    batch = self._take_batch(table)
+                    if await self._insert(table, batch):
+                        written += len(batch)
+                        self._stats["batches"] += 1
+                    else:
+                        # Keep the rows for the next flush; stop hammering this table
+                        self._stats["failed_batches"] += 1
+                        self._requeue(table, batch)
+                        break
+
+        self._stats["written"] += written
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue counters
+
+        Returns:
+            Dictionary with enqueue/write/retry/drop counters and backlog per table
+        """
+        return {
+            **self._stats,
+            "backlog": self._backlog,
+            "backlog_by_table": {table: len(rows) for table, rows in self._buffers.items() if rows},
+        }
+
+    async def close(self):
+        """Flush what is buffered and stop the background task"""
+        # Flush first: cancelling mid-insert could lose a batch already taken off the buffer
+        await self.flush()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
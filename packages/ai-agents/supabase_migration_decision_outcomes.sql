@@ -0,0 +1,29 @@
+-- RACE Protocol Decision Outcomes Migration
+-- On-chain outcome of each submitted decision, written by the receipt tracker
+
+CREATE TABLE IF NOT EXISTS decision_outcomes (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    agent_id TEXT NOT NULL,
+    user_address TEXT NOT NULL,
+    action TEXT NOT NULL,
+    tx_hash TEXT NOT NULL,
+    nonce BIGINT NOT NULL,
+    status TEXT NOT NULL,  -- confirmed | failed
+    gas_used BIGINT,
+    block_number BIGINT,
+    error TEXT,
+    submitted_at BIGINT NOT NULL,
+    settled_at BIGINT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_decision_outcomes_user ON decision_outcomes(agent_id, user_address, settled_at DESC);
+CREATE INDEX IF NOT EXISTS idx_decision_outcomes_tx_hash ON decision_outcomes(tx_hash);
+
+ALTER TABLE decision_outcomes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for authenticated users" ON decision_outcomes
+    FOR SELECT USING (auth.role() = 'authenticated');
+
+CREATE POLICY "Enable insert for service role" ON decision_outcomes
+    FOR INSERT WITH CHECK (auth.role() = 'service_role');
@@ -0,0 +1,63 @@
+"""
+Import smoke test for the API deploy (render.yaml installs requirements-api.txt only)
+"""
+import importlib.metadata as metadata
+import os
+import subprocess
+import sys
+
+from packaging.requirements import Requirement
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _closure(requirements):
+    """Installed distributions needed by `requirements`, following extras and markers"""
+    dists, seen, pending = {}, set(), [(req, ("",)) for req in requirements]
+    while pending:
+        req, extras = pending.pop()
+        if req.marker and not any(req.marker.evaluate({"extra": extra}) for extra in extras):
+            continue
+        key = (req.name.lower().replace("_", "-"), tuple(sorted(req.extras)))
+        if key in seen:
+            continue
+        seen.add(key)
+        dist = metadata.distribution(req.name)
+        dists[key[0]] = dist
+        for dep in dist.requires or []:
+            pending.append((Requirement(dep), ("", *req.extras)))
+    return dists.values()
+
+
+def _api_site(tmp_path) -> str:
+    """Directory linking only what `pip install -r requirements-api.txt` would install"""
+    with open(os.path.join(HERE, "requirements-api.txt")) as f:
+        lines = [line.split("#")[0].strip() for line in f]
+    site = tmp_path / "site-packages"
+    site.mkdir()
+    for dist in _closure(Requirement(line) for line in lines if line):
+        for top in {f.parts[0] for f in dist.files or [] if f.parts[0] not in ("..", "__pycache__")}:
+            target = dist.locate_file(top)
+            if os.path.exists(target) and not (site / top).exists():
+                (site / top).symlink_to(target)
+    return str(site)
+
+
+def test_api_imports_with_api_requirements_only(tmp_path):
+    env = {
+        **os.environ,
+        "PYTHONPATH": _api_site(tmp_path),
+        "WETH_ADDRESS": "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2",
+        "OHLC_STORE_DIR": "",
+    }
+    smoke = (
+        "import src.api\n"
+        "from src.tokens import get_token_registry\n"
+        "assert get_token_registry().address_of('ETH') == '0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2'\n"
+        "src.api.price_service.close()\n"
+    )
+    # -S: no site-packages, so only the linked distributions are importable
+    result = subprocess.run(
+        [sys.executable, "-S", "-c", smoke], cwd=HERE, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,96 @@
+"""
+Tests for the AsyncWeb3 transport against a local JSON-RPC server
+"""
+from contextlib import asynccontextmanager
+import pytest
+from aiohttp import web
+from web3.exceptions import TransactionNotFound
+
+from src.async_chain import AsyncChainClient
+from test_batch_reader import AGENT, AIAGENT_ABI, FakeChainProvider, user_address
+
+
+TX_HASH = "0x" + "ab" * 32
+
+
+class JsonRpcServer:
+    """aiohttp server that serves FakeChainProvider reads and a slow receipt"""
+
+    def __init__(self, pending_polls: int = 3):
+        self.chain = FakeChainProvider()
+        self.pending_polls = pending_polls
+        self.receipt_polls = 0
+
+    async def handle(self, request):
+        payload = await request.json()
+        method, params = payload["method"], payload.get("params", [])
+
+        if method == "eth_getTransactionReceipt":
+            self.receipt_polls += 1
+            result = None
+            if self.receipt_polls > self.pending_polls:
+                result = {
+                    "transactionHash": TX_HASH,
+                    "blockHash": "0x" + "cd" * 32,
+                    "blockNumber": "0x10",
+                    "status": "0x1",
+                    "gasUsed": "0x5208",
+                    "logs": [],
+                }
+            response = {"jsonrpc": "2.0", "id": payload["id"], "result": result}
+        else:
+            response = self.chain.make_request(method, params)
+            response["id"] = payload["id"]
+
+        return web.json_response(response)
+
+
+@asynccontextmanager
+async def serve_rpc():
+    """Run a JsonRpcServer on an ephemeral localhost port"""
+    server = JsonRpcServer()
+    app = web.Application()
+    app.router.add_post("/", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    server.uri = f"http://127.0.0.1:{port}/"
+    try:
+        yield server
+    finally:
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+class TestAsyncChainClient:
+    """Test async reads and receipt waits yield to the event loop"""
+
+    async def test_contract_read_matches_sync_decode(self):
+        async with serve_rpc() as rpc_server:
+            client = AsyncChainClient(rpc_server.uri)
+            contract = rpc_server.chain.w3.eth.contract(address=AGENT, abi=AIAGENT_ABI)
+
+            try:
+                prefs = await client.call(contract.functions.getUserPreferences(user_address(2)))
+            finally:
+                await client.close()
+
+        assert prefs[0] is True
+        assert prefs[1] == user_address(2)
+        assert prefs[3] == 300
+
+    async def test_receipt_lookup_while_pending(self):
+        async with serve_rpc() as rpc_server:
+            client = AsyncChainClient(rpc_server.uri)
+            try:
+                for _ in range(rpc_server.pending_polls):
+                    with pytest.raises(TransactionNotFound):
+                        await client.get_transaction_receipt(TX_HASH)
+                receipt = await client.get_transaction_receipt(TX_HASH)
+            finally:
+                await client.close()
+
+        assert receipt["blockNumber"] == 16
+        assert rpc_server.receipt_polls == 4
@@ -0,0 +1,171 @@
+"""
+Tests for Multicall3 batched state reads
+"""
+import pytest
+from web3 import Web3
+from web3.providers.base import BaseProvider
+from web3._utils.abi import get_abi_output_types
+
+from src.batch_reader import BatchStateReader, MULTICALL3_ABI, MULTICALL3_ADDRESS
+from src.contract_registry import ContractRegistry
+
+
+AGENT = "0x00000000000000000000000000000000000000A1"
+
+POSITION_COMPONENTS = [
+    {"name": "protocol", "type": "address"},
+    {"name": "asset", "type": "address"},
+    {"name": "amount", "type": "uint256"},
+    {"name": "entryPrice", "type": "uint256"},
+    {"name": "timestamp", "type": "uint256"},
+    {"name": "stopLoss", "type": "uint256"},
+    {"name": "takeProfit", "type": "uint256"},
+]
+
+AIAGENT_ABI = [
+    {
+        "name": "getUserState", "type": "function", "stateMutability": "view",
+        "inputs": [{"name": "user", "type": "address"}],
+        "outputs": [{
+            "name": "", "type": "tuple",
+            "components": [
+                {"name": "config", "type": "tuple", "components": [
+                    {"name": "owner", "type": "address"},
+                    {"name": "riskTolerance", "type": "uint256"},
+                    {"name": "targetROI", "type": "uint256"},
+                    {"name": "maxDrawdown", "type": "uint256"},
+                    {"name": "strategies", "type": "address[]"},
+                ]},
+                {"name": "rwaCollateral", "type": "address"},
+                {"name": "collateralAmount", "type": "uint256"},
+                {"name": "borrowedUSDC", "type": "uint256"},
+                {"name": "availableCredit", "type": "uint256"},
+                {"name": "totalAssets", "type": "uint256"},
+                {"name": "positions", "type": "tuple[]", "components": POSITION_COMPONENTS},
+            ],
+        }],
+    },
+    {
+        "name": "getUserPositions", "type": "function", "stateMutability": "view",
+        "inputs": [{"name": "user", "type": "address"}],
+        "outputs": [{"name": "", "type": "tuple[]", "components": POSITION_COMPONENTS}],
+    },
+    {
+        "name": "getUserPreferences", "type": "function", "stateMutability": "view",
+        "inputs": [{"name": "user", "type": "address"}],
+        "outputs": [{
+            "name": "", "type": "tuple",
+            "components": [
+                {"name": "autoDecisionsEnabled", "type": "bool"},
+                {"name": "decisionController", "type": "address"},
+                {"name": "maxBorrowPerDecision", "type": "uint256"},
+                {"name": "cooldownPeriod", "type": "uint256"},
+                {"name": "lastDecisionTime", "type": "uint256"},
+                {"name": "strategy", "type": "uint8"},
+            ],
+        }],
+    },
+]
+
+
+def user_address(i: int) -> str:
+    return Web3.to_checksum_address(f"0x{i + 1:040x}")
+
+
+def user_state(i: int):
+    """Deterministic on-chain state for user i"""
+    owner = user_address(i)
+    position = (owner, owner, 10 ** 18, (2000 + i) * 10 ** 18, 1_700_000_000, 1800 * 10 ** 18, 2400 * 10 ** 18)
+    positions = [position] * (i % 3)
+    state = ((owner, 5, 1200, 1500, []), owner, (1000 + i) * 10 ** 18, 100 * 10 ** 18, 500 * 10 ** 18, 0, positions)
+    prefs = (True, owner, 100 * 10 ** 18, 300, 1_700_000_000 + i, 1)
+    return state, positions, prefs
+
+
+class FakeChainProvider(BaseProvider):
+    """In-memory JSON-RPC provider serving AIAgent reads and Multicall3 aggregate3"""
+
+    def __init__(self, with_multicall: bool = True):
+        super().__init__()
+        self.with_multicall = with_multicall
+        self.eth_calls = 0
+        self.w3 = Web3()
+        self.agent = self.w3.eth.contract(address=AGENT, abi=AIAGENT_ABI)
+        self.multicall = self.w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+
+    def _agent_call(self, data: bytes) -> bytes:
+        fn, args = self.agent.decode_function_input(data)
+        index = int(args["user"], 16) - 1
+        state, positions, prefs = user_state(index)
+        value = {"getUserState": state, "getUserPositions": positions, "getUserPreferences": prefs}[fn.fn_name]
+        return self.w3.codec.encode(get_abi_output_types(fn.abi), [value])
+
+    def make_request(self, method, params):
+        if method == "eth_chainId":
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x7a69"}
+        if method == "eth_getCode":
+            code = "0x6080" if self.with_multicall and params[0].lower() == MULTICALL3_ADDRESS.lower() else "0x"
+            return {"jsonrpc": "2.0", "id": 1, "result": code}
+        if method == "eth_call":
+            self.eth_calls += 1
+            tx = params[0]
+            data = bytes.fromhex(tx["data"][2:])
+            if tx["to"].lower() == MULTICALL3_ADDRESS.lower():
+                _, args = self.multicall.decode_function_input(data)
+                results = [(True, self._agent_call(call["callData"])) for call in args["calls"]]
+                encoded = self.w3.codec.encode(["(bool,bytes)[]"], [results])
+            else:
+                encoded = self._agent_call(data)
+            return {"jsonrpc": "2.0", "id": 1, "result": "0x" + encoded.hex()}
+        raise NotImplementedError(method)
+
+
+def make_reader(provider: FakeChainProvider, batch_size: int = 50) -> BatchStateReader:
+    w3 = Web3(provider)
+    registry = ContractRegistry(w3)
+    registry.register_abi("AIAgent", AIAGENT_ABI)
+    return BatchStateReader(w3, registry, batch_size=batch_size)
+
+
+@pytest.mark.asyncio
+class TestBatchStateReader:
+    """Test batched reads decode exactly like per-user calls"""
+
+    async def test_states_one_round_trip_per_chunk(self):
+        provider = FakeChainProvider()
+        reader = make_reader(provider, batch_size=50)
+        users = [user_address(i) for i in range(120)]
+
+        states = await reader.read_states(AGENT, users)
+
+        assert len(states) == 120
+        assert provider.eth_calls == 3  # ceil(120 / 50) aggregate calls
+        assert states[users[7]].collateral_amount == 1007.0
+        assert states[users[7]].borrowed_usdc == 100.0
+        assert len(states[users[7]].positions) == 1
+        assert states[users[8]].positions[1].entry_price == 2008.0
+
+    async def test_preferences_decoded(self):
+        provider = FakeChainProvider()
+        reader = make_reader(provider)
+        users = [user_address(i) for i in range(5)]
+
+        prefs = await reader.read_preferences(AGENT, users)
+
+        assert provider.eth_calls == 1
+        assert prefs[users[3]]['autoDecisionsEnabled'] is True
+        assert prefs[users[3]]['decisionController'] == users[3]
+        assert prefs[users[3]]['cooldownPeriod'] == 300
+        assert prefs[users[3]]['lastDecisionTime'] == 1_700_000_003
+
+    async def test_fallback_without_multicall(self):
+        provider = FakeChainProvider(with_multicall=False)
+        reader = make_reader(provider)
+        users = [user_address(i) for i in range(4)]
+
+        batched = await make_reader(FakeChainProvider()).read_states(AGENT, users)
+        states = await reader.read_states(AGENT, users)
+
+        assert provider.eth_calls == 8  # state + positions per user
+        assert reader.get_stats()["multicall_available"] is False
+        assert states == batched
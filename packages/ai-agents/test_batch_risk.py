@@ -0,0 +1,92 @@
+"""
+Tests for the vectorized batch risk engine
+"""
+import random
+import pytest
+
+from src.batch_risk import BatchRiskEngine
+from src.models import AgentConfig, AgentState, MarketData, Position
+from src.simple_decision_engine import SimpleDecisionEngine
+
+
+ASSETS = ["0xWETH", "0xWBTC", "0xUSDC"]
+
+
+def make_state(rng: random.Random, user: str) -> AgentState:
+    """Random state, including zero-debt / zero-credit / no-position edge cases"""
+    borrowed = rng.choice([0.0, rng.uniform(1, 5000)])
+    credit = rng.choice([0.0, rng.uniform(0, 5000)])
+    positions = [
+        Position(
+            protocol="uniswap",
+            asset=rng.choice(ASSETS),
+            amount=rng.uniform(1, 100),
+            entry_price=1.0,
+            timestamp=0,
+            stop_loss=0.0,
+            take_profit=0.0
+        )
+        for _ in range(rng.randint(0, 5))
+    ]
+    return AgentState(
+        config=AgentConfig(owner=user, risk_tolerance=5, target_roi=0.12, max_drawdown=0.15, strategies=[]),
+        rwa_collateral="0xRWA",
+        collateral_amount=rng.uniform(0, 10000),
+        borrowed_usdc=borrowed,
+        available_credit=credit,
+        total_assets=0.0,
+        positions=positions
+    )
+
+
+def make_market_data(volatility=None) -> MarketData:
+    return MarketData(
+        timestamp=0,
+        prices={},
+        yield_curves={},
+        volatility=volatility or {},
+        liquidity={"WETH": 0.9, "WBTC": 0.7},
+        treasury_yield=0.045
+    )
+
+
+@pytest.mark.asyncio
+class TestBatchRiskEngine:
+    """The batch pass must agree with the per-user engine field for field"""
+
+    async def test_matches_per_user_assessment(self):
+        rng = random.Random(7)
+        states = {f"0x{i:040x}": make_state(rng, f"0x{i:040x}") for i in range(500)}
+        market_data = make_market_data({"WETH": 0.3, "WBTC": 0.5})
+        engine = SimpleDecisionEngine()
+
+        result = BatchRiskEngine().assess(states, market_data)
+
+        expected_breached = []
+        for user, state in states.items():
+            expected = await engine._assess_risk(state, market_data)
+            report = result.report(user)
+            assert report.collateral_ratio == pytest.approx(expected.collateral_ratio)
+            assert report.utilization_rate == pytest.approx(expected.utilization_rate)
+            assert report.concentration_risk == pytest.approx(expected.concentration_risk)
+            assert report.overall_risk == pytest.approx(expected.overall_risk)
+            assert report.volatility_score == pytest.approx(expected.volatility_score)
+            assert report.liquidity_score == pytest.approx(expected.liquidity_score)
+            assert report.warnings == expected.warnings
+            if expected.warnings:
+                expected_breached.append(user)
+
+        assert result.breached == expected_breached
+        assert 0 < len(expected_breached) < len(states)
+
+    async def test_empty_and_positionless_states(self):
+        rng = random.Random(1)
+        result = BatchRiskEngine().assess({}, make_market_data())
+        assert result.breached == []
+
+        state = make_state(rng, "0xA")
+        state.positions = []
+        result = BatchRiskEngine().assess({"0xA": state}, make_market_data())
+        report = result.report("0xA")
+        assert report.concentration_risk == 0.0
+        assert report.volatility_score == 0.5  # default when no volatility data
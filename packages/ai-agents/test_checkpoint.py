@@ -0,0 +1,93 @@
+"""
+Tests for orchestrator checkpoints and warm restart
+"""
+import pytest
+
+from src.checkpoint import CheckpointStore
+from src.nonce_manager import NonceManager
+from src.orchestrator import AgentOrchestrator
+from test_nonce_manager import CONTROLLER, FakeMempool, sign
+
+AGENT = "0x00000000000000000000000000000000000a9e17"
+USERS = [f"0x{i:040x}" for i in range(1, 4)]
+
+
+def make_manager(chain: FakeMempool) -> NonceManager:
+    return NonceManager(
+        CONTROLLER,
+        chain.get_transaction_count,
+        chain.send_raw_transaction,
+        chain.get_transaction_receipt,
+        stuck_timeout=0.0
+    )
+
+
+def make_orchestrator(tmp_path, head: int, changed=(), prefs=None) -> AgentOrchestrator:
+    orchestrator = AgentOrchestrator()
+    orchestrator.checkpoints = CheckpointStore(str(tmp_path / "checkpoint.json"))
+    orchestrator.reads = []
+
+    async def block_number():
+        return head
+
+    async def users_changed_since(agent_id, from_block, to_block):
+        orchestrator.reads.append(("logs", from_block, to_block))
+        return set(changed)
+
+    async def read_preferences(agent_id, users):
+        orchestrator.reads.append(("prefs", list(users)))
+        return {user: prefs[user] for user in users}
+
+    orchestrator._block_number = block_number
+    orchestrator._users_changed_since = users_changed_since
+    orchestrator._read_preferences = read_preferences
+    return orchestrator
+
+
+@pytest.mark.asyncio
+class TestCheckpoint:
+    """Save, restore and reconcile"""
+
+    async def test_restore_reads_only_users_changed_since_checkpoint(self, tmp_path):
+        before = make_orchestrator(tmp_path, head=100)
+        for i, user in enumerate(USERS):
+            before.scheduler.schedule(user, 5000 + i)
+        await before.save_checkpoint(AGENT, CONTROLLER)
+
+        prefs = {USERS[1]: {"autoDecisionsEnabled": True, "lastDecisionTime": 7000, "cooldownPeriod": 600}}
+        after = make_orchestrator(tmp_path, head=130, changed=[USERS[1]], prefs=prefs)
+
+        assert await after.restore_checkpoint(AGENT, CONTROLLER)
+        assert after.scheduler.snapshot() == {USERS[0]: 5000, USERS[1]: 7600, USERS[2]: 5002}
+        assert after.reads == [("logs", 100, 130), ("prefs", [USERS[1]])]
+
+    async def test_checkpoint_for_other_controller_is_ignored(self, tmp_path):
+        before = make_orchestrator(tmp_path, head=100)
+        before.scheduler.schedule(USERS[0], 5000)
+        await before.save_checkpoint(AGENT, CONTROLLER)
+
+        after = make_orchestrator(tmp_path, head=130)
+        assert not await after.restore_checkpoint(AGENT, "0x000000000000000000000000000000000000beef")
+        assert len(after.scheduler) == 0
+
+    async def test_in_flight_transactions_survive_restart(self, tmp_path):
+        chain = FakeMempool()
+        first = make_manager(chain)
+        nonce, _ = await first.submit(sign, {'gasPrice': 10})
+        [exported] = first.export_pending()
+
+        # New process: the signer is gone, the raw tx and hashes are not
+        second = make_manager(chain)
+        await second.adopt(exported["nonce"], bytes.fromhex(exported["raw"].removeprefix("0x")),
+                           [bytes.fromhex(h.removeprefix("0x")) for h in exported["hashes"]], exported["sent_at"])
+        next_nonce, _ = await second.submit(sign, {'gasPrice': 10})
+        assert next_nonce == nonce + 1
+
+        # Stuck: rebroadcast unchanged rather than re-priced
+        sent_before = len(chain.sent)
+        await second.poll_pending()
+        assert chain.sent[sent_before] == (nonce, 10)
+
+        chain.mine()
+        settled = await second.poll_pending()
+        assert settled[nonce]["status"] == 1
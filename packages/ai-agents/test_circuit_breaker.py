@@ -0,0 +1,83 @@
+"""
+Tests for the per-user circuit breaker
+"""
+from src.circuit_breaker import UserCircuitBreaker
+
+USER = "0xAbC0000000000000000000000000000000000001"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_breaker(clock: Clock, threshold: int = 3) -> UserCircuitBreaker:
+    return UserCircuitBreaker(failure_threshold=threshold, base_backoff=10, max_backoff=60, clock=clock)
+
+
+def test_failures_back_off_exponentially():
+    clock = Clock()
+    breaker = make_breaker(clock, threshold=10)
+
+    delays = []
+    for _ in range(5):
+        breaker.record_failure(USER, "rpc timeout")
+        delays.append(breaker.retry_at(USER) - clock.now)
+        assert not breaker.allow(USER)
+        clock.now = breaker.retry_at(USER)
+        assert breaker.allow(USER)
+
+    assert delays == [10, 20, 40, 60, 60]
+    assert breaker.state(USER) == "closed"
+
+
+def test_repeated_failures_park_user_until_probe():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(USER.lower(), "reverted")
+        clock.now = breaker.retry_at(USER)
+
+    assert breaker.state(USER) == "open"
+    assert breaker.get_stats()["opened"] == 1
+
+    # Backoff elapsed: exactly one half-open probe is let through
+    assert breaker.allow(USER)
+    assert breaker.state(USER) == "half_open"
+    assert not breaker.allow(USER)
+
+
+def test_failed_probe_reopens_with_longer_backoff():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(USER)
+    clock.now = breaker.retry_at(USER)
+    assert breaker.allow(USER)
+
+    breaker.record_failure(USER, "still broken")
+
+    assert breaker.state(USER) == "open"
+    assert breaker.retry_at(USER) - clock.now == 60
+    [entry] = breaker.snapshot()
+    assert (entry["failures"], entry["last_error"]) == (4, "still broken")
+
+
+def test_successful_probe_closes_circuit():
+    clock = Clock()
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        breaker.record_failure(USER)
+    clock.now = breaker.retry_at(USER)
+    assert breaker.allow(USER)
+
+    breaker.record_success(USER)
+
+    assert breaker.state(USER) == "closed"
+    assert breaker.retry_at(USER) is None
+    assert breaker.allow(USER)
+    stats = breaker.get_stats()
+    assert (stats["recovered"], stats["open"], stats["half_open"]) == (1, 0, 0)
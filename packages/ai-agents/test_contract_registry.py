@@ -0,0 +1,78 @@
+"""
+Tests for the shared contract registry
+"""
+import json
+import pytest
+from unittest.mock import Mock
+
+from src.contract_registry import ContractRegistry
+
+
+AGENT = "0x00000000000000000000000000000000000000a1"
+DEX = "0x00000000000000000000000000000000000000d1"
+
+
+@pytest.fixture
+def artifacts_dir(tmp_path):
+    """Write minimal Hardhat artifacts for AIAgent and SimpleDEX"""
+    for name in ("AIAgent", "SimpleDEX"):
+        contract_dir = tmp_path / f"{name}.sol"
+        contract_dir.mkdir()
+        (contract_dir / f"{name}.json").write_text(json.dumps({"abi": [{"name": name}]}))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def mock_w3():
+    """Mock Web3 instance that counts checksum calls"""
+    w3 = Mock()
+    w3.to_checksum_address = Mock(side_effect=lambda addr: addr.upper())
+    w3.eth.contract = Mock(side_effect=lambda address, abi: Mock(address=address, abi=abi))
+    return w3
+
+
+class TestContractRegistry:
+    """Test ABI and contract reuse"""
+
+    def test_abi_loaded_once(self, mock_w3, artifacts_dir):
+        registry = ContractRegistry(mock_w3, artifacts_dir)
+
+        for _ in range(100):
+            registry.agent(AGENT)
+
+        stats = registry.get_stats()
+        assert stats["abi_loads"] == 1
+        assert stats["contract_builds"] == 1
+        assert stats["contract_hits"] == 99
+        assert mock_w3.eth.contract.call_count == 1
+
+    def test_same_instance_returned(self, mock_w3, artifacts_dir):
+        registry = ContractRegistry(mock_w3, artifacts_dir)
+
+        assert registry.agent(AGENT) is registry.agent(AGENT)
+        assert registry.dex(DEX) is not registry.agent(AGENT)
+        assert registry.get_stats()["abi_loads"] == 2
+
+    def test_checksum_cached(self, mock_w3, artifacts_dir):
+        registry = ContractRegistry(mock_w3, artifacts_dir)
+
+        for _ in range(10):
+            assert registry.checksum(AGENT) == AGENT.upper()
+
+        assert mock_w3.to_checksum_address.call_count == 1
+        assert registry.get_stats()["checksum_hits"] == 9
+
+    def test_missing_artifact(self, mock_w3, tmp_path):
+        registry = ContractRegistry(mock_w3, str(tmp_path))
+
+        with pytest.raises(FileNotFoundError):
+            registry.agent(AGENT)
+
+    def test_registered_abi_skips_file(self, mock_w3, tmp_path):
+        registry = ContractRegistry(mock_w3, str(tmp_path))
+        registry.register_abi("AIAgent", [{"name": "AIAgent"}])
+
+        contract = registry.agent(AGENT)
+
+        assert contract.abi == [{"name": "AIAgent"}]
+        assert registry.get_stats()["abi_loads"] == 0
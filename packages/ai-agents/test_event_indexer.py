@@ -0,0 +1,266 @@
+"""
+Tests for the AIAgent event-log indexer
+"""
+import os
+import threading
+from unittest.mock import Mock, patch
+import pytest
+from eth_utils import event_abi_to_log_topic
+from web3 import Web3
+
+from src.contract_registry import ContractRegistry
+from src.event_indexer import EventIndexer
+from test_batch_reader import AGENT, AIAGENT_ABI, FakeChainProvider, make_reader, user_address
+
+
+EVENT_ABIS = {
+    "AgentInitialized": {
+        "name": "AgentInitialized", "type": "event", "anonymous": False,
+        "inputs": [
+            {"name": "user", "type": "address", "indexed": True},
+            {"name": "owner", "type": "address", "indexed": True},
+            {"name": "rwaCollateral", "type": "address", "indexed": False},
+            {"name": "amount", "type": "uint256", "indexed": False},
+        ],
+    },
+    "AutomationUpdated": {
+        "name": "AutomationUpdated", "type": "event", "anonymous": False,
+        "inputs": [
+            {"name": "user", "type": "address", "indexed": True},
+            {"name": "maxBorrow", "type": "uint256", "indexed": False},
+            {"name": "cooldown", "type": "uint256", "indexed": False},
+            {"name": "strategy", "type": "uint8", "indexed": False},
+        ],
+    },
+    "PositionOpened": {
+        "name": "PositionOpened", "type": "event", "anonymous": False,
+        "inputs": [
+            {"name": "user", "type": "address", "indexed": True},
+            {"name": "protocol", "type": "address", "indexed": False},
+            {"name": "asset", "type": "address", "indexed": False},
+            {"name": "amount", "type": "uint256", "indexed": False},
+        ],
+    },
+}
+
+INDEXED_ABI = AIAGENT_ABI + list(EVENT_ABIS.values())
+
+
+def encode_log(w3: Web3, name: str, user: str, block_number: int, block_hash: str, log_index: int) -> dict:
+    """Encode an AIAgent log as eth_getLogs would return it"""
+    abi = EVENT_ABIS[name]
+    topics = ["0x" + event_abi_to_log_topic(abi).hex(), "0x" + "00" * 12 + user[2:].lower()]
+    if name == "AgentInitialized":
+        topics.append(topics[1])  # owner == user
+        data = w3.codec.encode(["address", "uint256"], [user, 10 ** 18])
+    elif name == "AutomationUpdated":
+        data = w3.codec.encode(["uint256", "uint256", "uint8"], [10 ** 18, 600, 1])
+    else:
+        data = w3.codec.encode(["address", "address", "uint256"], [user, user, 10 ** 18])
+    return {
+        "address": AGENT,
+        "topics": topics,
+        "data": "0x" + data.hex(),
+        "blockNumber": hex(block_number),
+        "blockHash": block_hash,
+        "transactionHash": "0x" + f"{block_number:032x}{log_index:032x}",
+        "transactionIndex": "0x0",
+        "logIndex": hex(log_index),
+        "removed": False,
+    }
+
+
+class FakeLogChain(FakeChainProvider):
+    """FakeChainProvider plus a mutable block list serving eth_getLogs"""
+
+    def __init__(self, empty_blocks: int = 1):
+        super().__init__()
+        self.blocks = []  # [(hash, [(event name, user)])]
+        self.get_logs_calls = 0
+        for _ in range(empty_blocks):
+            self.mine([])
+
+    def mine(self, events, fork: str = "a"):
+        number = len(self.blocks)
+        self.blocks.append((f"0x{fork * 2}{number:062x}", events))
+
+    def reorg(self, depth: int, replacement):
+        """Replace the last `depth` blocks with `replacement` (list of event lists)"""
+        del self.blocks[-depth:]
+        for events in replacement:
+            self.mine(events, fork="b")
+
+    def make_request(self, method, params):
+        if method == "eth_blockNumber":
+            return {"jsonrpc": "2.0", "id": 1, "result": hex(len(self.blocks) - 1)}
+        if method == "eth_getBlockByNumber":
+            number = int(params[0], 16)
+            block_hash, _ = self.blocks[number]
+            return {"jsonrpc": "2.0", "id": 1, "result": {"number": hex(number), "hash": block_hash}}
+        if method == "eth_getLogs":
+            self.get_logs_calls += 1
+            query = params[0]
+            logs = []
+            for number in range(int(query["fromBlock"], 16), int(query["toBlock"], 16) + 1):
+                block_hash, events = self.blocks[number]
+                for log_index, (name, user) in enumerate(events):
+                    logs.append(encode_log(self.w3, name, user, number, block_hash, log_index))
+            return {"jsonrpc": "2.0", "id": 1, "result": logs}
+        return super().make_request(method, params)
+
+
+def make_indexer(chain: FakeLogChain, log_range: int = 2000, reorg_depth: int = 12) -> EventIndexer:
+    reader = make_reader(chain)
+    reader.contracts.register_abi("AIAgent", INDEXED_ABI)
+    return EventIndexer(
+        reader.w3, reader.contracts, AGENT,
+        db_path=":memory:", log_range=log_range, reorg_depth=reorg_depth,
+        batch_reader=reader
+    )
+
+
+@pytest.mark.asyncio
+class TestEventIndexer:
+    """Test backfill, incremental tailing and reorg handling"""
+
+    async def test_backfill_indexes_users_prefs_and_positions(self):
+        chain = FakeLogChain()
+        for i in range(5):
+            chain.mine([("AgentInitialized", user_address(i))])
+            chain.mine([])
+        indexer = make_indexer(chain, log_range=4)
+
+        await indexer.sync()
+
+        assert indexer.ready
+        assert indexer.last_block == 10
+        assert chain.get_logs_calls == 3  # blocks 0..10 in ranges of 4
+        assert indexer.get_users() == [user_address(i) for i in range(5)]
+        prefs = indexer.get_preferences()
+        assert prefs[user_address(3)]["lastDecisionTime"] == 1_700_000_003
+        assert len(indexer.get_positions()[user_address(2)]) == 2
+        assert chain.eth_calls == 2  # one aggregate for prefs, one for positions
+
+    async def test_tail_refreshes_only_touched_users(self):
+        chain = FakeLogChain()
+        chain.mine([("AgentInitialized", user_address(i)) for i in range(20)])
+        indexer = make_indexer(chain)
+        await indexer.sync()
+
+        chain.mine([("AutomationUpdated", user_address(4)), ("AgentInitialized", user_address(20))])
+        calls_before = chain.eth_calls
+        applied = await indexer.sync()
+
+        assert applied == 2
+        assert len(indexer.get_users()) == 21
+        assert user_address(20) in indexer.get_preferences()
+        assert chain.eth_calls - calls_before == 2
+        assert indexer.get_stats()["dirty_users"] == 0
+
+        # Nothing new: no logs applied and no reads issued
+        calls_before = chain.eth_calls
+        assert await indexer.sync() == 0
+        assert chain.eth_calls == calls_before
+
+    async def test_snapshot_lookups_by_user(self):
+        chain = FakeLogChain()
+        chain.mine([("AgentInitialized", user_address(i)) for i in range(7)])
+        indexer = make_indexer(chain)
+        await indexer.sync()
+
+        wanted = [user_address(i) for i in (6, 0, 3, 5, 1)] + ["0x" + "f" * 40]
+        with patch("src.event_indexer.LOOKUP_CHUNK", 2):
+            prefs = indexer.get_preferences(wanted)
+            positions = indexer.get_positions(wanted[:1])
+
+        all_prefs = indexer.get_preferences()
+        assert prefs == {user: all_prefs[user] for user in wanted[:5]}
+        assert list(positions) == [user_address(6)]
+        assert indexer.get_preferences([]) == {}
+
+    async def test_async_reads_run_off_the_event_loop(self):
+        chain = FakeLogChain()
+        chain.mine([("AgentInitialized", user_address(i)) for i in range(3)])
+        indexer = make_indexer(chain)
+        await indexer.sync()
+
+        readers = set()
+        get_positions = indexer.get_positions
+
+        def recording_get_positions(users=None):
+            readers.add(threading.get_ident())
+            return get_positions(users)
+
+        indexer.get_positions = recording_get_positions
+        assert await indexer.read_users() == indexer.get_users()
+        assert await indexer.read_preferences([user_address(1)]) == indexer.get_preferences([user_address(1)])
+        assert list(await indexer.read_positions([user_address(2)])) == [user_address(2)]
+        assert readers and threading.get_ident() not in readers
+
+    async def test_reorg_rolls_back_orphaned_events(self):
+        chain = FakeLogChain()
+        chain.mine([("AgentInitialized", user_address(0))])
+        chain.mine([("AgentInitialized", user_address(1))])
+        chain.mine([])
+        indexer = make_indexer(chain)
+        await indexer.sync()
+        assert indexer.get_users() == [user_address(0), user_address(1)]
+
+        # Block 2 (user 1's registration) and 3 are replaced; user 2 registers instead
+        chain.reorg(2, [[("AgentInitialized", user_address(2))], [], []])
+        await indexer.sync()
+
+        assert indexer.get_stats()["reorgs"] == 1
+        assert indexer.last_block == 4
+        assert indexer.get_users() == [user_address(0), user_address(2)]
+        assert user_address(1) not in indexer.get_preferences()
+        assert set(indexer.get_positions()) == {user_address(0), user_address(2)}
+
+    async def test_orchestrator_reads_users_and_prefs_from_index(self):
+        from src.orchestrator import AgentOrchestrator
+
+        chain = FakeLogChain()
+        chain.mine([("AgentInitialized", user_address(i)) for i in range(3)])
+        indexer = make_indexer(chain)
+        await indexer.sync()
+
+        with patch('src.orchestrator.Web3', return_value=Mock(spec=Web3)):
+            orchestrator = AgentOrchestrator()
+        orchestrator.indexer = indexer
+        orchestrator.contracts = Mock()  # any chain read would go through here
+
+        users = await orchestrator._get_all_users(AGENT)
+        prefs = await orchestrator._get_user_preferences(AGENT, users[1])
+
+        assert users == [user_address(i) for i in range(3)]
+        assert prefs["decisionController"] == user_address(1)
+        orchestrator.contracts.agent.assert_not_called()
+
+        # A submitted tx invalidates the snapshot so the next read goes to chain
+        indexer.invalidate(users[1])
+        assert users[1] not in indexer.get_preferences()
+
+
+DEV_CHAIN_URI = os.getenv("RACE_DEV_CHAIN_URI")
+DEV_AGENT_ADDRESS = os.getenv("RACE_DEV_AGENT_ADDRESS")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    not (DEV_CHAIN_URI and DEV_AGENT_ADDRESS),
+    reason="set RACE_DEV_CHAIN_URI and RACE_DEV_AGENT_ADDRESS to run against a local dev chain"
+)
+async def test_index_matches_contract_on_dev_chain():
+    """Backfill a deployed AIAgent (e.g. hardhat node) and compare with direct reads"""
+    w3 = Web3(Web3.HTTPProvider(DEV_CHAIN_URI))
+    contracts = ContractRegistry(w3)
+    indexer = EventIndexer(w3, contracts, DEV_AGENT_ADDRESS, db_path=":memory:")
+
+    await indexer.sync()
+
+    contract = contracts.agent(DEV_AGENT_ADDRESS)
+    assert indexer.get_users() == [str(user) for user in contract.functions.getAllUsers().call()]
+    for user, prefs in indexer.get_preferences().items():
+        on_chain = contract.functions.getUserPreferences(user).call()
+        assert prefs["decisionController"] == on_chain[1]
+        assert prefs["lastDecisionTime"] == on_chain[4]
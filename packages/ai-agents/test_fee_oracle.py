@@ -0,0 +1,86 @@
+"""
+Tests for block-scoped fee caching and learned gas limits
+"""
+import asyncio
+import pytest
+
+from src.fee_oracle import FeeOracle
+
+
+class FakeFeeChain:
+    """Counts fee RPCs; base_fee None simulates a legacy chain"""
+
+    def __init__(self, base_fee=10 * 10 ** 9):
+        self.block_number = 1000
+        self.base_fee = base_fee
+        self.calls = {"get_block": 0, "gas_price": 0, "priority_fee": 0}
+
+    async def get_block(self, block_identifier):
+        self.calls["get_block"] += 1
+        block = {"number": self.block_number}
+        if self.base_fee is not None:
+            block["baseFeePerGas"] = self.base_fee
+        return block
+
+    async def gas_price(self):
+        self.calls["gas_price"] += 1
+        return 7 * 10 ** 9
+
+    async def max_priority_fee(self):
+        self.calls["priority_fee"] += 1
+        return 10 ** 9
+
+
+def make_oracle(chain: FakeFeeChain, **kwargs) -> FeeOracle:
+    return FeeOracle(chain.get_block, chain.gas_price, chain.max_priority_fee, **kwargs)
+
+
+@pytest.mark.asyncio
+class TestFeeOracle:
+    """Test per-block fee caching and per-action gas limits"""
+
+    async def test_burst_shares_one_fee_lookup_per_block(self):
+        chain = FakeFeeChain()
+        oracle = make_oracle(chain, block_time=60)
+
+        fees = await asyncio.gather(*(oracle.get_fees() for _ in range(25)))
+
+        assert fees[0] == {"maxFeePerGas": 21 * 10 ** 9, "maxPriorityFeePerGas": 10 ** 9}
+        assert all(f == fees[0] for f in fees)
+        assert chain.calls == {"get_block": 1, "gas_price": 0, "priority_fee": 1}
+
+        # A receipt from a newer block expires the suggestion
+        chain.block_number, chain.base_fee = 1001, 20 * 10 ** 9
+        oracle.note_block(1001)
+        assert (await oracle.get_fees())["maxFeePerGas"] == 41 * 10 ** 9
+        assert chain.calls["get_block"] == 2
+
+    async def test_legacy_chain_uses_gas_price(self):
+        chain = FakeFeeChain(base_fee=None)
+        oracle = make_oracle(chain)
+
+        assert await oracle.get_fees() == {"gasPrice": 7 * 10 ** 9}
+        assert chain.calls["priority_fee"] == 0
+
+    async def test_gas_limits_learned_per_action(self):
+        oracle = make_oracle(FakeFeeChain(), gas_limit_multiplier=1.5, default_gas_limit=900_000)
+        estimates = 0
+
+        async def estimate():
+            nonlocal estimates
+            estimates += 1
+            return 200_000
+
+        assert await oracle.gas_limit("BORROW_AND_INVEST", estimate) == 300_000
+        assert await oracle.gas_limit("BORROW_AND_INVEST", estimate) == 300_000
+        assert estimates == 1
+
+        oracle.record_gas("BORROW_AND_INVEST", 240_000)  # receipt gasUsed
+        assert await oracle.gas_limit("BORROW_AND_INVEST", estimate) == 360_000
+        assert await oracle.gas_limit("TAKE_PROFIT") == 900_000  # no samples, no estimator
+
+        async def failing_estimate():
+            raise ValueError("execution reverted")
+
+        assert await oracle.gas_limit("REBALANCE", failing_estimate) == 900_000
+        assert oracle.get_stats()["gas_limits"] == {"BORROW_AND_INVEST": 360_000}
@@ -0,0 +1,80 @@
+"""
+Tests for stage metrics and the /metrics endpoint
+"""
+import socket
+import aiohttp
+import pytest
+
+from src.metrics import AgentMetrics, MetricsServer
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_stage_timer_records_latency_and_errors():
+    metrics = AgentMetrics()
+    with metrics.stage("market_data"):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.stage("submit"):
+            raise ValueError("nonce too low")
+
+    totals = metrics.stage_totals()
+    assert totals["market_data"][0] == 1
+    assert totals["submit"][0] == 1
+    assert metrics.stage_errors.value(stage="submit") == 1
+    assert metrics.stage_errors.value(stage="market_data") == 0
+
+
+def test_prometheus_text_format():
+    metrics = AgentMetrics()
+    for value in (0.002, 0.02, 3.0):
+        metrics.stage_seconds.observe(value, stage="fetch_state")
+    metrics.record_round("decision", users=50, duration=2.0, outcomes={"acted": 5, "skipped": 45})
+    metrics.register_collector("agent_state_cache", lambda: {"hits": 7, "hit_rate": 0.5, "block": None})
+
+    text = metrics.render()
+    assert 'agent_stage_seconds_bucket{stage="fetch_state",le="0.005"} 1' in text
+    assert 'agent_stage_seconds_bucket{stage="fetch_state",le="+Inf"} 3' in text
+    assert 'agent_stage_seconds_count{stage="fetch_state"} 3' in text
+    assert 'agent_round_users_per_second{loop="decision"} 25.0' in text
+    assert 'agent_users_processed_total{loop="decision",outcome="acted"} 5.0' in text
+    assert "agent_state_cache_hits 7.0" in text
+    assert "agent_state_cache_block" not in text  # non-numeric stats are skipped
+
+
+def test_round_summary_counts_only_this_round():
+    metrics = AgentMetrics()
+    metrics.stage_seconds.observe(1.0, stage="decision_engine")
+    before = metrics.stage_totals()
+    metrics.stage_seconds.observe(0.2, stage="decision_engine")
+    metrics.stage_seconds.observe(0.4, stage="decision_engine")
+    metrics.record_round("decision", users=2, duration=0.5)
+
+    summary = metrics.round_summary("decision", before, {"acted": 2})
+    assert summary["stages"]["decision_engine"]["count"] == 2
+    assert summary["stages"]["decision_engine"]["avg_ms"] == pytest.approx(300.0)
+    assert summary["users_per_second"] == 4.0
+    assert summary["acted"] == 2
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    metrics = AgentMetrics()
+    metrics.stage_seconds.observe(0.01, stage="submit")
+    port = free_port()
+    server = MetricsServer(metrics, host="127.0.0.1", port=port)
+    server.add_json_route("/status", lambda: {"ok": True})
+    await server.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                assert response.status == 200
+                assert 'agent_stage_seconds_count{stage="submit"} 1' in await response.text()
+            async with session.get(f"http://127.0.0.1:{port}/status") as response:
+                assert await response.json() == {"ok": True}
+    finally:
+        await server.stop()
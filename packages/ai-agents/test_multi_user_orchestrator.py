@@ -2,12 +2,15 @@
 Integration tests for multi-user orchestrator
 """
 import asyncio
+import time
 import pytest
 from unittest.mock import Mock, AsyncMock, patch
 from web3 import Web3
 
 from src.orchestrator import AgentOrchestrator
 from src.models import AgentState, AgentConfig, Position
+from src.price_service import PriceService
+from test_price_service import FakeCoinGecko
 
 
 @pytest.fixture
@@ -182,6 +185,62 @@ class TestMultiUserOrchestrator:
         # Verify both users were processed
         assert orchestrator.orchestrate_decision.call_count == 2
 
+    async def test_concurrent_round_bounded_by_slowest_user(self, orchestrator):
+        """Test concurrent mode overlaps users up to the configured limit"""
+        agent_id = "0xAgent123"
+        users = [f"0xUser00{i}" for i in range(6)]
+        real_sleep = asyncio.sleep
+
+        orchestrator._get_all_users = AsyncMock(return_value=users)
+        orchestrator._get_user_preferences = AsyncMock(return_value={
+            'autoDecisionsEnabled': True,
+            'decisionController': "0xController",
+            'maxBorrowPerDecision': int(100 * 1e18),
+            'cooldownPeriod': 300,
+            'lastDecisionTime': 0,
+            'strategy': 1
+        })
+
+        in_flight = 0
+        peak = 0
+
+        async def slow_decision(agent, user, agent_state=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await real_sleep(0.2)
+            in_flight -= 1
+            return {
+                "decision": {
+                    "action": "HOLD",
+                    "params": {},
+                    "risk_score": 0.3,
+                    "expected_return": 0.0,
+                    "reasoning": "Test"
+                },
+                "user_address": user
+            }
+
+        orchestrator.orchestrate_decision = slow_decision
+
+        async def stop_sleep(seconds):
+            raise KeyboardInterrupt()
+
+        from src.config import config
+        with patch.object(config, 'PRIVATE_KEY', '0xkey'), \
+                patch.object(config, 'MAX_CONCURRENT_USERS', 3), \
+                patch('asyncio.sleep', side_effect=stop_sleep):
+            started = time.monotonic()
+            try:
+                await orchestrator.run_multi_user_loop(agent_id)
+            except KeyboardInterrupt:
+                pass
+            elapsed = time.monotonic() - started
+
+        # 6 users x 0.2s with 3 slots -> two waves, not six
+        assert peak == 3
+        assert elapsed < 0.9
+
     async def test_execute_decision_with_user_parameter(self, orchestrator, mock_w3):
         """Test executing decision with user parameter"""
         agent_id = "0xAgent123"
@@ -301,6 +360,60 @@ class TestMultiUserOrchestrator:
         orchestrator._fetch_agent_state.assert_called_once_with(agent_id, user_address)
         orchestrator.decision_engine._assess_risk.assert_called_once()
 
+    async def test_dex_price_fallback_does_not_block_loop(self, orchestrator):
+        """A slow DEX getPrice read yields to other users while it runs"""
+        orchestrator.aget_market_price = AsyncMock(return_value=None)  # CoinGecko unavailable
+
+        def slow_get_price():
+            time.sleep(0.2)
+            return int(2000 * 1e18)
+
+        dex = Mock()
+        dex.functions.getPrice.return_value.call = slow_get_price
+        orchestrator.contracts.dex = Mock(return_value=dex)
+        orchestrator.contracts.checksum = lambda address: address
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            price = await orchestrator.aget_dex_price("0x" + "ab" * 20)
+        finally:
+            ticking.cancel()
+
+        assert price == 2000.0
+        assert ticks >= 5
+
+    async def test_market_price_outage_does_not_block_loop(self, orchestrator):
+        """With no usable cache and CoinGecko failing, other users keep running"""
+        price_service = PriceService()
+        price_service._get_json = FakeCoinGecko(delay=0.2, fail=True).get_json
+        orchestrator.price_service = price_service
+
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticking = asyncio.create_task(ticker())
+        try:
+            price = await orchestrator.aget_market_price("BTC")
+        finally:
+            ticking.cancel()
+            price_service.close()
+
+        assert price is None
+        assert ticks >= 5
+
     async def test_multiple_users_independent_states(self, orchestrator, mock_w3):
         """Test that multiple users have independent states"""
         agent_id = "0xAgent123"
@@ -0,0 +1,162 @@
+"""
+Tests for local nonce allocation and pipelined submission
+"""
+import asyncio
+import pytest
+from web3.exceptions import TransactionNotFound
+
+from src.nonce_manager import NonceManager, TransactionReplaced
+
+
+CONTROLLER = "0x000000000000000000000000000000000000c0de"
+
+
+class FakeMempool:
+    """Controller account with a mempool; mine() includes the best tx per nonce"""
+
+    def __init__(self, start_nonce: int = 5):
+        self.nonce = start_nonce
+        self.block = 100
+        self.mempool = {}  # nonce -> (gas price, hash)
+        self.receipts = {}
+        self.count_calls = 0
+        self.sent = []
+        self.fail_next_send = False
+        self.revert_nonces = set()
+
+    async def get_transaction_count(self, address, block_identifier):
+        self.count_calls += 1
+        if block_identifier == 'pending':
+            nonce = self.nonce
+            while nonce in self.mempool:
+                nonce += 1
+            return nonce
+        return self.nonce
+
+    async def send_raw_transaction(self, raw_tx: bytes):
+        if self.fail_next_send:
+            self.fail_next_send = False
+            raise ValueError("insufficient funds")
+        nonce, gas_price = (int(part) for part in raw_tx.decode().split(":"))
+        if nonce < self.nonce:
+            raise ValueError("nonce too low")
+        tx_hash = f"0x{nonce:04x}{gas_price:060x}"
+        current = self.mempool.get(nonce)
+        if current is None or gas_price > current[0]:
+            self.mempool[nonce] = (gas_price, tx_hash)
+        self.sent.append((nonce, gas_price))
+        return bytes.fromhex(tx_hash[2:])
+
+    async def get_transaction_receipt(self, tx_hash):
+        key = tx_hash.hex() if isinstance(tx_hash, bytes) else tx_hash
+        if key not in self.receipts:
+            raise TransactionNotFound(key)
+        return self.receipts[key]
+
+    def mine(self):
+        self.block += 1
+        while self.nonce in self.mempool:
+            _, tx_hash = self.mempool.pop(self.nonce)
+            self.receipts[tx_hash[2:]] = {
+                "status": 0 if self.nonce in self.revert_nonces else 1,
+                "blockNumber": self.block,
+                "gasUsed": 50_000 + self.nonce,
+                "transactionHash": bytes.fromhex(tx_hash[2:]),
+            }
+            self.nonce += 1
+
+
+async def sign(nonce, fees):
+    return f"{nonce}:{fees['gasPrice']}".encode()
+
+
+def make_manager(chain: FakeMempool, **kwargs) -> NonceManager:
+    return NonceManager(
+        CONTROLLER,
+        chain.get_transaction_count,
+        chain.send_raw_transaction,
+        chain.get_transaction_receipt,
+        **kwargs
+    )
+
+
+async def settle(manager: NonceManager, nonces, timeout: float = 1.0) -> dict:
+    """Poll (as the ReceiptTracker does) until every nonce has settled"""
+    results = {}
+
+    async def poll():
+        while not set(nonces) <= results.keys():
+            results.update(await manager.poll_pending())
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+    return results
+
+
+@pytest.mark.asyncio
+class TestNonceManager:
+    """Test pipelining, resync and fee bumping"""
+
+    async def test_burst_lands_in_one_block(self):
+        chain = FakeMempool()
+        manager = make_manager(chain)
+
+        submitted = await asyncio.gather(*(manager.submit(sign, {'gasPrice': 10}) for _ in range(10)))
+        nonces = sorted(nonce for nonce, _ in submitted)
+
+        assert nonces == list(range(5, 15))
+        assert chain.count_calls == 1  # seeded once, then allocated locally
+        assert manager.pending_count == 10
+
+        chain.mine()
+        receipts = await settle(manager, nonces)
+
+        assert {receipt["blockNumber"] for receipt in receipts.values()} == {101}
+        assert manager.get_stats()["confirmed"] == 10
+        assert manager.pending_count == 0
+
+    async def test_failed_broadcast_does_not_leave_gap(self):
+        chain = FakeMempool()
+        manager = make_manager(chain)
+
+        first, _ = await manager.submit(sign, {'gasPrice': 10})
+        chain.fail_next_send = True
+        with pytest.raises(ValueError):
+            await manager.submit(sign, {'gasPrice': 10})
+        second, _ = await manager.submit(sign, {'gasPrice': 10})
+
+        assert (first, second) == (5, 6)
+
+    async def test_stuck_transaction_is_repriced_under_same_nonce(self):
+        chain = FakeMempool()
+        manager = make_manager(chain, stuck_timeout=0.02, gas_bump_percent=150)
+
+        nonce, _ = await manager.submit(sign, {'gasPrice': 100})
+
+        async def mine_after_bump():
+            while len(chain.sent) < 2:
+                await asyncio.sleep(0.01)
+            chain.mine()
+
+        miner = asyncio.create_task(mine_after_bump())
+        receipt = (await settle(manager, [nonce], timeout=2))[nonce]
+        await miner
+
+        assert receipt["status"] == 1
+        assert chain.sent[:2] == [(5, 100), (5, 151)]
+        assert manager.get_stats()["gas_bumps"] >= 1
+
+    async def test_externally_replaced_nonce_triggers_resync(self):
+        chain = FakeMempool()
+        manager = make_manager(chain, stuck_timeout=0.02)
+
+        nonce, _ = await manager.submit(sign, {'gasPrice': 10})
+        # Someone else (e.g. a wallet sharing the key) used nonce 5 and 6
+        chain.mempool.clear()
+        chain.nonce = 7
+
+        assert isinstance((await settle(manager, [nonce]))[nonce], TransactionReplaced)
+
+        next_nonce, _ = await manager.submit(sign, {'gasPrice': 10})
+        assert next_nonce == 7
+        assert manager.get_stats()["replaced"] == 1
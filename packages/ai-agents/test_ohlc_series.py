@@ -0,0 +1,79 @@
+"""
+Tests for the columnar OHLC series and the history endpoint built on it
+"""
+import json
+import numpy as np
+import pytest
+
+from src.ohlc_series import OHLCSeries
+
+HOUR = 3_600_000
+
+
+def hourly(count: int) -> OHLCSeries:
+    close = 100 + np.arange(count, dtype=np.float64) * 0.25
+    return OHLCSeries(HOUR * np.arange(count), close - 0.5, close + 1, close - 1, close)
+
+
+def test_slice_is_a_view():
+    series = hourly(48)
+    window = series.slice(10 * HOUR, 20 * HOUR)
+
+    assert window.timestamp.tolist() == [h * HOUR for h in range(10, 20)]
+    assert np.shares_memory(window.close, series.close)
+    assert len(series.slice(start_ms=47 * HOUR)) == 1
+    assert len(series.slice(end_ms=0)) == 0
+
+
+def test_resample_to_coarser_candles():
+    series = hourly(48)
+    daily = series.resample(24 * HOUR)
+
+    assert daily.timestamp.tolist() == [0, 24 * HOUR]
+    assert daily.open.tolist() == [series.open[0], series.open[24]]
+    assert daily.close.tolist() == [series.close[23], series.close[47]]
+    assert daily.high.tolist() == [series.high[:24].max(), series.high[24:].max()]
+    assert daily.low.tolist() == [series.low[:24].min(), series.low[24:].min()]
+
+
+def test_json_and_binary_serialization():
+    series = hourly(5)
+    series.close[2] = 65432.123456789
+
+    candles = json.loads(series.to_json({'timestamp': ['date']}))
+    assert candles[2] == {
+        'timestamp': 2 * HOUR, 'date': 2 * HOUR, 'open': series.open[2],
+        'high': series.high[2], 'low': series.low[2], 'close': 65432.123456789,
+    }
+    assert OHLCSeries.from_bytes(series.to_bytes()) == series
+    assert json.loads(OHLCSeries.empty().to_json()) == []
+
+
+class FakePriceService:
+    def __init__(self, series: OHLCSeries):
+        self.series = series
+
+    def get_historical_prices(self, symbol, days):
+        return self.series
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from src import api
+    monkeypatch.setattr(api, "price_service", FakePriceService(hourly(48)))
+    return api.app.test_client()
+
+
+def test_history_endpoint_formats(client):
+    body = client.get('/api/prices/history?symbol=btc&days=7').get_json()
+    assert body['success'] and body['data']['count'] == 48
+    assert body['data']['ohlc'][0]['date'] == body['data']['ohlc'][0]['timestamp'] == 0
+
+    daily = client.get('/api/prices/history?days=7&interval=1d&format=columns').get_json()
+    assert daily['data']['columns']['timestamp'] == [0, 24 * HOUR]
+
+    raw = client.get('/api/prices/history?days=7&format=binary')
+    assert raw.mimetype == 'application/octet-stream'
+    assert OHLCSeries.from_bytes(raw.data) == hourly(48)
+
+    assert client.get('/api/prices/history?interval=3x').status_code == 400
@@ -0,0 +1,148 @@
+"""
+Tests for the persistent OHLC store and incremental history fetches
+"""
+import asyncio
+import os
+import time
+import numpy as np
+import pytest
+
+from src.ohlc_store import DAY_MS, OHLCStore, granularity_for, tail_days
+from src.price_service import PriceService
+
+FOUR_HOURS = 4 * 3_600_000
+
+
+def candles(start_ms: int, count: int, step: int = FOUR_HOURS) -> np.ndarray:
+    ts = start_ms + step * np.arange(count, dtype=np.float64)
+    close = 100 + np.arange(count, dtype=np.float64)
+    return np.column_stack([ts, close - 1, close + 2, close - 2, close])
+
+
+class FakeOHLC:
+    """CoinGecko /ohlc stand-in: 4h candles ending now, records requested days"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def get_json(self, url, params, timeout):
+        self.calls.append(params["days"])
+        now_ms = int(time.time() * 1000) // FOUR_HOURS * FOUR_HOURS
+        count = params["days"] * 6
+        return candles(now_ms - (count - 1) * FOUR_HOURS, count).tolist()
+
+
+def make_service(root) -> PriceService:
+    ps = PriceService(ohlc_store=OHLCStore(str(root)))
+    ps.upstream = FakeOHLC()
+    ps._get_json = ps.upstream.get_json
+    return ps
+
+
+def test_candle_buckets():
+    assert granularity_for(1) == 30 * 60_000
+    assert granularity_for(14) == FOUR_HOURS
+    assert granularity_for(365) == 4 * DAY_MS
+    assert tail_days(FOUR_HOURS, 3 * 3_600_000) == 7
+    assert tail_days(FOUR_HOURS, 10 * DAY_MS) == 14
+    assert tail_days(FOUR_HOURS, 90 * DAY_MS) == 30
+
+
+def test_append_replaces_tail_and_slices_windows(tmp_path):
+    store = OHLCStore(str(tmp_path))
+    assert store.append("BTC", FOUR_HOURS, candles(0, 10)) == 10
+
+    # Tail candle revised, two new ones, older rows ignored
+    update = candles(7 * FOUR_HOURS, 5)
+    update[2, 4] = 999.0
+    assert store.append("BTC", FOUR_HOURS, update) == 2
+    series = store.read("BTC", FOUR_HOURS)
+    assert len(series) == 12
+    assert series[9, 4] == 999.0
+    assert np.all(np.diff(series[:, 0]) > 0)
+
+    window = store.window("BTC", FOUR_HOURS, 3 * FOUR_HOURS, 6 * FOUR_HOURS)
+    assert window[:, 0].tolist() == [3 * FOUR_HOURS, 4 * FOUR_HOURS, 5 * FOUR_HOURS]
+
+    # Interrupted append: the partial row is invisible and dropped on the next write
+    with open(os.path.join(str(tmp_path), "BTC-14400s.f64"), "ab") as f:
+        f.write(b"\x00" * 13)
+    reopened = OHLCStore(str(tmp_path))
+    assert len(reopened.read("BTC", FOUR_HOURS)) == 12
+    assert reopened.append("BTC", FOUR_HOURS, candles(12 * FOUR_HOURS, 1)) == 1
+    assert len(reopened.read("BTC", FOUR_HOURS)) == 13
+
+
+@pytest.mark.asyncio
+class TestIncrementalHistory:
+    """Repeated history requests cost a file read"""
+
+    async def test_fetches_window_once_then_only_the_tail(self, tmp_path):
+        service = make_service(tmp_path)
+        try:
+            first = await service.aget_historical_prices("BTC", days=30)
+            assert len(first) >= 30 * 6 - 1
+            assert service.upstream.calls == [30]
+
+            # Served from disk; shorter windows of the same candle size are slices
+            assert await service.aget_historical_prices("BTC", days=30) == first
+            assert len(await service.aget_historical_prices("BTC", days=7)) < len(first)
+            assert service.upstream.calls == [30]
+
+            # Tail due: smallest window covering the gap
+            service.ohlc_store.set_meta("BTC", FOUR_HOURS, synced_at=0)
+            await service.aget_historical_prices("BTC", days=30)
+            assert service.upstream.calls == [30, 7]
+            assert service.get_stats()["ohlc_tail_syncs"] == 1
+        finally:
+            service.close()
+
+    async def test_history_survives_restart(self, tmp_path):
+        before = make_service(tmp_path)
+        try:
+            history = await before.aget_historical_prices("ETH", days=14)
+        finally:
+            before.close()
+
+        after = make_service(tmp_path)
+        try:
+            assert await after.aget_historical_prices("ETH", days=14) == history
+            assert after.upstream.calls == []
+        finally:
+            after.close()
+
+    async def test_store_io_does_not_stall_price_fetches(self, tmp_path):
+        service = make_service(tmp_path)
+        fetch_ohlc = service._get_json
+
+        async def get_json(url, params, timeout):
+            if "days" in params:
+                return await fetch_ohlc(url, params, timeout)
+            return {"bitcoin": {"usd": 65000.0}}
+
+        merge = service.ohlc_store.merge
+
+        def slow_merge(*args):
+            time.sleep(0.5)  # fsync on a slow disk
+            merge(*args)
+
+        service._get_json = get_json
+        service.ohlc_store.merge = slow_merge
+        try:
+            # 7- and 14-day windows share the 4h series: their writes take turns
+            history = asyncio.gather(
+                service.aget_historical_prices("BTC", days=7),
+                service.aget_historical_prices("BTC", days=14),
+            )
+            await asyncio.sleep(0.1)
+
+            started = time.monotonic()
+            assert await service.aget_current_price("BTC") == 65000.0
+            assert time.monotonic() - started < 0.3
+
+            week, fortnight = await history
+            assert 0 < len(week) < len(fortnight)
+            stored = service.ohlc_store.read("BTC", FOUR_HOURS)
+            assert np.all(np.diff(stored[:, 0]) > 0)
+        finally:
+            service.close()
@@ -0,0 +1,185 @@
+"""
+Tests for pre-flight simulation of decision transactions
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+import pytest
+from web3.exceptions import ContractLogicError
+
+from src.circuit_breaker import UserCircuitBreaker
+from src.config import config
+from src.preflight import PreflightSimulator
+from test_multi_user_orchestrator import mock_w3, orchestrator  # noqa: F401 (fixtures)
+
+
+class FakeNode:
+    """eth_call/estimate_gas where a borrow reverts above `max_borrow`"""
+
+    def __init__(self, max_borrow: int = 100, gas: int = 200_000, latency: float = 0.0):
+        self.max_borrow = max_borrow
+        self.gas = gas
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def eth_call(self, tx, block_identifier):
+        self.calls.append(block_identifier)
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        if tx["data"] == "unavailable":
+            raise ConnectionError("node unreachable")
+        if tx["data"] > self.max_borrow:
+            raise ContractLogicError("execution reverted: Exceeds borrow capacity")
+        return b""
+
+    async def estimate_gas(self, tx):
+        return self.gas
+
+
+def borrow(amount: int, resizable: bool = True):
+    async def build(scale: float):
+        if scale != 1.0 and not resizable:
+            return None
+        return {"from": "0xc0", "to": "0xa9", "data": int(amount * scale)}
+    return build
+
+
+@pytest.mark.asyncio
+class TestPreflightSimulator:
+    """Simulation outcomes and counters"""
+
+    async def test_passing_tx_gets_estimated_limit(self):
+        node = FakeNode()
+        simulator = PreflightSimulator(node.eth_call, node.estimate_gas, gas_limit_multiplier=1.5)
+
+        result = await simulator.check(borrow(80))
+
+        assert result.ok and result.scale == 1.0
+        assert result.gas_limit == 300_000
+        assert node.calls == ["pending"]
+
+    async def test_doomed_borrow_is_resized(self):
+        node = FakeNode(max_borrow=60)
+        simulator = PreflightSimulator(node.eth_call, node.estimate_gas, resize_steps=(0.5, 0.25))
+
+        result = await simulator.check(borrow(100))
+
+        assert result.ok and result.scale == 0.5
+        assert result.tx["data"] == 50
+        assert simulator.get_stats()["resized"] == 1
+
+    async def test_doomed_tx_is_dropped_and_counted(self):
+        node = FakeNode(max_borrow=0)
+        simulator = PreflightSimulator(node.eth_call, node.estimate_gas)
+
+        result = await simulator.check(borrow(100, resizable=False), expected_gas=400_000)
+
+        assert not result.ok and not result.inconclusive
+        assert "borrow capacity" in result.reason
+        stats = simulator.get_stats()
+        assert (stats["avoided_reverts"], stats["saved_gas"]) == (1, 400_000)
+
+    async def test_rpc_failure_is_inconclusive(self):
+        node = FakeNode()
+        simulator = PreflightSimulator(node.eth_call, node.estimate_gas)
+
+        async def build(scale):
+            return {"from": "0xc0", "to": "0xa9", "data": "unavailable"}
+
+        result = await simulator.check(build)
+
+        assert result.inconclusive
+        assert simulator.get_stats()["avoided_reverts"] == 0
+
+    async def test_batch_simulates_concurrently(self):
+        node = FakeNode(latency=0.05)
+        simulator = PreflightSimulator(node.eth_call, node.estimate_gas, max_concurrent=4)
+
+        results = await simulator.simulate_many(
+            [{"from": "0xc0", "to": "0xa9", "data": amount} for amount in (10, 500, 20, 30, 40, 50, 60, 70)]
+        )
+
+        assert [r.ok for r in results] == [True, False, True, True, True, True, True, True]
+        assert node.peak_in_flight == 4
+
+
+@pytest.mark.asyncio
+class TestDroppedDecision:
+    """A tx dropped by pre-flight is not counted or rescheduled as a landed decision"""
+
+    @staticmethod
+    def _drop_every_decision(orchestrator, user, cooldown):
+        """Opt `user` in and make pre-flight refuse every tx the orchestrator builds"""
+        orchestrator._get_all_users = AsyncMock(return_value=[user])
+        orchestrator._batch_read_preferences = AsyncMock(return_value={user: {
+            'autoDecisionsEnabled': True,
+            'decisionController': "0xController",
+            'maxBorrowPerDecision': int(100 * 1e18),
+            'cooldownPeriod': cooldown,
+            'lastDecisionTime': 0,
+            'strategy': 1
+        }})
+        orchestrator._batch_read_states = AsyncMock(return_value={})
+        orchestrator.orchestrate_decision = AsyncMock(return_value={
+            "decision": {
+                "action": "STOP_LOSS",
+                "params": {"position_index": 0},
+                "risk_score": 0.9,
+                "expected_return": -0.1,
+                "reasoning": "Test"
+            },
+            "user_address": user
+        })
+
+        async def always_reverts(tx, block_identifier):
+            raise ContractLogicError("execution reverted: No position")
+
+        agent = Mock(address="0xAgent123")
+        agent.functions.makeInvestmentDecision.return_value._encode_transaction_data.return_value = "0x"
+        orchestrator.contracts.agent = Mock(return_value=agent)
+        orchestrator.contracts.checksum = lambda address: address
+
+        node = FakeNode()
+        orchestrator.preflight = PreflightSimulator(always_reverts, node.estimate_gas)
+
+    async def test_dropped_tx_is_skipped_and_retried_soon(self, orchestrator):
+        user = "0xUser001"
+        cooldown = 3600
+        self._drop_every_decision(orchestrator, user, cooldown)
+        orchestrator.breaker = UserCircuitBreaker()
+        orchestrator.breaker.record_success = Mock()
+
+        with patch.object(config, 'PRIVATE_KEY', '0xkey'):
+            summary = await orchestrator.run_round("0xAgent123", "0xController", pause_between_users=0)
+
+        assert (summary["acted"], summary["skipped"]) == (0, 1)
+        assert summary["next_wakeup"] <= time.time() + config.PREFLIGHT_RETRY_DELAY < time.time() + cooldown
+        assert orchestrator.nonce_manager is None  # nothing submitted
+        orchestrator.breaker.record_success.assert_not_called()
+        assert orchestrator.preflight.get_stats()["avoided_reverts"] == 1
+
+    async def test_dropped_probe_parks_user_until_retry(self, orchestrator):
+        user = "0xUser001"
+        self._drop_every_decision(orchestrator, user, cooldown=3600)
+        offset = [0.0]
+        breaker = UserCircuitBreaker(failure_threshold=1, base_backoff=0, clock=lambda: time.time() + offset[0])
+        breaker.record_failure(user, RuntimeError("rpc down"))
+        orchestrator.breaker = breaker
+
+        with patch.object(config, 'PRIVATE_KEY', '0xkey'):
+            summary = await orchestrator.run_round("0xAgent123", "0xController", pause_between_users=0)
+
+        # The probe ran, pre-flight dropped it: parked again rather than stuck half-open
+        assert summary["skipped"] == 1
+        assert breaker.state(user) == "open"
+        assert breaker.retry_at(user) > time.time() + config.PREFLIGHT_RETRY_DELAY - 5
+        assert not breaker.allow(user)
+
+        offset[0] = config.PREFLIGHT_RETRY_DELAY + 1
+        assert breaker.allow(user)  # probed again later
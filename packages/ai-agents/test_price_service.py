@@ -0,0 +1,177 @@
+"""
+Tests for the async PriceService: single-flight coalescing and stale-while-revalidate
+"""
+import asyncio
+import threading
+import time
+import aiohttp
+import pytest
+from yarl import URL
+
+from src.price_service import PriceService
+from src.rate_governor import DASHBOARD, RateGovernor
+
+PRICES = {"bitcoin": {"usd": 65000.0}, "ethereum": {"usd": 3200.0}, "usd-coin": {"usd": 1.0}}
+
+
+class FakeCoinGecko:
+    """Upstream stand-in: records each call's ids and answers after `delay`"""
+
+    def __init__(self, delay: float = 0.05, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.retry_after = None  # answer 429 with this Retry-After
+        self.calls = []
+
+    async def get_json(self, url, params, timeout):
+        self.calls.append(params.get("ids"))
+        await asyncio.sleep(self.delay)
+        if self.retry_after is not None:
+            request = aiohttp.RequestInfo(URL(url), "GET", {}, URL(url))
+            raise aiohttp.ClientResponseError(
+                request, (), status=429, message="Too Many Requests", headers={"Retry-After": self.retry_after}
+            )
+        if self.fail:
+            raise aiohttp.ClientError("connection reset")
+        return {coin_id: PRICES[coin_id] for coin_id in params["ids"].split(",") if coin_id in PRICES}
+
+
+def make_service(**kwargs) -> PriceService:
+    ps = PriceService(**kwargs)
+    ps.upstream = FakeCoinGecko()
+    ps._get_json = ps.upstream.get_json
+    return ps
+
+
+@pytest.fixture
+def service():
+    ps = make_service(cache_ttl=60)
+    yield ps
+    ps.close()
+
+
+@pytest.fixture
+def swr_service():
+    ps = make_service(cache_ttl=60, max_staleness=120, hard_fail_age=300)
+    yield ps
+    ps.close()
+
+
+@pytest.mark.asyncio
+class TestPriceService:
+    """One upstream call per symbol however many callers miss at once"""
+
+    async def test_concurrent_misses_share_one_call(self, service):
+        prices = await asyncio.gather(*(service.aget_current_price("BTC") for _ in range(20)))
+
+        assert prices == [65000.0] * 20
+        assert service.upstream.calls == ["bitcoin"]
+        assert service.get_stats()["coalesced"] >= 1
+
+        # Now cached: no further upstream traffic
+        assert await service.aget_current_price("btc") == 65000.0
+        assert service.upstream.calls == ["bitcoin"]
+
+    async def test_overlapping_symbol_sets_fetch_only_the_difference(self, service):
+        both = asyncio.ensure_future(service.aget_multiple_prices(["BTC", "ETH"]))
+        await asyncio.sleep(0.01)  # BTC+ETH now in flight
+        wider = await service.aget_multiple_prices(["ETH", "USDC"])
+
+        assert wider == {"ETH": 3200.0, "USDC": 1.0}
+        assert await both == {"BTC": 65000.0, "ETH": 3200.0}
+        assert service.upstream.calls == ["bitcoin,ethereum", "usd-coin"]
+
+    async def test_failure_returns_none_and_is_not_cached(self, service):
+        service.upstream.fail = True
+        assert await service.aget_multiple_prices(["BTC", "ETH"]) == {"BTC": None, "ETH": None}
+        assert service.get_cache_info() == {}
+
+        service.upstream.fail = False
+        assert await service.aget_current_price("BTC") == 65000.0
+        assert service.get_stats()["upstream_errors"] == 1
+
+
+def test_sync_wrapper_coalesces_across_threads(service):
+    results = []
+
+    def worker():
+        results.append(service.get_current_price("ETH"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [3200.0] * 8
+    assert service.upstream.calls == ["ethereum"]
+    assert service.get_multiple_prices(["ETH"]) == {"ETH": 3200.0}
+    assert service.get_current_price("DOGE") is None
+
+
+@pytest.mark.asyncio
+class TestStaleWhileRevalidate:
+    """Bounded staleness instead of blocking on CoinGecko"""
+
+    async def test_stale_value_served_while_revalidating(self, swr_service):
+        swr_service._price_cache["BTC"] = (60000.0, time.time() - 90)
+
+        started = time.perf_counter()
+        assert await swr_service.aget_current_price("BTC") == 60000.0
+        assert time.perf_counter() - started < swr_service.upstream.delay  # did not wait
+        assert swr_service.get_cache_info()["BTC"]["state"] == "stale"
+
+        await asyncio.sleep(swr_service.upstream.delay * 3)
+        assert swr_service.upstream.calls == ["bitcoin"]
+        assert swr_service.get_cache_info()["BTC"]["state"] == "fresh"
+        assert await swr_service.aget_current_price("BTC") == 65000.0
+
+    async def test_expired_value_is_fallback_only_until_hard_fail(self, swr_service):
+        swr_service.upstream.fail = True
+        swr_service._price_cache["BTC"] = (60000.0, time.time() - 200)
+        swr_service._price_cache["ETH"] = (3000.0, time.time() - 400)
+
+        assert await swr_service.aget_multiple_prices(["BTC", "ETH"]) == {"BTC": 60000.0, "ETH": None}
+        info = swr_service.get_cache_info()
+        assert (info["BTC"]["state"], info["ETH"]["state"]) == ("expired", "dead")
+        stats = swr_service.get_stats()
+        assert (stats["stale_fallbacks"], stats["hard_failures"]) == (1, 1)
+
+    async def test_refresh_ahead_keeps_reads_fresh(self):
+        service = make_service(cache_ttl=1, refresh_ahead=0.5, max_staleness=5)
+        service.upstream.delay = 0.01
+        try:
+            assert await service.aget_current_price("ETH") == 3200.0
+            await asyncio.sleep(1.5)
+
+            assert await service.aget_current_price("ETH") == 3200.0
+            stats = service.get_stats()
+            assert stats["refreshes"] >= 1
+            assert stats["stale_served"] == 0
+            assert len(service.upstream.calls) >= 2
+        finally:
+            service.close()
+
+
+@pytest.mark.asyncio
+class TestRateGoverned:
+    """CoinGecko budget shared by every call on the service"""
+
+    async def test_429_blocks_upstream_and_serves_last_good_value(self):
+        service = make_service(cache_ttl=60, max_staleness=60, hard_fail_age=600,
+                               governor=RateGovernor(rate=100, burst=5))
+        try:
+            service._price_cache["BTC"] = (60000.0, time.time() - 120)
+            service.upstream.retry_after = "30"
+            assert await service.aget_current_price("BTC") == 60000.0
+
+            # Blocked for 30s: no upstream call, dashboard reads degrade to the cached value
+            service.upstream.retry_after = None
+            assert await service.aget_current_price("BTC", priority=DASHBOARD) == 60000.0
+            assert service.upstream.calls == ["bitcoin"]
+            stats = service.get_stats()
+            assert stats["governor_retry_after_hits"] == 1
+            assert stats["governor_throttled"] == 1
+            assert stats["governor_blocked_for"] > 25
+        finally:
+            service.close()
@@ -0,0 +1,59 @@
+"""
+Tests for the upstream rate governor
+"""
+import asyncio
+import time
+from email.utils import formatdate
+import pytest
+
+from src.rate_governor import BACKGROUND, DASHBOARD, DECISION, RateGovernor, parse_retry_after
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert 25 <= parse_retry_after(formatdate(time.time() + 30, usegmt=True)) <= 30
+    assert parse_retry_after("soon", default=60) == 60
+    assert parse_retry_after(None, default=15) == 15
+
+
+@pytest.mark.asyncio
+class TestRateGovernor:
+    """Budget, priorities and Retry-After"""
+
+    async def test_decision_requests_jump_the_queue(self):
+        governor = RateGovernor(rate=20, burst=1, max_wait={DECISION: 1, DASHBOARD: 1})
+        assert await governor.acquire(DASHBOARD)  # empties the bucket
+
+        order = []
+
+        async def request(priority, name):
+            if await governor.acquire(priority):
+                order.append(name)
+
+        dashboard = [asyncio.ensure_future(request(DASHBOARD, f"dashboard-{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        decision = asyncio.ensure_future(request(DECISION, "decision"))
+        await asyncio.gather(*dashboard, decision)
+
+        assert order == ["decision", "dashboard-0", "dashboard-1"]
+        assert governor.get_stats()["queued_total"] == 3
+
+    async def test_exhausted_budget_throttles(self):
+        governor = RateGovernor(rate=0.1, burst=2, max_wait={DECISION: 0.05})
+        assert await governor.acquire(DECISION)
+        assert await governor.acquire(DECISION)
+
+        assert not await governor.acquire(BACKGROUND)  # never queues
+        assert not await governor.acquire(DECISION)  # queued, gave up
+        stats = governor.get_stats()
+        assert (stats["granted"], stats["throttled"], stats["queued"]) == (2, 2, 0)
+
+    async def test_retry_after_blocks_grants(self):
+        governor = RateGovernor(rate=100, burst=5, max_wait={DECISION: 1})
+        governor.penalize(0.2)
+        assert governor.get_stats()["blocked_for"] > 0
+
+        started = time.perf_counter()
+        assert await governor.acquire(DECISION)
+        assert time.perf_counter() - started >= 0.19
+        assert governor.get_stats()["retry_after_hits"] == 1
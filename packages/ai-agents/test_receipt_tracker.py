@@ -0,0 +1,87 @@
+"""
+Tests for background receipt tracking
+"""
+import asyncio
+import pytest
+
+from src.receipt_tracker import ReceiptTracker
+from test_nonce_manager import FakeMempool, make_manager, sign
+
+
+AGENT = "0x00000000000000000000000000000000000000A1"
+
+
+async def submit_and_track(manager, tracker, user: str, action: str = "BORROW_AND_INVEST"):
+    nonce, tx_hash = await manager.submit(sign, {'gasPrice': 10})
+    return tracker.track(nonce, tx_hash, AGENT, user, action)
+
+
+@pytest.mark.asyncio
+class TestReceiptTracker:
+    """Test hand-off, reconciliation and outcome counts"""
+
+    async def test_outcomes_matched_back_to_decisions(self):
+        chain = FakeMempool()
+        manager = make_manager(chain)
+        outcomes = []
+
+        async def record(tracked):
+            outcomes.append(tracked)
+
+        tracker = ReceiptTracker(manager, on_outcome=record, poll_interval=0.01)
+        chain.revert_nonces = {6}
+        for i in range(3):
+            await submit_and_track(manager, tracker, f"0xUser{i}")
+
+        # Hand-off is immediate: nothing settled yet
+        assert tracker.get_counts() == {"pending": 3, "confirmed": 0, "failed": 0}
+        assert tracker.has_pending("0xuser1")
+
+        chain.mine()
+        await asyncio.wait_for(tracker._task, timeout=1)
+
+        assert tracker.get_counts() == {"pending": 0, "confirmed": 2, "failed": 1}
+        by_user = {t.user_address: t for t in outcomes}
+        assert by_user["0xUser0"].status == "confirmed"
+        assert by_user["0xUser0"].gas_used == 50_005
+        assert by_user["0xUser0"].block_number == 101
+        assert by_user["0xUser1"].status == "failed"
+        assert not tracker.has_pending("0xUser1")
+        assert tracker.get_recent(1)[0]["nonce"] == 7
+
+    async def test_one_nonce_lookup_per_poll(self):
+        chain = FakeMempool()
+        manager = make_manager(chain, max_pending=32)
+        tracker = ReceiptTracker(manager, poll_interval=10)
+        for i in range(20):
+            await submit_and_track(manager, tracker, f"0xUser{i}")
+        await tracker.close()  # drive polls by hand
+
+        lookups_before = chain.count_calls
+        assert await tracker.poll_once() == []
+        assert chain.count_calls - lookups_before == 1
+
+        chain.mine()
+        settled = await tracker.poll_once()
+        assert len(settled) == 20
+        assert chain.count_calls - lookups_before == 2
+
+    async def test_nonce_settled_before_track_is_matched(self):
+        chain = FakeMempool()
+        manager = make_manager(chain)
+        tracker = ReceiptTracker(manager, poll_interval=0.01)
+        await submit_and_track(manager, tracker, "0xUser0")
+        await tracker.close()  # drive the first poll by hand
+
+        # The second tx is mined and polled while its submit() is still committing
+        nonce, tx_hash = await manager.submit(sign, {'gasPrice': 10})
+        chain.mine()
+        assert [t.user_address for t in await tracker.poll_once()] == ["0xUser0"]
+
+        tracked = tracker.track(nonce, tx_hash, AGENT, "0xUser1", "BORROW_AND_INVEST")
+        await asyncio.wait_for(tracker._task, timeout=1)
+
+        assert tracked.status == "confirmed"
+        assert not tracker.has_pending("0xUser1")
+        assert tracker.get_counts() == {"pending": 0, "confirmed": 2, "failed": 0}
+
@@ -0,0 +1,77 @@
+"""
+Tests for the cooldown-aware scheduler
+"""
+import asyncio
+import time
+import pytest
+
+from src.scheduler import CooldownScheduler
+
+
+class TestCooldownScheduler:
+    """Test heap ordering and lazy rescheduling"""
+
+    def test_pop_due_in_order(self):
+        scheduler = CooldownScheduler()
+        scheduler.schedule("0xC", 300)
+        scheduler.schedule("0xA", 100)
+        scheduler.schedule("0xB", 200)
+
+        assert scheduler.next_due() == 100
+        assert scheduler.pop_due(250) == ["0xA", "0xB"]
+        assert len(scheduler) == 1
+        assert "0xC" in scheduler
+
+    def test_reschedule_drops_stale_entry(self):
+        scheduler = CooldownScheduler()
+        scheduler.schedule("0xA", 100)
+        scheduler.schedule("0xA", 500)
+
+        assert scheduler.pop_due(200) == []
+        assert scheduler.next_due() == 500
+        assert scheduler.pop_due(500) == ["0xA"]
+        assert scheduler.next_due() is None
+
+    def test_remove(self):
+        scheduler = CooldownScheduler()
+        scheduler.schedule("0xA", 100)
+        scheduler.remove("0xA")
+
+        assert scheduler.pop_due(1000) == []
+        assert len(scheduler) == 0
+
+    def test_compaction_bounds_heap(self):
+        scheduler = CooldownScheduler()
+        for due_at in range(5000):
+            scheduler.schedule("0xA", due_at)
+
+        assert len(scheduler._heap) < 2000
+        assert scheduler.pop_due(10_000) == ["0xA"]
+
+
+@pytest.mark.asyncio
+class TestCooldownSchedulerWait:
+    """Test the async wakeup"""
+
+    async def test_wait_returns_when_user_due(self):
+        scheduler = CooldownScheduler()
+        scheduler.schedule("0xA", int(time.time()))
+
+        started = time.monotonic()
+        await scheduler.wait(max_wait=5)
+
+        assert time.monotonic() - started < 0.5
+
+    async def test_sooner_user_wakes_waiter(self):
+        scheduler = CooldownScheduler()
+        scheduler.schedule("0xA", int(time.time()) + 60)
+
+        async def add_due_user():
+            await asyncio.sleep(0.05)
+            scheduler.schedule("0xB", int(time.time()))
+
+        started = time.monotonic()
+        await asyncio.gather(scheduler.wait(max_wait=5), add_due_user())
+
+        assert time.monotonic() - started < 1
+        assert scheduler.pop_due() == ["0xB"]
@@ -0,0 +1,292 @@
+"""
+Tests for shard leases and the shared controller nonce across processes
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import time
+import pytest
+
+from src.nonce_manager import NonceManager
+from src.sharding import FileLeaseStore, ShardCoordinator, SharedNonceAllocator, shard_for
+from test_nonce_manager import CONTROLLER, FakeMempool, sign
+
+
+def run_coordinator(directory: str, worker_id: str, num_shards: int):
+    """Worker process body: keep renewing shard leases until killed"""
+    coordinator = ShardCoordinator(
+        FileLeaseStore(directory), num_shards, worker_id, lease_ttl=1.0, renew_interval=0.1
+    )
+    asyncio.run(coordinator.run())
+
+
+def allocate_nonces(directory: str, worker_id: str, count: int, results):
+    """Worker process body: draw `count` nonces from the shared sequence"""
+    async def allocate():
+        allocator = SharedNonceAllocator(FileLeaseStore(directory), CONTROLLER, worker_id)
+        nonces = []
+        for _ in range(count):
+            nonce = await allocator.allocate(0)
+            await allocator.committed(nonce)
+            nonces.append(nonce)
+        return nonces
+
+    results.put(asyncio.run(allocate()))
+
+
+def lease_owners(store: FileLeaseStore, key: str) -> dict:
+    now = time.time()
+    leases = store.read(key).get("leases", {})
+    return {int(shard): lease["owner"] for shard, lease in leases.items() if lease["expires"] > now}
+
+
+def wait_for(condition, timeout: float = 10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_shard_for_is_stable_and_case_insensitive():
+    user = "0xAbCdEf0000000000000000000000000000000001"
+    assert shard_for(user, 8) == shard_for(user.lower(), 8)
+    counts = [0] * 4
+    for i in range(4000):
+        counts[shard_for(f"0x{i:040x}", 4)] += 1
+    assert min(counts) > 800  # roughly even
+
+
+@pytest.mark.asyncio
+class TestShardCoordinator:
+    """Rebalancing between coordinators sharing one store"""
+
+    async def rebalance_all(self, coordinators, rounds: int = 3):
+        for _ in range(rounds):
+            for coordinator in coordinators:
+                await coordinator.rebalance()
+
+    async def test_workers_join_and_leave(self, tmp_path):
+        store = FileLeaseStore(str(tmp_path))
+        workers = [ShardCoordinator(store, 6, f"w{i}") for i in range(2)]
+        await self.rebalance_all(workers)
+        assert [sorted(w.owned) for w in workers] == [[0, 2, 4], [1, 3, 5]]
+
+        # A third worker joins: shards are released first, then taken over
+        workers.append(ShardCoordinator(store, 6, "w2"))
+        await self.rebalance_all(workers)
+        assert [sorted(w.owned) for w in workers] == [[0, 3], [1, 4], [2, 5]]
+
+        users = [f"0x{i:040x}" for i in range(300)]
+        owned = [set(w.owned_users(users)) for w in workers]
+        assert set().union(*owned) == set(users)
+        assert sum(len(o) for o in owned) == len(users)
+
+        # One leaves gracefully: the rest cover its shards immediately
+        await workers[1].leave()
+        remaining = [workers[0], workers[2]]
+        await self.rebalance_all(remaining)
+        assert sorted(remaining[0].owned | remaining[1].owned) == list(range(6))
+        assert not workers[1].owns(users[0])
+
+    async def test_shard_not_taken_while_lease_is_live(self, tmp_path):
+        store = FileLeaseStore(str(tmp_path))
+        first = ShardCoordinator(store, 2, "w0")
+        await first.rebalance()
+        assert first.owned == {0, 1}
+
+        # w1 is assigned shard 1 but must wait until w0 hands it over
+        second = ShardCoordinator(store, 2, "w1")
+        await second.rebalance()
+        assert second.owned == set()
+        await first.rebalance()
+        await second.rebalance()
+        assert (first.owned, second.owned) == ({0}, {1})
+
+
+def test_crashed_worker_shards_move_to_survivors(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    store = FileLeaseStore(str(tmp_path))
+    key = "shards"
+    processes = {
+        f"w{i}": ctx.Process(target=run_coordinator, args=(str(tmp_path), f"w{i}", 6), daemon=True)
+        for i in range(3)
+    }
+    for process in processes.values():
+        process.start()
+
+    try:
+        assert wait_for(lambda: sorted(set(lease_owners(store, key).values())) == ["w0", "w1", "w2"]
+                        and len(lease_owners(store, key)) == 6)
+
+        os.kill(processes["w1"].pid, signal.SIGKILL)  # no graceful leave
+        processes["w1"].join()
+
+        assert wait_for(lambda: set(lease_owners(store, key).values()) == {"w0", "w2"}
+                        and len(lease_owners(store, key)) == 6)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+
+def test_shared_nonce_sequence_across_processes(tmp_path):
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=allocate_nonces, args=(str(tmp_path), f"w{i}", 25, results))
+        for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    nonces = [nonce for _ in processes for nonce in results.get(timeout=30)]
+    for process in processes:
+        process.join()
+
+    assert sorted(nonces) == list(range(100))
+
+
+@pytest.mark.asyncio
+class TestSharedNonceManager:
+    """Two nonce managers on one key (as in two worker processes)"""
+
+    def make_manager(self, chain: FakeMempool, store: FileLeaseStore, worker_id: str) -> NonceManager:
+        return NonceManager(
+            CONTROLLER,
+            chain.get_transaction_count,
+            chain.send_raw_transaction,
+            chain.get_transaction_receipt,
+            allocator=SharedNonceAllocator(store, CONTROLLER, worker_id)
+        )
+
+    async def test_interleaved_submits_do_not_collide(self, tmp_path):
+        chain = FakeMempool()
+        store = FileLeaseStore(str(tmp_path))
+        a = self.make_manager(chain, store, "w0")
+        b = self.make_manager(chain, store, "w1")
+
+        submitted = await asyncio.gather(*(m.submit(sign, {'gasPrice': 10}) for m in (a, b) * 5))
+        assert sorted(nonce for nonce, _ in submitted) == list(range(5, 15))
+
+        chain.mine()
+        assert chain.nonce == 15
+
+    async def test_failed_broadcast_nonce_is_reused_by_other_worker(self, tmp_path):
+        chain = FakeMempool()
+        store = FileLeaseStore(str(tmp_path))
+        a = self.make_manager(chain, store, "w0")
+        b = self.make_manager(chain, store, "w1")
+
+        chain.fail_next_send = True
+        with pytest.raises(ValueError):
+            await a.submit(sign, {'gasPrice': 10})
+        nonce, _ = await b.submit(sign, {'gasPrice': 10})
+
+        assert nonce == 5  # no gap left behind
+
+    async def test_unsettled_claim_of_live_worker_is_not_reissued(self, tmp_path):
+        chain = FakeMempool()
+        store = FileLeaseStore(str(tmp_path))
+        for worker_id in ("w0", "w1"):
+            await ShardCoordinator(store, 2, worker_id).rebalance()  # both heartbeating
+
+        def manager(worker_id, get_transaction_count=chain.get_transaction_count):
+            return NonceManager(
+                CONTROLLER, get_transaction_count, chain.send_raw_transaction, chain.get_transaction_receipt,
+                allocator=SharedNonceAllocator(store, CONTROLLER, worker_id, claim_ttl=0.05, membership="shards")
+            )
+
+        # Slow RPC: w0 holds nonce 5 past claim_ttl before it broadcasts
+        async def slow_sign(nonce, fees):
+            await asyncio.sleep(0.3)
+            return await sign(nonce, fees)
+
+        a, b = manager("w0"), manager("w1")
+        slow = asyncio.create_task(a.submit(slow_sign, {'gasPrice': 10}))
+        await asyncio.sleep(0.15)
+        assert (await b.submit(sign, {'gasPrice': 10}))[0] == 6
+        assert (await slow)[0] == 5
+
+        # Broadcast landed but committed() failed; w1's node does not see w0's tx yet
+        async def store_down(nonce):
+            raise OSError("lease store unavailable")
+
+        async def lagging_count(address, block_identifier):
+            return chain.nonce
+
+        a._allocator.committed = store_down
+        nonce, _ = await a.submit(sign, {'gasPrice': 10})
+        await asyncio.sleep(0.1)
+        lagging = manager("w1", get_transaction_count=lagging_count)
+        assert (await lagging.submit(sign, {'gasPrice': 10}))[0] == nonce + 1
+
+        chain.mine()
+        assert sorted(nonce for nonce, _ in chain.sent) == [5, 6, 7, 8]
+        assert chain.nonce == 9
+
+    async def test_claim_of_dead_worker_is_reissued(self, tmp_path):
+        chain = FakeMempool()
+        store = FileLeaseStore(str(tmp_path))
+        await ShardCoordinator(store, 2, "w1").rebalance()
+        # w0 claimed nonce 5 and died before broadcasting (no heartbeat)
+        await SharedNonceAllocator(store, CONTROLLER, "w0").allocate(5)
+        await asyncio.sleep(0.1)
+
+        b = NonceManager(
+            CONTROLLER, chain.get_transaction_count, chain.send_raw_transaction, chain.get_transaction_receipt,
+            allocator=SharedNonceAllocator(store, CONTROLLER, "w1", claim_ttl=0.05, membership="shards")
+        )
+        assert (await b.submit(sign, {'gasPrice': 10}))[0] == 5
+
+    async def test_claim_of_earlier_run_of_same_worker_is_reissued(self, tmp_path):
+        chain = FakeMempool()
+        store = FileLeaseStore(str(tmp_path))
+        # w0 claimed nonce 5, crashed before broadcasting and restarted under the same id
+        await SharedNonceAllocator(store, CONTROLLER, "w0").allocate(5)
+        await ShardCoordinator(store, 2, "w0").rebalance()
+        await asyncio.sleep(0.1)
+
+        restarted = NonceManager(
+            CONTROLLER, chain.get_transaction_count, chain.send_raw_transaction, chain.get_transaction_receipt,
+            allocator=SharedNonceAllocator(store, CONTROLLER, "w0", claim_ttl=0.05, membership="shards")
+        )
+        assert (await restarted.submit(sign, {'gasPrice': 10}))[0] == 5
+
+    async def test_own_claim_is_reissued_after_failed_release(self, tmp_path):
+        chain = FakeMempool()
+        store = FileLeaseStore(str(tmp_path))
+        await ShardCoordinator(store, 2, "w0").rebalance()
+
+        class StoreGoesDown:
+            def __init__(self):
+                self.down = False
+
+            def read(self, key):
+                return store.read(key)
+
+            def update(self, key, fn):
+                if self.down:
+                    raise OSError("lease store unavailable")
+                return store.update(key, fn)
+
+        flaky = StoreGoesDown()
+        manager = NonceManager(
+            CONTROLLER, chain.get_transaction_count, chain.send_raw_transaction, chain.get_transaction_receipt,
+            allocator=SharedNonceAllocator(flaky, CONTROLLER, "w0", claim_ttl=0.05, membership="shards")
+        )
+
+        # Broadcast fails and the store is down for the release of nonce 5
+        async def sign_during_outage(nonce, fees):
+            flaky.down = True
+            return await sign(nonce, fees)
+
+        chain.fail_next_send = True
+        with pytest.raises(ValueError):
+            await manager.submit(sign_during_outage, {'gasPrice': 10})
+        flaky.down = False
+        await asyncio.sleep(0.1)
+
+        assert (await manager.submit(sign, {'gasPrice': 10}))[0] == 5
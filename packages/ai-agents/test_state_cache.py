@@ -0,0 +1,92 @@
+"""
+Tests for the block-scoped state cache
+"""
+import asyncio
+import pytest
+
+from src.state_cache import BlockStateCache
+
+
+AGENT = "0x00000000000000000000000000000000000000A1"
+
+
+class FakeHead:
+    def __init__(self, block: int = 100):
+        self.block = block
+        self.lookups = 0
+
+    async def __call__(self) -> int:
+        self.lookups += 1
+        await asyncio.sleep(0)
+        return self.block
+
+
+def counting_loader(calls: list, value="state"):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return value
+    return load
+
+
+@pytest.mark.asyncio
+class TestBlockStateCache:
+    """Test block keying, invalidation and sharing between loops"""
+
+    async def test_same_block_reads_hit(self):
+        head = FakeHead()
+        cache = BlockStateCache(head)
+        calls = []
+
+        # Decision loop and risk monitor asking for the same user concurrently
+        results = await asyncio.gather(
+            cache.read(AGENT, "state", "0xUser", counting_loader(calls)),
+            cache.read(AGENT, "state", "0xuser", counting_loader(calls)),
+        )
+        assert results == ["state", "state"]
+        assert len(calls) == 1
+        assert head.lookups == 1  # concurrent head checks share one lookup
+
+        await cache.read(AGENT, "state", "0xUser", counting_loader(calls))
+        assert len(calls) == 1
+        stats = cache.get_stats()
+        assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 1, 1)
+
+    async def test_new_block_and_tx_submission_invalidate(self):
+        head = FakeHead()
+        cache = BlockStateCache(head)
+        calls = []
+
+        await cache.read(AGENT, "prefs", "0xUser", counting_loader(calls))
+        head.block = 101
+        await cache.read(AGENT, "prefs", "0xUser", counting_loader(calls))
+        assert len(calls) == 2
+
+        cache.invalidate("0xUSER")
+        await cache.read(AGENT, "prefs", "0xUser", counting_loader(calls))
+        assert len(calls) == 3
+        assert cache.get_stats()["new_blocks"] == 1
+
+    async def test_read_many_loads_only_misses(self):
+        cache = BlockStateCache(FakeHead())
+        requested = []
+
+        async def load(users):
+            requested.append(list(users))
+            return {user: user.upper() for user in users if user != "0xc"}
+
+        first = await cache.read_many(AGENT, "state", ["0xa", "0xb", "0xc"], load)
+        second = await cache.read_many(AGENT, "state", ["0xa", "0xb", "0xc", "0xd"], load)
+
+        assert first == {"0xa": "0XA", "0xb": "0XB"}
+        assert requested == [["0xa", "0xb", "0xc"], ["0xc", "0xd"]]
+        assert second["0xd"] == "0XD"
+
+    async def test_head_failure_reads_through(self):
+        async def broken_head():
+            raise ConnectionError("rpc down")
+
+        cache = BlockStateCache(broken_head)
+        calls = []
+        assert await cache.read(AGENT, "state", "0xUser", counting_loader(calls)) == "state"
+        assert cache.get_stats()["entries"] == 0
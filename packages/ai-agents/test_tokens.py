@@ -0,0 +1,66 @@
+"""
+Tests for the token registry
+"""
+import pytest
+
+from src.tokens import Token, TokenRegistry
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+WETH_CHECKSUM = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+
+
+class Cfg:
+    WETH_ADDRESS = WETH
+    WBTC_ADDRESS = None
+    MOCK_USDC_ADDRESS = "not-an-address"
+    WETH_DECIMALS = 18
+    WBTC_DECIMALS = 8
+    USDC_DECIMALS = 6
+    EXTRA_TOKENS = "SOL::solana:9, LINK:0x514910771af9ca656af840dff83e8264ecf986ca:chainlink:18"
+
+
+def test_lookups_by_any_address_casing():
+    tokens = TokenRegistry.from_config(Cfg)
+
+    for address in (WETH, WETH_CHECKSUM, WETH.upper().replace("0X", "0x")):
+        assert tokens.symbol_for(address) == "ETH"
+    assert tokens.address_of("ETH") == WETH_CHECKSUM
+    assert tokens.symbol_for("0x" + "0" * 40) is None
+    assert tokens.symbol_for(None) is None
+
+
+def test_config_tokens_and_extras():
+    tokens = TokenRegistry.from_config(Cfg)
+
+    assert tokens.by_symbol("BTC").address is None  # not configured: price-only
+    assert tokens.by_symbol("USDC").address is None  # invalid address ignored
+    assert tokens.by_symbol("SOL") == Token("SOL", None, "solana", 9)
+    assert tokens.symbol_for("0x514910771af9ca656af840dff83e8264ecf986ca") == "LINK"
+    assert dict(tokens.coingecko_ids) == {
+        "ETH": "ethereum", "BTC": "bitcoin", "USDC": "usd-coin", "USDT": "tether",
+        "SOL": "solana", "LINK": "chainlink",
+    }
+
+
+def test_only_eth_and_btc_are_tradable():
+    tokens = TokenRegistry.from_config(Cfg)
+    usdc = Token("USDC", "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48", "usd-coin", 6)
+    with_usdc = TokenRegistry([*tokens, usdc])
+
+    assert tokens.tradable("ETH").address == WETH_CHECKSUM
+    assert tokens.tradable("BTC") is None  # WBTC not configured
+    assert tokens.tradable("LINK") is None  # deployed, but not a trade target
+    assert with_usdc.tradable("USDC") is None
+    assert tokens.tradable("DOGE") is None
+
+
+def test_registry_is_immutable_and_converts_units():
+    tokens = TokenRegistry.from_config(Cfg)
+    with pytest.raises(TypeError):
+        tokens.coingecko_ids["DOGE"] = "dogecoin"
+    with pytest.raises(AttributeError):
+        tokens.by_symbol("ETH").decimals = 6
+
+    usdc = tokens.by_symbol("USDC")
+    assert usdc.to_units(12.34) == 12_340_000
+    assert usdc.from_units(12_340_000) == 12.34
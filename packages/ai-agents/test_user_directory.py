@@ -0,0 +1,121 @@
+"""
+Tests for incremental user enumeration
+"""
+import pytest
+from web3.exceptions import ABIFunctionNotFound
+
+from src.user_directory import UserDirectory
+
+AGENT = "0x00000000000000000000000000000000000a9e17"
+
+
+class FakeAgent:
+    """AIAgent user list with call accounting; users register at a block"""
+
+    def __init__(self, count: int = 0, paginated: bool = True):
+        self.registered = []  # (block, user)
+        self.head = 100
+        self.paginated = paginated
+        self.calls = []
+        for _ in range(count):
+            self.register()
+
+    def register(self):
+        self.head += 1
+        self.registered.append((self.head, f"0x{len(self.registered) + 1:040x}"))
+
+    async def total_users(self):
+        self.calls.append("total")
+        return len(self.registered)
+
+    async def users_page(self, offset, limit):
+        if not self.paginated:
+            raise ABIFunctionNotFound("getUsersPaginated")
+        self.calls.append(("page", offset, limit))
+        users = [user for _, user in self.registered]
+        return users[offset:offset + limit], len(users)
+
+    async def registered_users(self, from_block, to_block):
+        self.calls.append(("logs", from_block, to_block))
+        return [user for block, user in self.registered if from_block <= block <= to_block]
+
+    async def block_number(self):
+        return self.head
+
+    async def all_users(self):
+        self.calls.append("all")
+        return [user for _, user in self.registered]
+
+    def directory(self, **kwargs) -> UserDirectory:
+        return UserDirectory(
+            AGENT,
+            self.total_users,
+            users_page=self.users_page,
+            registered_users=self.registered_users,
+            block_number=self.block_number,
+            all_users=self.all_users,
+            **kwargs
+        )
+
+
+@pytest.mark.asyncio
+class TestUserDirectory:
+    """Tail-only syncs in each discovery mode"""
+
+    async def test_pages_then_tail_only(self):
+        agent = FakeAgent(count=5)
+        directory = agent.directory(page_size=2)
+
+        assert await directory.sync() == [user for _, user in agent.registered]
+        assert agent.calls == ["total", ("page", 0, 2), ("page", 2, 2), ("page", 4, 2)]
+
+        # Unchanged: one call
+        agent.calls.clear()
+        await directory.sync()
+        assert agent.calls == ["total"]
+
+        agent.register()
+        agent.calls.clear()
+        users = await directory.sync()
+        assert agent.calls == ["total", ("page", 5, 2)]
+        assert len(users) == 6
+        stats = directory.get_stats()
+        assert (stats["mode"], stats["users"], stats["lag_users"]) == ("paginated", 6, 0)
+
+    async def test_falls_back_to_events_without_pagination(self):
+        agent = FakeAgent(count=3, paginated=False)
+        directory = agent.directory(start_block=100, log_range=2)
+
+        assert await directory.sync() == [user for _, user in agent.registered]
+        assert directory.mode == "events"
+
+        agent.register()
+        agent.calls.clear()
+        users = await directory.sync()
+        assert agent.calls == ["total", ("logs", 104, 104)]
+        assert users[-1] == agent.registered[-1][1]
+        assert directory.get_stats()["lag_blocks"] == 0
+
+    async def test_event_failure_uses_full_read_for_that_sync(self):
+        agent = FakeAgent(count=2, paginated=False)
+        directory = agent.directory(start_block=100)
+
+        async def broken_logs(from_block, to_block):
+            raise ValueError("query returned more than 10000 results")
+        directory._registered_users = broken_logs
+
+        assert len(await directory.sync()) == 2
+        assert "all" in agent.calls
+        assert directory.mode == "events"
+
+    async def test_restore_seeds_known_users(self):
+        agent = FakeAgent(count=4)
+        first = agent.directory(page_size=10)
+        await first.sync()
+
+        agent.register()
+        second = agent.directory(page_size=10)
+        second.restore(first.export())
+        agent.calls.clear()
+        assert len(await second.sync()) == 5
+        assert agent.calls == ["total", ("page", 4, 10)]
@@ -0,0 +1,102 @@
+"""
+Tests for write-behind batching of Supabase inserts
+"""
+import asyncio
+import pytest
+
+from src.write_queue import WriteBehindQueue
+
+
+class FakeSupabase:
+    """Records bulk inserts; fail_times makes the next N executes raise"""
+
+    def __init__(self, fail_times: int = 0, delay: float = 0.0):
+        self.inserts = []
+        self.fail_times = fail_times
+        self.delay = delay
+
+    def table(self, name):
+        client = self
+
+        class Insert:
+            def __init__(self, rows):
+                self.rows = rows
+
+            def execute(self):
+                import time
+                time.sleep(client.delay)
+                if client.fail_times:
+                    client.fail_times -= 1
+                    raise ConnectionError("supabase unavailable")
+                client.inserts.append((name, list(self.rows)))
+
+        class Table:
+            def insert(self, rows):
+                return Insert(rows)
+
+        return Table()
+
+
+@pytest.mark.asyncio
+class TestWriteBehindQueue:
+    """Test size/time flushing, retries and the bounded backlog"""
+
+    async def test_enqueue_never_waits_and_flushes_in_bulk(self):
+        db = FakeSupabase(delay=0.05)
+        factory_calls = []
+
+        def factory():
+            factory_calls.append(1)
+            return db
+
+        queue = WriteBehindQueue(factory, max_batch=10, flush_interval=60)
+        started = asyncio.get_running_loop().time()
+        for i in range(25):
+            queue.enqueue("agent_decisions", {"i": i})
+        queue.enqueue("risk_reports", {"r": 1})
+        assert asyncio.get_running_loop().time() - started < 0.01
+
+        await queue.close()
+
+        decision_batches = [rows for table, rows in db.inserts if table == "agent_decisions"]
+        assert [len(rows) for rows in decision_batches] == [10, 10, 5]
+        assert [row["i"] for rows in decision_batches for row in rows] == list(range(25))
+        assert ("risk_reports", [{"r": 1}]) in db.inserts
+        assert len(factory_calls) == 1  # one pooled client
+        assert queue.get_stats()["written"] == 26
+
+    async def test_time_threshold_flushes_partial_batch(self):
+        db = FakeSupabase()
+        queue = WriteBehindQueue(lambda: db, max_batch=100, flush_interval=0.05)
+
+        queue.enqueue("agent_states", {"s": 1})
+        await asyncio.sleep(0.2)
+
+        assert db.inserts == [("agent_states", [{"s": 1}])]
+
+    async def test_failed_batch_is_retried(self):
+        db = FakeSupabase(fail_times=2)
+        queue = WriteBehindQueue(lambda: db, max_batch=5, flush_interval=60, max_retries=3, retry_backoff=0.01)
+
+        for i in range(5):
+            queue.enqueue("agent_decisions", {"i": i})
+        await queue.close()
+
+        assert len(db.inserts) == 1
+        assert queue.get_stats()["retries"] == 2
+
+    async def test_backlog_is_bounded_while_database_is_down(self):
+        db = FakeSupabase(fail_times=1000)
+        queue = WriteBehindQueue(lambda: db, max_batch=10, flush_interval=60, max_backlog=20, max_retries=0)
+
+        for i in range(50):
+            queue.enqueue("agent_decisions", {"i": i})
+
+        stats = queue.get_stats()
+        assert stats["backlog"] <= 20
+        assert stats["dropped"] >= 30
+
+        db.fail_times = 0
+        await queue.close()
+        written = [row["i"] for _, rows in db.inserts for row in rows]
+        assert written[-1] == 49  # newest rows survive
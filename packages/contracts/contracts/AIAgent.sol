@@ -554,6 +554,35 @@ contract AIAgent is Ownable, ReentrancyGuard {
         return allUsers;
     }
 
+    /**
+     * @notice Get a page of users in registration order
+     * @dev Users are only ever appended, so callers can fetch just the tail past what they know
+     */
+    function getUsersPaginated(
+        uint256 offset,
+        uint256 limit
+    ) external view returns (address[] memory users, uint256 total) {
+        total = allUsers.length;
+
+        if (offset >= total) {
+            return (new address[](0), total);
+        }
+
+        uint256 end = offset + limit;
+        if (end > total) {
+            end = total;
+        }
+
+        uint256 length = end - offset;
+        users = new address[](length);
+
+        for (uint256 i = 0; i < length; i++) {
+            users[i] = allUsers[offset + i];
+        }
+
+        return (users, total);
+    }
+
     /**
      * @notice Get system-wide statistics
      */
@@ -461,5 +461,40 @@ describe("AIAgent - Multi-User Architecture", function () {
       const [positions, total] = await aiAgent.getUserPositionsPaginated(userA.address, 0, 10);
       expect(total).to.equal(0);  // No positions yet
     });
+
+    it("Should page through users in registration order", async function () {
+      const users = [
+        { signer: userA, amount: COLLATERAL_AMOUNT_A },
+        { signer: userB, amount: COLLATERAL_AMOUNT_B },
+        { signer: userC, amount: COLLATERAL_AMOUNT_C }
+      ];
+
+      for (const user of users) {
+        await rwaToken.connect(user.signer).approve(await aiAgent.getAddress(), user.amount);
+        await aiAgent.connect(user.signer).initializeAgent(
+          await rwaToken.getAddress(),
+          user.amount,
+          {
+            owner: user.signer.address,
+            riskTolerance: 5,
+            targetROI: 1200,
+            maxDrawdown: 1500,
+            strategies: []
+          }
+        );
+      }
+
+      const [firstPage, total] = await aiAgent.getUsersPaginated(0, 2);
+      expect(total).to.equal(3);
+      expect(firstPage).to.deep.equal([userA.address, userB.address]);
+
+      // Tail only
+      const [tail] = await aiAgent.getUsersPaginated(2, 2);
+      expect(tail).to.deep.equal([userC.address]);
+
+      const [pastEnd, sameTotal] = await aiAgent.getUsersPaginated(5, 2);
+      expect(pastEnd).to.have.lengthOf(0);
+      expect(sameTotal).to.equal(3);
+    });
   });
 });